@@ -1,25 +1,29 @@
 import os
+import io
 import csv
+import sys
+import json
+import glob
 import time
-from datetime import datetime
-from src.instance import VRPTWInstance
-from src.branching import BranchAndBoundEngine # <--- 改用 B&P 引擎
+import argparse
+import contextlib
+import multiprocessing as mp
 
 # ==========================================
-# 1. 配置区域 (在这里修改测试列表)
+# 1. 配置区域
 # ==========================================
-TARGET_INSTANCES = [
-    "C101", "C102",
-    "R101", "R102",
-    # "RC101", "RC102" 
-]
-
-# 每个算例的最大运行时间 (秒)
+# 每个算例的 B&P 时间限制 (秒)
 GLOBAL_TIME_LIMIT = 10
 
+# 硬超时 = B&P 时间限制 + 这个余量；超时后直接杀掉 worker 进程
+# (B&P 的时间限制是协作式的，最终 MIP / 单次 CG 可能拖过限制)
+HARD_TIMEOUT_SLACK = 60
+
 # 车辆固定成本 (用于还原纯距离)
 VEHICLE_FIXED_COST = 2000.0
 
+DEFAULT_OUTPUT = "result/benchmark_bnb/results.csv"
+
 # ==========================================
 # 2. Solomon 100 节点 BKS
 # ==========================================
@@ -39,131 +43,210 @@ SOLOMON_BKS = {
     "RC107": (1207.8, 11), "RC108": (1114.2, 10)
 }
 
-def run_benchmark(data_dir="data", output_dir="result/benchmark_bnb"):
-    # 1. 准备输出
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    csv_filename = os.path.join(output_dir, f"bnb_results_{timestamp}.csv")
-    
-    # 2. 定义表头
-    headers = [
-        "Instance", 
-        "Time(s)",
-        "Status",       # Optimal / Feasible / Infeasible
-        "Total_Obj",    # 含固定成本
-        "Pure_Dist",    # 纯距离 (Obj - 2000*k)
-        "BKS_Dist",     # 已知最优距离
-        "Gap_Pct",      # (Pure - BKS)/BKS
-        "Trucks", 
-        "BKS_Trucks"
-    ]
-    
-    results = []
-    
-    print(f"🚀 Starting B&P Benchmark on {len(TARGET_INSTANCES)} instances...")
-    print(f"⏱️  Time Limit per instance: {GLOBAL_TIME_LIMIT}s")
-    print("-" * 80)
+HEADERS = [
+    "Instance",
+    "Customers",
+    "Time(s)",
+    "Status",       # Optimal / TimeLimit / Infeasible / Killed / Crashed
+    "Total_Obj",    # 含固定成本
+    "Pure_Dist",    # 纯距离 (Obj - 2000*k)
+    "BKS_Dist",     # 已知最优距离
+    "Gap_Pct",      # (Pure - BKS)/BKS
+    "Trucks",
+    "BKS_Trucks",
+    "Root_Bound",   # 根节点 LP 值 (含固定成本)
+    "Best_Bound",   # 结束时的全局下界
+    "BnB_Gap_Pct",  # (Total_Obj - Best_Bound)/Total_Obj
+    "Nodes",
+    "Columns",      # 生成的列数 (不含 Big-M 虚拟列)
+]
+
+
+def load_bks(data_dir="data"):
+    """SOLOMON_BKS + data/solomon_bks.json (补充 C2 等)"""
+    bks = dict(SOLOMON_BKS)
+    json_path = os.path.join(data_dir, "solomon_bks.json")
+    if os.path.exists(json_path):
+        with open(json_path) as f:
+            for name, v in json.load(f).items():
+                bks.setdefault(name, (v["distance"], v["vehicles"]))
+    return bks
+
+
+def _fmt(x, digits=2):
+    return round(x, digits) if abs(x) < float('inf') else str(x)
+
+
+def solve_instance(file_path, time_limit, max_customers, queue, lp_backend="gurobi"):
+    """worker 进程：求解一个算例，把结果行放进 queue"""
+    # 放在 worker 里导入，主进程不需要初始化 Gurobi
+    from src.instance import VRPTWInstance
+    from src.branching import BranchAndBoundEngine
+
+    # B&P 的打印全部丢弃，只回传结果
+    with contextlib.redirect_stdout(io.StringIO()):
+        instance = VRPTWInstance(file_path, max_customers=max_customers, verbose=False)
+        engine = BranchAndBoundEngine(instance, verbose=False, lp_backend=lp_backend)
+        start_time = time.perf_counter()
+        final_obj, final_routes = engine.solve(global_time_limit=time_limit)
+        run_time = time.perf_counter() - start_time
+
+    queue.put({
+        "Customers": instance.num_nodes - 1,
+        "Time(s)": round(run_time, 2),
+        "Total_Obj": final_obj,
+        "Trucks": len(final_routes),
+        "Root_Bound": engine.root_bound,
+        "Best_Bound": engine.best_bound,
+        "Nodes": engine.nodes_explored,
+        "Columns": engine.columns_generated,
+    })
+
+
+def _worker(file_path, time_limit, max_customers, queue, lp_backend="gurobi"):
+    try:
+        solve_instance(file_path, time_limit, max_customers, queue, lp_backend)
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def build_row(name, raw, bks):
+    """把 worker 的原始结果整理成 CSV 行"""
+    bks_dist, bks_trucks = bks.get(name, (0, 0))
+    row = {h: "" for h in HEADERS}
+    row.update({"Instance": name, "BKS_Dist": bks_dist or "", "BKS_Trucks": bks_trucks or ""})
+
+    if "status" in raw:  # Killed / Crashed
+        row.update({"Status": raw["status"], "Time(s)": raw.get("Time(s)", "")})
+        return row
+
+    obj = raw["Total_Obj"]
+    row.update({k: raw[k] for k in ("Customers", "Time(s)", "Trucks", "Nodes", "Columns")})
+    row["Root_Bound"] = _fmt(raw["Root_Bound"])
+    row["Best_Bound"] = _fmt(raw["Best_Bound"])
+    if obj == float('inf') or raw["Trucks"] == 0:
+        row.update({"Status": "Infeasible", "Total_Obj": "inf", "Pure_Dist": "inf"})
+        return row
 
-    # 3. 循环运行
-    for name in TARGET_INSTANCES:
-        base_name = os.path.basename(name).split('.')[0]
-        file_path = os.path.join(data_dir, f"{base_name}.txt")
-        
-        if not os.path.exists(file_path):
-            print(f"❌ Error: File not found {file_path}")
-            continue
-            
-        print(f"Running {base_name}...", end=" ", flush=True)
-        
-        try:
-            # --- 加载数据 ---
-            # verbose=False: 关闭详细的列生成日志，只保留关键信息
-            instance = VRPTWInstance(file_path, verbose=False)
-            
-            # --- 初始化 B&P 引擎 ---
-            bnb_engine = BranchAndBoundEngine(instance, verbose=False)
-            
-            # --- 计时开始 ---
-            start_time = time.perf_counter()
-            
-            # 调用 solve，传入时间限制
-            final_obj, final_routes = bnb_engine.solve(global_time_limit=GLOBAL_TIME_LIMIT)
-            
-            end_time = time.perf_counter()
-            run_time = end_time - start_time
-            
-            # --- 数据处理 ---
-            num_trucks = len(final_routes)
-            
-            if final_routes and final_obj < float('inf'):
-                # 成功找到解
-                status = "Optimal" # 或者 Feasible (如果是因为超时停止的)
-                if run_time > GLOBAL_TIME_LIMIT:
-                    status = "TimeLimit"
-                
-                # 计算纯距离
-                pure_dist = final_obj - (num_trucks * VEHICLE_FIXED_COST)
-                
-                # 获取 BKS
-                bks_dist, bks_trucks = SOLOMON_BKS.get(base_name, (0, 0))
-                
-                # 计算 Gap
-                if bks_dist > 0:
-                    gap_pct = (pure_dist - bks_dist) / bks_dist * 100
-                else:
-                    gap_pct = 0.0
-                
-                # 打印单行结果摘要
-                print(f"✅ Done. Dist: {pure_dist:.2f} (Gap: {gap_pct:.2f}%) | Time: {run_time:.2f}s")
-            
-            else:
-                # 无解
-                status = "Infeasible"
-                pure_dist = float('inf')
-                gap_pct = float('inf')
-                bks_dist, bks_trucks = SOLOMON_BKS.get(base_name, (0, 0))
-                print(f"⚠️ No Solution Found.")
-
-            # --- 记录 ---
-            row = {
-                "Instance": base_name,
-                "Time(s)": round(run_time, 2),
-                "Status": status,
-                "Total_Obj": round(final_obj, 2) if final_obj < float('inf') else "inf",
-                "Pure_Dist": round(pure_dist, 2) if pure_dist < float('inf') else "inf",
-                "BKS_Dist": bks_dist,
-                "Gap_Pct": f"{gap_pct:.2f}%" if gap_pct < float('inf') else "inf",
-                "Trucks": num_trucks,
-                "BKS_Trucks": bks_trucks
-            }
-            results.append(row)
-            
-        except Exception as e:
-            print(f"\n❌ Crashed! Error: {e}")
-            import traceback
-            traceback.print_exc()
-
-    # 4. 写入 CSV
-    if results:
-        with open(csv_filename, mode='w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
+    pure_dist = obj - raw["Trucks"] * VEHICLE_FIXED_COST
+    closed = raw["Best_Bound"] >= obj - 1e-4
+    row["Status"] = "Optimal" if closed else "TimeLimit"
+    row["Total_Obj"] = _fmt(obj)
+    row["Pure_Dist"] = _fmt(pure_dist)
+    if bks_dist > 0 and raw["Customers"] == 100:
+        row["Gap_Pct"] = f"{(pure_dist - bks_dist) / bks_dist * 100:.2f}%"
+    if abs(raw["Best_Bound"]) < float('inf'):
+        row["BnB_Gap_Pct"] = f"{max(0.0, obj - raw['Best_Bound']) / obj * 100:.2f}%"
+    return row
+
+
+# 这些状态的行不算完成：断点续跑时重新运行 (新结果追加在后面)
+FAILED_STATUSES = {"Killed", "Crashed"}
+
+
+def load_done(csv_path):
+    """已完成的算例 (断点续跑时跳过)；被杀掉 / 崩溃的算例不算完成"""
+    if not os.path.exists(csv_path):
+        return set()
+    with open(csv_path, newline='') as f:
+        return {r["Instance"] for r in csv.DictReader(f) if r["Status"] not in FAILED_STATUSES}
+
+
+def append_row(csv_path, row):
+    new_file = not os.path.exists(csv_path)
+    with open(csv_path, mode='a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=HEADERS)
+        if new_file:
             writer.writeheader()
-            writer.writerows(results)
-            
-        print("-" * 80)
-        print(f"📊 Benchmark Summary saved to: {csv_filename}")
-        print("-" * 80)
-        
-        # 打印漂亮的控制台表格
-        print(f"{'Instance':<10} {'Dist':<10} {'BKS':<10} {'Gap':<10} {'Time':<10} {'Veh':<5}")
-        print("-" * 60)
-        for r in results:
-            dist_str = str(r['Pure_Dist'])
-            print(f"{r['Instance']:<10} {dist_str:<10} {r['BKS_Dist']:<10} {r['Gap_Pct']:<10} {r['Time(s)']:<10} {r['Trucks']:<5}")
+        writer.writerow(row)
+        f.flush()
+
+
+def run_benchmark(instances=None, data_dir="data", output=DEFAULT_OUTPUT, workers=None,
+                  time_limit=GLOBAL_TIME_LIMIT, hard_timeout=None, max_customers=None, lp_backend="gurobi"):
+    """
+    并行跑全部 Solomon 算例。每个算例一个进程，超过 hard_timeout 直接 kill。
+    结果逐行追加到 output；重新运行时跳过 output 中已有的算例 (Killed / Crashed 的会重跑)。
+    """
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    workers = workers or max(1, (os.cpu_count() or 2) // 2)
+    hard_timeout = hard_timeout or time_limit + HARD_TIMEOUT_SLACK
+    bks = load_bks(data_dir)
+
+    if instances:
+        files = [os.path.join(data_dir, f"{n}.txt") for n in instances]
     else:
-        print("No results generated.")
+        files = sorted(glob.glob(os.path.join(data_dir, "*.txt")))
+    done = load_done(output)
+    todo = [f for f in files if os.path.splitext(os.path.basename(f))[0] not in done]
+
+    print(f"🚀 B&P Benchmark: {len(todo)} to run, {len(files) - len(todo)} already in {output}")
+    print(f"⏱️  Time limit {time_limit}s | hard timeout {hard_timeout}s | {workers} workers")
+    print("-" * 80)
+
+    ctx = mp.get_context("spawn")  # 子进程干净地初始化 Gurobi / pricing_lib
+    pending = list(reversed(todo))
+    running = {}  # name -> (process, queue, start)
+
+    while pending or running:
+        # 1. 补满 worker
+        while pending and len(running) < workers:
+            path = pending.pop()
+            name = os.path.splitext(os.path.basename(path))[0]
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_worker, args=(path, time_limit, max_customers, queue, lp_backend),
+                              daemon=True)
+            proc.start()
+            running[name] = (proc, queue, time.time())
+
+        # 2. 收结果 / 杀超时进程
+        for name in list(running):
+            proc, queue, start = running[name]
+            raw = None
+            if not queue.empty():
+                raw = queue.get()
+                proc.join(5)
+            elif not proc.is_alive():
+                # 进程退出和结果到达之间可能有竞态，再等一下队列
+                try:
+                    raw = queue.get(timeout=1)
+                except Exception:
+                    raw = {"status": "Crashed", "Time(s)": round(time.time() - start, 2)}
+            elif time.time() - start > hard_timeout:
+                proc.kill()
+                proc.join()
+                raw = {"status": "Killed", "Time(s)": round(time.time() - start, 2)}
+            if raw is None:
+                continue
+
+            if "error" in raw:
+                print(f"❌ {name}: {raw['error']}")
+                raw = {"status": "Crashed", "Time(s)": round(time.time() - start, 2)}
+            row = build_row(name, raw, bks)
+            append_row(output, row)
+            del running[name]
+            print(f"{name:<8} {row['Status']:<10} Dist {row['Pure_Dist']!s:<10} Gap {row['Gap_Pct'] or '-':<8} "
+                  f"B&B gap {row['BnB_Gap_Pct'] or '-':<8} Nodes {row['Nodes']!s:<5} Time {row['Time(s)']}s")
+        time.sleep(0.2)
+
+    print("-" * 80)
+    print(f"📊 Results: {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel, resumable B&P benchmark over Solomon instances")
+    parser.add_argument("instances", nargs="*", help="instance names (default: every data/*.txt)")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--time-limit", type=float, default=GLOBAL_TIME_LIMIT)
+    parser.add_argument("--hard-timeout", type=float, default=None)
+    parser.add_argument("--customers", type=int, default=None, help="only use the first N customers")
+    parser.add_argument("--lp-backend", default="gurobi", choices=["gurobi", "highs"])
+    args = parser.parse_args()
+    run_benchmark(args.instances, args.data_dir, args.output, args.workers,
+                  args.time_limit, args.hard_timeout, args.customers, args.lp_backend)
+
 
 if __name__ == "__main__":
-    run_benchmark()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import io
+import sys
+import time
+import random
+import argparse
+import contextlib
+import numpy as np
+from src.instance import VRPTWInstance
+from src.solver import CGSolver
+from src.branching import BranchAndBoundEngine
+
+# ==========================================
+# 增量重优化 benchmark
+#   先用前 N 个客户冷启动求解，然后交替 "加单 (文件里后面的客户) / 取消 (随机一个客户)"。
+#   每个事件之后分别：
+#     incremental: 在原求解器上 add_customer / remove_customer，再从保留下来的列重跑
+#     cold       : 用同样的客户集合从头构建算例、主问题、定价引擎再求解
+#   默认比较根节点 CG (LP 值必须一致)；--bnp 改为比较完整 B&P (带时间限制，目标值只在都证明最优时可比)
+# ==========================================
+DEFAULT_INSTANCES = ["C101", "R101", "RC101", "C201", "R201"]
+
+
+def _quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def _root_cg(solver):
+    ok, obj, _ = solver.solve_with_constraints([])
+    return obj if ok else float("inf")
+
+
+def _cold(customers, capacity, lp_backend, bnp, time_limit):
+    start = time.perf_counter()
+    inst = VRPTWInstance.from_arrays(customers, capacity)
+    if bnp:
+        engine = BranchAndBoundEngine(inst, verbose=False, lp_backend=lp_backend)
+        obj, _ = engine.solve(global_time_limit=time_limit)
+        closed = engine.best_bound >= obj - 1e-4
+        return time.perf_counter() - start, obj, closed, engine.nodes_explored
+    obj = _root_cg(CGSolver(inst, verbose=False, lp_backend=lp_backend))
+    return time.perf_counter() - start, obj, True, 1
+
+
+def run(instance_names, customers, events, lp_backend, bnp, time_limit, seed, data_dir="data"):
+    rng = random.Random(seed)
+    ratios = []
+    mismatches = 0
+    mode = "B&P" if bnp else "root CG"
+    print(f"📊 {mode} | {customers} customers + {events} events | LP backend {lp_backend}")
+    print(f"{'Instance':<9}{'Event':<14}{'Cust':>5}{'Inc(s)':>9}{'Cold(s)':>9}{'Ratio':>8}"
+          f"{'Inc obj':>12}{'Cold obj':>12}{'Cols':>7}")
+    print("-" * 85)
+    for name in instance_names:
+        full = _quiet(VRPTWInstance, f"{data_dir}/{name}.txt", max_customers=customers + events, verbose=False)
+        pool = list(full.customers[customers + 1:])
+        inst = VRPTWInstance.from_arrays(full.customers[:customers + 1], full.vehicle_capacity)
+        if bnp:
+            engine = BranchAndBoundEngine(inst, verbose=False, lp_backend=lp_backend)
+            solver = engine.cg_solver
+            _quiet(engine.solve, global_time_limit=time_limit)
+        else:
+            solver = CGSolver(inst, verbose=False, lp_backend=lp_backend)
+            _root_cg(solver)
+
+        for k in range(events):
+            if k % 2 == 0 and pool:
+                cust = pool.pop(0)
+                label = f"add {cust.id}"
+                do = (engine.add_customer if bnp else solver.add_customer, cust)
+            else:
+                node = rng.randrange(1, inst.num_nodes)
+                label = f"remove {inst.customers[node].id}"
+                do = (engine.remove_customer if bnp else solver.remove_customer, node)
+
+            start = time.perf_counter()
+            _quiet(*do)
+            if bnp:
+                obj = _quiet(engine.solve, global_time_limit=time_limit)[0]
+                closed = engine.best_bound >= obj - 1e-4
+            else:
+                obj, closed = _quiet(_root_cg, solver), True
+            t_inc = time.perf_counter() - start
+
+            t_cold, cold_obj, cold_closed, _ = _quiet(_cold, list(inst.customers), inst.vehicle_capacity,
+                                                       lp_backend, bnp, time_limit)
+            ratios.append(t_inc / t_cold)
+            flag = ""
+            if closed and cold_closed and abs(obj - cold_obj) > 1e-4 * max(1.0, abs(cold_obj)):
+                mismatches += 1
+                flag = "  ❌"
+            print(f"{name:<9}{label:<14}{inst.num_nodes - 1:>5}{t_inc:>9.3f}{t_cold:>9.3f}{t_inc / t_cold:>8.2f}"
+                  f"{obj:>12.2f}{cold_obj:>12.2f}{solver.master.num_columns:>7}{flag}")
+
+    print("-" * 85)
+    print(f"Median latency ratio (incremental / cold): {float(np.median(ratios)):.2f} over {len(ratios)} events")
+    print(f"Objective mismatches: {mismatches}")
+    return 1 if mismatches else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental re-optimization vs cold re-solve")
+    parser.add_argument("instances", nargs="*", default=DEFAULT_INSTANCES)
+    parser.add_argument("--customers", type=int, default=40, help="customers in the initial solve")
+    parser.add_argument("--events", type=int, default=6, help="alternating add / remove events")
+    parser.add_argument("--lp-backend", default="gurobi", choices=["gurobi", "highs"])
+    parser.add_argument("--bnp", action="store_true", help="compare full B&P instead of the root CG")
+    parser.add_argument("--time-limit", type=float, default=30.0, help="B&P time limit per solve (--bnp)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    return run(args.instances, args.customers, args.events, args.lp_backend, args.bnp, args.time_limit, args.seed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
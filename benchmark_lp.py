@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from src.instance import VRPTWInstance
+from src.solver import CGSolver
+
+# ==========================================
+# 主问题 LP 后端对比 (gurobi vs highs)
+#   同一算例上跑根节点 CG + 若干个禁止弧子节点 (改变列界限后重解)，
+#   统计每次 master.solve() (LP 热启动重解) 的耗时
+# ==========================================
+DEFAULT_BACKENDS = ["gurobi", "highs"]
+
+
+def _timed(fn, times):
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        out = fn(*args, **kwargs)
+        times.append(time.perf_counter() - t0)
+        return out
+    return wrapper
+
+
+def run_backend(instance, backend, num_children):
+    cg = CGSolver(instance, verbose=False, lp_backend=backend)
+    lp_times = []
+    cg.master.solve = _timed(cg.master.solve, lp_times)
+
+    t0 = time.perf_counter()
+    _, root_obj, routes = cg.solve_with_constraints([])
+    # 子节点：依次禁止根节点分数解中的弧，之后回到根节点 (整列改界限 + 热启动重解)
+    arcs = sorted({(r.path[k], r.path[k + 1]) for r in routes if r.val < 1 - 1e-6
+                   for k in range(1, len(r.path) - 2)})
+    for arc in arcs[:num_children]:
+        cg.solve_with_constraints([arc])
+    cg.solve_with_constraints([])
+    total = time.perf_counter() - t0
+
+    return {
+        "root_obj": root_obj,
+        "columns": cg.master.num_columns - cg.master.num_dummies,
+        "solves": len(lp_times),
+        "lp_total": sum(lp_times),
+        "lp_median_ms": float(np.median(lp_times)) * 1000,
+        "lp_p95_ms": float(np.percentile(lp_times, 95)) * 1000,
+        "cg_total": total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare master LP backends on the CG re-solve loop")
+    parser.add_argument("instances", nargs="*", default=["C101", "R101", "RC101"])
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--customers", type=int, default=30, help="only use the first N customers")
+    parser.add_argument("--children", type=int, default=10, help="number of forbidden-arc child nodes")
+    parser.add_argument("--backends", nargs="+", default=DEFAULT_BACKENDS)
+    args = parser.parse_args()
+
+    print(f"{'Instance':<10}{'Backend':<8}{'RootLP':>12}{'Cols':>7}{'Solves':>8}"
+          f"{'LP(s)':>8}{'Med(ms)':>9}{'P95(ms)':>9}{'CG(s)':>8}")
+    print("-" * 79)
+    for name in args.instances:
+        instance = VRPTWInstance(os.path.join(args.data_dir, f"{name}.txt"),
+                                 max_customers=args.customers, verbose=False)
+        for backend in args.backends:
+            r = run_backend(instance, backend, args.children)
+            print(f"{name:<10}{backend:<8}{r['root_obj']:>12.2f}{r['columns']:>7}{r['solves']:>8}"
+                  f"{r['lp_total']:>8.3f}{r['lp_median_ms']:>9.3f}{r['lp_p95_ms']:>9.3f}{r['cg_total']:>8.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
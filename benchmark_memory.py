@@ -0,0 +1,89 @@
+import sys
+import math
+import time
+import argparse
+import resource
+import multiprocessing as mp
+import numpy as np
+
+# ==========================================
+# 大算例内存占用 benchmark：稠密距离矩阵 vs 稀疏 (CSR 候选弧 + 坐标现算)
+#   按 Solomon R 类的规则随机生成 N 个客户的算例 (坐标范围随 sqrt(N) 放大，保持客户密度)，
+#   每个 (N, 模式) 在单独的 spawn 进程里依次构建 算例 -> ProblemData -> LabelingSolver (BucketGraph)，
+#   报告每一步之后的常驻内存 (相对 import 之后) 和峰值内存
+# ==========================================
+DEFAULT_SIZES = [1000, 2000, 5000]
+
+
+def make_customers(n, seed=0):
+    """随机算例：depot 在中心，需求 1-50 (容量 200)，服务时间 10，时间窗宽 60 且保证单独服务可行"""
+    from src.instance import Customer
+
+    rng = np.random.default_rng(seed)
+    side = 100.0 * math.sqrt(n / 100.0)
+    horizon = int(10 * side)
+    depot = Customer(0, side / 2, side / 2, 0, 0, horizon, 0)
+    customers = [depot]
+    for k in range(1, n + 1):
+        x, y = rng.integers(0, int(side) + 1, size=2)
+        d0 = math.hypot(x - depot.x, y - depot.y)
+        latest = max(int(horizon - 2 * d0 - 10 - 60), int(math.ceil(d0)))
+        tw_a = int(rng.integers(int(math.ceil(d0)), latest + 1))
+        customers.append(Customer(k, float(x), float(y), int(rng.integers(1, 51)), tw_a, tw_a + 60, 10))
+    return customers
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+
+
+def _measure(n, sparse, queue):
+    import pricing_lib
+    from src.instance import VRPTWInstance
+    from src.pricing import build_problem_data
+
+    customers = make_customers(n)
+    base = _rss_mb()
+    start = time.perf_counter()
+    inst = VRPTWInstance.from_arrays(customers, 200, sparse=sparse)
+    rss_inst = _rss_mb() - base
+    data = build_problem_data(inst)
+    rss_data = _rss_mb() - base
+    solver = pricing_lib.LabelingSolver(data, 10.0)
+    rss_solver = _rss_mb() - base
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - base
+    arcs = sum(len(a) for a in data.neighbors)
+    queue.put((rss_inst, rss_data, rss_solver, peak, elapsed, arcs))
+
+
+def measure(n, sparse):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_measure, args=(n, sparse, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory footprint of dense vs sparse (CSR) instance storage")
+    parser.add_argument("sizes", nargs="*", type=int, default=DEFAULT_SIZES, help="number of customers")
+    parser.add_argument("--modes", nargs="+", default=["dense", "sparse"], choices=["dense", "sparse"])
+    args = parser.parse_args()
+
+    print("📊 RSS in MB relative to the interpreter after imports")
+    print(f"{'N':>6}{'Mode':>8}{'Instance':>10}{'+Data':>10}{'+Solver':>10}{'Peak':>10}{'Arcs':>9}{'Time(s)':>9}")
+    print("-" * 72)
+    for n in args.sizes:
+        for mode in args.modes:
+            rss_inst, rss_data, rss_solver, peak, elapsed, arcs = measure(n, mode == "sparse")
+            print(f"{n:>6}{mode:>8}{rss_inst:>10.1f}{rss_data:>10.1f}{rss_solver:>10.1f}{peak:>10.1f}"
+                  f"{arcs:>9}{elapsed:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import platform
+import numpy as np
+import pricing_lib
+from src.recording import load_snapshots
+
+# ==========================================
+# 定价引擎 micro-benchmark
+#   record : 跑一遍 B&P，把每次定价调用的输入录制到 .npz
+#   run    : 轮流回放录制的调用 --rounds 轮，报告每次调用 (取各轮最小值) 的 median / p95，并和本机的 baseline 比较
+#            (各轮 median 的相对极差作为噪声带；本机没有 baseline 时先生成一份)
+#   compare: 同一批调用分别用一维支配 (每节点一个 label 列表) 和二维 (时间 × 载重) 支配桶回放，
+#            核对两者返回的列一致，并报告每类算例的加速比；--simd 改为对比标量 / AVX2 支配内核，
+#            --preprocess 改为对比原始数据 / 时间窗收紧 + 删弧后的数据，--warm 改为对比冷启动 / label 热启动，
+#            --fixed 改为对比浮点 / 定点资源引擎 (另报告 label 池的峰值内存)
+# ==========================================
+SNAPSHOT_DIR = "result/pricing_bench"
+BASELINE_FILE = os.path.join(SNAPSHOT_DIR, "baseline.json")
+# 全部 100 个客户、HiGHS 30 秒的 B&P：三个算例都会分支，root / tree 两类调用都有
+# (C101 在根节点就得到整数解，没有 tree 调用，所以 C 类用 C102)
+DEFAULT_INSTANCES = ["C102", "R101", "RC101"]
+# 二维支配桶对比用的快照 (C1 / R1 窗口窄、C2 / R2 窗口宽)
+COMPARE_DIR = os.path.join(SNAPSHOT_DIR, "compare")
+COMPARE_INSTANCES = ["C101", "R101", "C201", "R201"]
+
+# median 比 baseline 慢超过 (这个比例 + 噪声带) 视为回归
+REGRESSION_TOLERANCE = 0.10
+
+
+def machine_id():
+    """baseline 按机器分开存：CPU 型号 / 核数 / 支配内核 (绝对耗时只在同一台机器上可比)"""
+    model = platform.processor() or platform.machine()
+    try:
+        with open("/proc/cpuinfo") as f:
+            model = next(line.split(":", 1)[1].strip() for line in f if line.startswith("model name"))
+    except (OSError, StopIteration):
+        pass
+    return f"{model} | {os.cpu_count()} cpus | {pricing_lib.simd_level()}"
+
+
+def record(instances, max_customers, time_limit, data_dir="data", output_dir=SNAPSHOT_DIR, lp_backend="gurobi"):
+    from src.instance import VRPTWInstance
+    from src.branching import BranchAndBoundEngine
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name in instances:
+        instance = VRPTWInstance(os.path.join(data_dir, f"{name}.txt"), max_customers=max_customers, verbose=False)
+        engine = BranchAndBoundEngine(instance, verbose=False, lp_backend=lp_backend)
+        tag = f"{name}_{instance.num_nodes - 1}"
+        recorder = engine.cg_solver.start_recording(tag)
+        engine.solve(global_time_limit=time_limit)
+        path = os.path.join(output_dir, f"{tag}.npz")
+        recorder.save(path)
+        print(f"Recorded {len(recorder)} pricing calls -> {path}")
+
+
+def replay(path, repeat=3):
+    """
+    回放一个快照文件。每次调用重复 repeat 次取最小值 (去掉调度噪声)。
+    Returns: {category: [seconds per call]}，category 为 root (无禁止弧) / tree (有禁止弧)
+    """
+    data, snapshots, name = load_snapshots(path)
+    solvers = {}
+    times = {"root": [], "tree": []}
+    for snap in snapshots:
+        step = snap["bucket_step"]
+        if step not in solvers:
+            solvers[step] = pricing_lib.LabelingSolver(data, step)
+        solver = solvers[step]
+        solver.arc_limit = snap["arc_limit"]
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            solver.solve_arrays(snap["duals"], snap["forbidden_arcs"], snap["limit"], snap["max_per_customer"])
+            best = min(best, time.perf_counter() - t0)
+        times["tree" if snap["forbidden_arcs"] else "root"].append(best)
+    return name, times
+
+
+def _scalar_solver(data, step):
+    solver = pricing_lib.LabelingSolver(data, step)
+    solver.use_simd = False
+    return solver
+
+
+def _warm_solver(data, step):
+    solver = pricing_lib.LabelingSolver(data, step)
+    solver.warm_start = True
+    return solver
+
+
+def compare(snapshot_dir=COMPARE_DIR, repeat=3, load_buckets=4, time_cells=16, simd=False, preprocess=False,
+            warm=False, fixed=0):
+    """
+    两种引擎逐调用对比，返回值非 0 表示两者返回的列不一致。
+    默认: 一维 vs 二维支配桶；simd: 标量 vs AVX2 支配内核；
+    preprocess: 原始数据 vs 时间窗收紧 + 删弧后的数据；
+    warm: 冷启动 vs label 热启动 (按录制顺序连续调用，repeat 固定为 1，否则热启动会拿到同一组对偶)；
+    fixed > 0: 浮点 vs 定点引擎 (时间缩放 fixed 倍)
+    """
+    files = sorted(glob.glob(os.path.join(snapshot_dir, "*.npz")))
+    if not files:
+        print(f"No snapshots in {snapshot_dir}. Run "
+              f"`python benchmark_pricing.py record --instances {' '.join(COMPARE_INSTANCES)} "
+              f"--output-dir {snapshot_dir}` first.")
+        return 1
+
+    prep = {}
+    if warm:
+        repeat = 1
+        names = ("Cold", "Warm")
+        make = lambda data, step: (pricing_lib.LabelingSolver(data, step), _warm_solver(data, step))
+    elif preprocess:
+        names = ("Raw", "Prep")
+        make = lambda data, step: (pricing_lib.LabelingSolver(data, step),
+                                   pricing_lib.LabelingSolver(prep["data"], step))
+    elif fixed:
+        names = ("Float", "Fixed")
+        make = lambda data, step: (pricing_lib.LabelingSolver(data, step),
+                                   pricing_lib.LabelingSolver(data, step, fixed_point=fixed))
+    elif simd:
+        if pricing_lib.simd_level() == "scalar":
+            print("CPU lacks AVX2: both engines run the scalar kernel.")
+        names = ("Scalar", "AVX2")
+        make = lambda data, step: (_scalar_solver(data, step), pricing_lib.LabelingSolver(data, step))
+    else:
+        print(f"load_buckets={load_buckets}, time_cells={time_cells}")
+        names = ("1D", "2D")
+        make = lambda data, step: (pricing_lib.LabelingSolver(data, step),
+                                   pricing_lib.LabelingSolver(data, step, load_buckets, time_cells))
+
+    mismatches = []
+    a_name, b_name = names
+    print(f"{'Snapshot':<16}{'Calls':>7}{a_name + '(ms)':>12}{b_name + '(ms)':>12}{'Speedup':>9}"
+          f"{'Dom share':>11}{'Checks ' + a_name:>16}{'Checks ' + b_name:>14}")
+    print("-" * 97)
+    for path in files:
+        data, snapshots, name = load_snapshots(path)
+        if preprocess:
+            prep["data"] = load_snapshots(path)[0]
+            rep = pricing_lib.preprocess(prep["data"])
+            print(f"{name}: tw_start {rep.tw_start_tightened} / tw_end {rep.tw_end_tightened} tightened, "
+                  f"arcs {rep.arcs_before} -> {rep.arcs_after} (capacity {rep.removed_capacity}, "
+                  f"time {rep.removed_time}, triangle {rep.removed_triangle}, tightened {rep.removed_tightened})")
+        solvers = {}
+        t1, t2 = [], []
+        checks1 = checks2 = 0
+        dom_time = total_time = 0.0
+        peak_bytes = [0, 0]
+        for k, snap in enumerate(snapshots):
+            step = snap["bucket_step"]
+            if step not in solvers:
+                solvers[step] = make(data, step)
+            args = (snap["duals"], snap["forbidden_arcs"], snap["limit"], snap["max_per_customer"])
+            results = []
+            for solver, times in zip(solvers[step], (t1, t2)):
+                solver.arc_limit = snap["arc_limit"]
+                best = float("inf")
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    res = solver.solve_arrays(*args)
+                    best = min(best, time.perf_counter() - t0)
+                times.append(best)
+                results.append(res)
+            a, b = results
+            # 热启动下等 RC 的 label 谁先进支配集不同，同价列的路径可能不同，只比较 reduced cost；
+            # 定点引擎按取整后的成本排序，RC 相同 (只差浮点噪声) 的列先后顺序可能不同，同样只比较 reduced cost
+            same_paths = warm or fixed or np.array_equal(a["nodes"], b["nodes"])
+            same_rc = len(a["reduced_costs"]) == len(b["reduced_costs"]) and np.allclose(a["reduced_costs"], b["reduced_costs"])
+            if not (same_paths and same_rc):
+                mismatches.append(f"{name}#{k}")
+            st_a, st_b = solvers[step][0].stats, solvers[step][1].stats
+            checks1 += st_a.dominance_checks
+            checks2 += st_b.dominance_checks
+            dom_time += st_a.time_dominance
+            total_time += st_a.time_total
+            for s, solver in enumerate(solvers[step]):
+                peak_bytes[s] = max(peak_bytes[s], solver.stats.peak_pool * solver.label_bytes)
+
+        m1, m2 = float(np.median(t1)) * 1000, float(np.median(t2)) * 1000
+        share = dom_time / max(total_time, 1e-12)
+        print(f"{name:<16}{len(snapshots):>7}{m1:>12.3f}{m2:>12.3f}{m1 / max(m2, 1e-9):>8.2f}x"
+              f"{share:>10.0%}{checks1:>16}{checks2:>14}")
+        if fixed:
+            fa, fb = solvers[step]
+            print(f"{'  label pool':<16}{'':>7}{peak_bytes[0] / 2**20:>12.2f}{peak_bytes[1] / 2**20:>12.2f}"
+                  f"{peak_bytes[0] / max(peak_bytes[1], 1):>8.2f}x  (peak MB, {fa.label_bytes} vs {fb.label_bytes} B/label)")
+        if warm:
+            # 根节点后半段 (tailing-off) 的调用
+            root = [k for k, snap in enumerate(snapshots) if not snap["forbidden_arcs"]]
+            late = root[len(root) // 2:]
+            if late:
+                c, w = sum(t1[k] for k in late) * 1000, sum(t2[k] for k in late) * 1000
+                print(f"{'  late root':<16}{len(late):>7}{c:>12.3f}{w:>12.3f}{c / max(w, 1e-9):>8.2f}x  (total ms)")
+
+    if mismatches:
+        print(f"\n{len(mismatches)} call(s) returned different columns: {', '.join(mismatches[:10])}")
+        return 1
+    return 0
+
+
+def run(snapshot_dir=SNAPSHOT_DIR, repeat=1, rounds=5, save_baseline=False, tolerance=REGRESSION_TOLERANCE):
+    """
+    全部快照轮流回放 rounds 轮 (轮次交错，每个快照的各轮分散在整个运行期间)，每次调用取 rounds × repeat 次的最小值，
+    每类调用报告这些最小值的 median / p95。各轮 median 的相对极差 (max / min - 1) 是这次测量的噪声带，
+    baseline 里同样保存一份；median 超过 baseline × (1 + tolerance + 两者噪声带的较大值) 才算回归。
+    baseline.json 以 machine_id() 为键，本机没有记录 (或 save_baseline) 时把这次结果存为本机的 baseline。
+    """
+    files = sorted(glob.glob(os.path.join(snapshot_dir, "*.npz")))
+    if not files:
+        print(f"No snapshots in {snapshot_dir}. Run `python benchmark_pricing.py record` first.")
+        return 1
+
+    machines = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            machines = json.load(f)
+    machine = machine_id()
+    baseline = {} if save_baseline else machines.get(machine, {})
+    print(f"Machine: {machine}" + ("" if baseline else " (no baseline yet, this run becomes the baseline)"))
+
+    # per_round[path][r] = (name, {kind: [seconds per call]})
+    per_round = {path: [] for path in files}
+    for _ in range(rounds):
+        for path in files:
+            per_round[path].append(replay(path, repeat))
+
+    results = {}
+    regressions = []
+    print(f"{'Snapshot':<16}{'Kind':<6}{'Calls':>7}{'Median(ms)':>12}{'P95(ms)':>10}{'Noise':>8}{'Base(ms)':>10}  Status")
+    print("-" * 80)
+    for path in files:
+        name = per_round[path][0][0]
+        for kind in ("root", "tree"):
+            samples = np.array([times[kind] for _, times in per_round[path]]) * 1000
+            if samples.size == 0:
+                continue
+            key = f"{name}/{kind}"
+            best = samples.min(axis=0)
+            median = float(np.median(best))
+            p95 = float(np.percentile(best, 95))
+            round_medians = np.median(samples, axis=1)
+            noise = float(round_medians.max() / round_medians.min() - 1)
+            results[key] = {"calls": len(best), "median_ms": median, "p95_ms": p95, "noise": noise}
+
+            status, base_str = "", "-"
+            if key in baseline:
+                base = baseline[key]["median_ms"]
+                base_str = f"{base:.3f}"
+                band = tolerance + max(noise, baseline[key].get("noise", 0.0))
+                if median > base * (1 + band):
+                    status = f"REGRESSION (+{(median / base - 1) * 100:.0f}% > {band * 100:.0f}%)"
+                    regressions.append(key)
+                else:
+                    status = "ok"
+            print(f"{name:<16}{kind:<6}{len(best):>7}{median:>12.3f}{p95:>10.3f}{noise:>7.0%}{base_str:>10}  {status}")
+
+    if save_baseline or not baseline:
+        machines[machine] = results
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(machines, f, indent=2)
+        print(f"\nBaseline for this machine saved to {BASELINE_FILE}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pricing engine micro-benchmark (record / replay)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_rec = sub.add_parser("record", help="run B&P and record every pricing call")
+    p_rec.add_argument("--instances", nargs="+", default=DEFAULT_INSTANCES)
+    p_rec.add_argument("--customers", type=int, default=None, help="only use the first N customers")
+    p_rec.add_argument("--time", type=float, default=30.0, help="B&P time limit per instance (s)")
+    p_rec.add_argument("--lp-backend", default="gurobi", help="master LP backend (gurobi / highs)")
+    p_rec.add_argument("--output-dir", default=SNAPSHOT_DIR)
+
+    p_run = sub.add_parser("run", help="replay recorded calls and compare against the baseline")
+    p_run.add_argument("--repeat", type=int, default=1, help="runs per call within a round")
+    p_run.add_argument("--rounds", type=int, default=5,
+                       help="interleaved replays of all snapshots (each call keeps its best time, "
+                            "the spread of per-round medians is the noise band)")
+    p_run.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    p_run.add_argument("--save-baseline", action="store_true")
+
+    p_cmp = sub.add_parser("compare", help="replay recorded calls with 1D and 2D (time x load) dominance")
+    p_cmp.add_argument("--snapshot-dir", default=COMPARE_DIR)
+    p_cmp.add_argument("--simd", action="store_true", help="compare the scalar and AVX2 dominance kernels instead")
+    p_cmp.add_argument("--warm", action="store_true", help="compare cold solves against label warm start instead")
+    p_cmp.add_argument("--preprocess", action="store_true",
+                       help="compare raw data against time-window tightening + arc elimination instead")
+    p_cmp.add_argument("--fixed", type=int, nargs="?", const=10000, default=0, metavar="SCALE",
+                       help="compare the floating-point and fixed-point engines instead (time scale, default 10000)")
+    p_cmp.add_argument("--repeat", type=int, default=3)
+    p_cmp.add_argument("--load-buckets", type=int, default=4)
+    p_cmp.add_argument("--time-cells", type=int, default=16)
+
+    args = parser.parse_args()
+    if args.cmd == "record":
+        record(args.instances, args.customers, args.time, output_dir=args.output_dir, lp_backend=args.lp_backend)
+        return 0
+    if args.cmd == "compare":
+        return compare(args.snapshot_dir, repeat=args.repeat, load_buckets=args.load_buckets,
+                       time_cells=args.time_cells, simd=args.simd, preprocess=args.preprocess, warm=args.warm,
+                       fixed=args.fixed)
+    return run(repeat=args.repeat, rounds=args.rounds, save_baseline=args.save_baseline, tolerance=args.tolerance)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
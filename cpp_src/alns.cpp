@@ -0,0 +1,386 @@
+#include "alns.h"
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+#include <limits>
+#include <numeric>
+
+namespace {
+const double INF = std::numeric_limits<double>::infinity();
+
+// 破坏/修复算子的自适应权重 (Ropke & Pisinger 2006)
+const double SCORE_GLOBAL_BEST = 33.0;
+const double SCORE_IMPROVED = 9.0;
+const double SCORE_ACCEPTED = 13.0;
+const double REACTION = 0.1;
+const int SEGMENT_LENGTH = 100;
+
+int roulette(const std::vector<double>& weights, std::mt19937& rng) {
+    std::discrete_distribution<int> dist(weights.begin(), weights.end());
+    return dist(rng);
+}
+}
+
+ALNSSolver::ALNSSolver(ProblemData p_data, double p_vehicle_fixed_cost, unsigned int seed)
+    : data(p_data), vehicle_fixed_cost(p_vehicle_fixed_cost), rng(seed),
+      local_search(p_data, p_vehicle_fixed_cost) {
+    // 反向近邻表: predecessors[u] = { w | u 在 neighbors[w] 中 }
+    predecessors.resize(data.num_nodes);
+    for (int w = 0; w < data.num_nodes; ++w) {
+        for (int u : data.neighbors[w]) {
+            if (u != w) predecessors[u].push_back(w);
+        }
+    }
+}
+
+bool ALNSSolver::is_feasible(const TimeSeq& s) const {
+    return s.time_warp < 1e-6 && s.load <= data.vehicle_capacity;
+}
+
+// =======================
+// 解的维护
+// =======================
+void ALNSSolver::set_routes(const std::vector<std::vector<int>>& rs) {
+    routes.clear();
+    for (const auto& r : rs) {
+        if (r.size() > 2) routes.push_back(r);
+    }
+    route_of.assign(data.num_nodes, -1);
+    pos_of.assign(data.num_nodes, -1);
+    prefix.assign(routes.size(), {});
+    suffix.assign(routes.size(), {});
+    touched.assign(routes.size(), 0);
+    for (int r = 0; r < (int)routes.size(); ++r) update_route(r);
+}
+
+void ALNSSolver::update_route(int r) {
+    const std::vector<int>& nodes = routes[r];
+    int L = (int)nodes.size();
+    prefix[r].resize(L);
+    suffix[r].resize(L);
+    prefix[r][0] = TimeSeq::single(data, nodes[0]);
+    for (int k = 1; k < L; ++k) {
+        prefix[r][k] = TimeSeq::concat(data, prefix[r][k - 1], TimeSeq::single(data, nodes[k]));
+    }
+    suffix[r][L - 1] = TimeSeq::single(data, nodes[L - 1]);
+    for (int k = L - 2; k >= 0; --k) {
+        suffix[r][k] = TimeSeq::concat(data, TimeSeq::single(data, nodes[k]), suffix[r][k + 1]);
+    }
+    for (int k = 1; k < L - 1; ++k) {
+        route_of[nodes[k]] = r;
+        pos_of[nodes[k]] = k;
+    }
+}
+
+void ALNSSolver::remove_customer(int u) {
+    int r = route_of[u];
+    if (r < 0) return;
+    routes[r].erase(routes[r].begin() + pos_of[u]);
+    touched[r] = 1;
+    route_of[u] = -1;
+    pos_of[u] = -1;
+    update_route(r);
+    removed.push_back(u);
+}
+
+double ALNSSolver::total_cost() const {
+    double cost = 0.0;
+    for (int r = 0; r < (int)routes.size(); ++r) {
+        if (routes[r].size() <= 2) continue;
+        cost += prefix[r].back().distance + vehicle_fixed_cost;
+    }
+    return cost;
+}
+
+void ALNSSolver::educate_touched() {
+    // 只对本轮破坏/修复改动过的路径做局部搜索，其余路径保持不变
+    std::vector<std::vector<int>> kept, changed;
+    for (int r = 0; r < (int)routes.size(); ++r) {
+        if (routes[r].size() <= 2) continue;
+        (touched[r] ? changed : kept).push_back(routes[r]);
+    }
+    for (auto& r : local_search.improve(changed, 20)) kept.push_back(std::move(r));
+    set_routes(kept);
+}
+
+std::vector<std::vector<int>> ALNSSolver::export_routes() const {
+    std::vector<std::vector<int>> result;
+    for (const auto& r : routes) {
+        if (r.size() > 2) result.push_back(r);
+    }
+    return result;
+}
+
+// =======================
+// 破坏算子
+// =======================
+void ALNSSolver::random_removal(int q) {
+    std::vector<int> routed;
+    for (int u = 1; u < data.num_nodes; ++u) {
+        if (route_of[u] >= 0) routed.push_back(u);
+    }
+    std::shuffle(routed.begin(), routed.end(), rng);
+    for (int k = 0; k < q && k < (int)routed.size(); ++k) remove_customer(routed[k]);
+}
+
+void ALNSSolver::worst_removal(int q) {
+    // 按删除节省的距离排序，带随机扰动地挑选
+    std::vector<std::pair<double, int>> savings;
+    auto d = [this](int i, int j) { return data.dist(i, j); };
+    for (int u = 1; u < data.num_nodes; ++u) {
+        int r = route_of[u];
+        if (r < 0) continue;
+        int prev = routes[r][pos_of[u] - 1];
+        int next = routes[r][pos_of[u] + 1];
+        savings.push_back({d(prev, u) + d(u, next) - d(prev, next), u});
+    }
+    std::sort(savings.begin(), savings.end(), std::greater<std::pair<double, int>>());
+
+    std::uniform_real_distribution<double> unif(0.0, 1.0);
+    for (int k = 0; k < q && !savings.empty(); ++k) {
+        int idx = (int)(std::pow(unif(rng), 3.0) * savings.size());
+        remove_customer(savings[idx].second);
+        savings.erase(savings.begin() + idx);
+    }
+}
+
+void ALNSSolver::related_removal(int q) {
+    // 从随机种子出发，沿近邻表扩展，移除地理上相关的一簇客户
+    std::vector<int> routed;
+    for (int u = 1; u < data.num_nodes; ++u) {
+        if (route_of[u] >= 0) routed.push_back(u);
+    }
+    if (routed.empty()) return;
+    std::uniform_int_distribution<int> pick(0, (int)routed.size() - 1);
+
+    int start = (int)removed.size();
+    remove_customer(routed[pick(rng)]);
+    for (int k = start; k < (int)removed.size() && (int)removed.size() - start < q; ++k) {
+        for (int v : data.neighbors[removed[k]]) {
+            if ((int)removed.size() - start >= q) break;
+            if (v != 0 && route_of[v] >= 0) remove_customer(v);
+        }
+    }
+    // 近邻簇不够大时补随机移除
+    int rest = q - ((int)removed.size() - start);
+    if (rest > 0) random_removal(rest);
+}
+
+void ALNSSolver::route_removal(int q) {
+    // 移除一整条较短的路径 (两条随机路径里取短的)，有助于减少车辆数
+    if (routes.empty()) return;
+    std::uniform_int_distribution<int> pick(0, (int)routes.size() - 1);
+    int a = pick(rng), b = pick(rng);
+    int r = (routes[a].size() <= routes[b].size()) ? a : b;
+    std::vector<int> customers(routes[r].begin() + 1, routes[r].end() - 1);
+    for (int u : customers) remove_customer(u);
+    int rest = q - (int)customers.size();
+    if (rest > 0) related_removal(rest);
+}
+
+// =======================
+// 修复算子
+// =======================
+double ALNSSolver::insertion_delta(int u, int r, int pos) const {
+    // u 插到路径 r 的位置 pos 之后
+    TimeSeq s = TimeSeq::concat(data, TimeSeq::concat(data, prefix[r][pos], TimeSeq::single(data, u)), suffix[r][pos + 1]);
+    if (!is_feasible(s)) return INF;
+    double old_dist = prefix[r].back().distance;
+    double delta = s.distance - old_dist;
+    if (routes[r].size() <= 2) delta += vehicle_fixed_cost;
+    return delta;
+}
+
+bool ALNSSolver::best_insertion(int u, int& best_r, int& best_pos, double& best_delta) const {
+    best_delta = INF;
+    best_r = -1;
+    best_pos = -1;
+
+    // 1. 只看近邻附近的位置：u 插到后继候选 v 之前，或前驱候选 w 之后
+    auto consider = [&](int r, int pos) {
+        double delta = insertion_delta(u, r, pos);
+        if (delta < best_delta) {
+            best_delta = delta;
+            best_r = r;
+            best_pos = pos;
+        }
+    };
+    for (int v : data.neighbors[u]) {
+        if (v != 0 && route_of[v] >= 0) consider(route_of[v], pos_of[v] - 1);
+    }
+    for (int w : predecessors[u]) {
+        if (w != 0 && route_of[w] >= 0) consider(route_of[w], pos_of[w]);
+    }
+
+    // 2. 近邻位置全都不可行时，扫描全部位置
+    if (best_r < 0) {
+        for (int r = 0; r < (int)routes.size(); ++r) {
+            for (int pos = 0; pos + 1 < (int)routes[r].size(); ++pos) {
+                double delta = insertion_delta(u, r, pos);
+                if (delta < best_delta) {
+                    best_delta = delta;
+                    best_r = r;
+                    best_pos = pos;
+                }
+            }
+        }
+    }
+
+    // 3. 新开一辆车
+    auto d = [this](int i, int j) { return data.dist(i, j); };
+    double new_route = vehicle_fixed_cost + d(0, u) + d(u, 0);
+    if (new_route < best_delta) {
+        best_delta = new_route;
+        best_r = (int)routes.size();
+        best_pos = 0;
+    }
+    return best_r >= 0;
+}
+
+void ALNSSolver::insert_customer(int u, int r, int pos) {
+    if (r == (int)routes.size()) {
+        routes.push_back({0, u, 0});
+        prefix.emplace_back();
+        suffix.emplace_back();
+        touched.push_back(1);
+    } else {
+        touched[r] = 1;
+        routes[r].insert(routes[r].begin() + pos + 1, u);
+    }
+    update_route(r);
+}
+
+void ALNSSolver::greedy_repair(bool hardest_first) {
+    if (hardest_first) {
+        // 时间窗最窄、需求最大的客户优先
+        std::sort(removed.begin(), removed.end(), [&](int a, int b) {
+            double wa = data.tw_end[a] - data.tw_start[a];
+            double wb = data.tw_end[b] - data.tw_start[b];
+            if (wa != wb) return wa < wb;
+            return data.demands[a] > data.demands[b];
+        });
+    } else {
+        std::shuffle(removed.begin(), removed.end(), rng);
+    }
+
+    for (int u : removed) {
+        int r, pos;
+        double delta;
+        best_insertion(u, r, pos, delta);
+        insert_customer(u, r, pos);
+    }
+    removed.clear();
+}
+
+// =======================
+// 主循环
+// =======================
+std::vector<std::vector<int>> ALNSSolver::solve(
+    double time_limit,
+    const std::vector<std::vector<int>>& initial_routes,
+    int max_iterations) {
+
+    auto start = std::chrono::steady_clock::now();
+    auto elapsed = [&]() {
+        return std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+    };
+    int n = data.num_nodes - 1;
+    iterations = 0;
+    if (n <= 0) return {};
+
+    // 1. 初始解：给定路径 + 贪心插入未覆盖的客户
+    removed.clear();
+    set_routes(initial_routes);
+    for (int u = 1; u < data.num_nodes; ++u) {
+        if (route_of[u] < 0) removed.push_back(u);
+    }
+    greedy_repair(true);
+    set_routes(local_search.improve(export_routes(), 50));
+
+    std::vector<std::vector<int>> current = export_routes();
+    double current_cost = total_cost();
+    std::vector<std::vector<int>> best = current;
+    best_cost = current_cost;
+
+    // 2. 模拟退火初温：初始时距离变差 1% 的解以 50% 概率被接受
+    //    (只看距离部分，车辆固定成本会把温度抬得过高)
+    double init_dist = current_cost - vehicle_fixed_cost * (double)routes.size();
+    double t0 = std::max(0.01 * init_dist / std::log(2.0), 1e-3);
+    std::uniform_real_distribution<double> unif(0.0, 1.0);
+    int q_min = std::min(n, 4);
+    int q_max = std::max(q_min, std::min(40, (int)(0.2 * n)));
+    std::uniform_int_distribution<int> pick_q(q_min, q_max);
+
+    std::vector<double> destroy_w(4, 1.0), repair_w(2, 1.0);
+    std::vector<double> destroy_score(4, 0.0), repair_score(2, 0.0);
+    std::vector<int> destroy_used(4, 0), repair_used(2, 0);
+
+    while (elapsed() < time_limit && (max_iterations < 0 || iterations < max_iterations)) {
+        ++iterations;
+        int di = roulette(destroy_w, rng);
+        int ri = roulette(repair_w, rng);
+        int q = pick_q(rng);
+
+        switch (di) {
+            case 0: random_removal(q); break;
+            case 1: worst_removal(q); break;
+            case 2: related_removal(q); break;
+            default: route_removal(q); break;
+        }
+        greedy_repair(ri == 1);
+        educate_touched();
+        double cost = total_cost();
+
+        // 指数降温，结束时降到初温的 1%
+        double progress = std::min(elapsed() / time_limit, 1.0);
+        if (max_iterations > 0) progress = std::max(progress, (double)iterations / max_iterations);
+        double temperature = t0 * std::pow(0.01, progress);
+        double score = 0.0;
+        if (cost < best_cost - 1e-6) {
+            // 新的全局最优：先用局部搜索打磨
+            set_routes(local_search.improve(export_routes(), 200));
+            cost = total_cost();
+            best = export_routes();
+            best_cost = cost;
+            current = best;
+            current_cost = cost;
+            score = SCORE_GLOBAL_BEST;
+        } else if (cost < current_cost - 1e-6) {
+            current = export_routes();
+            current_cost = cost;
+            score = SCORE_IMPROVED;
+        } else if (unif(rng) < std::exp(-(cost - current_cost) / temperature)) {
+            current = export_routes();
+            current_cost = cost;
+            score = SCORE_ACCEPTED;
+        } else {
+            set_routes(current);
+        }
+
+        destroy_score[di] += score;
+        repair_score[ri] += score;
+        destroy_used[di]++;
+        repair_used[ri]++;
+
+        // 3. 每个分段结束时更新算子权重
+        if (iterations % SEGMENT_LENGTH == 0) {
+            for (int k = 0; k < 4; ++k) {
+                if (destroy_used[k] > 0)
+                    destroy_w[k] = (1 - REACTION) * destroy_w[k] + REACTION * destroy_score[k] / destroy_used[k];
+                destroy_w[k] = std::max(destroy_w[k], 0.05);
+                destroy_score[k] = 0.0;
+                destroy_used[k] = 0;
+            }
+            for (int k = 0; k < 2; ++k) {
+                if (repair_used[k] > 0)
+                    repair_w[k] = (1 - REACTION) * repair_w[k] + REACTION * repair_score[k] / repair_used[k];
+                repair_w[k] = std::max(repair_w[k], 0.05);
+                repair_score[k] = 0.0;
+                repair_used[k] = 0;
+            }
+        }
+    }
+
+    set_routes(best);
+    return best;
+}
@@ -0,0 +1,69 @@
+#ifndef ALNS_H
+#define ALNS_H
+
+#include <vector>
+#include <random>
+#include "pricing_engine.h"
+#include "local_search.h"
+
+// 大规模算例的元启发式模式：自适应大邻域搜索 (ALNS)
+// - 破坏算子：随机移除、最差移除、相关 (近邻) 移除、整路径移除
+// - 修复算子：贪心插入 (随机顺序 / 困难客户优先)，插入可行性用 TimeSeq 前后缀 O(1) 判断
+// - 接受准则：模拟退火；新的全局最优解再用 LocalSearch 打磨
+class ALNSSolver {
+public:
+    ALNSSolver(ProblemData p_data, double p_vehicle_fixed_cost = 0.0, unsigned int seed = 0);
+
+    // 输出格式与定价引擎一致: 每条路径 [0, ..., 0]
+    // max_iterations < 0 表示只受 time_limit (秒) 限制
+    std::vector<std::vector<int>> solve(
+        double time_limit,
+        const std::vector<std::vector<int>>& initial_routes = {},
+        int max_iterations = -1
+    );
+
+    double get_best_cost() const { return best_cost; }
+    int get_iterations() const { return iterations; }
+
+private:
+    ProblemData data;
+    double vehicle_fixed_cost;
+    std::mt19937 rng;
+    LocalSearch local_search;
+    std::vector<std::vector<int>> predecessors;  // 近邻表的反向表
+
+    // 当前工作解
+    std::vector<std::vector<int>> routes;
+    std::vector<std::vector<TimeSeq>> prefix;  // prefix[r][k] = 路径 r 的 0..k
+    std::vector<std::vector<TimeSeq>> suffix;  // suffix[r][k] = 路径 r 的 k..end
+    std::vector<int> route_of;
+    std::vector<int> pos_of;
+    std::vector<int> removed;
+    std::vector<char> touched;  // 本轮被破坏/修复改动过的路径
+
+    double best_cost = 0.0;
+    int iterations = 0;
+
+    void set_routes(const std::vector<std::vector<int>>& rs);
+    void update_route(int r);
+    void remove_customer(int u);
+    double total_cost() const;
+    bool is_feasible(const TimeSeq& s) const;
+
+    // 破坏算子
+    void random_removal(int q);
+    void worst_removal(int q);
+    void related_removal(int q);
+    void route_removal(int q);
+
+    // 修复算子
+    void greedy_repair(bool hardest_first);
+    bool best_insertion(int u, int& best_r, int& best_pos, double& best_delta) const;
+    double insertion_delta(int u, int r, int pos) const;
+    void insert_customer(int u, int r, int pos);
+
+    void educate_touched();
+    std::vector<std::vector<int>> export_routes() const;
+};
+
+#endif
@@ -1,9 +1,24 @@
 // cpp_src/bind.cpp
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h> // 必须包含！负责 vector <-> list 转换
+#include <pybind11/numpy.h>
 #include "pricing_engine.h"
+#include "local_search.h"
+#include "alns.h"
+#include "route_eval.h"
+#include "dominance_simd.h"
+#include "preprocess.h"
+#include "enumeration.h"
 namespace py = pybind11;
 
+// [新增] 把 std::vector 的所有权移交给 NumPy 数组 (零拷贝)
+template <typename T>
+py::array_t<T> to_numpy(std::vector<T>&& vec) {
+    auto* owned = new std::vector<T>(std::move(vec));
+    py::capsule owner(owned, [](void* p) { delete reinterpret_cast<std::vector<T>*>(p); });
+    return py::array_t<T>(owned->size(), owned->data(), owner);
+}
+
 PYBIND11_MODULE(pricing_lib, m) {
     m.doc() = "High-performance VRP Pricing Engine (C++17)";
 
@@ -20,14 +35,232 @@ PYBIND11_MODULE(pricing_lib, m) {
         .def_readwrite("dist_matrix", &ProblemData::dist_matrix)
         .def_readwrite("time_matrix", &ProblemData::time_matrix)
         .def_readwrite("neighbors", &ProblemData::neighbors)
+        .def_readwrite("xs", &ProblemData::xs)
+        .def_readwrite("ys", &ProblemData::ys)
+        .def_property_readonly("sparse", &ProblemData::sparse)
         .def_readwrite("ng_neighbor_lists", &ProblemData::ng_neighbor_lists);
+    // [新增] 定价返回的列 (路径 + 引擎算好的成本/资源)
+    py::class_<Column>(m, "Column")
+        .def_readonly("path", &Column::path)
+        .def_readonly("reduced_cost", &Column::reduced_cost)
+        .def_readonly("distance", &Column::distance)
+        .def_readonly("duration", &Column::duration)
+        .def_readonly("load", &Column::load);
+
+    // [新增] 每次 solve 的统计信息
+    py::class_<SolveStats>(m, "SolveStats")
+        .def_readonly("labels_created", &SolveStats::labels_created)
+        .def_readonly("labels_extended", &SolveStats::labels_extended)
+        .def_readonly("dominated_forward", &SolveStats::dominated_forward)
+        .def_readonly("dominated_backward", &SolveStats::dominated_backward)
+        .def_readonly("ng_rejected", &SolveStats::ng_rejected)
+        .def_readonly("tw_rejected", &SolveStats::tw_rejected)
+        .def_readonly("capacity_rejected", &SolveStats::capacity_rejected)
+        .def_readonly("forbidden_skipped", &SolveStats::forbidden_skipped)
+        .def_readonly("dominance_checks", &SolveStats::dominance_checks)
+        .def_readonly("cells_skipped", &SolveStats::cells_skipped)
+        .def_readonly("seeded_labels", &SolveStats::seeded_labels)
+        .def_readonly("seed_skipped", &SolveStats::seed_skipped)
+        .def_readonly("graph_arcs", &SolveStats::graph_arcs)
+        .def_readonly("peak_pool", &SolveStats::peak_pool)
+        .def_readonly("depot_candidates", &SolveStats::depot_candidates)
+        .def_readonly("columns_returned", &SolveStats::columns_returned)
+        .def_readonly("timed_out", &SolveStats::timed_out)
+        .def_readonly("bucket_histogram", &SolveStats::bucket_histogram)
+        .def_readonly("time_setup", &SolveStats::time_setup)
+        .def_readonly("time_extension", &SolveStats::time_extension)
+        .def_readonly("time_dominance", &SolveStats::time_dominance)
+        .def_readonly("time_collection", &SolveStats::time_collection)
+        .def_readonly("time_total", &SolveStats::time_total)
+        .def("to_dict", [](const SolveStats& s) {
+            py::dict d;
+            d["labels_created"] = s.labels_created;
+            d["labels_extended"] = s.labels_extended;
+            d["dominated_forward"] = s.dominated_forward;
+            d["dominated_backward"] = s.dominated_backward;
+            d["ng_rejected"] = s.ng_rejected;
+            d["tw_rejected"] = s.tw_rejected;
+            d["capacity_rejected"] = s.capacity_rejected;
+            d["forbidden_skipped"] = s.forbidden_skipped;
+            d["dominance_checks"] = s.dominance_checks;
+            d["cells_skipped"] = s.cells_skipped;
+            d["seeded_labels"] = s.seeded_labels;
+            d["seed_skipped"] = s.seed_skipped;
+            d["graph_arcs"] = s.graph_arcs;
+            d["peak_pool"] = s.peak_pool;
+            d["depot_candidates"] = s.depot_candidates;
+            d["columns_returned"] = s.columns_returned;
+            d["timed_out"] = s.timed_out;
+            d["time_setup"] = s.time_setup;
+            d["time_extension"] = s.time_extension;
+            d["time_dominance"] = s.time_dominance;
+            d["time_collection"] = s.time_collection;
+            d["time_total"] = s.time_total;
+            return d;
+        }, "Scalar counters and timers as a dict (without the bucket histogram)");
+
     // 2. 绑定 LabelingSolver 类
     py::class_<LabelingSolver>(m, "LabelingSolver")
-        .def(py::init<ProblemData, double>(), 
-             py::arg("data"), py::arg("bucket_step"))
+        .def(py::init<ProblemData, double, int, int, int>(), 
+             py::arg("data"), py::arg("bucket_step"), py::arg("load_buckets") = 0, py::arg("time_cells") = 16,
+             py::arg("fixed_point") = 0)
         // [修改] 绑定新的 solve 签名
         .def("solve", &LabelingSolver::solve, 
              py::arg("duals"),
              py::arg("forbidden_arcs") = std::vector<std::pair<int, int>>(), // 默认参数为空
-             "Solve ESPPRC with duals and optional forbidden arcs");
+             py::arg("max_columns") = 1000,
+             py::arg("max_per_customer") = 0,
+             py::arg("time_limit") = -1.0,
+             "Solve ESPPRC with duals and optional forbidden arcs")
+        .def("solve_columns", &LabelingSolver::solve_columns,
+             py::arg("duals"),
+             py::arg("forbidden_arcs") = std::vector<std::pair<int, int>>(),
+             py::arg("max_columns") = 1000,
+             py::arg("max_per_customer") = 0,
+             py::arg("time_limit") = -1.0,
+             "Same as solve, but return Column objects with reduced cost, distance and resources")
+        // [新增] 扁平 NumPy 数组形式: nodes / offsets / reduced_costs / distances / durations / loads
+        .def("solve_arrays",
+             [](LabelingSolver& self, const std::vector<double>& duals,
+                const std::vector<std::pair<int, int>>& forbidden_arcs,
+                int max_columns, int max_per_customer, double time_limit) {
+                 ColumnBatch batch;
+                 {
+                     py::gil_scoped_release release;
+                     batch = self.solve_batch(duals, forbidden_arcs, max_columns, max_per_customer, time_limit);
+                 }
+                 py::dict out;
+                 out["nodes"] = to_numpy(std::move(batch.nodes));
+                 out["offsets"] = to_numpy(std::move(batch.offsets));
+                 out["reduced_costs"] = to_numpy(std::move(batch.reduced_costs));
+                 out["distances"] = to_numpy(std::move(batch.distances));
+                 out["durations"] = to_numpy(std::move(batch.durations));
+                 out["loads"] = to_numpy(std::move(batch.loads));
+                 out["timed_out"] = self.get_stats().timed_out;
+                 return out;
+             },
+             py::arg("duals"),
+             py::arg("forbidden_arcs") = std::vector<std::pair<int, int>>(),
+             py::arg("max_columns") = 1000,
+             py::arg("max_per_customer") = 0,
+             py::arg("time_limit") = -1.0,
+             "Solve and return columns as flat NumPy arrays (path k = nodes[offsets[k]:offsets[k+1]])")
+        .def_property_readonly("stats", [](const LabelingSolver& self) { return self.get_stats(); },
+             "SolveStats of the most recent solve (copy)")
+        .def_property("arc_limit", &LabelingSolver::get_arc_limit, &LabelingSolver::set_arc_limit,
+             "> 0: keep only the arc_limit lowest reduced-cost arcs per customer, rebuilt from the duals on every solve")
+        .def_property("warm_start", &LabelingSolver::get_warm_start, &LabelingSolver::set_warm_start,
+             "Seed each solve with the previous solve's labels re-costed under the new duals")
+        .def_property("use_simd", &LabelingSolver::get_use_simd, &LabelingSolver::set_use_simd,
+             "Use the AVX2 dominance kernels (ignored when the CPU lacks AVX2)")
+        .def_property_readonly("fixed_point", &LabelingSolver::get_fixed_point,
+             "Time scale of the fixed-point engine (int32 times, int64 costs; heuristic, dominance on rounded times may miss columns); 0 = floating-point engine")
+        .def_property_readonly("label_bytes", &LabelingSolver::label_bytes,
+             "sizeof(Label) of the active engine");
+
+    // 3. 绑定 LocalSearch (整数解改进)
+    py::class_<LocalSearch>(m, "LocalSearch")
+        .def(py::init<ProblemData, double>(),
+             py::arg("data"), py::arg("vehicle_fixed_cost") = 0.0)
+        .def("improve", &LocalSearch::improve,
+             py::arg("routes"),
+             py::arg("max_iterations") = 1000,
+             "Improve a set of [0, ..., 0] routes with relocate / exchange / 2-opt* / SWAP*");
+
+    // 4. 绑定 ALNSSolver (大规模算例的元启发式模式)
+    py::class_<ALNSSolver>(m, "ALNSSolver")
+        .def(py::init<ProblemData, double, unsigned int>(),
+             py::arg("data"), py::arg("vehicle_fixed_cost") = 0.0, py::arg("seed") = 0)
+        .def("solve", &ALNSSolver::solve,
+             py::arg("time_limit"),
+             py::arg("initial_routes") = std::vector<std::vector<int>>(),
+             py::arg("max_iterations") = -1,
+             py::call_guard<py::gil_scoped_release>(),
+             "Run ALNS for time_limit seconds and return the best [0, ..., 0] routes")
+        .def_property_readonly("best_cost", &ALNSSolver::get_best_cost)
+        .def_property_readonly("iterations", &ALNSSolver::get_iterations);
+
+    // 5. 批量路径评估 (主问题加列 / 整数阶段 / 结果校验)
+    py::class_<RouteEval>(m, "RouteEval")
+        .def_readonly("distance", &RouteEval::distance)
+        .def_readonly("reduced_cost", &RouteEval::reduced_cost)
+        .def_readonly("duration", &RouteEval::duration)
+        .def_readonly("load", &RouteEval::load)
+        .def_readonly("feasible", &RouteEval::feasible);
+    m.def("evaluate_routes", &evaluate_routes,
+          py::arg("data"), py::arg("routes"),
+          py::arg("duals") = std::vector<double>(),
+          "Evaluate [0, ..., 0] routes: distance, reduced cost (without fixed cost), load, end time, feasibility");
+
+    // 6. 运行时检测到的支配检查指令集
+    m.def("simd_level", &simd_level, "Dominance kernel instruction set detected at runtime: 'avx2' or 'scalar'");
+
+    // 7. 时间窗收紧 + 删弧预处理
+    py::class_<PreprocessReport>(m, "PreprocessReport")
+        .def_readonly("rounds", &PreprocessReport::rounds)
+        .def_readonly("tw_start_tightened", &PreprocessReport::tw_start_tightened)
+        .def_readonly("tw_end_tightened", &PreprocessReport::tw_end_tightened)
+        .def_readonly("tw_width_before", &PreprocessReport::tw_width_before)
+        .def_readonly("tw_width_after", &PreprocessReport::tw_width_after)
+        .def_readonly("arcs_before", &PreprocessReport::arcs_before)
+        .def_readonly("removed_capacity", &PreprocessReport::removed_capacity)
+        .def_readonly("removed_time", &PreprocessReport::removed_time)
+        .def_readonly("removed_triangle", &PreprocessReport::removed_triangle)
+        .def_readonly("removed_tightened", &PreprocessReport::removed_tightened)
+        .def_readonly("arcs_after", &PreprocessReport::arcs_after)
+        .def("to_dict", [](const PreprocessReport& r) {
+            py::dict d;
+            d["rounds"] = r.rounds;
+            d["tw_start_tightened"] = r.tw_start_tightened;
+            d["tw_end_tightened"] = r.tw_end_tightened;
+            d["tw_width_before"] = r.tw_width_before;
+            d["tw_width_after"] = r.tw_width_after;
+            d["arcs_before"] = r.arcs_before;
+            d["removed_capacity"] = r.removed_capacity;
+            d["removed_time"] = r.removed_time;
+            d["removed_triangle"] = r.removed_triangle;
+            d["removed_tightened"] = r.removed_tightened;
+            d["arcs_after"] = r.arcs_after;
+            return d;
+        });
+    m.def("preprocess", &preprocess_problem,
+          py::arg("data"), py::arg("max_rounds") = 20,
+          "Tighten tw_start / tw_end in place and drop arcs that no feasible route can use from data.neighbors");
+
+    // 8. [新增] 小 gap 节点的路径枚举
+    py::class_<RouteEnumerator>(m, "RouteEnumerator")
+        .def(py::init<ProblemData>(), py::arg("data"))
+        .def("enumerate",
+             [](RouteEnumerator& self, const std::vector<double>& duals, double gap,
+                const std::vector<std::pair<int, int>>& forbidden_arcs,
+                int max_routes, long long max_labels, double time_limit) {
+                 EnumerationResult res;
+                 {
+                     py::gil_scoped_release release;
+                     res = self.enumerate(duals, gap, forbidden_arcs, max_routes, max_labels, time_limit);
+                 }
+                 py::dict out;
+                 out["nodes"] = to_numpy(std::move(res.routes.nodes));
+                 out["offsets"] = to_numpy(std::move(res.routes.offsets));
+                 out["reduced_costs"] = to_numpy(std::move(res.routes.reduced_costs));
+                 out["distances"] = to_numpy(std::move(res.routes.distances));
+                 out["durations"] = to_numpy(std::move(res.routes.durations));
+                 out["loads"] = to_numpy(std::move(res.routes.loads));
+                 out["complete"] = res.complete;
+                 out["labels"] = res.labels;
+                 out["pruned_bound"] = res.pruned_bound;
+                 out["dominated"] = res.dominated;
+                 out["bound_buckets"] = res.bound_buckets;
+                 out["time_bound"] = res.time_bound;
+                 out["time_total"] = res.time_total;
+                 return out;
+             },
+             py::arg("duals"),
+             py::arg("gap"),
+             py::arg("forbidden_arcs") = std::vector<std::pair<int, int>>(),
+             py::arg("max_routes") = 20000,
+             py::arg("max_labels") = 2000000,
+             py::arg("time_limit") = -1.0,
+             "Enumerate every elementary route with reduced cost <= gap (cheapest route per customer set), "
+             "as flat NumPy arrays; complete=False when a limit was hit");
 }
\ No newline at end of file
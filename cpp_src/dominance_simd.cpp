@@ -0,0 +1,345 @@
+#include "dominance_simd.h"
+
+#if defined(__x86_64__) || defined(_M_X64)
+#define DOM_HAS_X86 1
+#include <immintrin.h>
+#ifdef _MSC_VER
+#include <intrin.h>
+#define DOM_TARGET_AVX2
+#else
+// 只给 AVX2 内核打开指令集，其余代码保持默认目标，运行时按 CPU 分派
+#define DOM_TARGET_AVX2 __attribute__((target("avx2")))
+#endif
+#else
+#define DOM_HAS_X86 0
+#endif
+
+static const double DOM_EPS = 1e-6;
+
+// =======================
+// DomSoA
+// =======================
+template <class R>
+void DomSoAT<R>::clear() {
+    cost.clear();
+    time.clear();
+    load.clear();
+    for (auto& m : mask) m.clear();
+    index.clear();
+}
+
+template <class R>
+void DomSoAT<R>::push(const LabelT<R>& L, int label_idx) {
+    cost.push_back(L.cost);
+    time.push_back(L.time);
+    load.push_back((typename R::load_t)L.load);
+    for (int k = 0; k < 4; ++k) mask[k].push_back(L.visited_mask.bits[k]);
+    index.push_back(label_idx);
+}
+
+template <class R>
+void DomSoAT<R>::remove(size_t pos) {
+    const size_t last = index.size() - 1;
+    if (pos != last) {
+        cost[pos] = cost[last];
+        time[pos] = time[last];
+        load[pos] = load[last];
+        for (auto& m : mask) m[pos] = m[last];
+        index[pos] = index[last];
+    }
+    cost.pop_back();
+    time.pop_back();
+    load.pop_back();
+    for (auto& m : mask) m.pop_back();
+    index.pop_back();
+}
+
+template struct DomSoAT<FloatRes>;
+template struct DomSoAT<FixedRes>;
+
+// =======================
+// CPU 检测
+// =======================
+static bool detect_avx2() {
+#if DOM_HAS_X86 && defined(_MSC_VER)
+    int info[4];
+    __cpuid(info, 0);
+    if (info[0] < 7) return false;
+    __cpuid(info, 1);
+    const bool osxsave = (info[2] & (1 << 27)) != 0;
+    const bool avx = (info[2] & (1 << 28)) != 0;
+    if (!osxsave || !avx) return false;
+    if ((_xgetbv(0) & 0x6) != 0x6) return false; // OS 保存 YMM 寄存器
+    __cpuidex(info, 7, 0);
+    return (info[1] & (1 << 5)) != 0;
+#elif DOM_HAS_X86
+    __builtin_cpu_init();
+    return __builtin_cpu_supports("avx2");
+#else
+    return false;
+#endif
+}
+
+bool simd_available() {
+    static const bool available = detect_avx2();
+    return available;
+}
+
+const char* simd_level() {
+    return simd_available() ? "avx2" : "scalar";
+}
+
+// =======================
+// 标量内核 (与原来的逐对比较条件完全相同)
+// =======================
+static bool forward_scalar(const DomSoA& s, const Label& c, size_t begin, long long& checks) {
+    const double c_cost = c.cost + DOM_EPS, c_time = c.time + DOM_EPS, c_load = (double)c.load;
+    const uint64_t* w = c.visited_mask.bits;
+    for (size_t i = begin; i < s.size(); ++i) {
+        ++checks;
+        if (s.cost[i] <= c_cost && s.time[i] <= c_time && s.load[i] <= c_load &&
+            (s.mask[0][i] & ~w[0]) == 0 && (s.mask[1][i] & ~w[1]) == 0 &&
+            (s.mask[2][i] & ~w[2]) == 0 && (s.mask[3][i] & ~w[3]) == 0) {
+            return true;
+        }
+    }
+    return false;
+}
+
+static void backward_scalar(const DomSoA& s, const Label& c, size_t begin,
+                            std::vector<int>& out, long long& checks) {
+    const double c_load = (double)c.load;
+    const uint64_t* w = c.visited_mask.bits;
+    for (size_t i = begin; i < s.size(); ++i) {
+        ++checks;
+        if (c.cost <= s.cost[i] + DOM_EPS && c.time <= s.time[i] + DOM_EPS && c_load <= s.load[i] &&
+            (w[0] & ~s.mask[0][i]) == 0 && (w[1] & ~s.mask[1][i]) == 0 &&
+            (w[2] & ~s.mask[2][i]) == 0 && (w[3] & ~s.mask[3][i]) == 0) {
+            out.push_back((int)i);
+        }
+    }
+}
+
+// =======================
+// AVX2 内核：一次比较 4 个 label，尾部交给标量内核
+// =======================
+#if DOM_HAS_X86
+DOM_TARGET_AVX2
+static bool forward_avx2(const DomSoA& s, const Label& c, long long& checks) {
+    const size_t n = s.size();
+    const __m256d c_cost = _mm256_set1_pd(c.cost + DOM_EPS);
+    const __m256d c_time = _mm256_set1_pd(c.time + DOM_EPS);
+    const __m256d c_load = _mm256_set1_pd((double)c.load);
+    __m256i w[4];
+    for (int k = 0; k < 4; ++k) w[k] = _mm256_set1_epi64x((long long)c.visited_mask.bits[k]);
+
+    size_t i = 0;
+    for (; i + 4 <= n; i += 4) {
+        checks += 4;
+        __m256d ok = _mm256_and_pd(
+            _mm256_cmp_pd(_mm256_loadu_pd(&s.cost[i]), c_cost, _CMP_LE_OQ),
+            _mm256_cmp_pd(_mm256_loadu_pd(&s.time[i]), c_time, _CMP_LE_OQ));
+        ok = _mm256_and_pd(ok, _mm256_cmp_pd(_mm256_loadu_pd(&s.load[i]), c_load, _CMP_LE_OQ));
+        if (_mm256_movemask_pd(ok) == 0) continue;
+        // old ⊆ cand  <=>  old & ~cand == 0
+        __m256i extra = _mm256_setzero_si256();
+        for (int k = 0; k < 4; ++k) {
+            const __m256i old = _mm256_loadu_si256((const __m256i*)&s.mask[k][i]);
+            extra = _mm256_or_si256(extra, _mm256_andnot_si256(w[k], old));
+        }
+        const __m256i subset = _mm256_cmpeq_epi64(extra, _mm256_setzero_si256());
+        if (_mm256_movemask_pd(_mm256_and_pd(ok, _mm256_castsi256_pd(subset))) != 0) return true;
+    }
+    return forward_scalar(s, c, i, checks);
+}
+
+DOM_TARGET_AVX2
+static void backward_avx2(const DomSoA& s, const Label& c, std::vector<int>& out, long long& checks) {
+    const size_t n = s.size();
+    const __m256d eps = _mm256_set1_pd(DOM_EPS);
+    const __m256d c_cost = _mm256_set1_pd(c.cost);
+    const __m256d c_time = _mm256_set1_pd(c.time);
+    const __m256d c_load = _mm256_set1_pd((double)c.load);
+    __m256i w[4];
+    for (int k = 0; k < 4; ++k) w[k] = _mm256_set1_epi64x((long long)c.visited_mask.bits[k]);
+
+    size_t i = 0;
+    for (; i + 4 <= n; i += 4) {
+        checks += 4;
+        __m256d ok = _mm256_and_pd(
+            _mm256_cmp_pd(c_cost, _mm256_add_pd(_mm256_loadu_pd(&s.cost[i]), eps), _CMP_LE_OQ),
+            _mm256_cmp_pd(c_time, _mm256_add_pd(_mm256_loadu_pd(&s.time[i]), eps), _CMP_LE_OQ));
+        ok = _mm256_and_pd(ok, _mm256_cmp_pd(c_load, _mm256_loadu_pd(&s.load[i]), _CMP_LE_OQ));
+        if (_mm256_movemask_pd(ok) == 0) continue;
+        // cand ⊆ old  <=>  cand & ~old == 0
+        __m256i extra = _mm256_setzero_si256();
+        for (int k = 0; k < 4; ++k) {
+            const __m256i old = _mm256_loadu_si256((const __m256i*)&s.mask[k][i]);
+            extra = _mm256_or_si256(extra, _mm256_andnot_si256(old, w[k]));
+        }
+        const __m256i subset = _mm256_cmpeq_epi64(extra, _mm256_setzero_si256());
+        int bits = _mm256_movemask_pd(_mm256_and_pd(ok, _mm256_castsi256_pd(subset)));
+        while (bits) {
+            const int lane = lowest_bit((uint64_t)bits);
+            bits &= bits - 1;
+            out.push_back((int)(i + lane));
+        }
+    }
+    backward_scalar(s, c, i, out, checks);
+}
+#endif
+
+// =======================
+// 分派
+// =======================
+bool soa_find_dominating(const DomSoA& soa, const Label& cand, bool use_simd, long long& checks) {
+#if DOM_HAS_X86
+    if (use_simd) return forward_avx2(soa, cand, checks);
+#else
+    (void)use_simd;
+#endif
+    return forward_scalar(soa, cand, 0, checks);
+}
+
+void soa_find_dominated(const DomSoA& soa, const Label& cand, bool use_simd,
+                        std::vector<int>& out, long long& checks) {
+    out.clear();
+#if DOM_HAS_X86
+    if (use_simd) {
+        backward_avx2(soa, cand, out, checks);
+        return;
+    }
+#else
+    (void)use_simd;
+#endif
+    backward_scalar(soa, cand, 0, out, checks);
+}
+
+// =======================
+// [新增] 定点引擎的内核
+// 成本 int64、时间 / 载重 int32，条件用按位与合并 (没有分支)。
+// 成本不是精确比较：容差 FixedRes::cost_tol (1000 个单位，即浮点引擎的 1e-6) 预先加到 / 减到候选 label 上；
+// 时间 / 载重是精确的整数比较
+// =======================
+using FixedSoA = DomSoAT<FixedRes>;
+using FixedLabel = LabelT<FixedRes>;
+
+static bool forward_scalar_fixed(const FixedSoA& s, const FixedLabel& c, size_t begin, long long& checks) {
+    const uint64_t* w = c.visited_mask.bits;
+    for (size_t i = begin; i < s.size(); ++i) {
+        ++checks;
+        const uint64_t extra = (s.mask[0][i] & ~w[0]) | (s.mask[1][i] & ~w[1]) |
+                               (s.mask[2][i] & ~w[2]) | (s.mask[3][i] & ~w[3]);
+        if ((s.cost[i] <= c.cost + FixedRes::cost_tol) & (s.time[i] <= c.time) & (s.load[i] <= c.load) & (extra == 0)) return true;
+    }
+    return false;
+}
+
+static void backward_scalar_fixed(const FixedSoA& s, const FixedLabel& c, size_t begin,
+                                  std::vector<int>& out, long long& checks) {
+    const uint64_t* w = c.visited_mask.bits;
+    for (size_t i = begin; i < s.size(); ++i) {
+        ++checks;
+        const uint64_t extra = (w[0] & ~s.mask[0][i]) | (w[1] & ~s.mask[1][i]) |
+                               (w[2] & ~s.mask[2][i]) | (w[3] & ~s.mask[3][i]);
+        if ((c.cost - FixedRes::cost_tol <= s.cost[i]) & (c.time <= s.time[i]) & (c.load <= s.load[i]) & (extra == 0)) {
+            out.push_back((int)i);
+        }
+    }
+}
+
+#if DOM_HAS_X86
+// 4 个 label 一组：成本用 64 位比较，时间 / 载重用 128 位的 32 位比较再符号扩展到 64 位通道
+DOM_TARGET_AVX2
+static bool forward_avx2_fixed(const FixedSoA& s, const FixedLabel& c, long long& checks) {
+    const size_t n = s.size();
+    const __m256i c_cost = _mm256_set1_epi64x(c.cost + FixedRes::cost_tol);
+    const __m128i c_time = _mm_set1_epi32(c.time);
+    const __m128i c_load = _mm_set1_epi32(c.load);
+    __m256i w[4];
+    for (int k = 0; k < 4; ++k) w[k] = _mm256_set1_epi64x((long long)c.visited_mask.bits[k]);
+
+    size_t i = 0;
+    for (; i + 4 <= n; i += 4) {
+        checks += 4;
+        // old 不支配 cand 的通道: old.cost > cand.cost || old.time > cand.time || old.load > cand.load
+        const __m128i bad32 = _mm_or_si128(
+            _mm_cmpgt_epi32(_mm_loadu_si128((const __m128i*)&s.time[i]), c_time),
+            _mm_cmpgt_epi32(_mm_loadu_si128((const __m128i*)&s.load[i]), c_load));
+        const __m256i bad = _mm256_or_si256(
+            _mm256_cmpgt_epi64(_mm256_loadu_si256((const __m256i*)&s.cost[i]), c_cost),
+            _mm256_cvtepi32_epi64(bad32));
+        if (_mm256_movemask_pd(_mm256_castsi256_pd(bad)) == 0xF) continue;
+        // old ⊆ cand  <=>  old & ~cand == 0
+        __m256i extra = _mm256_setzero_si256();
+        for (int k = 0; k < 4; ++k) {
+            const __m256i old = _mm256_loadu_si256((const __m256i*)&s.mask[k][i]);
+            extra = _mm256_or_si256(extra, _mm256_andnot_si256(w[k], old));
+        }
+        const __m256i subset = _mm256_cmpeq_epi64(extra, _mm256_setzero_si256());
+        if (_mm256_movemask_pd(_mm256_castsi256_pd(_mm256_andnot_si256(bad, subset))) != 0) return true;
+    }
+    return forward_scalar_fixed(s, c, i, checks);
+}
+
+DOM_TARGET_AVX2
+static void backward_avx2_fixed(const FixedSoA& s, const FixedLabel& c, std::vector<int>& out,
+                                long long& checks) {
+    const size_t n = s.size();
+    const __m256i c_cost = _mm256_set1_epi64x(c.cost - FixedRes::cost_tol);
+    const __m128i c_time = _mm_set1_epi32(c.time);
+    const __m128i c_load = _mm_set1_epi32(c.load);
+    __m256i w[4];
+    for (int k = 0; k < 4; ++k) w[k] = _mm256_set1_epi64x((long long)c.visited_mask.bits[k]);
+
+    size_t i = 0;
+    for (; i + 4 <= n; i += 4) {
+        checks += 4;
+        // cand 不支配 old 的通道: cand.cost > old.cost || cand.time > old.time || cand.load > old.load
+        const __m128i bad32 = _mm_or_si128(
+            _mm_cmpgt_epi32(c_time, _mm_loadu_si128((const __m128i*)&s.time[i])),
+            _mm_cmpgt_epi32(c_load, _mm_loadu_si128((const __m128i*)&s.load[i])));
+        const __m256i bad = _mm256_or_si256(
+            _mm256_cmpgt_epi64(c_cost, _mm256_loadu_si256((const __m256i*)&s.cost[i])),
+            _mm256_cvtepi32_epi64(bad32));
+        if (_mm256_movemask_pd(_mm256_castsi256_pd(bad)) == 0xF) continue;
+        // cand ⊆ old  <=>  cand & ~old == 0
+        __m256i extra = _mm256_setzero_si256();
+        for (int k = 0; k < 4; ++k) {
+            const __m256i old = _mm256_loadu_si256((const __m256i*)&s.mask[k][i]);
+            extra = _mm256_or_si256(extra, _mm256_andnot_si256(old, w[k]));
+        }
+        const __m256i subset = _mm256_cmpeq_epi64(extra, _mm256_setzero_si256());
+        int bits = _mm256_movemask_pd(_mm256_castsi256_pd(_mm256_andnot_si256(bad, subset)));
+        while (bits) {
+            const int lane = lowest_bit((uint64_t)bits);
+            bits &= bits - 1;
+            out.push_back((int)(i + lane));
+        }
+    }
+    backward_scalar_fixed(s, c, i, out, checks);
+}
+#endif
+
+bool soa_find_dominating(const FixedSoA& soa, const FixedLabel& cand, bool use_simd, long long& checks) {
+#if DOM_HAS_X86
+    if (use_simd) return forward_avx2_fixed(soa, cand, checks);
+#else
+    (void)use_simd;
+#endif
+    return forward_scalar_fixed(soa, cand, 0, checks);
+}
+
+void soa_find_dominated(const FixedSoA& soa, const FixedLabel& cand, bool use_simd,
+                        std::vector<int>& out, long long& checks) {
+    out.clear();
+#if DOM_HAS_X86
+    if (use_simd) {
+        backward_avx2_fixed(soa, cand, out, checks);
+        return;
+    }
+#else
+    (void)use_simd;
+#endif
+    backward_scalar_fixed(soa, cand, 0, out, checks);
+}
@@ -0,0 +1,29 @@
+#ifndef DOMINANCE_SIMD_H
+#define DOMINANCE_SIMD_H
+
+#include <vector>
+#include <cstdint>
+#include "pricing_engine.h"
+
+// 支配检查内核 (DomSoA 定义在 pricing_engine.h)，DomSoA 成员函数也实现在 dominance_simd.cpp
+
+// CPU 是否支持 AVX2 (运行时检测，结果缓存)
+bool simd_available();
+// "avx2" 或 "scalar"
+const char* simd_level();
+
+// Forward: soa 中是否存在支配 cand 的 label。checks 累加比较次数
+bool soa_find_dominating(const DomSoA& soa, const Label& cand, bool use_simd, long long& checks);
+
+// Backward: 被 cand 支配的 label 在 soa 中的位置按升序写入 out
+void soa_find_dominated(const DomSoA& soa, const Label& cand, bool use_simd,
+                        std::vector<int>& out, long long& checks);
+
+// [新增] 定点引擎的内核：整数比较，成本带 FixedRes::cost_tol (1e-6 × COST_SCALE = 1000 个单位) 的容差，
+// 时间 / 载重精确比较 (没有容差)
+bool soa_find_dominating(const DomSoAT<FixedRes>& soa, const LabelT<FixedRes>& cand, bool use_simd,
+                         long long& checks);
+void soa_find_dominated(const DomSoAT<FixedRes>& soa, const LabelT<FixedRes>& cand, bool use_simd,
+                        std::vector<int>& out, long long& checks);
+
+#endif
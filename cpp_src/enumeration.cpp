@@ -0,0 +1,268 @@
+#include "enumeration.h"
+#include <unordered_map>
+#include <stdexcept>
+
+namespace {
+
+using Clock = std::chrono::steady_clock;
+
+inline double seconds_since(Clock::time_point t0) {
+    return std::chrono::duration<double>(Clock::now() - t0).count();
+}
+
+// 完成界最多用这么多个时间桶 (节点数 × 桶数个 double)
+const int MAX_BOUND_BUCKETS = 2048;
+const double RC_EPS = 1e-6;
+const double INF = 1e300;
+
+struct EnumLabel {
+    int node;
+    int parent;
+    double cost;
+    double time;
+    int load;
+    FastBitset visited;  // 精确的访问集合 (含 depot)，不做 ng 松弛
+};
+
+struct SetHash {
+    size_t operator()(const FastBitset& s) const {
+        uint64_t h = 0x9E3779B97F4A7C15ULL;
+        for (int k = 0; k < 4; ++k) h = (h ^ s.bits[k]) * 0x100000001B3ULL + (h >> 29);
+        return (size_t)h;
+    }
+};
+
+struct SetEq {
+    bool operator()(const FastBitset& a, const FastBitset& b) const {
+        return std::memcmp(a.bits, b.bits, sizeof(a.bits)) == 0;
+    }
+};
+
+// 支配只在同一节点、同一客户集合的 label 之间做：先按节点分组，组内按客户集合分
+using SetMap = std::unordered_map<FastBitset, std::vector<int>, SetHash, SetEq>;
+
+}  // namespace
+
+RouteEnumerator::RouteEnumerator(ProblemData p_data) : data(std::move(p_data)) {
+    if (data.num_nodes > 256) {
+        throw std::invalid_argument("route enumeration supports at most 256 nodes (FastBitset)");
+    }
+    for (double t : data.tw_end) horizon = std::max(horizon, t);
+    graph.build(data, ResourceScale<FloatRes>());
+    min_duration = INF;
+    for (const auto& arcs : graph.nodes_outgoing_arcs) {
+        for (const Arc& arc : arcs) min_duration = std::min(min_duration, arc.duration);
+    }
+    for (int i = 1; i < data.num_nodes; ++i) {
+        min_duration = std::min(min_duration, data.service_times[i] + data.travel(i, 0));
+    }
+    if (min_duration >= INF) min_duration = 0.0;
+}
+
+void RouteEnumerator::completion_bounds(const std::vector<double>& duals, const std::vector<char>& forbidden,
+                                        double step, int buckets, std::vector<double>& bound) const {
+    const int n = data.num_nodes;
+    // 桶宽不超过最短弧时长时，任何扩展都落到后面的桶，按桶倒序一遍算完；
+    // 否则同一个桶内的转移用 Bellman-Ford 迭代，出现负环时该桶退化成 -inf (平凡下界)
+    const bool strictly_later = step <= min_duration;
+    bound.assign((size_t)n * buckets, INF);
+    std::vector<std::pair<int, const Arc*>> same_bucket;
+    for (int b = buckets - 1; b >= 0; --b) {
+        const double lo = b * step;
+        same_bucket.clear();
+        for (int j = 1; j < n; ++j) {
+            if (lo > data.tw_end[j]) continue;
+            double best = INF;
+            if (!forbidden[(size_t)j * n] && lo + data.service_times[j] + data.travel(j, 0) <= data.tw_end[0]) {
+                best = data.dist(j, 0) - duals[0];
+            }
+            for (const Arc& arc : graph.nodes_outgoing_arcs[j]) {
+                const int k = arc.target;
+                if (k == 0 || forbidden[(size_t)j * n + k]) continue;
+                const double tk = std::max(lo + arc.duration, data.tw_start[k]);
+                if (tk > data.tw_end[k]) continue;
+                int bk = std::min((int)(tk / step), buckets - 1);
+                if (strictly_later) bk = std::max(bk, b + 1);
+                if (bk >= buckets) continue;  // 超出计划期 (只可能是舍入造成的)
+                if (bk > b) {
+                    best = std::min(best, arc.cost - duals[k] + bound[(size_t)k * buckets + bk]);
+                } else {
+                    same_bucket.push_back({j, &arc});
+                }
+            }
+            bound[(size_t)j * buckets + b] = best;
+        }
+        if (same_bucket.empty()) continue;
+        bool changed = true;
+        for (int pass = 0; pass < n && changed; ++pass) {
+            changed = false;
+            for (const auto& [j, arc] : same_bucket) {
+                const double cand = arc->cost - duals[arc->target] + bound[(size_t)arc->target * buckets + b];
+                double& cur = bound[(size_t)j * buckets + b];
+                if (cand < cur - 1e-12) {
+                    cur = cand;
+                    changed = true;
+                }
+            }
+        }
+        if (changed) {
+            for (const auto& entry : same_bucket) bound[(size_t)entry.first * buckets + b] = -INF;
+        }
+    }
+}
+
+EnumerationResult RouteEnumerator::enumerate(const std::vector<double>& duals, double gap,
+                                             const std::vector<std::pair<int, int>>& forbidden_arcs,
+                                             int max_routes, long long max_labels, double time_limit) {
+    const auto t_start = Clock::now();
+    const bool has_deadline = time_limit > 0.0;
+    const int n = data.num_nodes;
+    EnumerationResult res;
+
+    std::vector<char> forbidden((size_t)n * n, 0);
+    for (const auto& [u, v] : forbidden_arcs) {
+        if (u >= 0 && u < n && v >= 0 && v < n) forbidden[(size_t)u * n + v] = 1;
+    }
+
+    // 1. 完成界
+    const double step = std::max({min_duration, horizon / MAX_BOUND_BUCKETS, 1e-9});
+    const int buckets = std::min((int)(horizon / step) + 1, MAX_BOUND_BUCKETS + 1);
+    std::vector<double> bound;
+    completion_bounds(duals, forbidden, step, buckets, bound);
+    res.bound_buckets = buckets;
+    res.time_bound = seconds_since(t_start);
+    auto bucket_of = [&](double t) { return std::min((int)(t / step), buckets - 1); };
+
+    // 2. 按时刻顺序扩展 (时间桶与完成界相同)
+    std::vector<EnumLabel> pool;
+    std::vector<char> alive;
+    std::vector<std::vector<int>> queue(buckets);
+    std::vector<SetMap> by_set(n);  // 每个节点：客户集合 -> 该集合下互不支配的 label
+    // 客户集合 -> (reduced cost, label, 回到 depot 的时刻)，每个集合只留最便宜的
+    std::unordered_map<FastBitset, std::tuple<double, int, double>, SetHash, SetEq> routes;
+
+    EnumLabel root;
+    root.node = 0;
+    root.parent = -1;
+    root.cost = 0.0;
+    root.time = data.tw_start[0];
+    root.load = 0;
+    root.visited.set(0);
+    pool.push_back(root);
+    alive.push_back(1);
+    queue[bucket_of(root.time)].push_back(0);
+
+    bool aborted = false;
+    long long processed = 0;
+    for (int b = 0; b < buckets && !aborted; ++b) {
+        for (size_t q = 0; q < queue[b].size() && !aborted; ++q) {
+            const int idx = queue[b][q];
+            if (!alive[idx]) continue;
+            const EnumLabel L = pool[idx];
+            const int i = L.node;
+
+            // a. 回到 depot，结束一条路径
+            if (i != 0 && !forbidden[(size_t)i * n]) {
+                const double arrival = L.time + data.service_times[i] + data.travel(i, 0);
+                const double rc = L.cost + data.dist(i, 0) - duals[0];
+                if (arrival <= data.tw_end[0] && rc <= gap + RC_EPS) {
+                    auto it = routes.find(L.visited);
+                    if (it == routes.end()) {
+                        routes.emplace(L.visited, std::make_tuple(rc, idx, arrival));
+                        if ((int)routes.size() > max_routes) aborted = true;
+                    } else if (rc < std::get<0>(it->second)) {
+                        it->second = std::make_tuple(rc, idx, arrival);
+                    }
+                }
+            }
+
+            // b. 扩展到下一个客户
+            for (const Arc& arc : graph.nodes_outgoing_arcs[i]) {
+                const int j = arc.target;
+                if (j == 0 || L.visited.test(j) || forbidden[(size_t)i * n + j]) continue;
+                const int load = L.load + arc.demand;
+                if (load > data.vehicle_capacity) continue;
+                const double t = std::max(L.time + arc.duration, data.tw_start[j]);
+                if (t > data.tw_end[j]) continue;
+                const double cost = L.cost + arc.cost - duals[j];
+                if (cost + bound[(size_t)j * buckets + bucket_of(t)] > gap + RC_EPS) {
+                    ++res.pruned_bound;
+                    continue;
+                }
+                FastBitset visited = L.visited;
+                visited.set(j);
+
+                std::vector<int>& group = by_set[j][visited];
+                bool dominated = false;
+                for (int other : group) {
+                    if (pool[other].cost <= cost + RC_EPS && pool[other].time <= t) {
+                        dominated = true;
+                        break;
+                    }
+                }
+                if (dominated) {
+                    ++res.dominated;
+                    continue;
+                }
+                // 新 label 支配的旧 label 不再扩展 (已经由它产生的路径留在池子里，按集合取最小不受影响)
+                size_t keep = 0;
+                for (int other : group) {
+                    if (cost <= pool[other].cost && t <= pool[other].time) {
+                        alive[other] = 0;
+                        ++res.dominated;
+                    } else {
+                        group[keep++] = other;
+                    }
+                }
+                group.resize(keep);
+
+                EnumLabel child;
+                child.node = j;
+                child.parent = idx;
+                child.cost = cost;
+                child.time = t;
+                child.load = load;
+                child.visited = visited;
+                const int child_idx = (int)pool.size();
+                pool.push_back(child);
+                alive.push_back(1);
+                group.push_back(child_idx);
+                queue[bucket_of(t)].push_back(child_idx);
+                if (++res.labels > max_labels) {
+                    aborted = true;
+                    break;
+                }
+            }
+            if (has_deadline && (++processed & 1023) == 0 && seconds_since(t_start) > time_limit) aborted = true;
+        }
+    }
+    if (!aborted && has_deadline && seconds_since(t_start) > time_limit) aborted = true;
+    res.complete = !aborted;
+
+    // 3. 输出：按 reduced cost 升序
+    std::vector<std::tuple<double, int, double>> best;
+    best.reserve(routes.size());
+    for (const auto& entry : routes) best.push_back(entry.second);
+    std::sort(best.begin(), best.end());
+
+    ColumnBatch& batch = res.routes;
+    batch.offsets.reserve(best.size() + 1);
+    batch.offsets.push_back(0);
+    std::vector<int> path;
+    for (const auto& [rc, idx, arrival] : best) {
+        path.clear();
+        path.push_back(0);
+        for (int curr = idx; curr != -1; curr = pool[curr].parent) path.push_back(pool[curr].node);
+        std::reverse(path.begin(), path.end());
+        double distance = 0.0;
+        for (size_t p = 0; p + 1 < path.size(); ++p) distance += data.dist(path[p], path[p + 1]);
+        batch.nodes.insert(batch.nodes.end(), path.begin(), path.end());
+        batch.offsets.push_back((int64_t)batch.nodes.size());
+        batch.reduced_costs.push_back(rc);
+        batch.distances.push_back(distance);
+        batch.durations.push_back(arrival);
+        batch.loads.push_back(pool[idx].load);
+    }
+    res.time_total = seconds_since(t_start);
+    return res;
+}
@@ -0,0 +1,51 @@
+#ifndef ENUMERATION_H
+#define ENUMERATION_H
+
+#include <vector>
+#include <utility>
+#include "pricing_engine.h"
+
+// [新增] 路径枚举的结果和统计
+struct EnumerationResult {
+    ColumnBatch routes;            // 每个客户集合只保留 reduced cost 最小的一条，按 reduced cost 升序
+    bool complete = false;         // false: 超过 max_routes / max_labels 或时间预算，池子不完整，不能用来关掉子树
+    long long labels = 0;          // 进入 label 池的部分路径 (不含 root)
+    long long pruned_bound = 0;    // 被完成界剪掉的扩展
+    long long dominated = 0;       // 被同节点、同客户集合的 label 支配
+    int bound_buckets = 0;         // 完成界的时间桶数
+    double time_bound = 0.0;       // 完成界 DP 耗时 (秒)
+    double time_total = 0.0;
+};
+
+// [新增] 小 gap 节点的路径枚举 (Baldacci et al. 的做法)：
+// 节点 LP 精确收敛后，所有列相对该节点对偶的 reduced cost >= 0，
+// 所以比上界更好的整数解只能由 reduced cost <= gap (= 上界 - LP 值) 的初等路径组成。
+// 把这些路径全部枚举出来，子树就可以直接用池子上的 MIP 求解，不再分支。
+//   - 完成界：按 (节点, 出发时刻所在的时间桶) 做反向 DP，放松初等性和容量，
+//     给出从该节点回到 depot 的 reduced cost 下界；部分路径 cost + 下界 > gap 时剪掉
+//   - 支配：同一节点、访问过的客户集合完全相同时，cost 和时刻都不差的 label 支配另一个
+//   - reduced cost 的口径与 LabelingSolver 相同 (sum(dist - duals[j])，回到 depot 时减 duals[0])
+class RouteEnumerator {
+public:
+    explicit RouteEnumerator(ProblemData p_data);
+
+    // gap: 保留 reduced cost <= gap 的路径
+    // max_routes: 池子 (不同客户集合) 超过这个数就放弃；max_labels: label 数超过这个数就放弃
+    // time_limit: 秒，<= 0 表示不限
+    EnumerationResult enumerate(const std::vector<double>& duals, double gap,
+                                const std::vector<std::pair<int, int>>& forbidden_arcs = {},
+                                int max_routes = 20000, long long max_labels = 2000000,
+                                double time_limit = -1.0);
+
+private:
+    ProblemData data;
+    BucketGraphT<FloatRes> graph;
+    double horizon = 0.0;
+    double min_duration = 0.0;  // 图中所有弧 (服务 + 行驶) 的最小值，决定完成界的时间桶宽
+
+    // 完成界 bound[node * buckets + b]：在时间桶 b 的起点从 node 出发回到 depot 的 reduced cost 下界
+    void completion_bounds(const std::vector<double>& duals, const std::vector<char>& forbidden,
+                           double step, int buckets, std::vector<double>& bound) const;
+};
+
+#endif
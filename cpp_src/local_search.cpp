@@ -0,0 +1,406 @@
+#include "local_search.h"
+#include <limits>
+
+namespace {
+const double INF = std::numeric_limits<double>::infinity();
+
+// 拷贝 nodes[i..j] 追加到 out
+void append_range(std::vector<int>& out, const std::vector<int>& nodes, int i, int j) {
+    for (int k = i; k <= j; ++k) out.push_back(nodes[k]);
+}
+}
+
+// =======================
+// TimeSeq: O(1) 拼接
+// =======================
+TimeSeq TimeSeq::single(const ProblemData& data, int node) {
+    TimeSeq s;
+    s.first = node;
+    s.last = node;
+    s.duration = data.service_times[node];
+    s.time_warp = 0.0;
+    s.earliest = data.tw_start[node];
+    s.latest = data.tw_end[node];
+    s.distance = 0.0;
+    s.load = data.demands[node];
+    s.num_customers = (node != 0) ? 1 : 0;
+    return s;
+}
+
+TimeSeq TimeSeq::concat(const ProblemData& data, const TimeSeq& a, const TimeSeq& b) {
+    // 到达 b.first = a 的开始时间 + a 的时长 (含 a.last 的服务) + 行驶时间
+    double travel = data.travel(a.last, b.first);
+    double delta = a.duration - a.time_warp + travel;
+    double delta_wt = std::max(b.earliest - delta - a.latest, 0.0);
+    double delta_tw = std::max(a.earliest + delta - b.latest, 0.0);
+
+    TimeSeq s;
+    s.first = a.first;
+    s.last = b.last;
+    s.duration = a.duration + b.duration + travel + delta_wt;
+    s.time_warp = a.time_warp + b.time_warp + delta_tw;
+    s.earliest = std::max(b.earliest - delta, a.earliest) - delta_wt;
+    s.latest = std::min(b.latest - delta, a.latest) + delta_tw;
+    s.distance = a.distance + b.distance + data.dist(a.last, b.first);
+    s.load = a.load + b.load;
+    s.num_customers = a.num_customers + b.num_customers;
+    return s;
+}
+
+// =======================
+// LocalSearch
+// =======================
+LocalSearch::LocalSearch(ProblemData p_data, double p_vehicle_fixed_cost)
+    : data(p_data), vehicle_fixed_cost(p_vehicle_fixed_cost) {}
+
+bool LocalSearch::is_feasible(const TimeSeq& s) const {
+    return s.time_warp < 1e-6 && s.load <= data.vehicle_capacity;
+}
+
+double LocalSearch::route_cost(const TimeSeq& s) const {
+    if (s.num_customers == 0) return 0.0; // 空路径不占用车辆
+    return s.distance + vehicle_fixed_cost;
+}
+
+const TimeSeq& LocalSearch::seg(int r, int i, int j) const {
+    int L = (int)routes[r].size();
+    return subseq[r][i * L + j];
+}
+
+TimeSeq LocalSearch::evaluate(const std::vector<int>& nodes) const {
+    TimeSeq s = TimeSeq::single(data, nodes[0]);
+    for (size_t k = 1; k < nodes.size(); ++k) {
+        s = TimeSeq::concat(data, s, TimeSeq::single(data, nodes[k]));
+    }
+    return s;
+}
+
+void LocalSearch::update_route(int r) {
+    const std::vector<int>& nodes = routes[r];
+    int L = (int)nodes.size();
+    std::vector<TimeSeq>& table = subseq[r];
+    table.resize(L * L);
+    for (int i = 0; i < L; ++i) {
+        table[i * L + i] = TimeSeq::single(data, nodes[i]);
+        for (int j = i + 1; j < L; ++j) {
+            table[i * L + j] = TimeSeq::concat(data, table[i * L + j - 1], TimeSeq::single(data, nodes[j]));
+        }
+    }
+    for (int k = 1; k < L - 1; ++k) {
+        route_of[nodes[k]] = r;
+        pos_of[nodes[k]] = k;
+    }
+}
+
+bool LocalSearch::load_solution(const std::vector<std::vector<int>>& input) {
+    routes.clear();
+    for (const auto& r : input) {
+        if (r.size() < 3 || r.front() != 0 || r.back() != 0) continue;
+        for (int node : r) {
+            if (node < 0 || node >= data.num_nodes) return false;
+        }
+        if (!is_feasible(evaluate(r))) return false;
+        routes.push_back(r);
+    }
+
+    // 集合覆盖的整数解可能重复访问客户：保留一次，从节省最多的路径中删除其余访问
+    std::vector<int> visits(data.num_nodes, 0);
+    for (const auto& r : routes)
+        for (size_t k = 1; k + 1 < r.size(); ++k) visits[r[k]]++;
+
+    for (int c = 1; c < data.num_nodes; ++c) {
+        while (visits[c] > 1) {
+            int best_r = -1, best_k = -1;
+            double best_saving = -INF;
+            for (int r = 0; r < (int)routes.size(); ++r) {
+                for (int k = 1; k + 1 < (int)routes[r].size(); ++k) {
+                    if (routes[r][k] != c) continue;
+                    std::vector<int> cand(routes[r]);
+                    cand.erase(cand.begin() + k);
+                    TimeSeq s = evaluate(cand);
+                    if (!is_feasible(s)) continue;
+                    double saving = route_cost(evaluate(routes[r])) - route_cost(s);
+                    if (saving > best_saving) {
+                        best_saving = saving;
+                        best_r = r;
+                        best_k = k;
+                    }
+                }
+            }
+            if (best_r < 0) return false;
+            routes[best_r].erase(routes[best_r].begin() + best_k);
+            visits[c]--;
+        }
+    }
+
+    route_of.assign(data.num_nodes, -1);
+    pos_of.assign(data.num_nodes, -1);
+    subseq.assign(routes.size(), {});
+    for (int r = 0; r < (int)routes.size(); ++r) update_route(r);
+    return true;
+}
+
+double LocalSearch::move_delta(int ra, const TimeSeq& new_a, int rb, const TimeSeq& new_b) const {
+    if (!is_feasible(new_a) || !is_feasible(new_b)) return INF;
+    const TimeSeq& old_a = seg(ra, 0, (int)routes[ra].size() - 1);
+    const TimeSeq& old_b = seg(rb, 0, (int)routes[rb].size() - 1);
+    return route_cost(new_a) + route_cost(new_b) - route_cost(old_a) - route_cost(old_b);
+}
+
+void LocalSearch::commit(int ra, std::vector<int> nodes_a, int rb, std::vector<int> nodes_b) {
+    routes[ra] = std::move(nodes_a);
+    update_route(ra);
+    if (rb != ra) {
+        routes[rb] = std::move(nodes_b);
+        update_route(rb);
+    }
+}
+
+// 把 u 移动到路径 rb 的位置 j 之后
+bool LocalSearch::try_relocate(int u, int rb, int j) {
+    int ra = route_of[u];
+    int i = pos_of[u];
+    int La = (int)routes[ra].size();
+    int Lb = (int)routes[rb].size();
+    TimeSeq su = TimeSeq::single(data, u);
+
+    if (ra != rb) {
+        TimeSeq new_a = TimeSeq::concat(data, seg(ra, 0, i - 1), seg(ra, i + 1, La - 1));
+        TimeSeq new_b = TimeSeq::concat(data, TimeSeq::concat(data, seg(rb, 0, j), su), seg(rb, j + 1, Lb - 1));
+        if (move_delta(ra, new_a, rb, new_b) > -1e-6) return false;
+
+        std::vector<int> nodes_a, nodes_b;
+        append_range(nodes_a, routes[ra], 0, i - 1);
+        append_range(nodes_a, routes[ra], i + 1, La - 1);
+        append_range(nodes_b, routes[rb], 0, j);
+        nodes_b.push_back(u);
+        append_range(nodes_b, routes[rb], j + 1, Lb - 1);
+        commit(ra, std::move(nodes_a), rb, std::move(nodes_b));
+        return true;
+    }
+
+    // 同一路径内移动
+    if (j == i || j == i - 1) return false;
+    TimeSeq new_r;
+    std::vector<int> nodes;
+    if (j < i) {
+        new_r = TimeSeq::concat(data, seg(ra, 0, j), su);
+        new_r = TimeSeq::concat(data, new_r, seg(ra, j + 1, i - 1));
+        new_r = TimeSeq::concat(data, new_r, seg(ra, i + 1, La - 1));
+    } else {
+        new_r = TimeSeq::concat(data, seg(ra, 0, i - 1), seg(ra, i + 1, j));
+        new_r = TimeSeq::concat(data, new_r, su);
+        new_r = TimeSeq::concat(data, new_r, seg(ra, j + 1, La - 1));
+    }
+    if (!is_feasible(new_r)) return false;
+    if (route_cost(new_r) - route_cost(seg(ra, 0, La - 1)) > -1e-6) return false;
+
+    if (j < i) {
+        append_range(nodes, routes[ra], 0, j);
+        nodes.push_back(u);
+        append_range(nodes, routes[ra], j + 1, i - 1);
+        append_range(nodes, routes[ra], i + 1, La - 1);
+    } else {
+        append_range(nodes, routes[ra], 0, i - 1);
+        append_range(nodes, routes[ra], i + 1, j);
+        nodes.push_back(u);
+        append_range(nodes, routes[ra], j + 1, La - 1);
+    }
+    commit(ra, std::move(nodes), ra, {});
+    return true;
+}
+
+// 交换两条不同路径上的 u 和 v
+bool LocalSearch::try_exchange(int u, int v) {
+    int ra = route_of[u], rb = route_of[v];
+    if (ra == rb) return false;
+    int i = pos_of[u], j = pos_of[v];
+    int La = (int)routes[ra].size();
+    int Lb = (int)routes[rb].size();
+
+    TimeSeq new_a = TimeSeq::concat(data, TimeSeq::concat(data, seg(ra, 0, i - 1), TimeSeq::single(data, v)), seg(ra, i + 1, La - 1));
+    TimeSeq new_b = TimeSeq::concat(data, TimeSeq::concat(data, seg(rb, 0, j - 1), TimeSeq::single(data, u)), seg(rb, j + 1, Lb - 1));
+    if (move_delta(ra, new_a, rb, new_b) > -1e-6) return false;
+
+    std::vector<int> nodes_a(routes[ra]), nodes_b(routes[rb]);
+    nodes_a[i] = v;
+    nodes_b[j] = u;
+    commit(ra, std::move(nodes_a), rb, std::move(nodes_b));
+    return true;
+}
+
+// 2-opt*: 交换两条路径的尾部，使 u 后面直接接 v
+bool LocalSearch::try_two_opt_star(int u, int v) {
+    int ra = route_of[u], rb = route_of[v];
+    if (ra == rb) return false;
+    int i = pos_of[u], j = pos_of[v];
+    int La = (int)routes[ra].size();
+    int Lb = (int)routes[rb].size();
+
+    TimeSeq new_a = TimeSeq::concat(data, seg(ra, 0, i), seg(rb, j, Lb - 1));
+    TimeSeq new_b = TimeSeq::concat(data, seg(rb, 0, j - 1), seg(ra, i + 1, La - 1));
+    if (move_delta(ra, new_a, rb, new_b) > -1e-6) return false;
+
+    std::vector<int> nodes_a, nodes_b;
+    append_range(nodes_a, routes[ra], 0, i);
+    append_range(nodes_a, routes[rb], j, Lb - 1);
+    append_range(nodes_b, routes[rb], 0, j - 1);
+    append_range(nodes_b, routes[ra], i + 1, La - 1);
+    commit(ra, std::move(nodes_a), rb, std::move(nodes_b));
+    return true;
+}
+
+// SWAP*: u (在 ra) 与 v (在 rb) 互换，但各自插入到对方路径中的最佳位置 (不必是原位置)
+bool LocalSearch::try_swap_star(int ra, int rb) {
+    int La = (int)routes[ra].size();
+    int Lb = (int)routes[rb].size();
+    if (La < 3 || Lb < 3) return false;
+    const auto& A = routes[ra];
+    const auto& B = routes[rb];
+    auto d = [this](int i, int j) { return data.dist(i, j); };
+
+    // 预处理：每个客户插入到对方路径的前 3 个最便宜位置 (只看距离)
+    auto top3 = [&](int u, const std::vector<int>& R) {
+        std::vector<std::pair<double, int>> pos;
+        for (int p = 0; p + 1 < (int)R.size(); ++p) {
+            pos.push_back({d(R[p], u) + d(u, R[p + 1]) - d(R[p], R[p + 1]), p});
+        }
+        int k = std::min(3, (int)pos.size());
+        std::partial_sort(pos.begin(), pos.begin() + k, pos.end());
+        pos.resize(k);
+        return pos;
+    };
+
+    // 在路径 r 中删除位置 j 的节点，并把 u 插到位置 p 之后 (p 为原路径中的位置)
+    auto remove_insert = [&](int r, int j, int u, int p) {
+        int L = (int)routes[r].size();
+        TimeSeq su = TimeSeq::single(data, u);
+        if (p == j - 1 || p == j) {
+            // 原位替换
+            return TimeSeq::concat(data, TimeSeq::concat(data, seg(r, 0, j - 1), su), seg(r, j + 1, L - 1));
+        }
+        if (p < j) {
+            TimeSeq s = TimeSeq::concat(data, seg(r, 0, p), su);
+            s = TimeSeq::concat(data, s, seg(r, p + 1, j - 1));
+            return TimeSeq::concat(data, s, seg(r, j + 1, L - 1));
+        }
+        TimeSeq s = TimeSeq::concat(data, seg(r, 0, j - 1), seg(r, j + 1, p));
+        s = TimeSeq::concat(data, s, su);
+        return TimeSeq::concat(data, s, seg(r, p + 1, L - 1));
+    };
+
+    // 在删除位置 j 后的路径 r 中找 u 的最佳可行插入位置
+    auto best_insert = [&](int r, int j, int u, const std::vector<std::pair<double, int>>& cand,
+                           TimeSeq& best_seq, int& best_p) {
+        double best_cost = INF;
+        best_p = -1;
+        // 候选：原位替换 + top3 中不与 j 相邻的位置
+        std::vector<int> positions = {j};
+        for (const auto& c : cand) {
+            if (c.second != j - 1 && c.second != j) positions.push_back(c.second);
+        }
+        for (int p : positions) {
+            TimeSeq s = remove_insert(r, j, u, p);
+            if (!is_feasible(s)) continue;
+            if (s.distance < best_cost) {
+                best_cost = s.distance;
+                best_seq = s;
+                best_p = p;
+            }
+        }
+        return best_p >= 0;
+    };
+
+    std::vector<std::vector<std::pair<double, int>>> top_a_in_b(La), top_b_in_a(Lb);
+    for (int i = 1; i < La - 1; ++i) top_a_in_b[i] = top3(A[i], B);
+    for (int j = 1; j < Lb - 1; ++j) top_b_in_a[j] = top3(B[j], A);
+
+    double best_delta = -1e-6;
+    int best_i = -1, best_j = -1, best_pa = -1, best_pb = -1;
+    for (int i = 1; i < La - 1; ++i) {
+        for (int j = 1; j < Lb - 1; ++j) {
+            TimeSeq new_b, new_a;
+            int pb, pa;
+            if (!best_insert(rb, j, A[i], top_a_in_b[i], new_b, pb)) continue;
+            if (!best_insert(ra, i, B[j], top_b_in_a[j], new_a, pa)) continue;
+            double delta = move_delta(ra, new_a, rb, new_b);
+            if (delta < best_delta) {
+                best_delta = delta;
+                best_i = i; best_j = j; best_pa = pa; best_pb = pb;
+            }
+        }
+    }
+    if (best_i < 0) return false;
+
+    auto build = [&](const std::vector<int>& R, int j, int u, int p) {
+        std::vector<int> nodes;
+        for (int k = 0; k < (int)R.size(); ++k) {
+            if (k == j) {
+                if (p == j - 1 || p == j) nodes.push_back(u);
+                continue;
+            }
+            nodes.push_back(R[k]);
+            if (k == p && p != j - 1) nodes.push_back(u);
+        }
+        return nodes;
+    };
+    int u = A[best_i], v = B[best_j];
+    std::vector<int> nodes_a = build(A, best_i, v, best_pa);
+    std::vector<int> nodes_b = build(B, best_j, u, best_pb);
+    commit(ra, std::move(nodes_a), rb, std::move(nodes_b));
+    return true;
+}
+
+std::vector<std::vector<int>> LocalSearch::improve(
+    const std::vector<std::vector<int>>& input, int max_iterations) {
+
+    if (!load_solution(input)) return input; // 无法处理 (不可行或无法去重)，原样返回
+
+    for (int iter = 0; iter < max_iterations; ++iter) {
+        bool improved = false;
+
+        for (int u = 1; u < data.num_nodes; ++u) {
+            if (route_of[u] < 0) continue;
+            for (int v : data.neighbors[u]) {
+                if (v == 0 || v == u || route_of[v] < 0) continue;
+                int rv = route_of[v];
+                // relocate: u 插到 v 之后 / v 之前
+                if (try_relocate(u, rv, pos_of[v]) || try_relocate(u, rv, pos_of[v] - 1)) {
+                    improved = true;
+                    continue;
+                }
+                if (try_exchange(u, v) || try_two_opt_star(u, v)) {
+                    improved = true;
+                }
+            }
+        }
+
+        // 简单邻域都无改进时再尝试 SWAP*
+        // 只考虑"相邻"的路径对：某条路径上的客户在另一条路径上有近邻
+        if (!improved) {
+            int R = (int)routes.size();
+            std::vector<char> adjacent(R * R, 0);
+            for (int u = 1; u < data.num_nodes; ++u) {
+                if (route_of[u] < 0) continue;
+                for (int v : data.neighbors[u]) {
+                    if (v == 0 || route_of[v] < 0 || route_of[v] == route_of[u]) continue;
+                    int a = std::min(route_of[u], route_of[v]);
+                    int b = std::max(route_of[u], route_of[v]);
+                    adjacent[a * R + b] = 1;
+                }
+            }
+            for (int ra = 0; ra < R; ++ra) {
+                for (int rb = ra + 1; rb < R; ++rb) {
+                    if (adjacent[ra * R + rb] && try_swap_star(ra, rb)) improved = true;
+                }
+            }
+        }
+        if (!improved) break;
+    }
+
+    std::vector<std::vector<int>> result;
+    for (const auto& r : routes) {
+        if (r.size() > 2) result.push_back(r);
+    }
+    return result;
+}
@@ -0,0 +1,64 @@
+#ifndef LOCAL_SEARCH_H
+#define LOCAL_SEARCH_H
+
+#include <vector>
+#include "pricing_engine.h"
+
+// 1. 时间窗拼接数据 (Vidal et al. 的 concatenation 公式)
+//    对任意子序列 σ 记录：总时长、时间违背量、最早/最晚开始时间、载重和距离，
+//    两段子序列拼接后的可行性可以 O(1) 得到。
+struct TimeSeq {
+    int first;          // 子序列第一个节点
+    int last;           // 子序列最后一个节点
+    double duration;    // 服务 + 行驶 + 等待
+    double time_warp;   // 时间窗违背量 (> 0 即不可行)
+    double earliest;    // 最早开始时间
+    double latest;      // 最晚开始时间
+    double distance;
+    int load;
+    int num_customers;  // 非 depot 节点个数 (0 表示空路径)
+
+    static TimeSeq single(const ProblemData& data, int node);
+    static TimeSeq concat(const ProblemData& data, const TimeSeq& a, const TimeSeq& b);
+};
+
+// 2. 局部搜索引擎：对整数解做改进
+//    邻域：relocate、exchange、2-opt*、SWAP*
+class LocalSearch {
+public:
+    LocalSearch(ProblemData p_data, double p_vehicle_fixed_cost = 0.0);
+
+    // 输入/输出格式与定价引擎一致: 每条路径 [0, ..., 0]
+    std::vector<std::vector<int>> improve(
+        const std::vector<std::vector<int>>& routes,
+        int max_iterations = 1000
+    );
+
+private:
+    ProblemData data;
+    double vehicle_fixed_cost;
+
+    // 当前解 (不含首尾 depot 的路径以 0 包围保存)
+    std::vector<std::vector<int>> routes;
+    // subseq[r][i * L + j] 为路径 r 上位置 i..j 的拼接数据 (i <= j)
+    std::vector<std::vector<TimeSeq>> subseq;
+    std::vector<int> route_of;
+    std::vector<int> pos_of;
+
+    bool load_solution(const std::vector<std::vector<int>>& input);
+    void update_route(int r);
+    const TimeSeq& seg(int r, int i, int j) const;
+    TimeSeq evaluate(const std::vector<int>& nodes) const;
+    bool is_feasible(const TimeSeq& s) const;
+    double route_cost(const TimeSeq& s) const;
+
+    // 两条路径被新序列替换后的目标变化量 (不可行返回 +inf)
+    double move_delta(int ra, const TimeSeq& new_a, int rb, const TimeSeq& new_b) const;
+    void commit(int ra, std::vector<int> nodes_a, int rb, std::vector<int> nodes_b);
+    bool try_relocate(int u, int rb, int j);
+    bool try_exchange(int u, int v);
+    bool try_two_opt_star(int u, int v);
+    bool try_swap_star(int ra, int rb);
+};
+
+#endif
@@ -0,0 +1,136 @@
+#include "preprocess.h"
+
+// 收紧 tw_end 时留的余量：b_j - d 再加回 d 可能因舍入比 b_j 大一个 ulp，
+// 不留余量会让原本恰好可行的路径在引擎里被判不可行
+static const double TW_SLACK = 1e-7;
+
+static bool arc_time_feasible(const ProblemData& d, const std::vector<double>& a,
+                              const std::vector<double>& b, int i, int j) {
+    // 与 BucketGraph / 标号扩展同样的结合顺序：到达 = 时刻 + (服务 + 行驶)
+    return a[i] + (d.service_times[i] + d.travel(i, j)) <= b[j];
+}
+
+static double window_width(const std::vector<double>& a, const std::vector<double>& b) {
+    double w = 0.0;
+    for (size_t k = 1; k < a.size(); ++k) w += b[k] - a[k];
+    return w;
+}
+
+// 稠密 Dijkstra：from_depot[k] = depot 出发到 k 的最短 (服务 + 行驶) 时间，
+// to_depot[k] = 从 k 开始服务到回到 depot 的最短时间。忽略时间窗和容量，是任何路径的下界
+static void shortest_depot_times(const ProblemData& d, std::vector<double>& from_depot,
+                                 std::vector<double>& to_depot) {
+    const int n = d.num_nodes;
+    for (int dir = 0; dir < 2; ++dir) {
+        std::vector<double>& dist = dir == 0 ? from_depot : to_depot;
+        dist.assign(n, 1e300);
+        std::vector<bool> done(n, false);
+        dist[0] = 0.0;
+        for (int it = 0; it < n; ++it) {
+            int u = -1;
+            for (int k = 0; k < n; ++k)
+                if (!done[k] && (u < 0 || dist[k] < dist[u])) u = k;
+            if (u < 0 || dist[u] >= 1e300) break;
+            done[u] = true;
+            for (int v = 1; v < n; ++v) {
+                if (done[v] || v == u) continue;
+                // 前向：u -> v 耗时 s_u + t_uv；反向：v -> u 耗时 s_v + t_vu
+                const double w = dir == 0 ? d.service_times[u] + d.travel(u, v)
+                                          : d.service_times[v] + d.travel(v, u);
+                dist[v] = std::min(dist[v], dist[u] + w);
+            }
+        }
+    }
+}
+
+PreprocessReport preprocess_problem(ProblemData& data, int max_rounds) {
+    PreprocessReport rep;
+    const int n = data.num_nodes;
+    const int Q = data.vehicle_capacity;
+    const std::vector<double> a0 = data.tw_start, b0 = data.tw_end;
+    std::vector<double>& a = data.tw_start;
+    std::vector<double>& b = data.tw_end;
+    rep.tw_width_before = window_width(a0, b0);
+
+    // 1. 时间窗收紧 (depot 不动：根 label 固定在 tw_start[0] 出发)
+    // 1a. 沿最短路从 depot 出发 / 回到 depot：打破宽时间窗之间互相支撑的不动点
+    std::vector<double> from_depot, to_depot;
+    shortest_depot_times(data, from_depot, to_depot);
+    for (int k = 1; k < n; ++k) {
+        a[k] = std::max(a[k], std::min(b[k], a[0] + from_depot[k]));
+        b[k] = std::min(b[k], std::max(a[k], b[0] - to_depot[k] + TW_SLACK));
+    }
+
+    // 1b. 逐弧规则迭代到不动点
+    bool changed = true;
+    while (changed && rep.rounds < max_rounds) {
+        changed = false;
+        ++rep.rounds;
+        for (int k = 1; k < n; ++k) {
+            const double sk = data.service_times[k];
+            // 最早到达：depot 直达或者任一可行前驱
+            double min_pred = a[0] + (data.service_times[0] + data.travel(0, k));
+            double max_pred = min_pred;
+            // 最晚出发：回 depot 或者赶上任一可行后继
+            double max_succ = b[0] - (sk + data.travel(k, 0));
+            for (int i = 1; i < n; ++i) {
+                if (i == k || data.demands[i] + data.demands[k] > Q) continue;
+                if (arc_time_feasible(data, a, b, i, k)) {
+                    const double d_ik = data.service_times[i] + data.travel(i, k);
+                    min_pred = std::min(min_pred, a[i] + d_ik);
+                    max_pred = std::max(max_pred, b[i] + d_ik);
+                }
+                if (arc_time_feasible(data, a, b, k, i))
+                    max_succ = std::max(max_succ, b[i] - (sk + data.travel(k, i)));
+            }
+            const double new_a = std::max(a[k], std::min(b[k], min_pred));
+            const double new_b = std::min(b[k], std::max(new_a, std::min(max_pred, max_succ + TW_SLACK)));
+            if (new_a > a[k] || new_b < b[k]) changed = true;
+            a[k] = new_a;
+            b[k] = new_b;
+        }
+    }
+    for (int k = 1; k < n; ++k) {
+        if (a[k] > a0[k]) ++rep.tw_start_tightened;
+        if (b[k] < b0[k]) ++rep.tw_end_tightened;
+    }
+    rep.tw_width_after = window_width(a, b);
+
+    // 2. 删弧：按原因分类统计 (回 depot 的弧保留，由收集阶段检查)
+    for (int i = 0; i < n; ++i) {
+        std::vector<int> kept;
+        kept.reserve(data.neighbors[i].size());
+        for (int j : data.neighbors[i]) {
+            if (j == 0 || j == i) {
+                kept.push_back(j);
+                continue;
+            }
+            ++rep.arcs_before;
+            if (data.demands[i] + data.demands[j] > Q) {
+                ++rep.removed_capacity;
+                continue;
+            }
+            if (!arc_time_feasible(data, a0, b0, i, j)) {
+                ++rep.removed_time;
+                continue;
+            }
+            // 三角路径 0 -> i -> j -> 0 (原始时间窗)
+            const double start_i = std::max(a0[i], a0[0] + (data.service_times[0] + data.travel(0, i)));
+            const double start_j = std::max(a0[j], start_i + (data.service_times[i] + data.travel(i, j)));
+            if (start_i > b0[i] || start_j > b0[j] ||
+                start_j + data.service_times[j] + data.travel(j, 0) > b0[0]) {
+                ++rep.removed_triangle;
+                continue;
+            }
+            if (!arc_time_feasible(data, a, b, i, j)) {
+                ++rep.removed_tightened;
+                continue;
+            }
+            kept.push_back(j);
+        }
+        data.neighbors[i] = std::move(kept);
+    }
+    rep.arcs_after = rep.arcs_before - rep.removed_capacity - rep.removed_time
+                   - rep.removed_triangle - rep.removed_tightened;
+    return rep;
+}
@@ -0,0 +1,32 @@
+#ifndef PREPROCESS_H
+#define PREPROCESS_H
+
+#include <vector>
+#include "pricing_engine.h"
+
+// [新增] 定价前的预处理统计
+struct PreprocessReport {
+    int rounds = 0;                  // 时间窗收紧迭代到不动点的轮数
+    int tw_start_tightened = 0;      // 被推后的 tw_start 个数
+    int tw_end_tightened = 0;        // 被提前的 tw_end 个数
+    double tw_width_before = 0.0;    // 客户时间窗总宽度
+    double tw_width_after = 0.0;
+    long long arcs_before = 0;       // neighbors 中的客户弧 (不含回 depot 的弧)
+    long long removed_capacity = 0;  // demand[i] + demand[j] > Q
+    long long removed_time = 0;      // 原始时间窗下 a_i + s_i + t_ij > b_j
+    long long removed_triangle = 0;  // 原始时间窗下 0 -> i -> j -> 0 不可行
+    long long removed_tightened = 0; // 只在收紧后的时间窗下才不可行
+    long long arcs_after = 0;
+};
+
+// 原地收紧 data.tw_start / tw_end 并从 data.neighbors 中删掉不可能出现在可行路径里的弧。
+// 收紧规则 (Desrochers et al.) 只去掉任何可行路径都用不到的时间段，
+// 所以任何在原始数据下可行的路径 (包括 ng-route 允许的非基本路径) 的服务开始时刻不变。
+//   a_k = max(a_k, min(b_k, min_{i -> k} (a_i + s_i + t_ik)))   最早从前驱到达
+//   b_k = min(b_k, max(a_k, max_{i -> k} (b_i + s_i + t_ik)))   最晚从前驱到达
+//   b_k = min(b_k, max(a_k, max_{k -> j} (b_j - s_k - t_kj)))   最晚出发还能赶上某个后继 (含回 depot)
+// 前驱 / 后继在全连接图上取 (不受 neighbors 截断影响)，重复直到不动点。
+// 迭代前先用 depot 出发 / 回 depot 的最短时间收紧一次，否则互为前驱后继的宽时间窗会互相支撑。
+PreprocessReport preprocess_problem(ProblemData& data, int max_rounds = 20);
+
+#endif
@@ -1,89 +1,256 @@
 #include "pricing_engine.h"
+#include "dominance_simd.h"
+#include <tuple>
+#include <chrono>
+#include <stdexcept>
+#include <type_traits>
+
+namespace {
+using Clock = std::chrono::steady_clock;
+inline double seconds_since(Clock::time_point t0) {
+    return std::chrono::duration<double>(Clock::now() - t0).count();
+}
+
+// 一次 "读时钟 + 求差" 的开销，用于修正采样计时的偏差
+double clock_overhead() {
+    static const double overhead = [] {
+        const int reps = 64;
+        const auto t0 = Clock::now();
+        double sink = 0.0;
+        for (int k = 0; k < reps; ++k) sink += seconds_since(Clock::now());
+        (void)sink;
+        return seconds_since(t0) / reps;
+    }();
+    return overhead;
+}
+}
 
 // =======================
 // 构造函数
 // =======================
-LabelingSolver::LabelingSolver(ProblemData p_data, double p_bucket_step) 
-    : data(p_data), bucket_step(p_bucket_step) {
+LabelingSolver::LabelingSolver(ProblemData p_data, double p_bucket_step, int p_load_buckets, int p_time_cells,
+                               int p_fixed_point)
+    : fixed_point(std::max(p_fixed_point, 0)) {
+    if (fixed_point > 0) {
+        fixed_engine = std::make_unique<LabelingEngine<FixedRes>>(
+            std::move(p_data), p_bucket_step, p_load_buckets, p_time_cells, fixed_point);
+    } else {
+        float_engine = std::make_unique<LabelingEngine<FloatRes>>(
+            std::move(p_data), p_bucket_step, p_load_buckets, p_time_cells, 0);
+    }
+}
+
+template <class R>
+LabelingEngine<R>::LabelingEngine(ProblemData p_data, double p_bucket_step, int p_load_buckets, int p_time_cells,
+                                  int p_time_scale)
+    : use_simd(simd_available()), data(std::move(p_data)), sc(p_time_scale),
+      load_buckets(std::max(p_load_buckets, 0)), time_cells(std::max(p_time_cells, 1)) {
     
     double max_horizon = 0;
     for(double t : data.tw_end) max_horizon = std::max(max_horizon, t);
-    int num_buckets = (int)(max_horizon / bucket_step) + 10;
+    int num_buckets = (int)(max_horizon / p_bucket_step) + 10;
+    bucket_step = sc.width(p_bucket_step);
+    if constexpr (std::is_same_v<R, FixedRes>) {
+        // 留出余量：到达时刻 = 时刻 + 弧时长，不能溢出 int32
+        if (max_horizon * p_time_scale > (double)std::numeric_limits<int32_t>::max() / 4) {
+            throw std::invalid_argument("fixed_point scale too large for the planning horizon (int32 times)");
+        }
+    }
+    tw_start.resize(data.num_nodes);
+    tw_end.resize(data.num_nodes);
+    for (int i = 0; i < data.num_nodes; ++i) {
+        tw_start[i] = sc.time(data.tw_start[i]);
+        tw_end[i] = sc.deadline(data.tw_end[i]);
+    }
+
+    // [新增] 二维支配桶的格子尺寸
+    time_cell_width = sc.width(std::max(max_horizon, 1.0) / time_cells);
+    load_cell_width = 1;
+    if (load_buckets > 0) {
+        load_buckets = std::min(load_buckets, 64);
+        time_cells = std::max(1, std::min(time_cells, 64 / load_buckets));
+        time_cell_width = sc.width(std::max(max_horizon, 1.0) / time_cells);
+        load_cell_width = std::max(1, data.vehicle_capacity / load_buckets + 1);
+        const int n_cells = time_cells * load_buckets;
+        dom_cells.resize((size_t)data.num_nodes * n_cells);
+        for (auto& cell : dom_cells) cell.reset();
+        nonempty_cells.assign(data.num_nodes, 0);
+        // 预计算每个格子的支配区域位图，支配检查时与非空位图相与，直接跳到需要比较的格子
+        region_forward.assign(n_cells, 0);
+        region_backward.assign(n_cells, 0);
+        for (int c = 0; c < n_cells; ++c) {
+            for (int d = 0; d < n_cells; ++d) {
+                const int ct = c / load_buckets, cq = c % load_buckets;
+                const int dt = d / load_buckets, dq = d % load_buckets;
+                if (dt <= ct && dq <= cq) region_forward[c] |= (1ULL << d);
+                if (dt >= ct && dq >= cq) region_backward[c] |= (1ULL << d);
+            }
+        }
+    }
     
     buckets.resize(num_buckets);
     dominance_sets.resize(data.num_nodes);
+    dominance_soa.resize(data.num_nodes);
     label_pool.reserve(500000); // 预分配大量空间，减少 resize
     // [新增] 构建静态图
     // 这会在 C++ 侧初始化时只运行一次，极大节省后续多次 solve 的时间
-    graph.build(data); 
-    // === 新增：初始化 ng_masks ===
-    // 将 Python 传来的 int 列表转换为 FastBitset
-    data.ng_masks.resize(data.num_nodes);
-    for (int i = 0; i < data.num_nodes; ++i) {
-        // 如果 Python 没传数据，默认全集 (退化为基本路径 ESPPRC)
-        if (data.ng_neighbor_lists.empty()) {
-            for(int k=0; k<256; ++k) data.ng_masks[i].set(k); 
-        } else {
-            // 设置 ng-集 中的位
-            for (int neighbor_idx : data.ng_neighbor_lists[i]) {
-                data.ng_masks[i].set(neighbor_idx);
-            }
-            // 必须包含自己 (自己总是被记住的)
-            data.ng_masks[i].set(i);
-        }
-    }
+    // [修改] ng-set 和记忆集的位置映射也在这里建好 (见 BucketGraphT::ng_sets)
+    graph.build(data, sc); 
 }
 
 // =======================
 // 核心：双向支配 (Bi-directional Dominance)
 // =======================
-bool LabelingSolver::check_and_update_dominance(int node, const Label& new_label) {
-    std::vector<int>& set = dominance_sets[node];
+template <class R>
+bool LabelingEngine<R>::check_and_update_dominance(int node, const LabelR& new_label) {
+    // 存活 label 连续存放在 dominance_soa[node]，AVX2 一次比较 4 个，CPU 不支持时走标量内核
+    DomSoAT<R>& soa = dominance_soa[node];
+    long long checks = 0;
     
     // 1. Forward Check: 新 Label 是否被旧 Label 支配？
     // 如果被支配，直接返回 true，新 Label 死亡
-    for (int idx : set) {
-        const Label& old = label_pool[idx];
-        if (!old.active) continue;
-
-        if (old.cost <= new_label.cost + 1e-6 &&
-            old.time <= new_label.time + 1e-6 &&
-            old.load <= new_label.load &&
-            old.visited_mask.is_subset_of(new_label.visited_mask)) {
-            return true; 
-        }
+    if (soa_find_dominating(soa, new_label, use_simd, checks)) {
+        stats.dominance_checks += checks;
+        ++stats.dominated_forward;
+        return true;
     }
 
     // 2. Backward Check: 新 Label 是否支配旧 Label？
-    // 如果支配，将旧 Label 标记为 active = false (逻辑删除)
+    // 如果支配，将旧 Label 标记为 active = false (逻辑删除) 并移出 SoA
     // 这是 C101 这种密集图能跑得动的关键！
-    for (int idx : set) {
-        Label& old = label_pool[idx];
-        if (!old.active) continue;
-
-        if (new_label.cost <= old.cost + 1e-6 &&
-            new_label.time <= old.time + 1e-6 &&
-            new_label.load <= old.load &&
-            new_label.visited_mask.is_subset_of(old.visited_mask)) {
-            old.active = false; // 杀掉旧 Label
-        }
+    soa_find_dominated(soa, new_label, use_simd, dominated_scratch, checks);
+    // 位置升序，从后往前 swap-remove 不会挪动还没处理的位置
+    for (auto it = dominated_scratch.rbegin(); it != dominated_scratch.rend(); ++it) {
+        label_pool[soa.index[*it]].active = false; // 杀掉旧 Label
+        soa.remove(*it);
     }
+    stats.dominance_checks += checks;
+    stats.dominated_backward += (long long)dominated_scratch.size();
 
     return false; // 新 Label 存活
 }
 
+void LabelingSolver::set_use_simd(bool v) {
+    visit([v](auto& e) { e.use_simd = v && simd_available(); });
+}
+
+// =======================
+// [新增] 二维支配桶版本
+// =======================
+// old 支配 new 需要 old.time <= new.time 且 old.load <= new.load：只可能在左下方的格子里；
+// new 支配 old 只可能在右上方的格子里。区域位图 & 非空位图直接跳到要比较的格子，
+// 格内最小成本 > new.cost 的格子整格跳过 (前向)，格内最大成本 < new.cost 的格子整格跳过 (后向)。
+// 逐对比较的条件与一维版本完全相同，所以支配结果不变。
+// [修改] 容差取 R::cost_tol / R::time_tol (定点引擎的时间是精确比较)
+template <class R>
+bool LabelingEngine<R>::check_and_update_dominance_2d(int node, const LabelR& new_label) {
+    DomCellT<R>* cells = &dom_cells[(size_t)node * time_cells * load_buckets];
+    const int q_new = load_cell(new_label.load);
+    const uint64_t nonempty = nonempty_cells[node];
+    long long checks = 0, skipped = 0;
+
+    // 1. Forward Check
+    uint64_t todo = nonempty & region_forward[time_cell(new_label.time + R::time_tol) * load_buckets + q_new];
+    while (todo) {
+        const int c = lowest_bit(todo);
+        todo &= todo - 1;
+        const DomCellT<R>& cell = cells[c];
+        if (cell.min_cost > new_label.cost + R::cost_tol) { ++skipped; continue; }
+        for (int idx : cell.labels) {
+            const LabelR& old = label_pool[idx];
+            if (!old.active) continue;
+            ++checks;
+            if (old.cost <= new_label.cost + R::cost_tol &&
+                old.time <= new_label.time + R::time_tol &&
+                old.load <= new_label.load &&
+                old.visited_mask.is_subset_of(new_label.visited_mask)) {
+                stats.dominance_checks += checks;
+                stats.cells_skipped += skipped;
+                ++stats.dominated_forward;
+                return true;
+            }
+        }
+    }
+
+    // 2. Backward Check
+    long long killed = 0;
+    todo = nonempty & region_backward[time_cell(new_label.time - R::time_tol) * load_buckets + q_new];
+    while (todo) {
+        const int c = lowest_bit(todo);
+        todo &= todo - 1;
+        DomCellT<R>& cell = cells[c];
+        if (cell.max_cost < new_label.cost - R::cost_tol) { ++skipped; continue; }
+        for (int idx : cell.labels) {
+            LabelR& old = label_pool[idx];
+            if (!old.active) continue;
+            ++checks;
+            if (new_label.cost <= old.cost + R::cost_tol &&
+                new_label.time <= old.time + R::time_tol &&
+                new_label.load <= old.load &&
+                new_label.visited_mask.is_subset_of(old.visited_mask)) {
+                old.active = false;
+                ++killed;
+            }
+        }
+    }
+    stats.dominance_checks += checks;
+    stats.cells_skipped += skipped;
+    stats.dominated_backward += killed;
+    return false;
+}
+
+template <class R>
+void LabelingEngine<R>::insert_dom_cell(int node, int label_idx) {
+    const LabelR& L = label_pool[label_idx];
+    const int c = time_cell(L.time) * load_buckets + load_cell(L.load);
+    DomCellT<R>& cell = dom_cells[(size_t)node * time_cells * load_buckets + c];
+    nonempty_cells[node] |= (1ULL << c);
+    cell.labels.push_back(label_idx);
+    cell.min_cost = std::min(cell.min_cost, L.cost);
+    cell.max_cost = std::max(cell.max_cost, L.cost);
+}
+
 // [新增] 构建图：预计算 + 强剪枝
-void BucketGraph::build(const ProblemData& data) {
+template <class R>
+void BucketGraphT<R>::build(const ProblemData& data, const ResourceScale<R>& sc) {
     nodes_outgoing_arcs.resize(data.num_nodes);
 
+    // [新增] ng-set：自己放在位置 0，其后是 Python 给的邻居 (去重)；没给则为全集 (ESPPRC)
+    const bool elementary = data.ng_neighbor_lists.empty();
+    if (elementary && data.num_nodes > 256) {
+        throw std::invalid_argument("elementary pricing (no ng-sets) supports at most 256 nodes");
+    }
+    ng_sets.assign(data.num_nodes, {});
+    std::vector<int> pos(data.num_nodes, -1);
     for (int i = 0; i < data.num_nodes; ++i) {
-        // 预分配内存，避免 push_back 导致的重分配（假设平均每个点 20-50 个邻居）
-        nodes_outgoing_arcs[i].reserve(data.num_nodes / 2); 
+        auto& ng = ng_sets[i];
+        ng.push_back(i);
+        pos[i] = 0;
+        if (elementary) {
+            for (int k = 0; k < data.num_nodes; ++k) if (k != i) ng.push_back(k);
+        } else {
+            for (int k : data.ng_neighbor_lists[i]) {
+                if (k >= 0 && k < data.num_nodes && pos[k] < 0) {
+                    pos[k] = 0;
+                    ng.push_back(k);
+                }
+            }
+        }
+        for (int k : ng) pos[k] = -1;
+        if (ng.size() > 256) {
+            throw std::invalid_argument("ng-sets larger than 256 nodes are not supported (FastBitset)");
+        }
+    }
+    ng_transfer.clear();
 
+    for (int i = 0; i < data.num_nodes; ++i) {
         // 遍历所有可能的邻居（这里用原始数据中的全连接或近邻表）
         // 如果你的 data.neighbors 已经是近邻表，就在此基础上过滤
         const auto& candidates = data.neighbors[i]; // 或者 0..num_nodes
 
+        // 按候选弧数预分配 ([修改] 原来按 num_nodes / 2 预留，几千个客户时光预留就要几百 MB)
+        nodes_outgoing_arcs[i].reserve(candidates.size());
+
         for (int j : candidates) {
             if (i == j) continue;
 
@@ -95,20 +262,29 @@ void BucketGraph::build(const ProblemData& data) {
             // 2. 时间窗剪枝 (Time Window Cut)
             // 最早到达 j 的时间 = max(TW_start[i], arrival_at_i) + service[i] + travel[i][j]
             // 这里我们用最宽松的条件：i 的最早出发时间 + 路程
-            double min_arrival = data.tw_start[i] + data.service_times[i] + data.time_matrix[i][j];
+            double min_arrival = data.tw_start[i] + data.service_times[i] + data.travel(i, j);
             if (min_arrival > data.tw_end[j]) continue;
 
             // --- 构建弧 (Arc) ---
-            Arc arc;
+            ArcT<R> arc;
             arc.target = j;
             // 注意：Reduced Cost 依赖 Duals，是动态的，所以这里只存静态的距离成本
             // 在 solve 中我们再减去 duals[j]
-            arc.cost = data.dist_matrix[i][j]; 
+            arc.cost = sc.cost(data.dist(i, j)); 
             // 预计算 duration = travel + service_at_i (注意定义的语义)
             // 通常 label.time 是到达时间。到达 j = 到达 i + service_at_i + travel
-            arc.duration = data.service_times[i] + data.time_matrix[i][j];
-            arc.distance = data.dist_matrix[i][j];
+            arc.duration = sc.time(data.service_times[i] + data.travel(i, j));
+            arc.distance = data.dist(i, j);
             arc.demand = data.demands[j];
+            // ng 位置映射 (pos 只在这一段里临时填上 ng_sets[j] 的位置)
+            for (size_t q = 0; q < ng_sets[j].size(); ++q) pos[ng_sets[j][q]] = (int)q;
+            arc.ng_pos = -1;
+            arc.ng_map = (int)ng_transfer.size();
+            for (size_t p = 0; p < ng_sets[i].size(); ++p) {
+                if (ng_sets[i][p] == j) arc.ng_pos = (int)p;
+                ng_transfer.push_back((int16_t)pos[ng_sets[i][p]]);
+            }
+            for (int k : ng_sets[j]) pos[k] = -1;
 
             nodes_outgoing_arcs[i].push_back(arc);
         }
@@ -116,7 +292,96 @@ void BucketGraph::build(const ProblemData& data) {
 }
 
 
-void LabelingSolver::reset_forbidden_mask(const std::vector<std::pair<int, int>>& arcs) {
+// [新增] 对偶感知的稀疏图：每个客户节点保留 dist[i][j] - duals[j] 最小的 arc_limit 条出弧
+// 弧的 cost 本身不变 (扩展时仍减 duals[j])，只是按当前对偶挑选要扫描的弧
+template <class R>
+void LabelingEngine<R>::build_heuristic_arcs(const std::vector<cost_t>& duals) {
+    const auto& full = graph.nodes_outgoing_arcs;
+    heuristic_arcs.resize(full.size());
+    for (size_t i = 0; i < full.size(); ++i) {
+        auto& arcs = heuristic_arcs[i];
+        arcs.clear();
+        for (const ArcT<R>& arc : full[i]) {
+            if (arc.target != 0) arcs.push_back(arc);
+        }
+        if (i == 0 || (int)arcs.size() <= arc_limit) continue;
+        std::nth_element(arcs.begin(), arcs.begin() + arc_limit, arcs.end(),
+                         [&duals](const ArcT<R>& x, const ArcT<R>& y) {
+                             return x.cost - duals[x.target] < y.cost - duals[y.target];
+                         });
+        arcs.resize(arc_limit);
+    }
+}
+
+// [新增] 热启动种子
+// label 的资源 (时间、载重、ng 掩码) 与对偶无关，只有 cost 要按新对偶沿父链重算。
+// 只保留上一次存活的 label 和它们的祖先 (父在子前的顺序不变)，路径用到禁止弧的整棵子树作废。
+// 上一次结束时存活的 label 按下标顺序走一遍正常的支配检查，没被支配的放进桶里等待扩展；
+// 其余只作为父链保留 (active = false)。这些种子都是真实可行的部分路径，所以结果仍然精确。
+template <class R>
+void LabelingEngine<R>::seed_from_previous(const std::vector<LabelR>& prev, const std::vector<cost_t>& duals) {
+    // 压缩下标：不压缩的话 label_pool 会随迭代不断变长
+    const int n_prev = (int)prev.size();
+    std::vector<int> new_index(n_prev, -1);
+    new_index[0] = 0;
+    for (int k = n_prev - 1; k >= 1; --k) {
+        if (!prev[k].active) continue;
+        for (int a = k; a > 0 && new_index[a] == -1; a = prev[a].parent_index) new_index[a] = 1;
+    }
+    int n = 0;
+    for (int k = 0; k < n_prev; ++k) {
+        if (new_index[k] != -1) new_index[k] = n++;
+    }
+
+    label_pool.resize(n);
+    seed_child_head.assign(n, -1);
+    seed_child_next.assign(n, -1);
+    std::vector<char> valid(n, 0), seed(n, 0);
+    valid[0] = 1;
+    for (int k = 1; k < n_prev; ++k) {
+        const int idx = new_index[k];
+        if (idx == -1) continue;
+        LabelR L = prev[k];
+        const int p = new_index[L.parent_index];
+        const int i = label_pool[p].node_id, j = L.node_id;
+        valid[idx] = valid[p] && !is_arc_forbidden(i, j);
+        seed[idx] = L.active;
+        const cost_t rc = sc.cost(data.dist(i, j)) - duals[j];
+        L.cost = label_pool[p].cost + rc;
+        L.parent_index = p;
+        L.active = false;
+        label_pool[idx] = L;
+    }
+    for (int k = 1; k < n; ++k) {
+        if (!seed[k] || !valid[k]) continue;
+        ++stats.seeded_labels;
+        const int p = label_pool[k].parent_index;
+        seed_child_next[k] = seed_child_head[p];
+        seed_child_head[p] = k;
+
+        const int j = label_pool[k].node_id;
+        const bool dominated = load_buckets > 0 ? check_and_update_dominance_2d(j, label_pool[k])
+                                                : check_and_update_dominance(j, label_pool[k]);
+        if (dominated) continue;
+        label_pool[k].active = true;
+        dominance_sets[j].push_back(k);
+        if (load_buckets > 0) insert_dom_cell(j, k);
+        else dominance_soa[j].push(label_pool[k], k);
+        int bucket_idx = (int)(label_pool[k].time / bucket_step);
+        if (bucket_idx < (int)buckets.size()) buckets[bucket_idx].push_back(k);
+    }
+}
+
+template <class R>
+bool LabelingEngine<R>::has_seed_child(int label_idx, int node) const {
+    for (int c = seed_child_head[label_idx]; c != -1; c = seed_child_next[c]) {
+        if (label_pool[c].node_id == node) return true;
+    }
+    return false;
+}
+
+template <class R>
+void LabelingEngine<R>::reset_forbidden_mask(const std::vector<std::pair<int, int>>& arcs) {
     int N = data.num_nodes;
     // 1. 如果 mask 大小不对（比如第一次运行），重新分配
     if (forbidden_mask.size() != N * N) {
@@ -136,7 +401,8 @@ void LabelingSolver::reset_forbidden_mask(const std::vector<std::pair<int, int>>
     }
 }
 
-inline bool LabelingSolver::is_arc_forbidden(int u, int v) const {
+template <class R>
+inline bool LabelingEngine<R>::is_arc_forbidden(int u, int v) const {
     // 这里的查表速度是 O(1)，极快
     return forbidden_mask[u * data.num_nodes + v];
 }
@@ -145,30 +411,114 @@ inline bool LabelingSolver::is_arc_forbidden(int u, int v) const {
 // =======================
 std::vector<std::vector<int>> LabelingSolver::solve(
     const std::vector<double>& duals,
-    const std::vector<std::pair<int, int>>& forbidden_arcs) {
+    const std::vector<std::pair<int, int>>& forbidden_arcs,
+    int max_columns,
+    int max_per_customer,
+    double time_limit) {
+    std::vector<Column> columns = solve_columns(duals, forbidden_arcs, max_columns, max_per_customer, time_limit);
+    std::vector<std::vector<int>> paths;
+    paths.reserve(columns.size());
+    for (auto& col : columns) paths.push_back(std::move(col.path));
+    return paths;
+}
+
+std::vector<Column> LabelingSolver::solve_columns(
+    const std::vector<double>& duals,
+    const std::vector<std::pair<int, int>>& forbidden_arcs,
+    int max_columns,
+    int max_per_customer,
+    double time_limit) {
+    ColumnBatch batch = solve_batch(duals, forbidden_arcs, max_columns, max_per_customer, time_limit);
+    std::vector<Column> columns(batch.size());
+    for (size_t k = 0; k < batch.size(); ++k) {
+        columns[k].path.assign(batch.nodes.begin() + batch.offsets[k],
+                               batch.nodes.begin() + batch.offsets[k + 1]);
+        columns[k].reduced_cost = batch.reduced_costs[k];
+        columns[k].distance = batch.distances[k];
+        columns[k].duration = batch.durations[k];
+        columns[k].load = batch.loads[k];
+    }
+    return columns;
+}
+
+ColumnBatch LabelingSolver::solve_batch(
+    const std::vector<double>& duals,
+    const std::vector<std::pair<int, int>>& forbidden_arcs,
+    int max_columns,
+    int max_per_customer,
+    double time_limit) {
+    return visit([&](auto& e) { return e.solve_batch(duals, forbidden_arcs, max_columns, max_per_customer, time_limit); });
+}
+
+template <class R>
+ColumnBatch LabelingEngine<R>::solve_batch(
+    const std::vector<double>& duals,
+    const std::vector<std::pair<int, int>>& forbidden_arcs,
+    int max_columns,
+    int max_per_customer,
+    double time_limit) {
+    const auto t_start = Clock::now();
+    stats = SolveStats();
+    stats.bucket_histogram.assign(buckets.size(), 0);
+
     // 0. [新增] 设置禁止表
     reset_forbidden_mask(forbidden_arcs);
-    // 1. 重置
+    scaled_duals.resize(duals.size());
+    for (size_t k = 0; k < duals.size(); ++k) scaled_duals[k] = sc.cost(duals[k]);
+    if (arc_limit > 0) build_heuristic_arcs(scaled_duals);
+    const auto& out_arcs = arc_limit > 0 ? heuristic_arcs : graph.nodes_outgoing_arcs;
+    for (const auto& arcs : out_arcs) stats.graph_arcs += (long long)arcs.size();
+    // 1. 重置 (热启动时先把上一次的 label_pool 拿出来)
+    std::vector<LabelR> prev_pool;
+    if (warm_start) prev_pool.swap(label_pool);
     label_pool.clear();
     for(auto& vec : dominance_sets) vec.clear();
+    for(auto& soa : dominance_soa) soa.clear();
     for(auto& vec : buckets) vec.clear();
+    // 只清理上一次用过的格子
+    for (int node = 0; node < (int)nonempty_cells.size(); ++node) {
+        for (uint64_t bits = nonempty_cells[node]; bits; bits &= bits - 1) {
+            dom_cells[(size_t)node * time_cells * load_buckets + lowest_bit(bits)].reset();
+        }
+        nonempty_cells[node] = 0;
+    }
 
     // 2. 初始化 Root Label (Depot)
-    Label root;
+    LabelR root;
     root.node_id = 0;
     root.parent_index = -1;
-    root.cost = 0.0;
-    root.time = data.tw_start[0];
+    root.cost = 0;
+    root.time = tw_start[0];
     root.load = 0;
-    root.visited_mask.set(0); 
+    root.visited_mask.set(0);  // 位置 0 = depot 自己
     root.active = true;
 
     label_pool.push_back(root);
     buckets[0].push_back(0);
     dominance_sets[0].push_back(0);
+    if (load_buckets > 0) insert_dom_cell(0, 0);
+    else dominance_soa[0].push(root, 0);
+    // 热启动：按新对偶重算上一次的 label 并作为种子放进支配集和桶
+    int n_seed_pool = 0;
+    if (prev_pool.size() > 1) {
+        seed_from_previous(prev_pool, scaled_duals);
+        n_seed_pool = (int)label_pool.size();
+    }
+    stats.time_setup = seconds_since(t_start);
 
     // 3. Bucket 循环
-    for (int b = 0; b < buckets.size(); ++b) {
+    const auto t_labeling = Clock::now();
+    long long dom_calls = 0, dom_sampled = 0;
+    double dom_sampled_time = 0.0;
+    // 截止时间：每 64 个桶、以及每扩展 256 个 label 检查一次 (读时钟本身也有开销)
+    const bool has_deadline = time_limit > 0.0;
+    const auto deadline = t_start + std::chrono::duration_cast<Clock::duration>(
+        std::chrono::duration<double>(has_deadline ? time_limit : 0.0));
+    for (int b = 0; b < buckets.size() && !stats.timed_out; ++b) {
+        if (has_deadline && (b & 63) == 0 && Clock::now() >= deadline) {
+            stats.timed_out = true;
+            break;
+        }
         // 使用索引遍历，因为 buckets[b] 可能在循环中不被修改，
         // 但为了安全和性能，最好将本轮要处理的全部取出来，或者标准索引遍历
         // 注意：Labeling 算法中，推入的桶索引通常 >= 当前桶，所以当前桶不会增加元素
@@ -179,46 +529,57 @@ std::vector<std::vector<int>> LabelingSolver::solve(
             if (!label_pool[curr_idx].active) continue;
             
             // 拷贝一份数据到栈上，避免 label_pool 扩容导致引用失效
-            const Label curr_label = label_pool[curr_idx]; 
+            const LabelR curr_label = label_pool[curr_idx]; 
+            ++stats.labels_extended;
+            if (has_deadline && (stats.labels_extended & 255) == 0 && Clock::now() >= deadline) {
+                stats.timed_out = true;
+                break;
+            }
 
             int i = curr_label.node_id;
             // [修改] 使用 BucketGraph 的预处理弧进行遍历
             // 这里的 arcs 已经是经过“容量”和“静态时间窗”过滤的
-            const auto& arcs = graph.nodes_outgoing_arcs[i];
+            const auto& arcs = out_arcs[i];
             for (const auto& arc : arcs) {
                 int j = arc.target;
                 // === [新增] 分支核心逻辑：如果是禁止边，直接跳过 ===
                 if (is_arc_forbidden(i, j)) {
+                    ++stats.forbidden_skipped;
                     continue; 
                 }
+                // 热启动：这条弧的扩展结果就是已经作为种子处理过的子 label，不必重算
+                if (curr_idx < n_seed_pool && seed_child_head[curr_idx] != -1 && has_seed_child(curr_idx, j)) {
+                    ++stats.seed_skipped;
+                    continue;
+                }
                 // a. ng-Route 可行性检查 (保持不变)
-                if (curr_label.visited_mask.test(j)) continue;
+                if (arc.ng_pos >= 0 && curr_label.visited_mask.test(arc.ng_pos)) { ++stats.ng_rejected; continue; }
 
                 // b. 资源检查 (简化版)
                 // 静态容量已经在 build 时检查过了，但在 Labeling 中累积容量仍需检查
                 int new_load = curr_label.load + arc.demand;
-                if (new_load > data.vehicle_capacity) continue;
+                if (new_load > data.vehicle_capacity) { ++stats.capacity_rejected; continue; }
 
                 // 时间计算：直接使用预计算的 duration
-                double arrival = curr_label.time + arc.duration;
-                double start_time = std::max(arrival, data.tw_start[j]);
+                const time_t arrival = curr_label.time + arc.duration;
+                const time_t start_time = std::max(arrival, tw_start[j]);
 
                 // [关键] 此时再做一次动态时间窗检查
                 // 虽然 build 时做了检查，但那是基于 i 的最早时间。
                 // 现在的 curr_label.time 可能比最早时间晚，所以必须检查。
-                if (start_time > data.tw_end[j]) continue;
+                if (start_time > tw_end[j]) { ++stats.tw_rejected; continue; }
 
                 // c. 计算 Cost (结合 Duals)
                 // Reduced Cost = arc.cost (distance) - duals[j]
-                double rc = arc.cost - duals[j];
-                double new_cost = curr_label.cost + rc;
+                const cost_t rc = arc.cost - scaled_duals[j];
+                const cost_t new_cost = curr_label.cost + rc;
                 
                 // d. 构造新掩码 (ng-relaxation 核心)
-                // NewMask = (OldMask & ng_mask[j]) | {j}
-                FastBitset new_mask = curr_label.visited_mask.apply_ng_relaxation(data.ng_masks[j], j);
+                // NewMask = (OldMask & N(j)) | {j}，按位置映射到 j 的 ng-set 上
+                FastBitset new_mask = graph.extend_ng(curr_label.visited_mask, arc);
 
                 // e. 构造临时 Label 用于支配性检查
-                Label temp_label;
+                LabelR temp_label;
                 temp_label.cost = new_cost;
                 temp_label.time = start_time;
                 temp_label.load = new_load;
@@ -226,7 +587,19 @@ std::vector<std::vector<int>> LabelingSolver::solve(
                 // node_id 和 parent 不需要参与支配检查
 
                 // f. 支配性检查 (Check + Clean)
-                if (check_and_update_dominance(j, temp_label)) {
+                //    每 32 次调用采样计时一次再按比例放大，逐次读时钟的开销比支配检查本身还大
+                bool dominated;
+                if ((dom_calls++ & 31) == 0) {
+                    const auto t_dom = Clock::now();
+                    dominated = load_buckets > 0 ? check_and_update_dominance_2d(j, temp_label)
+                                                 : check_and_update_dominance(j, temp_label);
+                    dom_sampled_time += seconds_since(t_dom);
+                    ++dom_sampled;
+                } else {
+                    dominated = load_buckets > 0 ? check_and_update_dominance_2d(j, temp_label)
+                                                 : check_and_update_dominance(j, temp_label);
+                }
+                if (dominated) {
                     continue; // 被支配，跳过
                 }
 
@@ -240,56 +613,164 @@ std::vector<std::vector<int>> LabelingSolver::solve(
                 
                 // 加入支配集
                 dominance_sets[j].push_back(new_idx);
+                if (load_buckets > 0) insert_dom_cell(j, new_idx);
+                else dominance_soa[j].push(temp_label, new_idx);
 
                 // 加入时间桶
                 int bucket_idx = (int)(start_time / bucket_step);
+                ++stats.labels_created;
                 if (bucket_idx < buckets.size()) {
                     buckets[bucket_idx].push_back(new_idx);
+                    ++stats.bucket_histogram[bucket_idx];
                 }
             }
         }
     }
+    stats.peak_pool = (long long)label_pool.size();
+    const double time_labeling = seconds_since(t_labeling);
+    if (dom_sampled > 0) {
+        double per_call = std::max(0.0, dom_sampled_time / dom_sampled - clock_overhead());
+        stats.time_dominance = std::min(time_labeling, per_call * dom_calls);
+    }
+    stats.time_extension = time_labeling - stats.time_dominance;
+    const auto t_collect = Clock::now();
 
     // =======================
     // 4. 收集结果 (回到 Depot)
     // =======================
-    std::vector<std::pair<double, int>> best_labels;
+    // (final_cost, label_idx, arrival_depot)
+    std::vector<std::tuple<double, int, double>> best_labels;
     
     // 遍历所有非 Depot 点
     for(int i=1; i<data.num_nodes; ++i) {
         for(int idx : dominance_sets[i]) {
-            const Label& L = label_pool[idx];
+            const LabelR& L = label_pool[idx];
             if (!L.active) continue;
 
-            double arrival_depot = L.time + data.service_times[i] + data.time_matrix[i][0];
-            if (arrival_depot <= data.tw_end[0]) {
-                double final_cost = L.cost + data.dist_matrix[i][0] - duals[0];
-                if (final_cost < -1e-5) {
-                    best_labels.push_back({final_cost, idx});
+            const time_t arrival_depot = L.time + sc.time(data.service_times[i]) + sc.time(data.travel(i, 0));
+            if (arrival_depot <= tw_end[0]) {
+                const cost_t final_cost = L.cost + sc.cost(data.dist(i, 0)) - scaled_duals[0];
+                if constexpr (std::is_same_v<R, FloatRes>) {
+                    if (final_cost < -1e-5) {
+                        best_labels.push_back({final_cost, idx, arrival_depot});
+                    }
+                } else {
+                    // 定点成本的取整误差在 1e-8 量级，直接换回 double 排序；选中的列再按 double 重算 (见下)
+                    const double rc = (double)final_cost / FixedRes::COST_SCALE;
+                    if (rc < -1e-5) best_labels.push_back({rc, idx, 0.0});
                 }
             }
         }
     }
 
-    std::sort(best_labels.begin(), best_labels.end());
-    
-    // 限制返回路径数量 (Heuristic limit)
-    int limit = std::min((int)best_labels.size(), 1000);
-    std::vector<std::vector<int>> results;
+    // 5. 选列：只对前 max_columns 个做 partial sort，只回溯被选中的 label
+    //    max_per_customer > 0 时做多样性筛选：每个客户最多被 max_per_customer 条返回列覆盖
+    const size_t n_cand = best_labels.size();
+    const size_t limit = std::min(n_cand, (size_t)std::max(max_columns, 0));
+    ColumnBatch batch;
+    batch.offsets.reserve(limit + 1);
+    batch.reduced_costs.reserve(limit);
+    batch.distances.reserve(limit);
+    batch.durations.reserve(limit);
+    batch.loads.reserve(limit);
+    batch.offsets.push_back(0);
+    stats.depot_candidates = (long long)n_cand;
+    if (limit == 0) {
+        finish_stats(batch, t_start, t_collect);
+        return batch;
+    }
+
+    // 多样性筛选会跳过一部分候选，排序窗口按需倍增
+    size_t sorted_end = (max_per_customer > 0) ? std::min(n_cand, 4 * limit) : limit;
+    std::partial_sort(best_labels.begin(), best_labels.begin() + sorted_end, best_labels.end());
 
-    for(int k=0; k<limit; ++k) {
-        int idx = best_labels[k].second;
-        std::vector<int> path;
+    std::vector<int> cover_count;
+    if (max_per_customer > 0) cover_count.assign(data.num_nodes, 0);
+
+    std::vector<int> path;
+    auto trace_path = [&](int idx) {
+        path.clear();
         path.push_back(0);
-        
-        int curr = idx;
-        while(curr != -1) {
+        for (int curr = idx; curr != -1; curr = label_pool[curr].parent_index) {
             path.push_back(label_pool[curr].node_id);
-            curr = label_pool[curr].parent_index;
         }
         std::reverse(path.begin(), path.end());
-        results.push_back(path);
+    };
+    for (size_t k = 0; k < n_cand && batch.size() < limit; ++k) {
+        if (k == sorted_end) {
+            size_t next_end = std::min(n_cand, 2 * sorted_end);
+            std::partial_sort(best_labels.begin() + k, best_labels.begin() + next_end, best_labels.end());
+            sorted_end = next_end;
+        }
+        int idx = std::get<1>(best_labels[k]);
+        double reduced_cost = std::get<0>(best_labels[k]);
+        double arrival = std::get<2>(best_labels[k]);
+        if constexpr (std::is_same_v<R, FixedRes>) {
+            // 定点时间是宽松取整的：按 double 复核，剔除只在取整后可行的路径
+            trace_path(idx);
+            if (!exact_cost(path, duals, reduced_cost, arrival) || reduced_cost >= -1e-5) continue;
+        }
+
+        if (max_per_customer > 0) {
+            // 只沿 parent 指针检查覆盖次数，通过了才真正回溯路径
+            bool saturated = false;
+            for (int curr = idx; curr != -1 && !saturated; curr = label_pool[curr].parent_index) {
+                int v = label_pool[curr].node_id;
+                if (v != 0 && cover_count[v] >= max_per_customer) saturated = true;
+            }
+            if (saturated) continue;
+            for (int curr = idx; curr != -1; curr = label_pool[curr].parent_index) {
+                int v = label_pool[curr].node_id;
+                if (v != 0) cover_count[v]++;
+            }
+        }
+
+        if constexpr (std::is_same_v<R, FloatRes>) trace_path(idx);
+
+        // 回溯时顺便累加真实距离，Python 侧不再重复计算
+        double distance = 0.0;
+        for (size_t p = 0; p + 1 < path.size(); ++p) {
+            distance += data.dist(path[p], path[p + 1]);
+        }
+        batch.nodes.insert(batch.nodes.end(), path.begin(), path.end());
+        batch.offsets.push_back((int64_t)batch.nodes.size());
+        batch.reduced_costs.push_back(reduced_cost);
+        batch.distances.push_back(distance);
+        batch.durations.push_back(arrival);
+        batch.loads.push_back(label_pool[idx].load);
+    }
+
+    finish_stats(batch, t_start, t_collect);
+    return batch;
+}
+
+template <class R>
+bool LabelingEngine<R>::exact_cost(const std::vector<int>& path, const std::vector<double>& duals,
+                                   double& reduced_cost, double& arrival) const {
+    double cost = 0.0, t = data.tw_start[0];
+    const size_t last = path.size() - 2;
+    for (size_t p = 0; p < last; ++p) {
+        const int u = path[p], v = path[p + 1];
+        cost += data.dist(u, v) - duals[v];
+        t = std::max(t + (data.service_times[u] + data.travel(u, v)), data.tw_start[v]);
+        if (t > data.tw_end[v]) return false;
     }
+    const int u = path[last];
+    reduced_cost = cost + data.dist(u, 0) - duals[0];
+    arrival = t + data.service_times[u] + data.travel(u, 0);
+    return arrival <= data.tw_end[0];
+}
+
+template <class R>
+void LabelingEngine<R>::finish_stats(const ColumnBatch& batch,
+                                     std::chrono::steady_clock::time_point t_start,
+                                     std::chrono::steady_clock::time_point t_collect) {
+    stats.columns_returned = (long long)batch.size();
+    stats.time_collection = seconds_since(t_collect);
+    stats.time_total = seconds_since(t_start);
+}
 
-    return results;
-}
\ No newline at end of file
+template class BucketGraphT<FloatRes>;
+template class BucketGraphT<FixedRes>;
+template class LabelingEngine<FloatRes>;
+template class LabelingEngine<FixedRes>;
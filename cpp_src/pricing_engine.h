@@ -5,7 +5,25 @@
 #include <cmath>
 #include <algorithm>
 #include <cstring> // for memset
+#include <cstdint>
+#include <chrono>
 #include <iostream>
+#include <limits>
+#include <memory>
+#ifdef _MSC_VER
+#include <intrin.h>
+#endif
+
+// 最低位 1 的下标 (x != 0)
+inline int lowest_bit(uint64_t x) {
+#ifdef _MSC_VER
+    unsigned long idx;
+    _BitScanForward64(&idx, x);
+    return (int)idx;
+#else
+    return __builtin_ctzll(x);
+#endif
+}
 
 // 1. 定义高性能 Bitset (放在 struct 定义之前)
 struct FastBitset {
@@ -30,16 +48,6 @@ struct FastBitset {
         return true;
     }
 
-    // ng-route 核心逻辑：生成去往 next_node 时的访问状态
-    // 新状态 = (当前状态 & next_node 的记忆集) | {next_node}
-    FastBitset apply_ng_relaxation(const FastBitset& ng_mask, int next_node) const {
-        FastBitset res;
-        for(int i=0; i<4; ++i) {
-            res.bits[i] = bits[i] & ng_mask.bits[i];
-        }
-        res.set(next_node);
-        return res;
-    }
 };
 
 
@@ -56,60 +64,273 @@ struct ProblemData {
     std::vector<std::vector<double>> time_matrix;
     std::vector<std::vector<int>> neighbors; 
 
+    // [新增] 稀疏模式：dist_matrix 为空时不存稠密矩阵，距离由坐标现算 (和 Python 侧同一公式)，
+    // 行驶时间等于距离；候选弧仍然是 neighbors (由算例的 CSR 候选弧表拆出)
+    std::vector<double> xs;
+    std::vector<double> ys;
+
+    bool sparse() const { return dist_matrix.empty(); }
+
+    double dist(int i, int j) const {
+        if (!dist_matrix.empty()) return dist_matrix[i][j];
+        const double dx = xs[i] - xs[j], dy = ys[i] - ys[j];
+        return std::sqrt(dx * dx + dy * dy);
+    }
+
+    double travel(int i, int j) const {
+        return time_matrix.empty() ? dist(i, j) : time_matrix[i][j];
+    }
+
     // === 新增部分 ===
-    // 1. Python 传进来的原始数据 (List[List[int]])
+    // Python 传进来的 ng-set (List[List[int]])；为空时每个节点的 ng-set 是全集 (基本路径 ESPPRC)
     std::vector<std::vector<int>> ng_neighbor_lists; 
-    
-    // 2. C++ 内部转换后的 Bitset 数组 (用于计算)
-    std::vector<FastBitset> ng_masks; 
+};
+
+// [新增] label 资源的数值类型 (定价引擎的模板参数)
+// FloatRes: 原来的浮点引擎，成本 / 时间为 double，支配比较带 1e-6 容差
+// FixedRes: 定点引擎，时间乘以 time_scale 存成 int32，成本乘以 COST_SCALE 存成 int64，
+//           支配比较是整数比较：成本容差同样是 1e-6 (= 1000 个单位，远大于每条弧 0.5 个单位的取整误差，
+//           浮点引擎里成本相同的 label 在这里仍然互相支配)，时间容差为 0
+struct FloatRes {
+    using cost_t = double;
+    using time_t = double;
+    using load_t = double;  // SoA 里的载重存成 double，和 cost / time 共用同一套 AVX2 比较
+    static constexpr double cost_tol = 1e-6;
+    static constexpr double time_tol = 1e-6;
+};
+
+struct FixedRes {
+    using cost_t = int64_t;
+    using time_t = int32_t;
+    using load_t = int32_t;
+    static constexpr double COST_SCALE = 1e9;  // |成本| < 9e9 不会溢出 (Big-M 对偶是 1e5 量级)
+    static constexpr int64_t cost_tol = 1000;
+    static constexpr int32_t time_tol = 0;
+};
+
+// [新增] double -> 资源类型的换算。浮点引擎原样返回；
+// 定点引擎的时间 (行驶、服务、最早开始) 向下取整、截止时间向上取整，只会更宽松：
+// double 下可行的路径在定点引擎里一定可行 (预处理收紧后的时间窗经常正好卡在某条路径的到达时刻上，
+// 保守取整会丢掉这些列)。成本四舍五入。选中的列按 double 重新检查时间窗并重算成本 (见 exact_cost)。
+// 代价是定点引擎只是启发式：只在取整后可行的 label 仍会参与支配，可能删掉 double 下可行、
+// 本来能延伸出负 reduced cost 列的 label。"没有负 RC 列" 的结论只能由浮点引擎给出。
+template <class R> struct ResourceScale;
+
+template <> struct ResourceScale<FloatRes> {
+    explicit ResourceScale(int = 0) {}
+    double time(double t) const { return t; }
+    double deadline(double t) const { return t; }
+    double cost(double c) const { return c; }
+    double width(double w) const { return w; }  // 桶宽 / 格宽
+};
+
+template <> struct ResourceScale<FixedRes> {
+    double time_scale;
+    explicit ResourceScale(int scale) : time_scale(scale) {}
+    int32_t time(double t) const { return (int32_t)std::floor(t * time_scale); }
+    int32_t deadline(double t) const { return (int32_t)std::ceil(t * time_scale); }
+    int64_t cost(double c) const { return std::llround(c * FixedRes::COST_SCALE); }
+    double width(double w) const { return w * time_scale; }
 };
 
 // 3. 修改 Label
-struct Label {
+// [修改] 成本 / 时间的类型由 R 决定：浮点 72 字节，定点 64 字节 (正好一条 cache line)
+template <class R>
+struct LabelT {
     int node_id;
     int parent_index;
-    double cost;
-    double time;
+    typename R::cost_t cost;
+    typename R::time_t time;
     int load;
-    FastBitset visited_mask; // 替换原来的 vector<uint64>
+    // [修改] ng 记忆集按 "当前节点的 ng-set 里的位置" 存 (记忆集总是当前节点 ng-set 的子集)，
+    // 所以节点数不受 256 位的限制，只要求每个 ng-set 不超过 256 个节点
+    FastBitset visited_mask;
     bool active;
 };
+using Label = LabelT<FloatRes>;
 
 // [新增] 定义紧凑的边结构，优化内存布局
-struct Arc {
-    int target;       // 目标节点 ID
-    double cost;      // 预计算的 Reduced Cost (部分) 或 距离成本
-    double duration;  // Travel Time + Service Time (预计算)
-    double distance;  // 用于计算真实成本
-    int demand;       // 资源消耗
+template <class R>
+struct ArcT {
+    int target;                     // 目标节点 ID
+    typename R::cost_t cost;        // 预计算的 Reduced Cost (部分) 或 距离成本
+    typename R::time_t duration;    // Travel Time + Service Time (预计算)
+    double distance;                // 用于计算真实成本
+    int demand;                     // 资源消耗
+    int ng_pos;                     // [新增] target 在起点 ng-set 里的位置 (-1: 不在)
+    int ng_map;                     // [新增] ng_transfer 中本条弧的起始下标
 };
+using Arc = ArcT<FloatRes>;
 
 // [新增] 桶图类：负责管理拓扑结构
-class BucketGraph {
+template <class R>
+class BucketGraphT {
 public:
     // 存储每个节点出发的“可行”边
     // vector index: from_node_id
-    std::vector<std::vector<Arc>> nodes_outgoing_arcs;
-    
-    // 构造函数：预处理和剪枝
-    void build(const ProblemData& data);
+    std::vector<std::vector<ArcT<R>>> nodes_outgoing_arcs;
+    // [新增] 每个节点的 ng-set (节点自己排在位置 0)，以及每条弧 i -> j 的位置映射：
+    // ng_transfer[arc.ng_map + p] = ng_sets[i][p] 在 ng_sets[j] 里的位置 (-1: 不在，扩展后被忘掉)
+    std::vector<std::vector<int>> ng_sets;
+    std::vector<int16_t> ng_transfer;
+
+    // 构造函数：预处理和剪枝 (剪枝在 double 上做，弧的成本 / 时长按 sc 换算)
+    void build(const ProblemData& data, const ResourceScale<R>& sc);
+
+    // 从节点 i 的记忆集 mask 沿 arc 扩展到 arc.target 后的记忆集: (M ∩ N(j)) ∪ {j}
+    FastBitset extend_ng(const FastBitset& mask, const ArcT<R>& arc) const {
+        FastBitset res;
+        res.set(0);
+        const int16_t* map = ng_transfer.data() + arc.ng_map;
+        for (int k = 0; k < 4; ++k) {
+            for (uint64_t w = mask.bits[k]; w; w &= w - 1) {
+                const int q = map[(k << 6) + lowest_bit(w)];
+                if (q >= 0) res.set(q);
+            }
+        }
+        return res;
+    }
 };
+using BucketGraph = BucketGraphT<FloatRes>;
 
-class LabelingSolver {
+// [新增] 定价返回的列：路径 + 引擎已经算好的成本与资源
+struct Column {
+    std::vector<int> path;   // [0, ..., 0]
+    double reduced_cost;     // 不含车辆固定成本
+    double distance;         // 真实距离成本
+    double duration;         // 回到 depot 的时刻
+    int load;
+};
+
+// [新增] 扁平列存储：所有路径的节点首尾相接，offsets[k]..offsets[k+1] 为第 k 条路径
+// 直接以 NumPy 数组交给 Python，避免 list of lists 的转换开销
+struct ColumnBatch {
+    std::vector<int> nodes;
+    std::vector<int64_t> offsets;       // size = num_columns + 1
+    std::vector<double> reduced_costs;  // 不含车辆固定成本
+    std::vector<double> distances;
+    std::vector<double> durations;
+    std::vector<int> loads;
+
+    size_t size() const { return reduced_costs.size(); }
+};
+
+// [新增] 每次 solve 的统计信息 (计数器 + 阶段计时)，开销只是若干整数自增
+struct SolveStats {
+    long long labels_created = 0;      // 通过支配检查、进入 label_pool 的 label (不含 root)
+    long long labels_extended = 0;     // 从桶中取出并尝试扩展的 label
+    long long dominated_forward = 0;   // 新 label 被已有 label 支配
+    long long dominated_backward = 0;  // 已有 label 被新 label 支配 (逻辑删除)
+    long long ng_rejected = 0;         // ng-route 记忆集拒绝
+    long long tw_rejected = 0;         // 时间窗拒绝
+    long long capacity_rejected = 0;   // 容量拒绝
+    long long forbidden_skipped = 0;   // 分支禁止弧跳过
+    long long dominance_checks = 0;    // 支配比较次数 (前向 + 后向)
+    long long cells_skipped = 0;       // 二维支配桶按桶内最小/最大成本整桶跳过的次数
+    long long seeded_labels = 0;       // 热启动：上一次存活、按新对偶重算后作为种子的 label
+    long long seed_skipped = 0;        // 热启动：扩展结果就是种子子 label 而跳过的弧
+    long long graph_arcs = 0;          // 本次使用的图的弧数 (arc_limit > 0 时为按对偶稀疏化后的图)
+    long long peak_pool = 0;           // label_pool 峰值大小
+    long long depot_candidates = 0;    // 回到 depot 且 RC < 0 的 label
+    long long columns_returned = 0;
+    bool timed_out = false;            // 因 time_limit 提前结束 (结果不保证是最优 RC)
+    std::vector<long long> bucket_histogram;  // 每个时间桶中创建的 label 数
+    // 阶段耗时 (秒)
+    double time_setup = 0.0;       // 重置 / 禁止表
+    double time_extension = 0.0;   // 桶循环中除支配检查外的部分
+    double time_dominance = 0.0;   // 支配检查 (1/32 采样估计)
+    double time_collection = 0.0;  // 收集、选列与路径回溯
+    double time_total = 0.0;
+};
+
+// [新增] 二维 (时间 × 载重) 支配桶：同一节点的 label 按 (时间格, 载重格) 分组
+// min_cost / max_cost 只在插入时更新 (label 被删后不回退)，作为整桶跳过的保守界
+template <class R>
+struct DomCellT {
+    std::vector<int> labels;
+    typename R::cost_t min_cost;
+    typename R::cost_t max_cost;
+
+    void reset() {
+        labels.clear();
+        min_cost = std::numeric_limits<typename R::cost_t>::max();
+        max_cost = std::numeric_limits<typename R::cost_t>::lowest();
+    }
+};
+
+// [新增] 每个节点存活 label 的 SoA (结构数组) 布局
+// 支配检查按列连续读取 cost / time / load / 掩码，AVX2 一次比较 4 个 label。
+// 只保存存活的 label：被支配的 label 用 swap-remove 移除，顺序不影响支配结果。
+// [修改] 列的类型随 R：定点引擎每个 label 占 8 + 4 + 4 字节 (浮点 3 × 8 字节)
+template <class R>
+struct DomSoAT {
+    std::vector<typename R::cost_t> cost;
+    std::vector<typename R::time_t> time;
+    std::vector<typename R::load_t> load;
+    std::vector<uint64_t> mask[4]; // FastBitset::bits 的 4 个字
+    std::vector<int> index;        // label_pool 下标
+
+    size_t size() const { return index.size(); }
+    void clear();
+    void push(const LabelT<R>& L, int label_idx);
+    void remove(size_t pos);       // 与末尾交换后弹出
+};
+using DomSoA = DomSoAT<FloatRes>;
+
+// [修改] 标签算法的实现，按资源类型 R 模板化 (FloatRes / FixedRes)，由 LabelingSolver 持有并转发
+template <class R>
+class LabelingEngine {
 public:
-    LabelingSolver(ProblemData p_data, double p_bucket_step);
-    std::vector<std::vector<int>> solve(
+    using cost_t = typename R::cost_t;
+    using time_t = typename R::time_t;
+    using LabelR = LabelT<R>;
+
+    LabelingEngine(ProblemData p_data, double p_bucket_step, int p_load_buckets, int p_time_cells, int p_time_scale);
+    ColumnBatch solve_batch(
         const std::vector<double>& duals,
-        const std::vector<std::pair<int, int>>& forbidden_arcs = {} // 默认为空
+        const std::vector<std::pair<int, int>>& forbidden_arcs,
+        int max_columns,
+        int max_per_customer,
+        double time_limit
     );
 
+    int arc_limit = 0;
+    bool warm_start = false;
+    bool use_simd;
+    SolveStats stats;
+
 private:
     ProblemData data;
-    BucketGraph graph; // [新增]
-    double bucket_step;
-    std::vector<Label> label_pool;
+    ResourceScale<R> sc;
+    // 换算后的时间窗 (浮点引擎就是 data.tw_start / tw_end)
+    std::vector<time_t> tw_start;
+    std::vector<time_t> tw_end;
+    std::vector<cost_t> scaled_duals;  // 每次 solve 按 sc 换算的对偶
+    BucketGraphT<R> graph; // [新增]
+    // [新增] 对偶感知的稀疏启发式图 (arc_limit > 0)，每次 solve 重建
+    std::vector<std::vector<ArcT<R>>> heuristic_arcs;
+    void build_heuristic_arcs(const std::vector<cost_t>& duals);
+    // [新增] label 热启动
+    std::vector<int> seed_child_head;   // [label] -> 第一个种子子 label (链表)
+    std::vector<int> seed_child_next;
+    void seed_from_previous(const std::vector<LabelR>& prev, const std::vector<cost_t>& duals);
+    bool has_seed_child(int label_idx, int node) const;
+    double bucket_step;   // 换算到 time_t 单位的桶宽
+    std::vector<LabelR> label_pool;
     std::vector<std::vector<int>> dominance_sets;
+    // [新增] 一维模式下每个节点存活 label 的 SoA 副本，支配检查在它上面做 (AVX2 / 标量)
+    std::vector<DomSoAT<R>> dominance_soa;
+    std::vector<int> dominated_scratch;
     std::vector<std::vector<int>> buckets;
+    // [新增] 二维支配桶 (load_buckets > 0)，下标 (node * time_cells + t) * load_buckets + q
+    int load_buckets;
+    int time_cells;
+    double time_cell_width;
+    int load_cell_width;
+    std::vector<DomCellT<R>> dom_cells;
+    std::vector<uint64_t> nonempty_cells;   // 每个节点一个位图：第 c 位 = 第 c 格非空
+    std::vector<uint64_t> region_forward;   // [t * load_buckets + q]：t' <= t 且 q' <= q 的格子
+    std::vector<uint64_t> region_backward;  // [t * load_buckets + q]：t' >= t 且 q' >= q 的格子
     // [新增] 扁平化的一维布尔数组，模拟二维矩阵 N x N
     // index = u * num_nodes + v
     // true 表示 u->v 禁止通行
@@ -118,7 +339,99 @@ private:
     void reset_forbidden_mask(const std::vector<std::pair<int, int>>& arcs);
     bool is_arc_forbidden(int u, int v) const;
     
-    bool check_and_update_dominance(int node, const Label& new_label);
+    bool check_and_update_dominance(int node, const LabelR& new_label);
+    bool check_and_update_dominance_2d(int node, const LabelR& new_label);
+    void insert_dom_cell(int node, int label_idx);
+    int time_cell(time_t t) const {
+        int c = (int)(t / time_cell_width);
+        return std::min(std::max(c, 0), time_cells - 1);
+    }
+    int load_cell(int q) const { return std::min(q / load_cell_width, load_buckets - 1); }
+    // 定点引擎：对选中的路径 [0, ..., 0] 按 double 检查时间窗、重算 reduced cost 和回到 depot 的时刻
+    // (运算顺序与浮点引擎相同)。返回 false 表示路径只在取整后的时间下可行
+    bool exact_cost(const std::vector<int>& path, const std::vector<double>& duals,
+                    double& reduced_cost, double& arrival) const;
+    void finish_stats(const ColumnBatch& batch,
+                      std::chrono::steady_clock::time_point t_start,
+                      std::chrono::steady_clock::time_point t_collect);
+};
+
+class LabelingSolver {
+    int fixed_point;
+    std::unique_ptr<LabelingEngine<FloatRes>> float_engine;
+    std::unique_ptr<LabelingEngine<FixedRes>> fixed_engine;
+
+    // 按模式把调用转发给对应的引擎 (放在最前面，下面的 inline 访问器要用到推导出的返回类型)
+    template <class F> decltype(auto) visit(F&& f) {
+        return fixed_engine ? f(*fixed_engine) : f(*float_engine);
+    }
+    template <class F> decltype(auto) visit(F&& f) const {
+        return fixed_engine ? f(static_cast<const LabelingEngine<FixedRes>&>(*fixed_engine))
+                            : f(static_cast<const LabelingEngine<FloatRes>&>(*float_engine));
+    }
+
+public:
+    // load_buckets > 0 时启用二维支配桶：每个节点的 label 按 time_cells 个时间格 × load_buckets 个载重格分组
+    // (每个节点最多 64 格，time_cells 会被截断)，支配检查只扫描可能支配 / 被支配的非空格子，
+    // 并按格内最小/最大成本整格跳过。
+    // load_buckets = 0 为原来的一维引擎 (每个节点一个 label 列表)。两种模式返回的列完全相同。
+    // [新增] fixed_point > 0 时使用定点引擎：时间乘以 fixed_point 存成 int32、成本乘以 1e9 存成 int64，
+    // 支配比较是整数比较 (label 更小)；返回列的 reduced cost / 时刻仍按 double 计算。
+    // 时间按宽松方向取整，返回前按 double 剔除时间窗不可行的路径；支配按取整后的时间做，可能漏列，
+    // 只适合启发式定价 (CG 的 Exact 阶段用浮点引擎)。= 0 为原来的浮点引擎。
+    LabelingSolver(ProblemData p_data, double p_bucket_step, int p_load_buckets = 0, int p_time_cells = 16,
+                   int p_fixed_point = 0);
+    // max_columns: 最多返回的列数 (按 reduced cost 取前 max_columns 个)
+    // max_per_customer: > 0 时开启多样性筛选，每个客户最多被这么多条返回列覆盖
+    // time_limit: 本次调用的时间预算 (秒，<= 0 表示不限)。桶循环中协作式检查，
+    //             超时后停止扩展，直接用已生成的 label 收集列 (stats.timed_out = true)
+    // 只返回路径 (兼容旧接口)
+    std::vector<std::vector<int>> solve(
+        const std::vector<double>& duals,
+        const std::vector<std::pair<int, int>>& forbidden_arcs = {}, // 默认为空
+        int max_columns = 1000,
+        int max_per_customer = 0,
+        double time_limit = -1.0
+    );
+    // 扁平数组形式的结果 (核心实现，其余接口都由它转换)
+    ColumnBatch solve_batch(
+        const std::vector<double>& duals,
+        const std::vector<std::pair<int, int>>& forbidden_arcs = {},
+        int max_columns = 1000,
+        int max_per_customer = 0,
+        double time_limit = -1.0
+    );
+    // 返回带成本和资源的列
+    std::vector<Column> solve_columns(
+        const std::vector<double>& duals,
+        const std::vector<std::pair<int, int>>& forbidden_arcs = {},
+        int max_columns = 1000,
+        int max_per_customer = 0,
+        double time_limit = -1.0
+    );
+
+    // > 0 时每次 solve 按当前对偶重建启发式图：客户节点只保留 reduced cost (dist - dual[j]) 最小的
+    // arc_limit 条出弧 (depot 保留全部)；<= 0 使用完整的 BucketGraph
+    int get_arc_limit() const { return visit([](const auto& e) { return e.arc_limit; }); }
+    void set_arc_limit(int k) { visit([k](auto& e) { e.arc_limit = k; }); }
+
+    // 热启动：保留上一次 solve 的 label，按本次对偶重算 cost 后作为种子 (相邻 CG 迭代对偶变化小)
+    // 同一个求解器对象上连续调用才有意义；改变 bucket_step 会重建求解器，自然冷启动
+    bool get_warm_start() const { return visit([](const auto& e) { return e.warm_start; }); }
+    void set_warm_start(bool v) { visit([v](auto& e) { e.warm_start = v; }); }
+
+    // 是否使用 AVX2 支配检查 (默认开启；CPU 不支持时设置无效，始终走标量代码)
+    bool get_use_simd() const { return visit([](const auto& e) { return e.use_simd; }); }
+    void set_use_simd(bool v);
+
+    // 最近一次 solve 的统计信息
+    const SolveStats& get_stats() const {
+        return fixed_engine ? fixed_engine->stats : float_engine->stats;
+    }
+
+    // [新增] 定点模式的时间缩放 (0 = 浮点引擎) 和每个 label 的字节数
+    int get_fixed_point() const { return fixed_point; }
+    size_t label_bytes() const { return fixed_engine ? sizeof(LabelT<FixedRes>) : sizeof(Label); }
 };
 
 #endif
\ No newline at end of file
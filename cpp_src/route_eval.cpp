@@ -0,0 +1,43 @@
+#include "route_eval.h"
+#include <algorithm>
+
+std::vector<RouteEval> evaluate_routes(
+    const ProblemData& data,
+    const std::vector<std::vector<int>>& routes,
+    const std::vector<double>& duals) {
+
+    const bool use_duals = !duals.empty();
+    std::vector<RouteEval> results;
+    results.reserve(routes.size());
+
+    for (const auto& route : routes) {
+        RouteEval ev{0.0, 0.0, data.tw_start[0], 0, true};
+        if (route.size() < 2 || route.front() != 0 || route.back() != 0) {
+            ev.feasible = false;
+        }
+
+        double dual_sum = 0.0;
+        for (size_t k = 0; k < route.size(); ++k) {
+            int v = route[k];
+            if (v < 0 || v >= data.num_nodes) {
+                ev.feasible = false;
+                break;
+            }
+            if (k == 0) continue;
+            // 与定价引擎一致：每个客户减去其对偶值，回到 depot 时减去 duals[0]
+            if (use_duals) dual_sum += duals[v];
+
+            int u = route[k - 1];
+            ev.distance += data.dist(u, v);
+            ev.load += data.demands[v];
+            ev.duration = std::max(ev.duration + data.service_times[u] + data.travel(u, v),
+                                   data.tw_start[v]);
+            if (ev.duration > data.tw_end[v] + 1e-6) ev.feasible = false;
+        }
+        if (ev.load > data.vehicle_capacity) ev.feasible = false;
+
+        ev.reduced_cost = ev.distance - dual_sum;
+        results.push_back(ev);
+    }
+    return results;
+}
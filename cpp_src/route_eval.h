@@ -0,0 +1,23 @@
+#ifndef ROUTE_EVAL_H
+#define ROUTE_EVAL_H
+
+#include <vector>
+#include "pricing_engine.h"
+
+// 批量路径评估：主问题加列、整数阶段与结果校验共用，
+// 避免在 Python 中逐弧重复计算距离和时间窗。
+struct RouteEval {
+    double distance;       // 真实距离成本
+    double reduced_cost;   // distance - sum(duals)，不含车辆固定成本 (duals 为空时等于 distance)
+    double duration;       // 回到 depot 的时刻
+    int load;
+    bool feasible;         // 容量 + 时间窗 + 首尾为 depot
+};
+
+std::vector<RouteEval> evaluate_routes(
+    const ProblemData& data,
+    const std::vector<std::vector<int>>& routes,
+    const std::vector<double>& duals = {}
+);
+
+#endif
@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+from src.instance import VRPTWInstance
+from src.metaheuristic import MetaheuristicSolver
+from src.visualizer import plot_solution
+
+def run_alns():
+    # 1. Configuration
+    DATA_PATH = sys.argv[1] if len(sys.argv) > 1 else "data/R101.txt"
+    TIME_LIMIT = float(sys.argv[2]) if len(sys.argv) > 2 else 30
+    if not os.path.exists(DATA_PATH):
+        print(f"Error: File not found at {DATA_PATH}")
+        return
+
+    # 2. Load Instance
+    instance = VRPTWInstance(DATA_PATH)
+
+    # 3. Solve (ALNS 元启发式，适合 400-1000 客户的大算例)
+    solver = MetaheuristicSolver(instance, verbose=True)
+    start_time = time.perf_counter()
+    obj, routes = solver.solve(time_limit=TIME_LIMIT)
+    end_time = time.perf_counter()
+
+    # 4. Report Results
+    fixed_cost = 2000.0
+    pure_distance = obj - len(routes) * fixed_cost
+    print("\n" + "="*50)
+    print(f"Time Taken  : {end_time - start_time:.2f} seconds")
+    print(f"Total Obj   : {obj:.2f} (With Fixed Cost)")
+    print(f"Pure Dist   : {pure_distance:.2f}")
+    print(f"Num Vehicles: {len(routes)}")
+    print("-" * 50)
+
+    # 5. Visualization
+    if routes:
+        plot_solution(instance, routes, title=f"ALNS Solution: {pure_distance:.2f}")
+
+if __name__ == "__main__":
+    run_alns()
@@ -0,0 +1,155 @@
+import os
+import sys
+import time
+import argparse
+import threading
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
+
+from src.service import ServiceClient, SolveService, make_server
+
+# ==========================================
+# 常驻求解服务
+#   serve: 启动 worker 池 + 本机 HTTP 接口 (POST /solve, GET /status)，直到 Ctrl-C
+#   bench: 同一批求解请求分别用 "每个请求一个新进程" (benchmark.py 的方式) 和常驻服务跑，
+#          报告两者的吞吐 (solves / min) 并核对目标值
+# ==========================================
+DEFAULT_PORT = 8765
+BENCH_INSTANCES = ["C101", "C201", "R101", "R201", "RC101", "RC201"]
+
+
+def serve(host, port, workers, lp_backend):
+    service = SolveService(workers=workers, lp_backend=lp_backend).start()
+    server = make_server(service, host, port)
+    print(f"🚀 Solve service on http://{host}:{server.server_address[1]} | "
+          f"{service.num_workers} workers | LP backend {lp_backend}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+def _run_processes(jobs, time_limit, max_customers, workers, lp_backend):
+    """基线：每个请求 spawn 一个新进程 (导入、解析、建模全部重来)，最多 workers 个同时跑"""
+    from benchmark import _worker
+
+    ctx = mp.get_context("spawn")
+    pending = list(reversed(jobs))
+    running = []  # (path, process, queue)
+    results = []
+    while pending or running:
+        while pending and len(running) < workers:
+            path = pending.pop()
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_worker, args=(path, time_limit, max_customers, queue, lp_backend),
+                               daemon=True)
+            proc.start()
+            running.append((path, proc, queue))
+        for item in list(running):
+            path, proc, queue = item
+            if not queue.empty():
+                raw = queue.get()
+            elif not proc.is_alive():
+                # 进程退出和结果到达之间可能有竞态，再等一下队列
+                try:
+                    raw = queue.get(timeout=1)
+                except Exception:
+                    raw = {}
+            else:
+                continue
+            proc.join()
+            results.append((path, raw.get("Total_Obj")))
+            running.remove(item)
+        time.sleep(0.01)
+    return results
+
+
+def bench(instances, max_customers, time_limit, repeat, workers, lp_backend, data_dir="data"):
+    jobs = [os.path.join(data_dir, f"{n}.txt") for n in instances] * repeat
+    print(f"📊 {len(jobs)} solves ({len(instances)} instances x {repeat}) | {max_customers} customers | "
+          f"time limit {time_limit}s | {workers} workers | LP backend {lp_backend}")
+
+    # 1. 基线：每个请求一个进程
+    start = time.perf_counter()
+    proc_results = _run_processes(jobs, time_limit, max_customers, workers, lp_backend)
+    t_proc = time.perf_counter() - start
+
+    # 2. 常驻服务：启动 (一次性) + 经 HTTP 并发提交
+    start = time.perf_counter()
+    service = SolveService(workers=workers, lp_backend=lp_backend).start()
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    t_startup = time.perf_counter() - start
+    client = ServiceClient(f"http://127.0.0.1:{server.server_address[1]}")
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+            futures = [pool.submit(client.solve, path, time_limit, max_customers) for path in jobs]
+            svc_results = [(path, f.result()) for path, f in zip(jobs, futures)]
+        t_svc = time.perf_counter() - start
+        stats = client.status()
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+    # 3. 核对：同一算例两种方式的目标值一致 (都在时间限制内解到最优时才可比)
+    proc_obj = {}
+    for path, obj in proc_results:
+        proc_obj.setdefault(path, set()).add(round(obj, 4) if obj is not None else None)
+    mismatches = 0
+    for path, res in svc_results:
+        obj = res.get("objective")
+        if res.get("status") == "Optimal" and round(obj, 4) not in proc_obj.get(path, ()):
+            mismatches += 1
+            print(f"❌ {os.path.basename(path)}: service {obj:.4f} vs process {sorted(proc_obj[path], key=str)}")
+    statuses = {}
+    for _, res in svc_results:
+        statuses[res["status"]] = statuses.get(res["status"], 0) + 1
+    waits = sorted(res.get("queue_wait", 0.0) for _, res in svc_results)
+
+    print("-" * 80)
+    print(f"{'mode':<26} {'wall (s)':>9} {'solves/min':>11}")
+    print(f"{'process per instance':<26} {t_proc:>9.2f} {len(jobs) / t_proc * 60:>11.1f}")
+    print(f"{'service (steady state)':<26} {t_svc:>9.2f} {len(jobs) / t_svc * 60:>11.1f}")
+    print(f"{'service (incl. startup)':<26} {t_svc + t_startup:>9.2f} {len(jobs) / (t_svc + t_startup) * 60:>11.1f}")
+    print("-" * 80)
+    print(f"Speedup (steady state) : {t_proc / t_svc:.2f}x | startup {t_startup:.2f}s | "
+          f"median queue wait {waits[len(waits) // 2]:.2f}s")
+    print(f"Service statuses       : {statuses} | counters {stats}")
+    print(f"Objective mismatches   : {mismatches}")
+    return 1 if mismatches else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-lived solve service (serve / throughput benchmark)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_srv = sub.add_parser("serve", help="serve solve requests over local HTTP")
+    p_srv.add_argument("--host", default="127.0.0.1")
+    p_srv.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p_srv.add_argument("--workers", type=int, default=None)
+    p_srv.add_argument("--lp-backend", default="gurobi", choices=["gurobi", "highs"])
+
+    p_bench = sub.add_parser("bench", help="throughput: process per instance vs the service")
+    p_bench.add_argument("--instances", nargs="+", default=BENCH_INSTANCES)
+    p_bench.add_argument("--customers", type=int, default=25, help="only use the first N customers")
+    p_bench.add_argument("--time-limit", type=float, default=10.0)
+    p_bench.add_argument("--repeat", type=int, default=3, help="submit every instance this many times")
+    p_bench.add_argument("--workers", type=int, default=4)
+    p_bench.add_argument("--lp-backend", default="gurobi", choices=["gurobi", "highs"])
+    p_bench.add_argument("--data-dir", default="data")
+
+    args = parser.parse_args()
+    if args.cmd == "serve":
+        return serve(args.host, args.port, args.workers, args.lp_backend)
+    return bench(args.instances, args.customers, args.time_limit, args.repeat, args.workers,
+                 args.lp_backend, args.data_dir)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,16 @@ from collections import defaultdict
 # 引入你的求解器组件
 # 假设 CGSolver 在 src.solver 中 (根据之前的 import 路径)
 from src.solver import CGSolver
+from src.master import RouteVal, drop_node
+from src.heuristics import PrimalHeuristics
+from src.deadline import Deadline
+
+# 全局时间用完后，最终 MIP 至少给这么多秒
+FINAL_MIP_MIN_TIME = 1.0
+# 路径枚举：枚举 + 池子 MIP 在一个节点上最多用这么多秒 (不超过全局剩余时间)
+ENUMERATION_TIME_LIMIT = 10.0
+# 枚举引擎用 256 位的 FastBitset 存精确的访问集合，节点更多的算例不做枚举
+ENUMERATION_MAX_NODES = 256
 
 class BranchConstraint(NamedTuple):
     """
@@ -30,23 +40,62 @@ class TreeNode:
             self.constraints.extend(constraints)
             
         self.obj_val = float('inf')
+        # 子树的有效下界：LP 精确收敛的节点取 LP 值，否则沿用父节点的 (CG 超时时 LP 值不是下界)
+        self.lower_bound = parent.lower_bound if parent else -float('inf')
         self.is_integer = False
         self.routes = [] # 该节点生成的列/解
+        # 节点 LP 收敛时的最优基 (MasterProblem.get_basis())，子节点出栈时用它热启动
+        self.basis = None
 
 class BranchAndBoundEngine:
-    def __init__(self, instance, verbose=True):
+    def __init__(self, instance, verbose=True, heuristic_interval=10, lp_backend="gurobi",
+                 warm_start_basis=True, enumeration_gap=0.01, enumeration_max_routes=20000):
         self.instance = instance
         self.verbose = verbose
         # 初始化一个 CGSolver 实例作为底层工头
-        self.cg_solver = CGSolver(instance, verbose=False) 
+        self.cg_solver = CGSolver(instance, verbose=False, lp_backend=lp_backend)
+        # 原始启发式：根节点必跑，之后每 heuristic_interval 个节点跑一次 (<=0 表示关闭)
+        self.heuristics = PrimalHeuristics(self.cg_solver, verbose=verbose)
+        self.heuristic_interval = heuristic_interval
+        # DFS 回溯时，主问题的基来自另一棵子树；打开后子节点从父节点保存的基开始重解
+        self.warm_start_basis = warm_start_basis
+        # 每个节点第一次 LP 的单纯形迭代次数 (统计热启动效果)
+        self.node_start_iterations: List[int] = []
+        # 路径枚举：节点 LP 精确收敛且 (上界 - LP) / 上界 <= enumeration_gap 时，枚举 reduced cost <= gap 的
+        # 全部初等路径，在池子上解 MIP 直接关掉子树；池子超过 enumeration_max_routes 时照常分支 (0 = 关闭)
+        self.enumeration_gap = enumeration_gap
+        self.enumeration_max_routes = enumeration_max_routes
+        # 上次枚举失败时的绝对 gap：之后只在 gap 明显更小的节点上重试
+        self._enumeration_failed_gap = float('inf')
+        self.enumerations_tried = 0
+        self.enumerations_closed = 0
+        self.enumeration_routes = 0
         
         self.best_integer_obj = float('inf')
         self.best_routes = []
         self.nodes_explored = 0
         self.start_time = 0
+        # 全局截止时间 (solve 时创建)，传给 CG / 启发式 / C++ 定价引擎
+        self.deadline = Deadline()
+        # 统计 (benchmark 用)：根节点 LP 下界、结束时的全局下界
+        self.root_bound = float('inf')
+        self.best_bound = float('inf')
+        # CG 没有精确收敛就被剪掉 / 判为整数解的节点继承的下界 (计入结束时的全局下界)
+        self._unconverged_bounds: List[float] = []
 
     def solve(self,global_time_limit=60): 
         self.start_time = time.time()
+        self.deadline = Deadline(global_time_limit)
+        # 统计按单次 solve 计 (增删客户后再次 solve 时重新开始)
+        self.nodes_explored = 0
+        self.node_start_iterations = []
+        self._enumeration_failed_gap = float('inf')
+        self.enumerations_tried = 0
+        self.enumerations_closed = 0
+        self.enumeration_routes = 0
+        self.root_bound = float('inf')
+        self.best_bound = float('inf')
+        self._unconverged_bounds = []
         print(f"=== Starting Branch-and-Price (Time Limit: {global_time_limit}s) ===")
         
         # 1. 创建根节点
@@ -54,7 +103,7 @@ class BranchAndBoundEngine:
         stack = [root] # 使用栈实现 DFS (深度优先搜索)
         
         while stack:
-            if time.time() - self.start_time > global_time_limit:
+            if self.deadline.expired():
                 print(f"\n⏰ Global Time Limit ({global_time_limit}s) Reached!")
                 print("   -> Stopping Search.")
                 print("   -> Running Final MIP on collected columns...")
@@ -70,12 +119,26 @@ class BranchAndBoundEngine:
             # 3. 运行列生成 (CG)
             # 我们需要让 CGSolver 支持传入约束
             is_feasible, obj, routes = self._solve_node(node)
+            if self.deadline.expired():
+                # CG 被截止时间打断，LP 值不是有效下界：节点放回 open 列表，下一轮结束搜索
+                stack.append(node)
+                continue
+            converged = is_feasible and self.cg_solver.converged
+            if converged:
+                node.lower_bound = max(node.lower_bound, obj)
+            if node is root and converged:
+                self.root_bound = obj
+                # 根节点对偶值用于整数阶段的约简成本过滤 (只在精确收敛后有效，超时退出的 CG 不设)
+                self.cg_solver.master.set_root_bound(self.cg_solver.last_duals, obj)
             
             # 4. 剪枝逻辑 (Pruning)
             # 情况 A: 无解
             if not is_feasible:
                 if self.verbose: print(f"{indent} -> Infeasible / Pruned")
                 continue
+            if not converged:
+                # LP 值不是下界：之后按界剪掉或找到整数解都不能证明子树，全局下界最多到继承的下界
+                self._unconverged_bounds.append(node.lower_bound)
             
             # 情况 B: 目标值比当前最优整数解还差 (Bound)
             if obj >= self.best_integer_obj - 1e-4:
@@ -84,15 +147,29 @@ class BranchAndBoundEngine:
             
             node.obj_val = obj
             node.routes = routes
+            # 在启发式改动主问题之前保存基
+            if self.warm_start_basis:
+                node.basis = self.cg_solver.master.get_basis()
+            # 潜水会重新跑 CG，先记下本节点的对偶值和收敛状态 (路径枚举用)
+            node_duals = list(self.cg_solver.last_duals) if self.cg_solver.converged else None
             
             # 5. 检查整数性 & 分支
             fractional_edge = self._find_most_fractional_edge(routes)
+
+            # 分数节点上按频率运行原始启发式，尽早获得上界
+            if fractional_edge is not None and self._should_run_heuristics():
+                self._run_primal_heuristics(node)
+                if obj >= self.best_integer_obj - 1e-4:
+                    if self.verbose: print(f"{indent} -> Pruned by Heuristic Bound ({obj:.2f} >= {self.best_integer_obj:.2f})")
+                    continue
             
+            if fractional_edge is not None and node_duals is not None and self._try_enumeration(node, obj, node_duals):
+                if self.verbose: print(f"{indent} -> Closed by Route Enumeration")
+                continue
+
             if fractional_edge is None:
                 # 找到整数解！
-                print(f"New Integer Solution Found: {obj:.2f}")
-                self.best_integer_obj = obj
-                self.best_routes = routes
+                self._update_incumbent(obj, routes, "Node")
             else:
                 # 需要分支
                 u, v, val = fractional_edge
@@ -118,37 +195,161 @@ class BranchAndBoundEngine:
                 else:
                     stack.append(child_1)
                     stack.append(child_0)
-        final_mip_dist, final_mip_routes = self.cg_solver.master.solve_integer()
+        # 最终 MIP 用剩余时间 (至少 FINAL_MIP_MIN_TIME 秒，保证能拿到一个整数解)
+        final_mip_time = max(self.deadline.remaining(), FINAL_MIP_MIN_TIME)
+        final_mip_dist, final_mip_routes = self.cg_solver.master.solve_integer(
+            time_limit=final_mip_time, incumbent=self._incumbent_paths(), upper_bound=self.best_integer_obj)
         fixed_cost = 2000.0
         final_mip_obj = final_mip_dist + (len(final_mip_routes) * fixed_cost)
-
-        if final_mip_obj < self.best_integer_obj:
-            print(f"Final MIP found best solution: {final_mip_obj:.2f} (Dist: {final_mip_dist:.2f})")
-            self.best_integer_obj = final_mip_obj
-            self.best_routes = final_mip_routes
+        self._update_incumbent(final_mip_obj, final_mip_routes, "Final MIP")
+        # 全局下界：未处理节点继承的下界取最小 (根节点未收敛则没有下界)；树搜完则等于上界
+        open_bounds = [n.lower_bound for n in stack] + self._unconverged_bounds
+        self.best_bound = min([self.best_integer_obj] + open_bounds)
         print(f"\n=== B&P Finished in {time.time() - self.start_time:.2f}s ===")
         print(f"Nodes Explored: {self.nodes_explored}")
+        if self.verbose and self.node_start_iterations:
+            print(f"Avg simplex iterations at node start: "
+                  f"{sum(self.node_start_iterations) / len(self.node_start_iterations):.1f}")
+        if self.enumerations_tried:
+            print(f"Route Enumeration: {self.enumerations_closed}/{self.enumerations_tried} nodes closed, "
+                  f"{self.enumeration_routes} routes enumerated")
         print(f"Best Integer Obj: {self.best_integer_obj}")
         return self.best_integer_obj, self.best_routes
 
-    def _solve_node(self, node: TreeNode) -> Tuple[bool, float, List]:
+    # =========================================
+    # [新增] 增量重优化：在已求解的引擎上增删客户，之后再调 solve() 即可。
+    # 保留的列作为根节点 CG 的热启动，修复后的旧整数解作为初始上界。
+    # =========================================
+    def add_customer(self, customer) -> int:
+        """新增客户 (Customer)，返回它的节点下标；旧整数解用最便宜插入修复"""
+        node = self.cg_solver.add_customer(customer)
+        paths = self._incumbent_paths()
+        self.set_incumbent(self.cg_solver.insert_customer(paths, node) if paths else [], "Repair")
+        return node
+
+    def remove_customer(self, node: int) -> None:
+        """取消节点 node 上的客户 (之后的节点下标前移一位)；旧整数解跳过该客户"""
+        paths = [drop_node(p, node) for p in self._incumbent_paths()]
+        self.cg_solver.remove_customer(node)
+        self.set_incumbent([p for p in paths if len(p) > 2], "Repair")
+
+    def set_incumbent(self, paths: List[List[int]], source: str = "Given") -> None:
         """
-        在特定节点上运行 CG。
-        核心任务：将 node.constraints 翻译成 CGSolver 能懂的 forbidden_arcs
+        用已知的整数解替换当前上界 (增删客户后修复的旧解、分解模式里子问题的当前路径)。
+        路径同时作为列加入主问题，最终 MIP 可以直接用它做初始解；解不可行时上界清空。
         """
-        # 1. 翻译约束
-        #    C++ 只懂 "Forbidden Arcs"。
-        #    Python 需要把 "Mandatory Arcs" 转化为一堆 "Forbidden Arcs"。
+        self.best_integer_obj = float('inf')
+        self.best_routes = []
+        if not paths or not self.cg_solver.validate_solution(paths):
+            return
+        evals = self.cg_solver.pricing.evaluate(paths)
+        master = self.cg_solver.master
+        new = [(p, e.distance) for p, e in zip(paths, evals) if not master.has_route(p)]
+        master.add_initial_routes([p for p, _ in new], [d for _, d in new])
+        dist = sum(e.distance for e in evals)
+        self._update_incumbent(dist + len(paths) * master.vehicle_fixed_cost, paths, source)
+
+    @property
+    def columns_generated(self) -> int:
+        """主问题中除 Big-M 虚拟列以外的列数"""
+        master = self.cg_solver.master
+        return master.num_columns - master.num_dummies
+
+    def _should_run_heuristics(self) -> bool:
+        if self.heuristic_interval <= 0:
+            return False
+        return self.nodes_explored == 1 or self.nodes_explored % self.heuristic_interval == 0
+
+    def _run_primal_heuristics(self, node: TreeNode) -> None:
+        """在当前节点上依次运行潜水和受限主问题 MIP，更新全局上界"""
+        forbidden_arcs = self._build_forbidden_arcs(node)
+
+        dive_obj, dive_routes = self.heuristics.dive(forbidden_arcs, cutoff=self.best_integer_obj,
+                                                     deadline=self.deadline)
+        self._update_incumbent(dive_obj, dive_routes, "Diving")
+
+        mip_obj, mip_routes = self.heuristics.restricted_mip(deadline=self.deadline, incumbent=self._incumbent_paths(),
+                                                             upper_bound=self.best_integer_obj)
+        self._update_incumbent(mip_obj, mip_routes, "Restricted MIP")
+
+    def _try_enumeration(self, node: TreeNode, obj: float, duals: List[float]) -> bool:
+        """
+        [新增] 小 gap 节点的路径枚举。节点 LP 精确收敛后所有列的 reduced cost >= 0，
+        比上界更好的整数解里每条路径的 reduced cost 都不超过 gap = 上界 - LP 值，
+        所以 reduced cost <= gap 的初等路径池上的 MIP 最优解就是整棵子树的最优解。
+        Returns: True 表示子树已关闭 (池子完整且 MIP 证明最优)；False 时照常分支
+        """
+        ub = self.best_integer_obj
+        # 节点数按当前算例判断 (增删客户后可能越过上限)
+        if self.enumeration_gap <= 0 or ub == float('inf') or self.instance.num_nodes > ENUMERATION_MAX_NODES:
+            return False
+        gap = ub - obj
+        if gap > self.enumeration_gap * ub or gap >= 0.5 * self._enumeration_failed_gap:
+            return False
+        budget = self.deadline.budget(ENUMERATION_TIME_LIMIT)
+        if budget <= 0:
+            return False
+        start = time.time()
+        self.enumerations_tried += 1
+        forbidden_arcs = self._build_forbidden_arcs(node)
+        # 收敛判据允许 reduced cost 略小于 0，gap 相应放宽
+        pool = self.cg_solver.pricing.enumerate(duals, gap + 1e-3, forbidden_arcs,
+                                                max_routes=self.enumeration_max_routes, time_limit=budget)
+        offsets, nodes = pool["offsets"], pool["nodes"]
+        num_routes = len(pool["reduced_costs"])
+        if not pool["complete"]:
+            if self.verbose:
+                print(f"   [Enumeration] gap {gap:.2f}: pool incomplete after {num_routes} routes, branching")
+            self._enumeration_failed_gap = gap
+            return False
+        self.enumeration_routes += num_routes
+        paths = [nodes[offsets[k]:offsets[k + 1]].tolist() for k in range(num_routes)]
+        distances = pool["distances"].tolist()
+        mip_time = max(budget - (time.time() - start), 0.1)
+        dist, selected, proven = self.cg_solver.master.solve_pool(paths, distances, time_limit=mip_time)
+        if self.verbose:
+            print(f"   [Enumeration] gap {gap:.2f}: {num_routes} routes, MIP {'optimal' if proven else 'not proven'}, "
+                  f"{time.time() - start:.2f}s")
+        if not proven:
+            self._enumeration_failed_gap = gap
+            return False
+        self.enumerations_closed += 1
+        if selected:
+            master = self.cg_solver.master
+            new = [p for p in selected if not master.has_route(p)]
+            master.add_initial_routes(new, [distances[paths.index(p)] for p in new])
+            self._update_incumbent(dist + len(selected) * master.vehicle_fixed_cost, selected, "Enumeration")
+        return True
+
+    def _incumbent_paths(self) -> List[List[int]]:
+        return [r.path if hasattr(r, 'path') else r for r in self.best_routes]
+
+    def _update_incumbent(self, obj: float, routes: List, source: str) -> None:
+        """先用局部搜索改进新整数解 (改进后的路径会作为列加回主问题)，再更新全局上界"""
+        if not routes:
+            return
+        paths = [r.path if hasattr(r, 'path') else r for r in routes]
+        if not self.cg_solver.validate_solution(paths):
+            if self.verbose: print(f"   [Warning] {source}: solution failed validation, skipped")
+            return
+        ls_dist, ls_paths = self.cg_solver.improve_solution(paths)
+        ls_obj = ls_dist + len(ls_paths) * self.cg_solver.master.vehicle_fixed_cost
+        if ls_obj < obj - 1e-4:
+            if self.verbose: print(f"   [LocalSearch] {source}: {obj:.2f} -> {ls_obj:.2f}")
+            obj, routes = ls_obj, [RouteVal(p, 1.0) for p in ls_paths]
+
+        if obj < self.best_integer_obj - 1e-4:
+            print(f"New Integer Solution Found ({source}): {obj:.2f}")
+            self.best_integer_obj = obj
+            self.best_routes = routes
+
+    def _build_forbidden_arcs(self, node: TreeNode) -> List[Tuple[int, int]]:
+        """
+        将 node.constraints 翻译成 CGSolver 能懂的 forbidden_arcs
+        """
+        # C++ 只懂 "Forbidden Arcs"。
+        # Python 需要把 "Mandatory Arcs" 转化为一堆 "Forbidden Arcs"。
         forbidden_arcs = []
-        
-        # 同时我们也需要在 Master Problem 里禁用包含非法边的列
-        # 但为简单起见，我们先依靠 Pricing 生成不出非法列，
-        # 并依靠 Master 的约束重新优化来“清洗”掉旧列（如果需要的话，通常需要 Reset Master 或清除旧列）
-        
-        # 这是一个关键点：最简单的做法是每次 Reset Solver，或者在 Solve 前
-        # 告诉 CGSolver 清理不符合当前约束的列。
-        # 这里我们采用“传参给 Pricing”策略。
-        
         for c in node.constraints:
             if c.kind == 0: # 禁止 u->v
                 forbidden_arcs.append((c.u, c.v))
@@ -162,12 +363,27 @@ class BranchAndBoundEngine:
                 for k in range(self.instance.num_nodes):
                     if k != c.u:
                         forbidden_arcs.append((k, c.v))
+        return forbidden_arcs
+
+    def _solve_node(self, node: TreeNode) -> Tuple[bool, float, List]:
+        """
+        在特定节点上运行 CG。
+        核心任务：将 node.constraints 翻译成 CGSolver 能懂的 forbidden_arcs
+        """
+        # 1. 翻译约束
+        #    同时我们也需要在 Master Problem 里禁用包含非法边的列，
+        #    这一步由 CGSolver.solve_with_constraints 内部的 deactivate_columns 完成。
+        forbidden_arcs = self._build_forbidden_arcs(node)
         
         # 2. 调用 CGSolver
         # 我们需要修改 CGSolver.run() 或者单独写一个 run_with_constraints
         # 为了不破坏原有逻辑，建议扩展 CGSolver
         # 1. 跑列生成 (LP), obj 包含固定成本 (20857.25)
-        is_feasible, obj, routes = self.cg_solver.solve_with_constraints(forbidden_arcs)
+        basis = node.parent.basis if node.parent is not None else None
+        is_feasible, obj, routes = self.cg_solver.solve_with_constraints(forbidden_arcs, deadline=self.deadline,
+                                                                         basis=basis)
+        if self.cg_solver.first_lp_iterations is not None:
+            self.node_start_iterations.append(self.cg_solver.first_lp_iterations)
         
         if not is_feasible:
             return False, 0.0, []
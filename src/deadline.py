@@ -0,0 +1,33 @@
+import time
+from typing import Optional
+
+
+class Deadline:
+    """
+    全局截止时间：由 B&P 创建，一路传给 CG、原始启发式和 C++ 定价引擎。
+    各层用 remaining() / budget() 计算自己的时间预算，而不是各自硬编码时间限制。
+    seconds=None 表示不限时。
+    """
+    def __init__(self, seconds: Optional[float] = None):
+        self.start = time.time()
+        self.at = None if seconds is None else self.start + seconds
+
+    def remaining(self) -> float:
+        """剩余秒数 (不限时返回 inf，已过期返回 0)"""
+        if self.at is None:
+            return float('inf')
+        return max(0.0, self.at - time.time())
+
+    def expired(self) -> bool:
+        return self.at is not None and time.time() >= self.at
+
+    def budget(self, limit: float) -> float:
+        """min(limit, 剩余时间)：子任务自己的时间上限再受全局截止时间约束"""
+        return min(limit, self.remaining())
+
+    def engine_limit(self) -> float:
+        """传给 C++ 引擎的 time_limit 参数 (<= 0 表示不限)"""
+        if self.at is None:
+            return -1.0
+        # 已过期也给一个极小的正数，引擎会立即返回已有结果而不是不限时
+        return max(self.remaining(), 1e-6)
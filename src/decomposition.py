@@ -0,0 +1,213 @@
+import io
+import math
+import time
+import contextlib
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+import numpy as np
+
+import pricing_lib
+from .instance import VRPTWInstance
+from .pricing import build_problem_data
+
+
+def sweep_partition(instance, parts: int) -> List[List[int]]:
+    """
+    按客户相对 depot 的极角排序后切成 parts 段 (每段客户数相同)。
+    起点放在相邻客户之间最大的角度空隙处，避免把一簇客户从中间切开。
+    """
+    depot = instance.customers[0]
+    nodes = list(range(1, instance.num_nodes))
+    angle = {i: math.atan2(instance.customers[i].y - depot.y, instance.customers[i].x - depot.x) for i in nodes}
+    nodes.sort(key=lambda i: angle[i])
+    gaps = [(angle[nodes[(k + 1) % len(nodes)]] - angle[nodes[k]]) % (2 * math.pi) for k in range(len(nodes))]
+    start = (int(np.argmax(gaps)) + 1) % len(nodes)
+    nodes = nodes[start:] + nodes[:start]
+    return [chunk.tolist() for chunk in np.array_split(np.array(nodes), parts) if len(chunk)]
+
+
+def kmeans_partition(instance, parts: int, time_weight: float = 1.0, seed: int = 0,
+                     max_iter: int = 50) -> List[List[int]]:
+    """
+    在 (x, y, 时间窗中点) 上做 k-means (k-means++ 初始化)。
+    时间窗中点按 坐标范围 / 计划期长度 缩放到和坐标同一量级，time_weight 调整它的权重。
+    """
+    cs = instance.customers
+    nodes = np.arange(1, instance.num_nodes)
+    xy = np.array([[cs[i].x, cs[i].y] for i in nodes], dtype=float)
+    mid = np.array([(cs[i].tw_a + cs[i].tw_b) / 2.0 for i in nodes], dtype=float)
+    span = max(float(np.ptp(xy, axis=0).max()), 1e-9)
+    horizon = max(float(cs[0].tw_b - cs[0].tw_a), 1e-9)
+    feats = np.column_stack([xy, mid * (span / horizon) * time_weight])
+
+    rng = np.random.default_rng(seed)
+    k = min(parts, len(nodes))
+    centers = [feats[rng.integers(len(feats))]]
+    for _ in range(1, k):
+        d2 = np.min([((feats - c) ** 2).sum(axis=1) for c in centers], axis=0)
+        centers.append(feats[rng.choice(len(feats), p=d2 / d2.sum())] if d2.sum() > 0 else feats[0])
+    centers = np.array(centers)
+    labels = np.zeros(len(feats), dtype=int)
+    for it in range(max_iter):
+        new = np.argmin(((feats[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2), axis=1)
+        if it > 0 and np.array_equal(new, labels):
+            break
+        labels = new
+        for c in range(k):
+            if np.any(labels == c):
+                centers[c] = feats[labels == c].mean(axis=0)
+    return [nodes[labels == c].tolist() for c in range(k) if np.any(labels == c)]
+
+
+PARTITIONERS = {"sweep": sweep_partition, "kmeans": kmeans_partition}
+
+
+def _solve_part(customers, capacity, nodes, initial_routes, time_limit, lp_backend):
+    """
+    worker 进程：把 nodes (全局下标) 上的客户当成独立算例用 B&P 求解。
+    initial_routes (全局下标) 作为初始列和上界，保证结果不比它差。
+    Returns: (含固定成本的目标值, 路径 (全局下标))，无解返回 (inf, [])
+    """
+    # 放在 worker 里导入，主进程不需要初始化 LP 后端
+    from src.branching import BranchAndBoundEngine
+
+    local = {0: 0, **{g: k + 1 for k, g in enumerate(nodes)}}
+    sub = VRPTWInstance.from_arrays([customers[0]] + [customers[g] for g in nodes], capacity)
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = BranchAndBoundEngine(sub, verbose=False, lp_backend=lp_backend)
+        if initial_routes:
+            engine.set_incumbent([[local[v] for v in r] for r in initial_routes], "Current")
+        obj, _ = engine.solve(global_time_limit=time_limit)
+    back = [0] + list(nodes)
+    return obj, [[back[v] for v in p] for p in engine._incumbent_paths()]
+
+
+class DecompositionSolver:
+    """
+    大算例的分解求解模式，与 MetaheuristicSolver 并列，返回格式与 BranchAndBoundEngine.solve 一致。
+      1. 按极角 (sweep) 或 (x, y, 时间窗) k-means 把客户分成若干部分，每部分约 part_size 个客户，
+         在进程池里各自作为独立的 VRPTWInstance 用 B&P 求解，路径直接拼起来
+      2. POPMUSIC 改进：取一条种子路径和离它最近 (路径重心距离) 的几条路径，客户数凑到 part_size，
+         用当前路径作为初始上界重新求解这个子问题，变好就替换。每轮挑出互不相交的子问题并行求解；
+         所有种子都试过且没有改进 (或者时间用完) 时停止
+    """
+    def __init__(self, instance, verbose=True, part_size=25, method="sweep", workers=None,
+                 lp_backend="gurobi", part_time_limit=10.0, seed=0):
+        if method not in PARTITIONERS:
+            raise ValueError(f"Unknown partition method '{method}', choose from {sorted(PARTITIONERS)}")
+        self.inst = instance
+        self.verbose = verbose
+        self.part_size = part_size
+        self.method = method
+        self.workers = workers or max(1, mp.cpu_count() // 2)
+        self.lp_backend = lp_backend
+        self.part_time_limit = part_time_limit
+        self.seed = seed
+        self.vehicle_fixed_cost = 2000.0
+        # 只用来评估路径，不需要 ng 集合
+        self.cpp_data = build_problem_data(instance, ng_size=0)
+        # 统计 (benchmark 用)
+        self.initial_obj = float('inf')
+        self.initial_vehicles = 0
+        self.subproblems = 0
+        self.improvements = 0
+
+    def partition(self) -> List[List[int]]:
+        parts = max(1, math.ceil((self.inst.num_nodes - 1) / self.part_size))
+        if self.method == "kmeans":
+            return kmeans_partition(self.inst, parts, seed=self.seed)
+        return sweep_partition(self.inst, parts)
+
+    def _cost(self, routes: List[List[int]]) -> float:
+        dist = sum(e.distance for e in pricing_lib.evaluate_routes(self.cpp_data, routes))
+        return dist + len(routes) * self.vehicle_fixed_cost
+
+    def _centroid(self, route: List[int]) -> Tuple[float, float]:
+        cs = [self.inst.customers[v] for v in route[1:-1]]
+        return sum(c.x for c in cs) / len(cs), sum(c.y for c in cs) / len(cs)
+
+    def _neighborhood(self, seed: int, routes: List[List[int]], taken: set) -> List[int]:
+        """种子路径 + 最近的未占用路径，直到客户数达到 part_size"""
+        cx, cy = self._centroid(routes[seed])
+        order = sorted((r for r in range(len(routes)) if r != seed and r not in taken),
+                       key=lambda r: math.dist((cx, cy), self._centroid(routes[r])))
+        group, size = [seed], len(routes[seed]) - 2
+        for r in order:
+            if size >= self.part_size:
+                break
+            group.append(r)
+            size += len(routes[r]) - 2
+        return group
+
+    def solve(self, time_limit=60) -> Tuple[float, List[List[int]]]:
+        start_time = time.time()
+        customers, cap = self.inst.customers, self.inst.vehicle_capacity
+        parts = self.partition()
+        if self.verbose:
+            print(f"=== Starting Decomposition ({self.method}, {len(parts)} parts, {self.workers} workers, "
+                  f"Time Limit: {time_limit}s) ===")
+
+        ctx = mp.get_context("spawn")  # 子进程干净地初始化 LP 后端 / pricing_lib
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx) as pool:
+            # 1. 各部分独立求解
+            futures = [pool.submit(_solve_part, customers, cap, p, None, self.part_time_limit, self.lp_backend)
+                       for p in parts]
+            routes = [r for f in futures for r in f.result()[1]]
+            self.subproblems += len(parts)
+            obj = self.initial_obj = self._cost(routes)
+            self.initial_vehicles = len(routes)
+            if self.verbose:
+                print(f"Parts solved: {len(routes)} routes | Obj {obj:.2f} | {time.time() - start_time:.1f}s")
+
+            # 2. POPMUSIC：未试过的种子路径排队，子问题变好后新路径重新入队
+            queue = list(range(len(routes)))
+            while queue and time.time() - start_time < time_limit:
+                taken, batch = set(), []
+                for seed in list(queue):
+                    if len(batch) >= self.workers:
+                        break
+                    if seed in taken:
+                        continue
+                    group = self._neighborhood(seed, routes, taken)
+                    taken.update(group)
+                    queue.remove(seed)
+                    batch.append(group)
+                budget = min(self.part_time_limit, max(time_limit - (time.time() - start_time), 1.0))
+                futures = []
+                for group in batch:
+                    nodes = sorted(v for r in group for v in routes[r][1:-1])
+                    futures.append(pool.submit(_solve_part, customers, cap, nodes, [routes[r] for r in group],
+                                               budget, self.lp_backend))
+                self.subproblems += len(batch)
+
+                replaced = {}
+                for group, f in zip(batch, futures):
+                    new_obj, new_routes = f.result()
+                    old = [routes[r] for r in group]
+                    if new_routes and new_obj < self._cost(old) - 1e-6:
+                        replaced[tuple(group)] = new_routes
+                if not replaced:
+                    continue
+                # 换掉改进的路径组；新路径作为种子重新排队，队列里旧路径的下标重新映射
+                dropped = {r for g in replaced for r in g}
+                keep = [r for r in range(len(routes)) if r not in dropped]
+                remap = {old: new for new, old in enumerate(keep)}
+                routes = [routes[r] for r in keep]
+                queue = [remap[r] for r in queue if r in remap]
+                for new_routes in replaced.values():
+                    queue += range(len(routes), len(routes) + len(new_routes))
+                    routes += new_routes
+                self.improvements += len(replaced)
+                obj = self._cost(routes)
+                if self.verbose:
+                    print(f"POPMUSIC: {len(replaced)}/{len(batch)} subproblems improved | Obj {obj:.2f} | "
+                          f"{time.time() - start_time:.1f}s")
+
+        obj = self._cost(routes)
+        if self.verbose:
+            print(f"=== Decomposition Finished in {time.time() - start_time:.2f}s ===")
+            print(f"Subproblems: {self.subproblems} | Improvements: {self.improvements}")
+            print(f"Vehicles: {len(routes)} | Obj: {obj:.2f}")
+        return obj, routes
@@ -0,0 +1,102 @@
+from typing import List, Tuple, Optional
+
+from src.master import RouteVal
+from src.deadline import Deadline
+
+
+class PrimalHeuristics:
+    """
+    B&P 中的原始启发式 (Primal Heuristics)，目标是尽早拿到上界用于剪枝。
+    1. 潜水 (Diving)：反复把取值最大的分数列固定为 1，再跑 CG 重新优化，直到 LP 解为整数。
+    2. 受限主问题 MIP：在当前列池 (按约简成本过滤) 单独构建的模型上跑一个限时 MIP。
+    两者返回的目标值口径与 B&P 一致 (距离 + 车辆固定成本)。
+    """
+    def __init__(self, cg_solver, max_dive_depth=30, dive_time_limit=10.0,
+                 mip_time_limit=5.0, verbose=False):
+        self.cg_solver = cg_solver
+        self.master = cg_solver.master
+        self.inst = cg_solver.inst
+        self.max_dive_depth = max_dive_depth
+        self.dive_time_limit = dive_time_limit
+        self.mip_time_limit = mip_time_limit
+        self.verbose = verbose
+        self.vehicle_fixed_cost = self.master.vehicle_fixed_cost
+
+    def dive(self, forbidden_arcs: List[Tuple[int, int]],
+             cutoff: float = float('inf'),
+             deadline: Optional[Deadline] = None) -> Tuple[float, List[RouteVal]]:
+        """
+        从当前节点 (forbidden_arcs 描述的约束) 出发做一次列潜水。
+        结束后恢复主问题的列界限，不影响 B&P 的后续节点。
+        Returns: (obj, routes)，失败返回 (inf, [])
+        """
+        # 潜水自己的时间上限，同时受全局截止时间约束
+        dive_deadline = Deadline((deadline or Deadline()).budget(self.dive_time_limit))
+        fixed: List[int] = []
+        dive_forbidden = list(forbidden_arcs)
+        best = (float('inf'), [])
+
+        try:
+            for depth in range(self.max_dive_depth):
+                active = self.master.get_active_columns()
+                # 仍在使用 Big-M 虚拟列，说明当前列池还覆盖不了所有客户
+                if any(self.master.is_dummy(i) for i, _ in active):
+                    break
+
+                fixed_set = set(fixed)
+                free = [(i, v) for i, v in active if i not in fixed_set]
+                fractional = [(i, v) for i, v in free if v < 1.0 - 1e-4]
+
+                if not fractional:
+                    # LP 解已经是整数
+                    obj = self.master.obj_val
+                    routes = [RouteVal(self.master.routes[i], 1.0) for i, _ in active]
+                    best = (obj, routes)
+                    break
+
+                if dive_deadline.expired():
+                    break
+
+                # 固定所有取值接近 1 的列 + 取值最大的分数列
+                to_fix = [i for i, v in free if v >= 1.0 - 1e-4]
+                to_fix.append(max(fractional, key=lambda x: x[1])[0])
+                fixed.extend(to_fix)
+
+                # 被固定列覆盖的客户从定价图中移除
+                for idx in to_fix:
+                    for c in self.master.routes[idx]:
+                        if c == 0:
+                            continue
+                        for k in range(self.inst.num_nodes):
+                            dive_forbidden.append((k, c))
+                            dive_forbidden.append((c, k))
+
+                is_feasible, obj, _ = self.cg_solver.solve_with_constraints(
+                    dive_forbidden, fixed_columns=fixed, deadline=dive_deadline)
+                if self.verbose:
+                    print(f"   [Dive] depth {depth + 1}: fixed {len(fixed)} cols, LP = {obj:.2f}")
+                if not is_feasible or obj >= cutoff - 1e-4:
+                    break
+        finally:
+            # 恢复主问题：撤销固定，并按当前节点约束重新设置列界限
+            self.master.unfix_columns(fixed)
+            self.master.deactivate_columns(forbidden_arcs)
+
+        return best
+
+    def restricted_mip(self, deadline: Optional[Deadline] = None,
+                       incumbent: Optional[List[List[int]]] = None,
+                       upper_bound: float = float('inf')) -> Tuple[float, List[RouteVal]]:
+        """
+        在当前列池上跑限时 MIP (单独的模型，只含约简成本小于 gap 的列)，返回 (obj, routes)，失败返回 (inf, [])
+        incumbent / upper_bound: 当前最优整数解，作为 MIP 初始解并用于过滤列
+        """
+        time_limit = (deadline or Deadline()).budget(self.mip_time_limit)
+        if time_limit <= 0:
+            return float('inf'), []
+        dist, paths = self.master.solve_integer_on_copy(time_limit=time_limit, incumbent=incumbent,
+                                                        upper_bound=upper_bound)
+        if not paths:
+            return float('inf'), []
+        obj = dist + len(paths) * self.vehicle_fixed_cost
+        return obj, [RouteVal(p, 1.0) for p in paths]
@@ -0,0 +1,220 @@
+from typing import List, Tuple, Optional
+
+
+def route_distance(inst, route: List[int]) -> float:
+    """计算路径的物理距离"""
+    d = 0.0
+    for k in range(len(route) - 1):
+        d += inst.dist_matrix[route[k]][route[k + 1]]
+    return d
+
+
+def route_is_feasible(inst, route: List[int]) -> bool:
+    """检查 [0, ..., 0] 路径的容量与时间窗可行性"""
+    load = 0
+    t = inst.customers[0].tw_a
+    for k in range(1, len(route)):
+        prev, node = route[k - 1], route[k]
+        c = inst.customers[node]
+        load += c.demand
+        if load > inst.vehicle_capacity:
+            return False
+        arrival = t + inst.customers[prev].service_time + inst.dist_matrix[prev][node]
+        t = max(arrival, c.tw_a)
+        if t > c.tw_b + 1e-6:
+            return False
+    return True
+
+
+class InitialSolutionGenerator:
+    """
+    初始列生成器：用构造启发式替代 Big-M 虚拟列作为 RMP 的初始列。
+    - Clarke-Wright 节约算法 (带时间窗可行性检查)
+    - Solomon I1 插入算法 (多组参数，增加列的多样性)
+    - 可选：对最好的解做一次简短的 relocate 局部搜索
+    """
+    # Solomon (1987) 推荐的参数组合: (mu, lambda, alpha1)
+    I1_PARAMS = [
+        (1.0, 1.0, 1.0),
+        (1.0, 2.0, 1.0),
+        (1.0, 1.0, 0.0),
+        (1.0, 2.0, 0.0),
+    ]
+
+    def __init__(self, instance, local_search=False):
+        self.inst = instance
+        self.local_search = local_search
+
+    def generate(self) -> List[List[int]]:
+        """返回去重后的可行路径集合"""
+        solutions = [self.clarke_wright()]
+        for mu, lam, alpha1 in self.I1_PARAMS:
+            solutions.append(self.solomon_i1(mu, lam, alpha1))
+
+        if self.local_search:
+            best = min(solutions, key=self._solution_cost)
+            solutions.append(self.relocate_search(best))
+
+        seen = set()
+        routes = []
+        for sol in solutions:
+            for r in sol:
+                key = tuple(r)
+                if key not in seen and route_is_feasible(self.inst, r):
+                    seen.add(key)
+                    routes.append(r)
+        return routes
+
+    def _solution_cost(self, routes: List[List[int]]) -> Tuple[int, float]:
+        # 先比车辆数，再比距离 (与主问题的固定成本口径一致)
+        return len(routes), sum(route_distance(self.inst, r) for r in routes)
+
+    # ==========================================
+    # Clarke-Wright 节约算法
+    # ==========================================
+    def clarke_wright(self) -> List[List[int]]:
+        inst = self.inst
+        n = inst.num_nodes
+        d = inst.dist_matrix
+        routes = {i: [0, i, 0] for i in range(1, n)}
+        route_of = {i: i for i in range(1, n)}
+
+        savings = []
+        for i in range(1, n):
+            for j in range(1, n):
+                if i != j:
+                    savings.append((d[i][0] + d[0][j] - d[i][j], i, j))
+        savings.sort(reverse=True)
+
+        for s, i, j in savings:
+            if s <= 0:
+                break
+            ri, rj = route_of[i], route_of[j]
+            if ri == rj:
+                continue
+            a, b = routes[ri], routes[rj]
+            # 只能把 i 结尾的路径接到 j 开头的路径
+            if a[-2] != i or b[1] != j:
+                continue
+            merged = a[:-1] + b[1:]
+            if not route_is_feasible(inst, merged):
+                continue
+            routes[ri] = merged
+            del routes[rj]
+            for c in b[1:-1]:
+                route_of[c] = ri
+
+        return list(routes.values())
+
+    # ==========================================
+    # Solomon I1 顺序插入算法
+    # ==========================================
+    def solomon_i1(self, mu=1.0, lam=1.0, alpha1=1.0) -> List[List[int]]:
+        inst = self.inst
+        d = inst.dist_matrix
+        cust = inst.customers
+        alpha2 = 1.0 - alpha1
+        unrouted = set(range(1, inst.num_nodes))
+        routes = []
+
+        while unrouted:
+            # 种子：最早截止时间的客户
+            seed = min(unrouted, key=lambda c: (cust[c].tw_b, -d[0][c]))
+            route = [0, seed, 0]
+            unrouted.discard(seed)
+            if not route_is_feasible(inst, route):
+                # 单点都不可行，保留给 Big-M 虚拟列兜底
+                continue
+
+            while True:
+                starts = self._start_times(route)
+                best_u, best_pos, best_c2 = None, -1, -float('inf')
+                for u in unrouted:
+                    best_c1, pos_u = float('inf'), -1
+                    for p in range(1, len(route)):
+                        i, j = route[p - 1], route[p]
+                        cand = route[:p] + [u] + route[p:]
+                        if not route_is_feasible(inst, cand):
+                            continue
+                        c11 = d[i][u] + d[u][j] - mu * d[i][j]
+                        new_start_j = self._start_times(cand)[p + 1]
+                        c12 = new_start_j - starts[p]
+                        c1 = alpha1 * c11 + alpha2 * c12
+                        if c1 < best_c1:
+                            best_c1, pos_u = c1, p
+                    if pos_u < 0:
+                        continue
+                    c2 = lam * d[0][u] - best_c1
+                    if c2 > best_c2:
+                        best_u, best_pos, best_c2 = u, pos_u, c2
+                if best_u is None:
+                    break
+                route.insert(best_pos, best_u)
+                unrouted.discard(best_u)
+            routes.append(route)
+
+        return routes
+
+    def _start_times(self, route: List[int]) -> List[float]:
+        """计算路径上每个位置的服务开始时间"""
+        inst = self.inst
+        t = inst.customers[0].tw_a
+        starts = [t]
+        for k in range(1, len(route)):
+            prev, node = route[k - 1], route[k]
+            arrival = t + inst.customers[prev].service_time + inst.dist_matrix[prev][node]
+            t = max(arrival, inst.customers[node].tw_a)
+            starts.append(t)
+        return starts
+
+    # ==========================================
+    # 简短的 relocate 局部搜索
+    # ==========================================
+    def relocate_search(self, routes: List[List[int]], max_rounds=5) -> List[List[int]]:
+        """把单个客户移动到其它位置 (含其它路径)，接受改进的移动，最多扫描 max_rounds 轮"""
+        inst = self.inst
+        routes = [list(r) for r in routes]
+        for _ in range(max_rounds):
+            improved = False
+            for a in range(len(routes)):
+                p = 1
+                while p < len(routes[a]) - 1:
+                    u = routes[a][p]
+                    src = routes[a][:p] + routes[a][p + 1:]
+                    src_delta = route_distance(inst, src) - route_distance(inst, routes[a])
+                    move = self._best_insertion(routes, a, u, src, src_delta)
+                    if move is None:
+                        p += 1
+                        continue
+                    b, q = move
+                    routes[a] = src
+                    routes[b].insert(q, u)
+                    improved = True
+            routes = [r for r in routes if len(r) > 2]
+            if not improved:
+                break
+        return routes
+
+    def _best_insertion(self, routes, a, u, src, src_delta) -> Optional[Tuple[int, int]]:
+        """返回 u 的最佳插入位置 (路径索引, 位置)，没有改进则返回 None"""
+        inst = self.inst
+        d = inst.dist_matrix
+        best, best_gain = None, 1e-6
+        for b in range(len(routes)):
+            # 同路径内移动时，在去掉 u 之后的 src 上找位置
+            target = src if b == a else routes[b]
+            if len(target) == 2:
+                continue
+            saving = -src_delta
+            if b != a and len(src) == 2:
+                # 源路径被清空时节省一辆车
+                saving += 1e6
+            for q in range(1, len(target)):
+                i, j = target[q - 1], target[q]
+                gain = saving - (d[i][u] + d[u][j] - d[i][j])
+                if gain <= best_gain:
+                    continue
+                cand = target[:q] + [u] + target[q:]
+                if route_is_feasible(inst, cand):
+                    best, best_gain = (b, q), gain
+        return best
@@ -1,8 +1,9 @@
 import math
 import sys
 from tabnanny import verbose
-from typing import List
+from typing import List, Tuple
 from dataclasses import dataclass
+import numpy as np
 
 @dataclass(frozen=True) # frozen 使得实例不可变 # 隐含结果：因为它是只读的，所以它可以作为字典的 Key 或放入 Set 集合（这对于写算法至关重要）。
 class Customer: 
@@ -13,24 +14,75 @@ class Customer:
     tw_a: int  # 最早到达
     tw_b: int  # 最晚到达
     service_time: int  
-    
+
+
+class CoordDistances:
+    """
+    [新增] 稀疏模式下 dist_matrix 的替身：不存矩阵，d[i][j] 按坐标现算。
+    只为兼容按 dist_matrix[i][j] 索引的旧代码 (构造启发式等)，新代码用 instance.dist(i, j)。
+    """
+    def __init__(self, customers: List[Customer]):
+        self.customers = customers  # 与算例共用同一个列表，加 / 删客户后自动同步
+
+    def __len__(self) -> int:
+        return len(self.customers)
+
+    def __getitem__(self, i: int) -> "_CoordRow":
+        return _CoordRow(self.customers, self.customers[i])
+
+
+class _CoordRow:
+    __slots__ = ("customers", "c1")
+
+    def __init__(self, customers: List[Customer], c1: Customer):
+        self.customers = customers
+        self.c1 = c1
+
+    def __len__(self) -> int:
+        return len(self.customers)
+
+    def __getitem__(self, j: int) -> float:
+        c2 = self.customers[j]
+        return math.sqrt((self.c1.x - c2.x)**2 + (self.c1.y - c2.y)**2)
+
+
+def _smallest(dist: np.ndarray, k: int) -> np.ndarray:
+    """dist 中最小的 k 个位置，按 (距离, 位置) 排序 (与对 (d, j) 列表稳定排序的结果一致)"""
+    if k < len(dist):
+        kth = np.partition(dist, k - 1)[k - 1]
+        cand = np.flatnonzero(dist <= kth)  # 带上和第 k 名并列的点，保证并列时按下标取
+    else:
+        cand = np.arange(len(dist))
+    return cand[np.argsort(dist[cand], kind="stable")][:k]
+
+
 class VRPTWInstance:
     """
     核心数据类：负责读取文件并存储所有全局只读数据。
+    sparse=True 时不建稠密距离矩阵 (几千个客户时 list of lists 要占几个 GB)：
+    距离按坐标现算，候选弧 (近邻表) 由 candidate_arcs 以 CSR 形式给出。
     """
-    def __init__(self, filepath, max_customers=None,verbose=True):
+    # 按行分块计算距离，控制临时数组大小 (块大小 × num_nodes)
+    ROW_BLOCK = 256
+
+    def __init__(self, filepath, max_customers=None,verbose=True, sparse=False):
         self.verbose = verbose
+        self.sparse = sparse
         self.customers: List[Customer] = []
         self.vehicle_capacity = 0
         self.vehicle_count = 50
         self.dist_matrix = []
         self.num_nodes = 0
         self.ng_masks = []
+        self._arc_cache = {}
         # 1. 读取数据
         self._read_solomon(filepath, max_customers)
         
-        # 2. 计算距离矩阵
-        self._compute_distance_matrix()
+        # 2. 计算距离矩阵 (稀疏模式只挂一个按坐标现算的替身)
+        if sparse:
+            self.dist_matrix = CoordDistances(self.customers)
+        else:
+            self._compute_distance_matrix()
         # 3. 更新节点计数 (State Update)
         self.num_nodes = len(self.customers)
         # 4. 预计算 ng-sets 掩码 Optimization Prep   # 单下划线方法 建议只在类内部或子类中使用。 # 双下滑线就是私有方法，防止子类重写或者外部访问
@@ -38,6 +90,125 @@ class VRPTWInstance:
         if self.verbose:
             print(f"Instance loaded: {self.num_nodes} nodes (incl. Depot), Cap={self.vehicle_capacity}")
 
+    @classmethod
+    def from_arrays(cls, customers, vehicle_capacity, dist_matrix=None, verbose=False, sparse=False):
+        """
+        [新增] 不读文件，直接由客户列表 (+ 可选的现成距离矩阵) 构造算例。
+        求解服务的 worker 用它从共享内存重建算例，跳过解析和距离计算。
+        """
+        inst = cls.__new__(cls)
+        inst.verbose = verbose
+        inst.sparse = sparse
+        inst.customers = list(customers)
+        inst.vehicle_capacity = vehicle_capacity
+        inst.vehicle_count = 50
+        inst.num_nodes = len(inst.customers)
+        inst._arc_cache = {}
+        if sparse:
+            inst.dist_matrix = CoordDistances(inst.customers)
+        elif dist_matrix is None:
+            inst._compute_distance_matrix()
+        else:
+            inst.dist_matrix = dist_matrix
+        inst._compute_ng_sets(ng_size=8)
+        return inst
+
+    def add_customer(self, customer: Customer) -> int:
+        """
+        [新增] 追加一个客户 (成为最后一个节点)，距离矩阵和 ng-set 同步更新。
+        Returns: 新客户的节点下标
+        """
+        self.customers.append(customer)
+        if not self.sparse:
+            row = [math.sqrt((customer.x - c.x)**2 + (customer.y - c.y)**2) for c in self.customers]
+            for i in range(self.num_nodes):
+                self.dist_matrix[i].append(row[i])
+            self.dist_matrix.append(row)
+        self.num_nodes = len(self.customers)
+        self._arc_cache.clear()
+        self._compute_ng_sets(ng_size=8)
+        return self.num_nodes - 1
+
+    def remove_customer(self, node: int) -> Customer:
+        """
+        [新增] 删除节点 node (不能是 depot)，之后的节点下标整体前移一位。
+        Returns: 被删除的客户
+        """
+        if not 0 < node < self.num_nodes:
+            raise ValueError(f"cannot remove node {node} (customers are 1..{self.num_nodes - 1})")
+        customer = self.customers.pop(node)
+        if not self.sparse:
+            del self.dist_matrix[node]
+            for row in self.dist_matrix:
+                del row[node]
+        self.num_nodes = len(self.customers)
+        self._arc_cache.clear()
+        self._compute_ng_sets(ng_size=8)
+        return customer
+
+    def node_of(self, customer_id: int) -> int:
+        """[新增] 客户编号 (Customer.id) -> 当前节点下标"""
+        for i, c in enumerate(self.customers):
+            if c.id == customer_id:
+                return i
+        raise KeyError(customer_id)
+
+    def dist(self, i: int, j: int) -> float:
+        """[新增] 节点 i -> j 的距离 (稠密 / 稀疏模式通用)"""
+        if self.sparse:
+            c1, c2 = self.customers[i], self.customers[j]
+            return math.sqrt((c1.x - c2.x)**2 + (c1.y - c2.y)**2)
+        return self.dist_matrix[i][j]
+
+    def _dist_rows(self, lo: int, hi: int) -> np.ndarray:
+        """第 lo..hi-1 行的距离 (hi - lo) × num_nodes；稀疏模式按坐标现算，结果与稠密矩阵逐位相同"""
+        if not self.sparse:
+            return np.array(self.dist_matrix[lo:hi], dtype=np.float64)
+        xs = np.array([c.x for c in self.customers], dtype=np.float64)
+        ys = np.array([c.y for c in self.customers], dtype=np.float64)
+        return np.sqrt((xs[lo:hi, None] - xs[None, :])**2 + (ys[lo:hi, None] - ys[None, :])**2)
+
+    def nearest_nodes(self, k: int) -> List[List[int]]:
+        """[新增] 每个节点最近的 k 个节点 (含自己)，按 (距离, 下标) 排序"""
+        result = []
+        for lo in range(0, self.num_nodes, self.ROW_BLOCK):
+            block = self._dist_rows(lo, min(lo + self.ROW_BLOCK, self.num_nodes))
+            result.extend(_smallest(row, k).tolist() for row in block)
+        return result
+
+    def candidate_arcs(self, neighbor_limit: int = 20) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        [新增] 剪枝后的候选弧，CSR 形式: 节点 i 的出弧为 targets[offsets[i]:offsets[i+1]]，距离在 dists 同样位置。
+        规则与原来 build_problem_data 里的近邻表相同：去掉 i 最早出发也赶不上 j 截止时间的弧，按距离取最近
+        neighbor_limit 个 (depot 保留全部)，每行都带上回 depot 的弧。结果按 neighbor_limit 缓存。
+        """
+        if neighbor_limit in self._arc_cache:
+            return self._arc_cache[neighbor_limit]
+        cs = self.customers
+        ready = np.array([c.tw_a + c.service_time for c in cs])
+        due = np.array([c.tw_b for c in cs], dtype=np.float64)
+        offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        targets, dists = [], []
+        for lo in range(0, self.num_nodes, self.ROW_BLOCK):
+            block = self._dist_rows(lo, min(lo + self.ROW_BLOCK, self.num_nodes))
+            for i, row in enumerate(block, start=lo):
+                ok = ready[i] + row <= due
+                ok[i] = False
+                cand = np.flatnonzero(ok)
+                if i == 0:
+                    # Depot 全连接，确保每个客户都能作为路径的起点
+                    cand = cand[np.argsort(row[cand], kind="stable")]
+                else:
+                    cand = cand[_smallest(row[cand], neighbor_limit)]
+                if not np.any(cand == 0):
+                    cand = np.append(cand, 0)
+                targets.append(cand.astype(np.int32))
+                dists.append(row[cand])
+                offsets[i + 1] = offsets[i] + len(cand)
+        arcs = (offsets, np.concatenate(targets), np.concatenate(dists))
+        self._arc_cache[neighbor_limit] = arcs
+        return arcs
+
     def _read_solomon(self, filepath, max_customers):
         """
         读取 Solomon 格式的文本文件。
@@ -99,27 +270,14 @@ class VRPTWInstance:
         """
         预计算每个节点的 ng-set 掩码。
         ng-set 包含节点本身及其最近的 (ng_size-1) 个邻居。
+        [修改] 最近邻改由 nearest_nodes 分块计算 (稀疏模式没有距离矩阵)，结果与原来逐行排序相同。
         """
-        self.ng_masks = [0] * self.num_nodes
-        
-        # 对于每个节点 i
-        for i in range(self.num_nodes):
-            # 拿到 i 到所有点 j 的距离: (distance, j_index)
-            # 注意：如果是 Depot (0)，通常也需要计算，或者根据策略略过
-            dists = []
-            for j in range(self.num_nodes):
-                dists.append((self.dist_matrix[i][j], j))
-            
-            # 按距离排序 (从小到大)
-            dists.sort(key=lambda x: x[0])
-            
-            # 取前 ng_size 个最近的点 (包含自己，因为自己到自己距离为0)
-            # 如果 ng_size 大于节点总数，就取全部
-            top_neighbors = dists[:min(ng_size, self.num_nodes)]
-            
+        # 取前 ng_size 个最近的点 (包含自己，因为自己到自己距离为0)
+        # 如果 ng_size 大于节点总数，就取全部
+        self.ng_masks = []
+        for top_neighbors in self.nearest_nodes(min(ng_size, self.num_nodes)):
             # 生成位掩码
             mask = 0
-            for _, node_idx in top_neighbors:
+            for node_idx in top_neighbors:
                 mask |= (1 << node_idx)
-            
-            self.ng_masks[i] = mask
\ No newline at end of file
+            self.ng_masks.append(mask)
@@ -0,0 +1,339 @@
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+# 主问题 (集合覆盖 RMP) 的 LP/MIP 求解后端。
+# MasterProblem 只通过这里的接口操作模型：
+#   行 = 客户覆盖约束 (>= 1)，列 = 路径变量
+# 增量加列、改变量界限后再次 solve_lp() 会沿用上一次的基 (热启动)。
+
+INF = float('inf')
+
+
+class LPBackend(ABC):
+    """后端接口 (GurobiBackend / HighsBackend)；缺少任何一个方法的后端在创建时就会报 TypeError"""
+    name = ""
+
+    @abstractmethod
+    def add_rows(self, num_rows: int, rhs: float) -> None:
+        """添加 num_rows 个 sum(...) >= rhs 的空约束"""
+
+    @abstractmethod
+    def add_columns(self, costs: Sequence[float], rows: Sequence[Sequence[int]]) -> None:
+        """批量加列：第 k 列目标系数 costs[k]，rows[k] 中每出现一次行号该行系数加 1，界限 [0, inf)"""
+
+    @abstractmethod
+    def set_bounds(self, indices: Sequence[int], lb: Sequence[float], ub: Sequence[float]) -> None:
+        ...
+
+    @abstractmethod
+    def delete_rows(self, indices: Sequence[int]) -> None:
+        """[新增] 删除约束，之后的行号整体前移 (客户被取消时用)"""
+
+    @abstractmethod
+    def delete_columns(self, indices: Sequence[int]) -> None:
+        """[新增] 删除列，之后的列号整体前移"""
+
+    @abstractmethod
+    def solve_lp(self) -> Optional[float]:
+        """求解 LP 松弛，返回目标值；不可行返回 None"""
+
+    @abstractmethod
+    def get_duals(self) -> List[float]:
+        ...
+
+    @abstractmethod
+    def get_values(self) -> List[float]:
+        ...
+
+    @abstractmethod
+    def solve_mip(self, time_limit: float, start: Optional[Sequence[float]] = None,
+                  verbose: bool = False) -> Optional[List[float]]:
+        """
+        把本模型的所有列设为 0-1 变量并求解，返回列取值；没有可行解返回 None。
+        调用后模型变成整数模型，所以只用于整数阶段单独构建的一次性模型，不要在 LP 模型上调用。
+        start: MIP 初始解 (每列取值)，通常来自当前最优整数解
+        """
+
+    @property
+    @abstractmethod
+    def mip_proven(self) -> bool:
+        """[新增] 最近一次 solve_mip 是否在时间限制内证明了最优 (或证明了不可行)"""
+
+    @abstractmethod
+    def get_basis(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        当前 LP 最优基 (列状态, 行状态)，编码是后端自己的 (int8 数组)；没有有效基返回 None。
+        只用于之后传回同一个后端的 set_basis。
+        """
+
+    @abstractmethod
+    def set_basis(self, basis: Tuple[np.ndarray, np.ndarray]) -> None:
+        """
+        恢复 get_basis 保存的基。保存之后新加的列补成 "非基变量 (下界 0)"；
+        保存时处于上界的非基列也改回下界 (之后界限可能已经变成 inf)。
+        """
+
+    @property
+    @abstractmethod
+    def iterations(self) -> int:
+        """最近一次 solve_lp 的单纯形迭代次数"""
+
+    @property
+    @abstractmethod
+    def num_columns(self) -> int:
+        ...
+
+    @property
+    @abstractmethod
+    def obj_val(self) -> float:
+        ...
+
+
+class GurobiBackend(LPBackend):
+    name = "gurobi"
+
+    def __init__(self, model_name="VRPTW_Master"):
+        import gurobipy as gp
+        from gurobipy import GRB
+        self.gp, self.GRB = gp, GRB
+        self.model = gp.Model(model_name)
+        self.model.setParam('OutputFlag', 0)
+        self.constrs = []
+        self.vars = []
+
+    def add_rows(self, num_rows, rhs):
+        for _ in range(num_rows):
+            self.constrs.append(self.model.addConstr(self.gp.LinExpr() >= rhs, name=f"cover_{len(self.constrs) + 1}"))
+
+    def add_columns(self, costs, rows):
+        for cost, rs in zip(costs, rows):
+            col = self.gp.Column()
+            for r in rs:
+                col.addTerms(1.0, self.constrs[r])
+            self.vars.append(self.model.addVar(obj=cost, column=col, name=f"col_{len(self.vars)}"))
+
+    def set_bounds(self, indices, lb, ub):
+        for i, l, u in zip(indices, lb, ub):
+            self.vars[i].LB = l
+            self.vars[i].UB = u
+
+    def delete_rows(self, indices):
+        drop = set(indices)
+        self.model.remove([self.constrs[i] for i in drop])
+        self.constrs = [c for i, c in enumerate(self.constrs) if i not in drop]
+
+    def delete_columns(self, indices):
+        drop = set(indices)
+        self.model.remove([self.vars[i] for i in drop])
+        self.vars = [v for i, v in enumerate(self.vars) if i not in drop]
+
+    def solve_lp(self):
+        self.model.optimize()
+        if self.model.Status != self.GRB.OPTIMAL:
+            return None
+        return self.model.ObjVal
+
+    def get_duals(self):
+        return self.model.getAttr("Pi", self.constrs)
+
+    def get_values(self):
+        try:
+            return self.model.getAttr("X", self.vars)
+        except self.gp.GurobiError:
+            return [0.0] * len(self.vars)
+
+    def solve_mip(self, time_limit, start=None, verbose=False):
+        self.model.setAttr("VType", self.vars, [self.GRB.BINARY] * len(self.vars))
+        if start is not None:
+            self.model.setAttr("Start", self.vars, list(start))
+        self.model.setParam('OutputFlag', 1 if verbose else 0)
+        self.model.setParam('TimeLimit', max(time_limit, 0.1))
+        self.model.optimize()
+        return self.model.getAttr("X", self.vars) if self.model.SolCount > 0 else None
+
+    @property
+    def mip_proven(self):
+        return self.model.Status in (self.GRB.OPTIMAL, self.GRB.INFEASIBLE)
+
+    # VBasis: 0 基变量, -1 下界, -2 上界, -3 超基；CBasis: 0 基变量, -1 非基
+    def get_basis(self):
+        if self.model.Status != self.GRB.OPTIMAL:
+            return None
+        cols = np.asarray(self.model.getAttr("VBasis", self.vars), dtype=np.int8)
+        rows = np.asarray(self.model.getAttr("CBasis", self.constrs), dtype=np.int8)
+        return cols, rows
+
+    def set_basis(self, basis):
+        cols, rows = basis
+        vbasis = np.full(len(self.vars), -1, dtype=np.int8)
+        vbasis[:len(cols)] = np.where(cols == 0, 0, -1)
+        self.model.update()
+        self.model.setAttr("VBasis", self.vars, vbasis.tolist())
+        self.model.setAttr("CBasis", self.constrs, rows.tolist())
+
+    @property
+    def iterations(self):
+        return int(self.model.IterCount)
+
+    @property
+    def num_columns(self):
+        return len(self.vars)
+
+    @property
+    def obj_val(self):
+        return self.model.ObjVal
+
+
+class HighsBackend(LPBackend):
+    """
+    HiGHS (highspy) 实现，不需要商业 license。
+    addCols / changeColsBounds 之后 HiGHS 保留当前基，下次 run() 从该基出发做对偶/原始单纯形。
+    """
+    name = "highs"
+    SIMPLEX_DUAL, SIMPLEX_PRIMAL = 1, 4  # HiGHS 的 simplex_strategy 取值
+
+    def __init__(self):
+        import highspy
+        self.highspy = highspy
+        self.h = highspy.Highs()
+        self.h.silent()
+        self.h.setOptionValue("presolve", "off")  # 小规模重复求解时 presolve 会丢掉热启动
+        self.num_rows = 0
+        self._obj = float('nan')
+        # 加列后旧基仍原始可行 -> 原始单纯形；改界限后仍对偶可行 -> 对偶单纯形
+        self._strategy = self.SIMPLEX_DUAL
+
+    def add_rows(self, num_rows, rhs):
+        empty_i = np.array([], dtype=np.int32)
+        self.h.addRows(num_rows, np.full(num_rows, float(rhs)), np.full(num_rows, self.highspy.kHighsInf),
+                       0, empty_i, empty_i, np.array([], dtype=np.float64))
+        self.num_rows += num_rows
+
+    def add_columns(self, costs, rows):
+        n = len(costs)
+        if n == 0:
+            return
+        # ng-route 可能重复访问同一客户：HiGHS 不接受列内重复的行号，合并成系数 (访问次数)
+        rows = [rs if len(set(rs)) == len(rs) else Counter(rs) for rs in rows]
+        starts = np.zeros(n, dtype=np.int32)
+        starts[1:] = np.cumsum([len(r) for r in rows[:-1]])
+        index = np.fromiter((r for rs in rows for r in rs), dtype=np.int32)
+        value = np.fromiter((rs[r] if isinstance(rs, Counter) else 1.0 for rs in rows for r in rs),
+                            dtype=np.float64, count=len(index))
+        status = self.h.addCols(n, np.asarray(costs, dtype=np.float64), np.zeros(n),
+                                np.full(n, self.highspy.kHighsInf), len(index), starts, index, value)
+        if status != self.highspy.HighsStatus.kOk:
+            raise RuntimeError(f"HiGHS addCols failed: {status}")
+        # 不改 _strategy：最优解之后 solve_lp 已切到原始单纯形 (加列不破坏原始可行)；
+        # 之前有改界限 / 删行删列时仍需对偶单纯形
+
+    def set_bounds(self, indices, lb, ub):
+        if len(indices) == 0:
+            return
+        inf = self.highspy.kHighsInf
+        self.h.changeColsBounds(len(indices), np.asarray(indices, dtype=np.int32),
+                                np.asarray(lb, dtype=np.float64),
+                                np.minimum(np.asarray(ub, dtype=np.float64), inf))
+        self._strategy = self.SIMPLEX_DUAL
+
+    def delete_rows(self, indices):
+        if len(indices) == 0:
+            return
+        self.h.deleteRows(len(indices), np.asarray(sorted(indices), dtype=np.int32))
+        self.num_rows -= len(indices)
+        # 删行 / 删列后 HiGHS 沿用剩下的基，一般不再原始可行：改用对偶单纯形
+        self._strategy = self.SIMPLEX_DUAL
+
+    def delete_columns(self, indices):
+        if len(indices) == 0:
+            return
+        self.h.deleteCols(len(indices), np.asarray(sorted(indices), dtype=np.int32))
+        self._strategy = self.SIMPLEX_DUAL
+
+    def solve_lp(self):
+        self.h.setOptionValue("simplex_strategy", self._strategy)
+        self.h.run()
+        if self.h.getModelStatus() != self.highspy.HighsModelStatus.kOptimal:
+            return None
+        self._obj = self.h.getInfo().objective_function_value
+        # 本次求解后基最优，下一次默认只会是加列
+        self._strategy = self.SIMPLEX_PRIMAL
+        return self._obj
+
+    def get_duals(self):
+        return list(self.h.getSolution().row_dual)
+
+    def get_values(self):
+        return list(self.h.getSolution().col_value)
+
+    def solve_mip(self, time_limit, start=None, verbose=False):
+        highspy = self.highspy
+        n = self.num_columns
+        if n == 0:
+            return None
+        cols = np.arange(n, dtype=np.int32)
+        self.h.changeColsBounds(n, cols, np.zeros(n), np.ones(n))
+        self.h.changeColsIntegrality(n, cols, np.full(n, highspy.HighsVarType.kInteger))
+        if verbose:
+            self.h.setOptionValue("output_flag", True)
+        self.h.setOptionValue("time_limit", max(time_limit, 0.1))
+        self.h.setOptionValue("presolve", "choose")  # 一次性 MIP 模型，presolve 有用
+        if start is not None:
+            sol = highspy.HighsSolution()
+            sol.col_value = [float(x) for x in start]
+            sol.value_valid = True
+            self.h.setSolution(sol)
+        self.h.run()
+        if self.h.getInfo().primal_solution_status != 2:  # kSolutionStatusFeasible
+            return None
+        return list(self.h.getSolution().col_value)
+
+    @property
+    def mip_proven(self):
+        status = self.h.getModelStatus()
+        return status in (self.highspy.HighsModelStatus.kOptimal, self.highspy.HighsModelStatus.kInfeasible)
+
+    def get_basis(self):
+        basis = self.h.getBasis()
+        if not basis.valid:
+            return None
+        cols = np.fromiter((int(s) for s in basis.col_status), dtype=np.int8, count=len(basis.col_status))
+        rows = np.fromiter((int(s) for s in basis.row_status), dtype=np.int8, count=len(basis.row_status))
+        return cols, rows
+
+    def set_basis(self, basis):
+        Status = self.highspy.HighsBasisStatus
+        cols, rows = basis
+        col_status = np.full(self.num_columns, int(Status.kLower), dtype=np.int8)
+        col_status[:len(cols)] = np.where(cols == int(Status.kBasic), int(Status.kBasic), int(Status.kLower))
+        b = self.highspy.HighsBasis()
+        codes = {int(s): s for s in (Status.kLower, Status.kBasic, Status.kUpper, Status.kZero, Status.kNonbasic)}
+        b.col_status = [codes[c] for c in col_status.tolist()]
+        b.row_status = [codes[r] for r in rows.tolist()]
+        b.valid = True
+        self.h.setBasis(b)
+        # 恢复的基对子节点的界限通常是对偶可行、原始不可行
+        self._strategy = self.SIMPLEX_DUAL
+
+    @property
+    def iterations(self):
+        return self.h.getInfo().simplex_iteration_count
+
+    @property
+    def num_columns(self):
+        return self.h.getNumCol()
+
+    @property
+    def obj_val(self):
+        return self._obj
+
+
+BACKENDS = {"gurobi": GurobiBackend, "highs": HighsBackend}
+
+
+def make_backend(name: str = "gurobi") -> LPBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LP backend '{name}', choose from {sorted(BACKENDS)}")
+    return BACKENDS[name]()
@@ -1,108 +1,205 @@
-import gurobipy as gp
-from gurobipy import GRB
-from typing import List, Tuple, NamedTuple
+from typing import List, Optional, Tuple, NamedTuple
+import numpy as np
+from .lp_backend import LPBackend, make_backend
 
 # 定义一个简单的结构体返回结果
 class RouteVal(NamedTuple):
     path: List[int]
     val: float
 
+
+def drop_node(path: List[int], node: int) -> List[int]:
+    """[新增] 节点 node 被删除后的路径：跳过 node，之后的节点下标前移一位 (三角不等式下仍可行)"""
+    return [v - (v > node) for v in path if v != node]
+
 class MasterProblem:
-    def __init__(self, instance, verbose=True) -> None:
+    def __init__(self, instance, verbose=True, backend: str = "gurobi") -> None:
         self.verbose = verbose
         self.inst = instance
-        self.model = gp.Model("VRPTW_Master")
-        self.model.setParam('OutputFlag', 0)
+        # [新增] LP/MIP 后端 ("gurobi" / "highs")，所有模型操作都经过 self.lp
+        self.backend = backend
+        self.lp: LPBackend = make_backend(backend)
         
         # 车辆固定成本
         self.vehicle_fixed_cost = 2000.0 
         
         # === [修复关键点 1] 初始化两个同步列表 ===
-        self.routes = []  # 存储路径结构 List[List[int]]
-        self.vars = []    # 存储对应的 Gurobi 变量 List[gp.Var]
-        
-        self.constrs = {}
+        self.routes = []  # 存储路径结构 List[List[int]]，第 i 条路径对应后端第 i 列
+        # [新增] 每列的真实距离 (不含固定成本)，由 C++ 定价/批量评估给出，整数阶段直接求和
+        self.distances = []
+
+        # Big-M 虚拟列的列号，启发式需要识别并排除它们 (初始是前 N-1 列，之后新增客户的虚拟列在末尾)
+        self.dummy_columns = set()
+        # 已有真实列的路径集合，用于避免重复加列
+        self.route_keys = set()
+        # [新增] 整数阶段的列过滤依据：根节点 CG 收敛时的对偶值和 LP 下界 (见 set_root_bound)
+        self.root_duals: Optional[List[float]] = None
+        self.root_bound = -float('inf')
         self._init_model()
 
     def _init_model(self):
         """初始化模型结构"""
-        # 覆盖约束
-        for i in range(1, self.inst.num_nodes):
-            self.constrs[i] = self.model.addConstr(gp.LinExpr() >= 1, name=f"cover_{i}")
+        # 覆盖约束：客户 i 对应后端第 i-1 行
+        self.lp.add_rows(self.inst.num_nodes - 1, 1.0)
         
         # 初始虚拟列 (Big-M)
         self._init_dummy_columns()
 
     def _init_dummy_columns(self) -> None:
-        big_m = 100000.0 
-        for i in range(1, self.inst.num_nodes):
-            col = gp.Column()
-            col.addTerms(1.0, self.constrs[i])
-            # 添加变量
-            var = self.model.addVar(obj=big_m + self.vehicle_fixed_cost, column=col, name=f"dummy_{i}")
-            
-            # === [修复关键点 2] 两个列表同步添加 ===
-            self.vars.append(var)
+        self.big_m = 100000.0 
+        self._add_dummy_columns(range(1, self.inst.num_nodes))
+
+    def _add_dummy_columns(self, customers) -> None:
+        self.lp.add_columns([self.big_m + self.vehicle_fixed_cost] * len(customers), [[i - 1] for i in customers])
+        for i in customers:
+            self.dummy_columns.add(len(self.routes))
             self.routes.append([0, i, 0]) 
+            self.distances.append(self.inst.dist(0, i) + self.inst.dist(i, 0))
+
+    @property
+    def num_columns(self) -> int:
+        return len(self.routes)
+
+    @property
+    def num_dummies(self) -> int:
+        return len(self.dummy_columns)
+
+    @property
+    def obj_val(self) -> float:
+        """最近一次 LP 求解的目标值"""
+        return self.lp.obj_val
+
+    def is_dummy(self, idx: int) -> bool:
+        """判断第 idx 列是否为 Big-M 虚拟列"""
+        return idx in self.dummy_columns
 
     def solve(self) -> Tuple[float, List[float]]:
-        """求解 RMP (线性松弛)"""
-        # 确保是连续模型
-        for v in self.model.getVars():
-            if v.vType != GRB.CONTINUOUS:
-                v.vType = GRB.CONTINUOUS
-                
-        self.model.optimize()
-        
-        if self.model.Status == GRB.INFEASIBLE:
-            # 尝试计算 IIS 以帮助调试，虽然这里直接返回 inf
-            # self.model.computeIIS() 
+        """求解 RMP (线性松弛)；后端从上一次的基热启动"""
+        obj = self.lp.solve_lp()
+        if obj is None:
             return float('inf'), []
         
-        duals = [0.0] * self.inst.num_nodes
-        for i in range(1, self.inst.num_nodes):
-            duals[i] = self.constrs[i].Pi
-            
-        return self.model.ObjVal, duals
+        # duals[0] (depot) 固定为 0
+        return obj, [0.0] + list(self.lp.get_duals())
+
+    def get_basis(self):
+        """保存当前 LP 基 (B&P 节点结束时调用)，没有有效基返回 None"""
+        return self.lp.get_basis()
+
+    def set_basis(self, basis) -> None:
+        """恢复 get_basis 保存的基；之后新增的列作为非基变量补齐"""
+        if basis is not None:
+            self.lp.set_basis(basis)
+
+    @property
+    def last_iterations(self) -> int:
+        """最近一次 LP 求解的单纯形迭代次数"""
+        return self.lp.iterations
 
     def add_route(self, route_label) -> None:
-        """添加新列"""
-        path = route_label.get_path()
-        phys_cost = 0.0
-        for k in range(len(path)-1):
-            u, v = path[k], path[k+1]
-            phys_cost += self.inst.dist_matrix[u][v]
-        
-        total_cost = phys_cost + self.vehicle_fixed_cost
-        
-        col = gp.Column()
-        for node in path:
-            if node != 0:
-                col.addTerms(1.0, self.constrs[node])
-        
-        # 注册变量
-        var = self.model.addVar(obj=total_cost, column=col, name=f"route_{len(self.routes)}")
-        
-        # === [修复关键点 3] 两个列表同步添加 ===
-        self.routes.append(path)
-        self.vars.append(var)
+        """添加新列 (真实成本直接用定价引擎返回的 real_cost)"""
+        self.add_path(route_label.get_path(), route_label.real_cost)
+
+    def add_columns(self, result, count: Optional[int] = None) -> int:
+        """
+        批量加列：直接读取 PricingResult 的扁平数组 (前 count 列)，不构造 Route 对象。
+        Returns: 实际添加的列数
+        """
+        count = len(result) if count is None else min(count, len(result))
+        paths = [result.path(k) for k in range(count)]
+        self._add_paths(paths, [float(d) for d in result.distances[:count]])
+        return count
+
+    def add_initial_routes(self, paths: List[List[int]], distances: Optional[List[float]] = None) -> None:
+        """
+        用启发式构造的可行路径初始化 RMP。
+        Big-M 虚拟列仍然保留，只作为可行性兜底。
+        """
+        if distances is None:
+            distances = [self._path_distance(p) for p in paths]
+        self._add_paths(paths, distances)
+
+    def has_route(self, path: List[int]) -> bool:
+        return tuple(path) in self.route_keys
+
+    def _path_distance(self, path: List[int]) -> float:
+        return sum(self.inst.dist(path[k], path[k+1]) for k in range(len(path)-1))
+
+    def add_path(self, path: List[int], distance: Optional[float] = None) -> None:
+        """按路径添加新列；distance 为 None 时才在 Python 侧逐弧累加"""
+        if distance is None:
+            distance = self._path_distance(path)
+        self._add_paths([path], [distance])
+
+    def _add_paths(self, paths: List[List[int]], distances: List[float]) -> None:
+        """一次性把一批列交给后端 (HiGHS 的 addCols 是批量接口)"""
+        if not paths:
+            return
+        costs = [d + self.vehicle_fixed_cost for d in distances]
+        self.lp.add_columns(costs, [[node - 1 for node in path if node != 0] for path in paths])
+        # === routes / distances 与后端列同步添加 ===
+        for path, d in zip(paths, distances):
+            self.routes.append(path)
+            self.distances.append(d)
+            self.route_keys.add(tuple(path))
+
+    def add_customer(self) -> None:
+        """
+        [新增] 客户集合变化：instance 末尾新增了一个客户 (节点 num_nodes - 1)。
+        加一行覆盖约束和它的 Big-M 虚拟列；已有列都不访问新客户，全部保持可行。
+        """
+        self.lp.add_rows(1, 1.0)
+        self._add_dummy_columns([self.inst.num_nodes - 1])
+        self._reset_root_bound()
+
+    def remove_customer(self, node: int) -> List[List[int]]:
+        """
+        [新增] 客户集合变化：节点 node 已从 instance 删除 (之后的节点下标前移一位)。
+        删掉它的覆盖约束和所有访问它的列 (含虚拟列)，其余列的路径按新下标重编号。
+        Returns: 被删真实列跳过 node 后的路径 (新下标，去掉空路径)，由调用方校验后作为新列加回
+        """
+        drop = [i for i, r in enumerate(self.routes) if node in r]
+        shortcuts = [drop_node(self.routes[i], node) for i in drop if not self.is_dummy(i)]
+        self.lp.delete_rows([node - 1])
+        self._delete_columns(drop, lambda r: drop_node(r, node))
+        self._reset_root_bound()
+        return [p for p in shortcuts if len(p) > 2]
+
+    def remove_columns(self, indices: List[int]) -> None:
+        """[新增] 删除真实列 (增删客户后 ng-set 变了，旧的带环路径可能不再合法)，之后的列号前移"""
+        self._delete_columns([i for i in indices if not self.is_dummy(i)])
+        self._reset_root_bound()
+
+    def _delete_columns(self, drop: List[int], relabel=None) -> None:
+        """从后端和 routes / distances 同步删列；relabel 给出保留列的新路径 (节点重编号)"""
+        self.lp.delete_columns(drop)
+        dropped = set(drop)
+        keep = [i for i in range(self.num_columns) if i not in dropped]
+        new_index = {old: new for new, old in enumerate(keep)}
+        self.dummy_columns = {new_index[i] for i in self.dummy_columns if i in new_index}
+        self.routes = [relabel(self.routes[i]) if relabel else self.routes[i] for i in keep]
+        self.distances = [self.distances[i] for i in keep]
+        self.route_keys = {tuple(r) for i, r in enumerate(self.routes) if not self.is_dummy(i)}
+
+    def _reset_root_bound(self) -> None:
+        # 根节点对偶对应旧的行集合，不能再用来过滤整数阶段的列
+        self.root_duals = None
+        self.root_bound = -float('inf')
 
     def deactivate_columns(self, forbidden_arcs: List[Tuple[int, int]]):
         """
         [关键逻辑] 根据禁止边列表，禁用所有包含这些边的旧列。
         方法：将对应的变量 Upper Bound (UB) 设为 0。
         """
-        if not forbidden_arcs:
-            return
+        # 注意：forbidden_arcs 为空时也要遍历一遍，把之前禁用的列全部恢复
+        # (例如从潜水启发式回到根节点时)
 
         # 1. 建立快速查询集
         forbidden_set = set(forbidden_arcs)
         
-        # 2. 遍历所有路径
-        # 注意：vars 和 routes 的长度必须一致
+        # 2. 遍历所有路径 (routes 与后端列一一对应)
+        ub = []
         for i, route in enumerate(self.routes):
-            var = self.vars[i]
-            
             # 检查该路径是否包含禁止边
             is_violated = False
             for k in range(len(route)-1):
@@ -113,49 +210,121 @@ class MasterProblem:
             
             # 3. 设置界限
             if is_violated:
-                var.UB = 0.0  # 禁用
+                ub.append(0.0)  # 禁用
             else:
-                # 只有之前被禁用的才需要恢复，这里简单起见全部设为 inf 也可以
-                # 或者更严谨一点：只在没有其他约束时恢复
-                # 在简单的分支策略中，我们假设父节点的约束子节点都继承，所以不需要恢复操作
-                # 但为了代码健壮性，我们可以重置为 inf (如果逻辑是每一轮重新应用所有约束)
-                var.UB = float('inf') 
+                # 为了代码健壮性，每一轮重新应用所有约束：未违反的列一律恢复为 inf
+                ub.append(float('inf'))
+        self.lp.set_bounds(range(len(ub)), [0.0] * len(ub), ub)
+
+    def fix_columns(self, indices: List[int]) -> None:
+        """把指定列固定为 1 (LB = UB = 1)，用于潜水启发式"""
+        self.lp.set_bounds(indices, [1.0] * len(indices), [1.0] * len(indices))
+
+    def unfix_columns(self, indices: List[int]) -> None:
+        """撤销 fix_columns，恢复默认界限"""
+        self.lp.set_bounds(indices, [0.0] * len(indices), [float('inf')] * len(indices))
+
+    def get_active_columns(self) -> List[Tuple[int, float]]:
+        """获取当前 LP 解中非零列的 (列索引, 取值)"""
+        return [(i, val) for i, val in enumerate(self.lp.get_values()) if val > 1e-4]
 
     def get_fractional_solution(self) -> List[RouteVal]:
         """获取当前 LP 的非零解"""
-        active_routes = []
-        for i, var in enumerate(self.vars):
-            try:
-                val = var.x
-            except AttributeError:
-                val = 0.0
-            
-            if val > 1e-4: # 忽略浮点误差
-                active_routes.append(RouteVal(self.routes[i], val))
-        return active_routes
-
-    def solve_integer(self) -> Tuple[float, List[List[int]]]:
-        """求解整数解 (MIP)"""
-        # 1. 转换为二值变量
-        for var in self.model.getVars():
-            var.vType = GRB.BINARY
-        
-        self.model.setParam('TimeLimit', 60)
-        self.model.setParam('OutputFlag', 1 if self.verbose else 0)
-        self.model.optimize()
-        
-        if self.model.SolCount > 0:
-            selected_routes = []
-            total_dist = 0.0
-            
-            for var, route in zip(self.vars, self.routes): # 使用 zip 安全遍历
-                if var.x > 0.5:
-                    # 计算物理距离
-                    d = 0.0
-                    for k in range(len(route)-1):
-                        d += self.inst.dist_matrix[route[k]][route[k+1]]
-                    total_dist += d
-                    selected_routes.append(route)
-            return total_dist, selected_routes
-        else:
-            return float('inf'), []
\ No newline at end of file
+        # 忽略浮点误差
+        return [RouteVal(self.routes[i], val) for i, val in self.get_active_columns()]
+
+    def set_root_bound(self, duals: List[float], lp_bound: float) -> None:
+        """
+        记录根节点 CG 收敛时的对偶值和 LP 值。
+        精确定价收敛后，之后生成的任何列相对这组对偶的约简成本都 >= 0，
+        所以约简成本 > (上界 - lp_bound) 的列不可能出现在比上界更好的整数解里。
+        """
+        self.root_duals = list(duals)
+        self.root_bound = lp_bound
+
+    def reduced_costs(self, duals: List[float]) -> np.ndarray:
+        """所有列相对 duals 的约简成本 (目标系数含固定成本，虚拟列为 Big-M)"""
+        costs = np.asarray(self.distances) + self.vehicle_fixed_cost
+        costs[sorted(self.dummy_columns)] = self.big_m + self.vehicle_fixed_cost
+        d = np.asarray(duals)
+        return costs - np.array([d[route].sum() for route in self.routes])
+
+    def select_columns(self, upper_bound: float = float('inf'), keep: Optional[List[List[int]]] = None) -> List[int]:
+        """
+        整数阶段的候选列：约简成本 <= 上界 - 根节点下界 的列，加上 keep 中的路径 (当前最优解)。
+        没有上界或没有根节点对偶时保留全部列。
+        """
+        if self.root_duals is None or upper_bound == float('inf'):
+            return list(range(self.num_columns))
+        gap = upper_bound - self.root_bound
+        selected = np.flatnonzero(self.reduced_costs(self.root_duals) <= gap + 1e-4).tolist()
+        if keep:
+            chosen = set(selected)
+            keys = {tuple(p) for p in keep}
+            selected += [i for i, r in enumerate(self.routes) if tuple(r) in keys and i not in chosen]
+        return sorted(selected)
+
+    def solve_integer(self, time_limit: float = 60.0, incumbent: Optional[List[List[int]]] = None,
+                      upper_bound: float = float('inf'),
+                      allow_dummies: bool = True) -> Tuple[float, List[List[int]]]:
+        """
+        求解整数解 (MIP)。
+        整数阶段在单独构建的模型上求解：只含 select_columns 过滤后的列，所有列 0-1、忽略节点上的列禁用，
+        LP 模型 (self.lp) 不受影响。incumbent (路径列表) 作为 MIP 初始解。
+        allow_dummies=False 时含 Big-M 虚拟列的解视为无效 (启发式用)。
+        """
+        columns = self.select_columns(upper_bound, keep=incumbent)
+        if not allow_dummies:
+            columns = [i for i in columns if not self.is_dummy(i)]
+        if not columns:
+            return float('inf'), []
+
+        mip = make_backend(self.backend)
+        mip.add_rows(self.inst.num_nodes - 1, 1.0)
+        costs = [self.distances[i] + self.vehicle_fixed_cost if not self.is_dummy(i)
+                 else self.big_m + self.vehicle_fixed_cost for i in columns]
+        mip.add_columns(costs, [[node - 1 for node in self.routes[i] if node != 0] for i in columns])
+        start = None
+        if incumbent:
+            keys = {tuple(p) for p in incumbent}
+            start = [1.0 if tuple(self.routes[i]) in keys else 0.0 for i in columns]
+        if self.verbose:
+            print(f"Integer phase: {len(columns)}/{self.num_columns} columns")
+
+        values = mip.solve_mip(time_limit, start=start, verbose=self.verbose)
+        if values is None:
+            return float('inf'), []
+
+        selected_routes = []
+        total_dist = 0.0
+        for x, idx in zip(values, columns):
+            if x > 0.5:
+                total_dist += self.distances[idx]
+                selected_routes.append(self.routes[idx])
+        return total_dist, selected_routes
+
+    def solve_pool(self, paths: List[List[int]], distances: List[float],
+                   time_limit: float = 10.0) -> Tuple[float, List[List[int]], bool]:
+        """
+        [新增] 只在给定的路径池上求整数解 (路径枚举关闭子树用)，模型与 solve_integer 相同但不含主问题的列。
+        Returns: (总距离, 选中的路径, 是否证明了最优)；池子覆盖不了所有客户时返回 (inf, [], True)
+        """
+        covered = {node for p in paths for node in p if node != 0}
+        if len(covered) < self.inst.num_nodes - 1:
+            return float('inf'), [], True
+        mip = make_backend(self.backend)
+        mip.add_rows(self.inst.num_nodes - 1, 1.0)
+        mip.add_columns([d + self.vehicle_fixed_cost for d in distances],
+                        [[node - 1 for node in p if node != 0] for p in paths])
+        values = mip.solve_mip(time_limit)
+        if values is None:
+            return float('inf'), [], mip.mip_proven
+        selected = [k for k, x in enumerate(values) if x > 0.5]
+        return sum(distances[k] for k in selected), [paths[k] for k in selected], mip.mip_proven
+
+    def solve_integer_on_copy(self, time_limit: float = 5.0, incumbent: Optional[List[List[int]]] = None,
+                              upper_bound: float = float('inf')) -> Tuple[float, List[List[int]]]:
+        """
+        限时 MIP (启发式用)：和 solve_integer 一样在单独的模型上求解，但不允许 Big-M 虚拟列。
+        """
+        return self.solve_integer(time_limit, incumbent, upper_bound, allow_dummies=False)
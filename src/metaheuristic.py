@@ -0,0 +1,35 @@
+import time
+from typing import List, Tuple, Optional
+
+import pricing_lib
+from .pricing import build_problem_data
+
+
+class MetaheuristicSolver:
+    """
+    大规模算例 (400-1000 客户) 的元启发式求解模式，与 CGSolver / BranchAndBoundEngine 并列。
+    核心是 C++ 侧的 ALNS (pricing_lib.ALNSSolver)，复用 ProblemData 和近邻表。
+    返回格式与 BranchAndBoundEngine.solve 一致: (含车辆固定成本的目标值, [[0, ..., 0], ...])
+    """
+    def __init__(self, instance, verbose=True, seed=0, neighbor_limit=20):
+        self.inst = instance
+        self.verbose = verbose
+        self.vehicle_fixed_cost = 2000.0
+        # 元启发式不需要 ng 集合，跳过这部分预处理
+        self.cpp_data = build_problem_data(instance, ng_size=0, neighbor_limit=neighbor_limit)
+        self.engine = pricing_lib.ALNSSolver(self.cpp_data, self.vehicle_fixed_cost, seed)
+
+    def solve(self, time_limit=60, initial_routes: Optional[List[List[int]]] = None) -> Tuple[float, List[List[int]]]:
+        start_time = time.time()
+        if self.verbose:
+            print(f"=== Starting ALNS (Time Limit: {time_limit}s) ===")
+
+        routes = [list(r) for r in self.engine.solve(time_limit, initial_routes or [])]
+        dist = sum(e.distance for e in pricing_lib.evaluate_routes(self.cpp_data, routes))
+        obj = dist + len(routes) * self.vehicle_fixed_cost
+
+        if self.verbose:
+            print(f"=== ALNS Finished in {time.time() - start_time:.2f}s ===")
+            print(f"Iterations: {self.engine.iterations}")
+            print(f"Vehicles: {len(routes)} | Dist: {dist:.2f} | Obj: {obj:.2f}")
+        return obj, routes
@@ -1,5 +1,7 @@
+import math
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
 import pricing_lib  # <--- 导入编译好的 C++ 扩展模块
 
 @dataclass
@@ -13,8 +15,129 @@ class Route:
     def get_path(self) -> List[int]:
         return self.path
     
+class PricingResult:
+    """
+    定价结果的扁平数组视图 (C++ 直接给出的 NumPy 数组)。
+    第 k 条路径为 nodes[offsets[k]:offsets[k+1]]；Route 对象只在访问时才创建。
+    reduced_costs 已加上车辆固定成本，与 Route.cost 口径一致。
+    """
+    def __init__(self, arrays: dict, vehicle_fixed_cost: float, limit: Optional[int] = None):
+        reduced_costs = arrays["reduced_costs"] + vehicle_fixed_cost
+        # 引擎已按 reduced cost 升序返回：先按 limit 截断，再去掉固定成本后非负的列
+        n = len(reduced_costs) if limit is None else min(limit, len(reduced_costs))
+        n = int(np.searchsorted(reduced_costs[:n], -1e-5))
+        self.offsets = arrays["offsets"][:n + 1]
+        self.nodes = arrays["nodes"][:self.offsets[-1]]
+        self.reduced_costs = reduced_costs[:n]
+        self.distances = arrays["distances"][:n]
+        self.durations = arrays["durations"][:n]
+        self.loads = arrays["loads"][:n]
+        # 引擎因时间预算提前结束：列仍然可用，但 "没有负 RC 列" 不再代表收敛
+        self.timed_out = bool(arrays.get("timed_out", False))
+
+    def __len__(self) -> int:
+        return len(self.reduced_costs)
+
+    def path(self, k: int) -> List[int]:
+        return self.nodes[self.offsets[k]:self.offsets[k + 1]].tolist()
+
+    def __getitem__(self, k: int) -> Route:
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError(k)
+        return Route(path=self.path(k), cost=float(self.reduced_costs[k]), real_cost=float(self.distances[k]))
+
+    def __iter__(self) -> Iterator[Route]:
+        for k in range(len(self)):
+            yield self[k]
+
+
+def build_problem_data(instance, ng_size=8, neighbor_limit=20) -> "pricing_lib.ProblemData":
+    """
+    把 VRPTWInstance 转换成 C++ 侧的 ProblemData (定价、局部搜索、元启发式共用)。
+    ng_size <= 0 时不计算 ng 邻居 (C++ 侧退化为基本路径)，大算例的元启发式用不到它。
+    """
+    # =========================================
+    # 1. 数据转换 (Python Object -> C++ Struct)
+    # =========================================
+    cpp_data = pricing_lib.ProblemData()
+    cpp_data.num_nodes = instance.num_nodes
+    cpp_data.vehicle_capacity = instance.vehicle_capacity
+    
+    # 提取数据 (C++ vector <-> Python List)
+    cpp_data.demands = [c.demand for c in instance.customers]
+    cpp_data.service_times = [c.service_time for c in instance.customers]
+    cpp_data.tw_start = [c.tw_a for c in instance.customers]
+    cpp_data.tw_end = [c.tw_b for c in instance.customers]
+    
+    # 提取矩阵
+    if getattr(instance, 'sparse', False):
+        # [新增] 稀疏模式：只传坐标，C++ 侧按坐标现算距离 (dist_matrix / time_matrix 留空)
+        cpp_data.xs = [c.x for c in instance.customers]
+        cpp_data.ys = [c.y for c in instance.customers]
+    else:
+        cpp_data.dist_matrix = instance.dist_matrix
+        # 兼容性处理：如果没有 time_matrix，复用 dist_matrix
+        cpp_data.time_matrix = getattr(instance, 'time_matrix', instance.dist_matrix)
+
+    # =========================================
+    # ng 邻居：离 i 最近的 ng_size 个点 (含 i 自己)
+    # =========================================
+    # 注意：这定义了“当我们到达 i 时，我们需要记住哪些点被访问过”
+    # [修改] 最近邻由 instance.nearest_nodes 分块计算，不再逐行对 (dist, j) 排序
+    ng_lists = instance.nearest_nodes(ng_size) if ng_size > 0 else []
+    for neighbors in ng_lists:
+        # 确保包含 0 (Depot)，虽然通常逻辑包含，但显式加上更安全
+        if 0 not in neighbors:
+            neighbors.append(0)
+
+    # 3. 传给 C++
+    # Pybind11 会自动把 List[List[int]] 转成 std::vector<std::vector<int>>
+    cpp_data.ng_neighbor_lists = ng_lists
+    # =========================================
+    # 2. 预处理邻居列表 (Heuristic Preprocessing)
+    # =========================================
+    # [修改] 近邻表直接取算例的 CSR 候选弧 (时间窗剪枝 + 最近 neighbor_limit 个，Depot 全连接，每行带回程弧)
+    offsets, targets, _ = instance.candidate_arcs(neighbor_limit)
+    cpp_data.neighbors = [targets[offsets[i]:offsets[i + 1]].tolist() for i in range(instance.num_nodes)]
+    return cpp_data
+
+
+class ArcLimitTuner:
+    """
+    启发式定价阶段每个客户保留的出弧数 k (按当前对偶挑 dist - dual 最小的 k 条)。
+    启发式阶段报告“没有负 RC 列”后由 Exact 阶段复查：
+      Exact 找到了列 (启发式漏了) -> k 乘以 grow；
+      连续 patience 次没漏 -> k 减 1，图更稀疏。
+    """
+    def __init__(self, k=10, k_min=4, k_max=40, grow=1.5, patience=5):
+        self.k = k
+        self.k_min = k_min
+        self.k_max = k_max
+        self.grow = grow
+        self.patience = patience
+        self.checks = 0
+        self.misses = 0
+        self._streak = 0
+
+    def record(self, missed: bool) -> int:
+        """记录一次 Exact 复查结果，返回调整后的 k"""
+        self.checks += 1
+        if missed:
+            self.misses += 1
+            self._streak = 0
+            self.k = min(self.k_max, int(math.ceil(self.k * self.grow)))
+        else:
+            self._streak += 1
+            if self._streak >= self.patience:
+                self._streak = 0
+                self.k = max(self.k_min, self.k - 1)
+        return self.k
+
+
 class PricingSolver:
-    def __init__(self, instance):
+    def __init__(self, instance, load_buckets=0, preprocess=True, warm_start=False, fixed_point=0):
         self.inst = instance
         # 请根据你的模型确认：固定成本是在这里加，还是在主问题 Duals 里处理
         # 如果主问题的 Duals 包含了 convexity constraint 的 dual (比如 duals[0]), 
@@ -22,107 +145,53 @@ class PricingSolver:
         # 这里保留原本逻辑。
         self.vehicle_fixed_cost = 2000.0
         
-        # =========================================
-        # 1. 数据转换 (Python Object -> C++ Struct)
-        # =========================================
-        cpp_data = pricing_lib.ProblemData()
-        cpp_data.num_nodes = instance.num_nodes
-        cpp_data.vehicle_capacity = instance.vehicle_capacity
-        
-        # 提取数据 (C++ vector <-> Python List)
-        cpp_data.demands = [c.demand for c in instance.customers]
-        cpp_data.service_times = [c.service_time for c in instance.customers]
-        cpp_data.tw_start = [c.tw_a for c in instance.customers]
-        cpp_data.tw_end = [c.tw_b for c in instance.customers]
-        
-        # 提取矩阵
-        cpp_data.dist_matrix = instance.dist_matrix
-        # 兼容性处理：如果没有 time_matrix，复用 dist_matrix
-        cpp_data.time_matrix = getattr(instance, 'time_matrix', instance.dist_matrix)
-        ng_size = 8
-        ng_lists = []
-
-        for i in range(instance.num_nodes):
-            # 拿到所有点到 i 的距离：(dist, node_index)
-            dists = []
-            for j in range(instance.num_nodes):
-                dists.append((instance.dist_matrix[i][j], j))
-            
-            # 按距离排序
-            dists.sort(key=lambda x: x[0])
-            
-            # 取最近的 ng_size 个点的索引
-            # 注意：这定义了“当我们到达 i 时，我们需要记住哪些点被访问过”
-            # 通常包含离 i 最近的那些点。
-            neighbors = [x[1] for x in dists[:ng_size]]
-            
-            # 确保包含 0 (Depot)，虽然通常逻辑包含，但显式加上更安全
-            if 0 not in neighbors:
-                neighbors.append(0)
-                
-            ng_lists.append(neighbors)
-
-        # 3. 传给 C++
-        # Pybind11 会自动把 List[List[int]] 转成 std::vector<std::vector<int>>
-        cpp_data.ng_neighbor_lists = ng_lists
-        # =========================================
-        # 2. 预处理邻居列表 (Heuristic Preprocessing)
-        # =========================================
-        neighbor_limit = 20  # <--- [修改] 设大一点，或者干脆对 R101 不做截断
-        cpp_neighbors = []
-        
-        for i in range(instance.num_nodes):
-            all_neighbors = []
-            for j in range(instance.num_nodes):
-                if i == j: continue
-                
-                # [可选] 简单的时间窗剪枝
-                # 如果从 i 出发，即便全速赶路也无法在 j 的截止时间前到达，则断开连接
-                dist = instance.dist_matrix[i][j]
-                arrival_time = instance.customers[i].tw_a + instance.customers[i].service_time + dist
-                if arrival_time > instance.customers[j].tw_b:
-                    continue
-                    
-                all_neighbors.append((dist, j))
-            
-            # 按距离排序
-            all_neighbors.sort(key=lambda x: x[0])
-            
-            # [核心修复]
-            # 如果是 Depot (0)，必须连接所有可行点，确保每个客户都能作为路径的起点！
-            # 如果是普通点，可以截断以加速
-            if i == 0:
-                sorted_indices = [x[1] for x in all_neighbors] # Depot 全连接
-            else:
-                sorted_indices = [x[1] for x in all_neighbors[:neighbor_limit]]
-            
-            # 确保回程可行：每个点的邻居里最好都包含 0
-            # (虽然 C++ 代码逻辑里通常是单独处理回 Depot 的，但加进去也没坏处)
-            if 0 not in sorted_indices:
-                sorted_indices.append(0)
-            
-            cpp_neighbors.append(sorted_indices)
-            
-        cpp_data.neighbors = cpp_neighbors
+        self.preprocess = preprocess
+        self._build_data()
 
         # =========================================
         # 3. 初始化 C++ 求解器
         # =========================================
-        self.cpp_data = cpp_data
         # [修改] 设置默认参数 (漏斗初始阶段：快)
         self.bucket_step = 1.0  # 默认步长 (建议 1.0 或 2.0 用于快速探测)
-        self.limit = 50         # 默认截断数量
+        self.limit = 50         # 默认截断数量 (直接传给 C++ 引擎做 partial sort)
+        self.max_per_customer = 0  # > 0 时开启多样性筛选：每个客户最多被几条返回列覆盖
+        # 热启动：每次 solve 用上一次的 label (按新对偶重算 cost) 做种子，相邻 CG 迭代对偶变化小时省去部分扩展
+        self.warm_start = warm_start
+        self.arc_limit = 0  # > 0 时每个客户只扫描 dist - dual 最小的 arc_limit 条出弧 (每次 solve 按对偶重建)
+        # > 0 时 C++ 引擎按 (时间 × 载重) 二维格子做支配检查 (容量紧的算例更快)，0 = 原来的一维版本
+        self.load_buckets = load_buckets
+        # > 0 时用定点引擎：时间乘以 fixed_point 存 int32，成本乘以 1e9 存 int64 (label 更小、支配比较为整数比较)。
+        # 定点引擎是启发式的 (取整后的时间支配可能误删列，见 pricing_engine.h)，不能用来证明 CG 收敛
+        self.fixed_point = fixed_point
         
         self.cpp_solver = None
         self._init_solver()
         
+    def _build_data(self):
+        # 1-2. 数据转换 + 邻居表预处理
+        cpp_data = build_problem_data(self.inst)
+        # 2.5 时间窗收紧 + 删掉不可能用到的弧 (原地修改 cpp_data，可行路径的服务开始时刻不变)
+        self.preprocess_report = pricing_lib.preprocess(cpp_data) if self.preprocess else None
+        self.cpp_data = cpp_data
+        # 路径枚举引擎 (小 gap 节点用)，第一次 enumerate 时才创建
+        self.enumerator = None
+
+    def rebuild(self):
+        """[新增] 算例的客户集合变了 (增删客户)：按新算例重建 ProblemData (ng-set、近邻弧、时间窗收紧) 和 C++ 求解器"""
+        self._build_data()
+        self._init_solver()
+
     # [新增] 辅助函数：初始化/重建 C++ 求解器
     def _init_solver(self):
         # 销毁旧对象（如果有），创建新对象
         # 注意：C++ 侧会重新构建 BucketGraph，但这通常只需要几毫秒
-        self.cpp_solver = pricing_lib.LabelingSolver(self.cpp_data, self.bucket_step)
+        self.cpp_solver = pricing_lib.LabelingSolver(self.cpp_data, self.bucket_step, self.load_buckets,
+                                                     fixed_point=self.fixed_point)
+        self.cpp_solver.arc_limit = self.arc_limit
+        self.cpp_solver.warm_start = self.warm_start
     # [新增] 漏斗机制的核心接口
-    def set_params(self, bucket_step=None, limit=None):
+    def set_params(self, bucket_step=None, limit=None, max_per_customer=None, load_buckets=None,
+                   arc_limit=None, fixed_point=None):
         """
         动态调整策略参数
         """
@@ -132,62 +201,78 @@ class PricingSolver:
         if bucket_step is not None and abs(bucket_step - self.bucket_step) > 1e-6:
             self.bucket_step = bucket_step
             rebuild_needed = True
+        if load_buckets is not None and load_buckets != self.load_buckets:
+            self.load_buckets = load_buckets
+            rebuild_needed = True
+        # 切换浮点 / 定点引擎 (0 = 浮点)
+        if fixed_point is not None and fixed_point != self.fixed_point:
+            self.fixed_point = fixed_point
+            rebuild_needed = True
             
         # 更新截断限制
         if limit is not None:
             self.limit = limit
+        if max_per_customer is not None:
+            self.max_per_customer = max_per_customer
+        if arc_limit is not None:
+            self.arc_limit = arc_limit
+            self.cpp_solver.arc_limit = arc_limit
             
         # 如果步长变了，执行重建
         if rebuild_needed:
             self._init_solver()
             
-    def solve(self, duals: List[float],forbidden_arcs: List[Tuple[int, int]] = []) -> List[Route]:
+    def solve(self, duals: List[float],forbidden_arcs: List[Tuple[int, int]] = [],
+              time_limit: float = -1.0) -> PricingResult:
         """
-        调用 C++ 引擎求解
+        调用 C++ 引擎求解。time_limit (秒，<= 0 不限) 到期时引擎返回已找到的列。
+        结果是扁平数组 (PricingResult)，按 reduced cost 升序，可以像 List[Route] 一样遍历；
+        reduced cost 和真实距离都由引擎给出，Python 侧不再逐弧重算。
         """
-        # 1. C++ 求解
-        raw_paths = self.cpp_solver.solve(duals, forbidden_arcs)
-        results = []
-        # [新增] Python 端截断 (漏斗机制生效点)
-        # 假设 C++ 返回了较多列 (e.g. 500)，这里根据当前策略只取前 limit 个 (e.g. 50)
-        if len(raw_paths) > self.limit:
-            # 假设 C++ 已经按 RC 排序，直接切片
-            raw_paths = raw_paths[:self.limit]
-        # 2. 后处理
-        for path in raw_paths:
-            # 计算成本
-            r_cost, real_c = self._calculate_path_costs(path, duals)
-            # 双重检查负 Reduced Cost
-            if r_cost < -1e-5:
-                # [修改] 这里实例化 Route 时使用 cost 参数
-                results.append(Route(path=path, cost=r_cost, real_cost=real_c))
-                
-        return results
-
-    def _calculate_path_costs(self, path: List[int], duals: List[float]) -> Tuple[float, float]:
+        # [修改] 截断 (漏斗机制生效点) 下沉到 C++：引擎只回溯前 limit 个 label
+        arrays = self.cpp_solver.solve_arrays(duals, forbidden_arcs, self.limit, self.max_per_customer, time_limit)
+        return PricingResult(arrays, self.vehicle_fixed_cost)
+
+    def enumerate(self, duals: List[float], gap: float, forbidden_arcs: List[Tuple[int, int]] = [],
+                  max_routes: int = 20000, time_limit: float = -1.0) -> dict:
         """
-        计算 Reduced Cost 和 Real Cost
+        [新增] 枚举所有 reduced cost (含车辆固定成本) <= gap 的初等路径，每个客户集合只留最便宜的一条。
+        返回 C++ 的扁平数组 (nodes / offsets / reduced_costs / distances ...) 和统计；
+        complete=False 表示超过 max_routes 或 time_limit (秒，<= 0 不限)，池子不完整。
         """
-        real_cost = 0.0
-        reduced_cost = 0.0
-        
-        # 加上固定成本
-        reduced_cost += self.vehicle_fixed_cost 
-        
-        curr = path[0]
-        for next_node in path[1:]:
-            dist = self.inst.dist_matrix[curr][next_node]
-            real_cost += dist
-            
-            # Reduced Cost 公式: c_ij - dual_j
-            rc_step = dist
-            if next_node != 0: 
-                # 注意：对偶变量通常对应客户约束 (index 1..N)
-                # 需确保 duals 列表长度正确且索引对齐
-                if next_node < len(duals):
-                    rc_step -= duals[next_node]
-            
-            reduced_cost += rc_step
-            curr = next_node
-            
-        return reduced_cost, real_cost
\ No newline at end of file
+        if self.enumerator is None:
+            self.enumerator = pricing_lib.RouteEnumerator(self.cpp_data)
+        # 引擎的 reduced cost 不含固定成本：把固定成本并进 depot 的对偶 (回 depot 时减 duals[0])
+        duals = list(duals)
+        duals[0] -= self.vehicle_fixed_cost
+        return self.enumerator.enumerate(duals, gap, forbidden_arcs, max_routes=max_routes, time_limit=time_limit)
+
+    def in_graph(self, paths: List[List[int]]) -> List[bool]:
+        """
+        [新增] 路径是否是当前引擎能生成的列：只走 neighbors 里的弧 (回 depot 的弧总是允许)，
+        且在当前 ng-set 下合法 (到达 j 时记忆 M' = (M ∩ N(j)) ∪ {j}，j ∈ M 时不允许再访问)。
+        """
+        arcs = [set(n) for n in self.cpp_data.neighbors]
+        ng = [set(n) | {i} for i, n in enumerate(self.cpp_data.ng_neighbor_lists)]
+        result = []
+        for path in paths:
+            ok, memory = True, set()
+            for u, v in zip(path[:-1], path[1:-1]):
+                if v in memory or v not in arcs[u]:
+                    ok = False
+                    break
+                memory = (memory & ng[v]) | {v}
+            result.append(ok)
+        return result
+
+    @property
+    def last_stats(self) -> "pricing_lib.SolveStats":
+        """最近一次 solve 的 C++ 统计 (label 计数、支配次数、桶直方图、阶段耗时)"""
+        return self.cpp_solver.stats
+
+    def evaluate(self, paths: List[List[int]], duals: List[float] = []) -> list:
+        """
+        批量评估路径 (C++)：距离、reduced cost (不含固定成本)、载重、回 depot 时刻和可行性。
+        主问题加列、整数阶段和结果校验都走这里。
+        """
+        return pricing_lib.evaluate_routes(self.cpp_data, paths, duals)
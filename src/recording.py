@@ -0,0 +1,107 @@
+from typing import List, Tuple
+import numpy as np
+import pricing_lib
+
+
+def _flatten(lists: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """变长列表 -> (values, offsets)，第 k 个列表为 values[offsets[k]:offsets[k+1]]"""
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(x) for x in lists])
+    values = np.fromiter((v for x in lists for v in x), dtype=np.int32, count=int(offsets[-1]))
+    return values, offsets
+
+
+def _unflatten(values: np.ndarray, offsets: np.ndarray) -> List[List[int]]:
+    return [values[offsets[k]:offsets[k + 1]].tolist() for k in range(len(offsets) - 1)]
+
+
+class PricingRecorder:
+    """
+    记录 CG 每次定价调用的输入 (duals、禁止弧、阶段参数)，用于离线回放做 micro-benchmark。
+    ProblemData 一并保存，回放不依赖算例文件和 Python 侧预处理。
+    文件格式为 np.savez_compressed (.npz)，变长数据用 values + offsets 扁平存储。
+    """
+    def __init__(self, cpp_data: "pricing_lib.ProblemData", name: str = ""):
+        self.cpp_data = cpp_data
+        self.name = name
+        self.duals: List[List[float]] = []
+        self.forbidden_arcs: List[List[Tuple[int, int]]] = []
+        self.bucket_steps: List[float] = []
+        self.limits: List[int] = []
+        self.max_per_customer: List[int] = []
+        self.arc_limits: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.duals)
+
+    def record(self, duals, forbidden_arcs, bucket_step, limit, max_per_customer=0, arc_limit=0) -> None:
+        self.duals.append(list(duals))
+        self.forbidden_arcs.append([tuple(a) for a in forbidden_arcs])
+        self.bucket_steps.append(bucket_step)
+        self.limits.append(limit)
+        self.max_per_customer.append(max_per_customer)
+        self.arc_limits.append(arc_limit)
+
+    def save(self, path: str) -> None:
+        d = self.cpp_data
+        neighbors, neighbor_offsets = _flatten(d.neighbors)
+        ng, ng_offsets = _flatten(d.ng_neighbor_lists)
+        arcs, arc_offsets = _flatten([[x for a in arcs for x in a] for arcs in self.forbidden_arcs])
+        np.savez_compressed(
+            path,
+            name=np.array(self.name),
+            vehicle_capacity=np.array(d.vehicle_capacity),
+            demands=np.asarray(d.demands, dtype=np.int32),
+            service_times=np.asarray(d.service_times),
+            tw_start=np.asarray(d.tw_start),
+            tw_end=np.asarray(d.tw_end),
+            dist_matrix=np.asarray(d.dist_matrix),
+            time_matrix=np.asarray(d.time_matrix),
+            xs=np.asarray(d.xs), ys=np.asarray(d.ys),  # [新增] 稀疏模式的坐标 (稠密模式为空)
+            neighbors=neighbors, neighbor_offsets=neighbor_offsets,
+            ng=ng, ng_offsets=ng_offsets,
+            duals=np.asarray(self.duals, dtype=np.float64).reshape(len(self), d.num_nodes),
+            arcs=arcs, arc_offsets=arc_offsets,
+            bucket_steps=np.asarray(self.bucket_steps, dtype=np.float64),
+            limits=np.asarray(self.limits, dtype=np.int32),
+            max_per_customer=np.asarray(self.max_per_customer, dtype=np.int32),
+            arc_limits=np.asarray(self.arc_limits, dtype=np.int32),
+        )
+
+
+def load_snapshots(path: str) -> Tuple["pricing_lib.ProblemData", List[dict], str]:
+    """
+    读取 PricingRecorder.save 的文件。
+    Returns: (ProblemData, [{duals, forbidden_arcs, bucket_step, limit, max_per_customer, arc_limit}], name)
+    """
+    z = np.load(path)
+    d = pricing_lib.ProblemData()
+    d.num_nodes = len(z["demands"])
+    d.vehicle_capacity = int(z["vehicle_capacity"])
+    d.demands = z["demands"].tolist()
+    d.service_times = z["service_times"].tolist()
+    d.tw_start = z["tw_start"].tolist()
+    d.tw_end = z["tw_end"].tolist()
+    d.dist_matrix = z["dist_matrix"].tolist()
+    d.time_matrix = z["time_matrix"].tolist()
+    if "xs" in z.files:
+        d.xs = z["xs"].tolist()
+        d.ys = z["ys"].tolist()
+    d.neighbors = _unflatten(z["neighbors"], z["neighbor_offsets"])
+    d.ng_neighbor_lists = _unflatten(z["ng"], z["ng_offsets"])
+
+    snapshots = []
+    flat_arcs = _unflatten(z["arcs"], z["arc_offsets"])
+    # 旧快照没有 arc_limits (全部是完整图)
+    arc_limits = z["arc_limits"] if "arc_limits" in z.files else np.zeros(len(z["bucket_steps"]), dtype=np.int32)
+    for k in range(len(z["bucket_steps"])):
+        a = flat_arcs[k]
+        snapshots.append({
+            "duals": z["duals"][k].tolist(),
+            "forbidden_arcs": list(zip(a[0::2], a[1::2])),
+            "bucket_step": float(z["bucket_steps"][k]),
+            "limit": int(z["limits"][k]),
+            "max_per_customer": int(z["max_per_customer"][k]),
+            "arc_limit": int(arc_limits[k]),
+        })
+    return d, snapshots, str(z["name"])
@@ -0,0 +1,405 @@
+"""
+[新增] 常驻求解服务。
+
+一次性脚本每个算例都要付一遍：新 Python 进程、导入 pricing_lib / LP 后端 (Gurobi 环境)、
+解析 Solomon 文件、算距离矩阵和 ng-set。服务模式把这些摊掉：
+  - SolveService: 服务进程，持有一组常驻 worker 进程 (启动时导入一次求解器)，
+    请求排队后派给空闲 worker；每个请求有自己的求解时间限制和排队超时，
+    超过 time_limit + 硬超时余量的 worker 直接 kill 并补一个新的
+  - SharedInstanceStore: 每个 (文件, 客户数) 只在服务进程里解析一次，
+    节点表和距离矩阵放进 multiprocessing.shared_memory，worker 按名字挂载后重建算例 (并按 LRU 缓存)
+  - make_server / ServiceClient: 本机 HTTP 接口 (POST /solve, GET /status)，JSON 收发
+"""
+import io
+import os
+import json
+import time
+import queue
+import threading
+import contextlib
+import urllib.request
+import multiprocessing as mp
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import shared_memory
+from typing import Dict
+
+import numpy as np
+
+from src.instance import Customer, VRPTWInstance
+
+# 车辆固定成本 (用于还原纯距离)
+VEHICLE_FIXED_COST = 2000.0
+
+# 硬超时 = 请求的 time_limit + 这个余量 (B&P 的时间限制是协作式的，最终 MIP 可能拖过限制)
+HARD_TIMEOUT_SLACK = 30.0
+
+# 每个 worker 缓存的已重建算例个数
+WORKER_CACHE_SIZE = 16
+
+# 共享内存中节点表的列 (顺序即 Customer 字段顺序)
+NODE_FIELDS = ("id", "x", "y", "demand", "tw_a", "tw_b", "service_time")
+
+# POST /solve 接受的字段
+REQUEST_FIELDS = ("instance", "time_limit", "max_customers", "queue_timeout")
+
+
+# ==========================================
+# 1. 共享内存中的算例
+# ==========================================
+def _views(shm, num_nodes):
+    """共享内存块上的 (节点表, 距离矩阵) 视图"""
+    n_node_vals = num_nodes * len(NODE_FIELDS)
+    buf = np.ndarray((n_node_vals + num_nodes * num_nodes,), dtype=np.float64, buffer=shm.buf)
+    return buf[:n_node_vals].reshape(num_nodes, len(NODE_FIELDS)), buf[n_node_vals:].reshape(num_nodes, num_nodes)
+
+
+class SharedInstanceStore:
+    """服务进程侧：解析过的算例放进共享内存，返回可 pickle 的小句柄给 worker"""
+
+    def __init__(self):
+        self._blocks: Dict[tuple, tuple] = {}  # key -> (SharedMemory, handle)
+        self._lock = threading.Lock()
+
+    def get(self, path, max_customers=None) -> dict:
+        key = (os.path.abspath(path), max_customers)
+        with self._lock:
+            if key not in self._blocks:
+                self._blocks[key] = self._publish(path, max_customers)
+            return self._blocks[key][1]
+
+    @staticmethod
+    def _publish(path, max_customers):
+        # VRPTWInstance 总会打印 "Reading file"，服务里丢掉
+        with contextlib.redirect_stdout(io.StringIO()):
+            inst = VRPTWInstance(path, max_customers=max_customers, verbose=False)
+        n = inst.num_nodes
+        shm = shared_memory.SharedMemory(create=True, size=8 * n * (len(NODE_FIELDS) + n))
+        nodes, dist = _views(shm, n)
+        nodes[:] = [[getattr(c, f) for f in NODE_FIELDS] for c in inst.customers]
+        dist[:] = inst.dist_matrix
+        handle = {
+            "shm": shm.name,
+            "num_nodes": n,
+            "capacity": inst.vehicle_capacity,
+            "name": os.path.splitext(os.path.basename(path))[0],
+        }
+        return shm, handle
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def close(self):
+        with self._lock:
+            for shm, _ in self._blocks.values():
+                shm.close()
+                shm.unlink()
+            self._blocks.clear()
+
+
+def attach_instance(handle) -> VRPTWInstance:
+    """worker 侧：按句柄挂载共享内存并重建 VRPTWInstance (不读文件、不重算距离)"""
+    shm = shared_memory.SharedMemory(name=handle["shm"])
+    try:
+        nodes, dist = _views(shm, handle["num_nodes"])
+        customers = [Customer(int(r[0]), float(r[1]), float(r[2]), int(r[3]), int(r[4]), int(r[5]), int(r[6]))
+                     for r in nodes]
+        # 求解器到处按 dist_matrix[i][j] 索引，转成嵌套 list 比逐元素读 numpy 快
+        dist_matrix = dist.tolist()
+    finally:
+        shm.close()
+    return VRPTWInstance.from_arrays(customers, handle["capacity"], dist_matrix)
+
+
+# ==========================================
+# 2. worker 进程
+# ==========================================
+def _solve_task(task, cache, engine_cls, lp_backend):
+    handle = task["handle"]
+    key = handle["shm"]
+    if key in cache:
+        cache.move_to_end(key)
+        instance = cache[key]
+    else:
+        instance = attach_instance(handle)
+        cache[key] = instance
+        if len(cache) > WORKER_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = engine_cls(instance, verbose=False, lp_backend=lp_backend)
+        start = time.perf_counter()
+        obj, routes = engine.solve(global_time_limit=task["time_limit"])
+        run_time = time.perf_counter() - start
+
+    result = {
+        "solve_time": round(run_time, 3),
+        "objective": obj,
+        "vehicles": len(routes),
+        "routes": [[int(v) for v in r] for r in engine._incumbent_paths()],
+        "root_bound": engine.root_bound,
+        "best_bound": engine.best_bound,
+        "nodes": engine.nodes_explored,
+    }
+    if obj == float('inf') or not routes:
+        result.update({"status": "Infeasible", "objective": None, "distance": None})
+    else:
+        result["status"] = "Optimal" if engine.best_bound >= obj - 1e-4 else "TimeLimit"
+        result["distance"] = obj - len(routes) * VEHICLE_FIXED_COST
+    # JSON 不认 inf
+    for k in ("root_bound", "best_bound"):
+        if abs(result[k]) == float('inf'):
+            result[k] = None
+    return result
+
+
+def _worker_main(worker_id, task_q, result_q, lp_backend):
+    """常驻 worker：启动时导入求解器、建一次 LP 后端 (Gurobi 环境 / 许可证检查)，之后循环取任务"""
+    from src.branching import BranchAndBoundEngine
+    from src.lp_backend import make_backend
+    make_backend(lp_backend)
+
+    cache = OrderedDict()  # shm 名字 -> VRPTWInstance
+    result_q.put(("ready", worker_id, None))
+    while True:
+        task = task_q.get()
+        if task is None:
+            break
+        try:
+            result = _solve_task(task, cache, BranchAndBoundEngine, lp_backend)
+        except Exception as e:
+            result = {"status": "Crashed", "error": f"{type(e).__name__}: {e}"}
+        result["worker"] = os.getpid()
+        result_q.put(("done", worker_id, (task["job"], result)))
+
+
+class _Worker:
+    def __init__(self, ctx, worker_id, result_q, lp_backend):
+        self.task_q = ctx.Queue()
+        self.proc = ctx.Process(target=_worker_main, args=(worker_id, self.task_q, result_q, lp_backend),
+                                daemon=True)
+        self.proc.start()
+        self.job = None  # 正在跑的 (request, future, start)
+
+
+# ==========================================
+# 3. 服务 (调度线程 + 请求队列)
+# ==========================================
+class SolveService:
+    """
+    常驻 worker 池 + 请求队列。submit() 立即返回 Future，solve() 阻塞到结果。
+    time_limit: 求解时间限制 (秒)，从 worker 拿到请求开始计
+    queue_timeout: 最多排队多久 (秒)，超过则不求解，直接返回 status="Expired"；None 表示一直等
+    """
+
+    def __init__(self, workers=None, lp_backend="gurobi", hard_timeout_slack=HARD_TIMEOUT_SLACK):
+        self.num_workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.lp_backend = lp_backend
+        self.hard_timeout_slack = hard_timeout_slack
+        self.store = SharedInstanceStore()
+
+        self._ctx = mp.get_context("spawn")  # 子进程干净地初始化 Gurobi / pricing_lib
+        self._result_q = self._ctx.Queue()
+        self._workers = []
+        self._pending = deque()  # (request, future, submit_time)
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = None
+        self._next_job = 0
+        self.counts = {"submitted": 0, "completed": 0, "expired": 0, "killed": 0, "crashed": 0}
+
+    # ---------- 生命周期 ----------
+    def start(self, wait_ready=True):
+        self._workers = [_Worker(self._ctx, i, self._result_q, self.lp_backend) for i in range(self.num_workers)]
+        if wait_ready:
+            ready = 0
+            while ready < self.num_workers:
+                try:
+                    kind, _, _ = self._result_q.get(timeout=1.0)
+                except queue.Empty:
+                    if any(not w.proc.is_alive() for w in self._workers):
+                        self.close()
+                        raise RuntimeError("solve worker exited during startup")
+                    continue
+                ready += kind == "ready"
+        self._thread = threading.Thread(target=self._dispatch_loop, name="solve-dispatch", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        for w in self._workers:
+            w.task_q.put(None)
+        for w in self._workers:
+            w.proc.join(5)
+            if w.proc.is_alive():
+                w.proc.kill()
+                w.proc.join()
+        with self._cond:
+            for _, fut, _ in self._pending:
+                fut.set_result({"status": "Cancelled"})
+            self._pending.clear()
+        self.store.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- 请求 ----------
+    def submit(self, instance, time_limit=10.0, max_customers=None, queue_timeout=None) -> Future:
+        # 解析 / 发布共享内存在调用线程里做，文件错误直接抛给调用方
+        handle = self.store.get(instance, max_customers)
+        request = {"handle": handle, "time_limit": float(time_limit), "queue_timeout": queue_timeout}
+        fut = Future()
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("service is closed")
+            self._pending.append((request, fut, time.time()))
+            self.counts["submitted"] += 1
+            self._cond.notify_all()
+        return fut
+
+    def solve(self, instance, time_limit=10.0, max_customers=None, queue_timeout=None) -> dict:
+        return self.submit(instance, time_limit, max_customers, queue_timeout).result()
+
+    def stats(self) -> dict:
+        with self._cond:
+            busy = sum(w.job is not None for w in self._workers)
+            return dict(self.counts, queued=len(self._pending), busy=busy,
+                        workers=self.num_workers, instances=len(self.store))
+
+    # ---------- 调度 ----------
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+                self._assign()
+            try:
+                kind, wid, payload = self._result_q.get(timeout=0.05)
+            except queue.Empty:
+                kind = None
+            with self._cond:
+                if kind == "done":
+                    self._finish(self._workers[wid], *payload)
+                self._check_workers()
+
+    def _assign(self):
+        now = time.time()
+        for w in self._workers:
+            if w.job is not None:
+                continue
+            while self._pending:
+                request, fut, submitted = self._pending.popleft()
+                wait = now - submitted
+                qt = request["queue_timeout"]
+                if qt is not None and wait > qt:
+                    self.counts["expired"] += 1
+                    fut.set_result({"status": "Expired", "queue_wait": round(wait, 3)})
+                    continue
+                self._next_job += 1
+                request = dict(request, queue_wait=wait, job=self._next_job)
+                w.task_q.put({"job": self._next_job, "handle": request["handle"],
+                              "time_limit": request["time_limit"]})
+                w.job = (request, fut, now)
+                break
+            if not self._pending:
+                break
+
+    def _finish(self, w, job, result):
+        if w.job is None or w.job[0]["job"] != job:  # 被判超时杀掉后才到达的旧结果
+            return
+        request, fut, _ = w.job
+        w.job = None
+        result["queue_wait"] = round(request["queue_wait"], 3)
+        result["instance"] = request["handle"]["name"]
+        self.counts["crashed" if result["status"] == "Crashed" else "completed"] += 1
+        fut.set_result(result)
+
+    def _check_workers(self):
+        """kill 超过硬超时的 worker，补上挂掉的 worker"""
+        now = time.time()
+        for i, w in enumerate(self._workers):
+            status = None
+            if not w.proc.is_alive():
+                status = "Crashed"
+            elif w.job is not None and now - w.job[2] > w.job[0]["time_limit"] + self.hard_timeout_slack:
+                status = "Killed"
+                w.proc.kill()
+            if status is None:
+                continue
+            w.proc.join()
+            if w.job is not None:
+                request, fut, start = w.job
+                self.counts["killed" if status == "Killed" else "crashed"] += 1
+                fut.set_result({"status": status, "instance": request["handle"]["name"],
+                                "queue_wait": round(request["queue_wait"], 3),
+                                "solve_time": round(now - start, 3)})
+            self._workers[i] = _Worker(self._ctx, i, self._result_q, self.lp_backend)
+
+
+# ==========================================
+# 4. 本机 HTTP 接口
+# ==========================================
+class _Handler(BaseHTTPRequestHandler):
+    def _reply(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/status":
+            return self._reply(404, {"error": f"unknown path {self.path}"})
+        self._reply(200, self.server.service.stats())
+
+    def do_POST(self):
+        if self.path != "/solve":
+            return self._reply(404, {"error": f"unknown path {self.path}"})
+        try:
+            params = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            unknown = set(params) - set(REQUEST_FIELDS)
+            if unknown or "instance" not in params:
+                raise ValueError(f"expected fields {REQUEST_FIELDS} (instance required), got {sorted(params)}")
+            fut = self.server.service.submit(**params)
+        except (ValueError, OSError) as e:
+            return self._reply(400, {"error": f"{type(e).__name__}: {e}"})
+        self._reply(200, fut.result())
+
+    def log_message(self, *args):
+        pass
+
+
+def make_server(service, host="127.0.0.1", port=8765) -> ThreadingHTTPServer:
+    """HTTP 服务器 (port=0 时由系统分配端口，见 server.server_address)；调用方负责 serve_forever / shutdown"""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+class ServiceClient:
+    def __init__(self, url="http://127.0.0.1:8765", timeout=None):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def solve(self, instance, time_limit=10.0, max_customers=None, queue_timeout=None) -> dict:
+        payload = {"instance": instance, "time_limit": time_limit,
+                   "max_customers": max_customers, "queue_timeout": queue_timeout}
+        req = urllib.request.Request(f"{self.url}/solve", data=json.dumps(payload).encode(),
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.loads(resp.read())
+
+    def status(self) -> dict:
+        with urllib.request.urlopen(f"{self.url}/status", timeout=self.timeout) as resp:
+            return json.loads(resp.read())
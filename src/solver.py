@@ -1,15 +1,182 @@
-from .master import MasterProblem,RouteVal
-from .pricing import PricingSolver
+from .master import MasterProblem,RouteVal,drop_node
+from .pricing import PricingSolver, ArcLimitTuner
+from .initial import InitialSolutionGenerator
+from .recording import PricingRecorder
+from .deadline import Deadline
+import pricing_lib
+import numpy as np
 import time
-from typing import List, Tuple
+from typing import List, Tuple, Optional
+
+# init_heuristic=None (默认) 时只在客户数不超过这个值的算例上运行构造启发式：
+# 纯 Python 的 Clarke-Wright / Solomon I1 是 O(n^3) 量级，100 个客户约 0.2-0.7 秒，几百个客户就要几十秒
+INIT_HEURISTIC_MAX_CUSTOMERS = 100
 
 class CGSolver:
-    def __init__(self, instance,verbose=True):
+    def __init__(self, instance,verbose=True, init_heuristic=None, init_local_search=False, diversity=0,
+                 lp_backend="gurobi", load_buckets=0, preprocess=True, heuristic_arcs=10,
+                 warm_start_pricing=False, fixed_point_pricing=0):
         self.inst = instance
         self.verbose = verbose
-        self.master = MasterProblem(instance,verbose=verbose)
-        self.pricing = PricingSolver(instance)
+        # 启发式定价阶段的多样性选列：每个客户最多被几条新列覆盖 (0 = 关闭，按 RC 取前 limit 个)
+        self.diversity = diversity
+        # 主问题 LP/MIP 后端："gurobi" 或 "highs" (开源，无需 license)
+        self.master = MasterProblem(instance,verbose=verbose, backend=lp_backend)
+        # load_buckets > 0: 定价引擎使用二维 (时间 × 载重) 支配桶
+        # warm_start_pricing: 定价引擎用上一次的 label 做种子 (结果仍精确，宽时间窗的 R2 类收益最明显)
+        # fixed_point_pricing > 0: 启发式阶段的定价引擎用定点资源 (时间缩放倍数)。
+        # 定点引擎按取整后的时间做支配，可能漏掉负 RC 列，所以 Exact 阶段 / run() 的收敛确认总是用浮点引擎
+        self.fixed_point_pricing = fixed_point_pricing
+        self.pricing = PricingSolver(instance, load_buckets=load_buckets, preprocess=preprocess,
+                                     warm_start=warm_start_pricing, fixed_point=fixed_point_pricing)
+        rep = self.pricing.preprocess_report
+        if rep is not None and self.verbose:
+            print(f"Preprocess: {rep.tw_start_tightened} tw_start / {rep.tw_end_tightened} tw_end tightened, "
+                  f"arcs {rep.arcs_before} -> {rep.arcs_after}")
+        # 用 Clarke-Wright / Solomon I1 的可行路径作为初始列，减少追赶 Big-M 对偶的迭代
+        # (True / False 强制打开 / 关闭，None 按算例规模决定)
+        if init_heuristic is None:
+            init_heuristic = instance.num_nodes - 1 <= INIT_HEURISTIC_MAX_CUSTOMERS
+        if init_heuristic:
+            init_routes = InitialSolutionGenerator(instance, local_search=init_local_search).generate()
+            evals = self.pricing.evaluate(init_routes)
+            self.master.add_initial_routes(init_routes, [e.distance for e in evals])
+            if self.verbose:
+                print(f"Initial columns: {len(init_routes)} heuristic routes")
+        # 启发式定价阶段的对偶感知稀疏图：每个客户保留 k 条 dist - dual 最小的出弧，
+        # k 按 Exact 阶段补漏的频率自动调整 (heuristic_arcs <= 0 表示启发式阶段也用完整图)
+        self.arc_tuner = ArcLimitTuner(k=heuristic_arcs) if heuristic_arcs > 0 else None
+        # C++ 局部搜索：改进整数解，复用定价引擎的 ProblemData 和近邻表
+        self.local_search = pricing_lib.LocalSearch(self.pricing.cpp_data, self.master.vehicle_fixed_cost)
+        # 录制模式 (见 start_recording)：保存每次定价调用的输入，供 benchmark_pricing.py 回放
+        self.recorder: Optional[PricingRecorder] = None
+        self.first_lp_iterations: Optional[int] = None
+        # 最近一次 solve_with_constraints 结束时的对偶值
+        self.last_duals: List[float] = []
+        # 最近一次 solve_with_constraints 是否由 Exact 阶段确认收敛 (超时退出时 False)
+        self.converged = False
+
+    def start_recording(self, name: str = "") -> PricingRecorder:
+        """开启录制模式，之后每次定价调用的 duals / 禁止弧 / 阶段参数都会被记录"""
+        self.recorder = PricingRecorder(self.pricing.cpp_data, name)
+        return self.recorder
+
+    def _price(self, duals: List[float], forbidden_arcs: List[Tuple[int, int]] = [],
+               deadline: Optional[Deadline] = None):
+        """定价调用的统一入口 (录制模式在这里记录输入；deadline 传给 C++ 引擎做协作式超时)"""
+        if self.recorder is not None:
+            p = self.pricing
+            self.recorder.record(duals, forbidden_arcs, p.bucket_step, p.limit, p.max_per_customer, p.arc_limit)
+        time_limit = deadline.engine_limit() if deadline is not None else -1.0
+        return self.pricing.solve(duals, forbidden_arcs, time_limit)
+
+    def improve_solution(self, paths: List[List[int]]) -> Tuple[float, List[List[int]]]:
+        """
+        用局部搜索改进整数解，并把改进后的新路径作为列加回主问题。
+        Returns: (total_dist, paths)，没有改进时原样返回
+        """
+        improved = [list(p) for p in self.local_search.improve(paths)]
+        old_dist = sum(e.distance for e in self.pricing.evaluate(paths))
+        new_evals = self.pricing.evaluate(improved)
+        new_dist = sum(e.distance for e in new_evals)
+        fixed = self.master.vehicle_fixed_cost
+        if len(improved) * fixed + new_dist >= len(paths) * fixed + old_dist - 1e-6:
+            return old_dist, paths
+
+        for p, e in zip(improved, new_evals):
+            if not self.master.has_route(p):
+                self.master.add_path(p, e.distance)
+        return new_dist, improved
+
+    def validate_solution(self, paths: List[List[int]]) -> bool:
+        """校验整数解：每条路径满足容量/时间窗，且每个客户都被覆盖 (与主问题的集合覆盖约束一致)"""
+        if not all(e.feasible for e in self.pricing.evaluate(paths)):
+            return False
+        covered = {c for p in paths for c in p[1:-1]}
+        return covered == set(range(1, self.inst.num_nodes))
         
+    # =========================================
+    # [新增] 增量重优化：客户集合在求解之间变化 (临时加单 / 取消订单)
+    # 之后再调用 solve_with_constraints / B&P 即从保留下来的列继续列生成
+    # =========================================
+    def add_customer(self, customer) -> int:
+        """
+        新增客户：算例末尾追加节点，主问题加一行覆盖约束和它的虚拟列，定价引擎按新算例重建。
+        已有列都不访问新客户，全部保留；单客户路径 0 -> i -> 0 可行时作为第一条覆盖它的真实列。
+        Returns: 新客户的节点下标
+        """
+        node = self.inst.add_customer(customer)
+        self._rebuild_engines()
+        self.master.add_customer()
+        self._filter_columns()
+        single = [0, node, 0]
+        e = self.pricing.evaluate([single])[0]
+        if e.feasible:
+            self.master.add_path(single, e.distance)
+        return node
+
+    def remove_customer(self, node: int) -> int:
+        """
+        取消客户：删掉它的覆盖约束和所有访问它的列，其余列按新下标重编号。
+        被删的列跳过该客户后 (三角不等式下仍可行) 校验一遍，不重复的作为新列加回。
+        Returns: 加回的列数
+        """
+        self.inst.remove_customer(node)
+        self._rebuild_engines()
+        candidates = []
+        for p in self.master.remove_customer(node):
+            if not self.master.has_route(p) and p not in candidates:
+                candidates.append(p)
+        self._filter_columns()
+        evals = self.pricing.evaluate(candidates)
+        ng_ok = self.pricing.in_graph(candidates)
+        kept = [(p, e.distance) for p, e, ok in zip(candidates, evals, ng_ok) if e.feasible and ok]
+        self.master.add_initial_routes([p for p, _ in kept], [d for _, d in kept])
+        return len(kept)
+
+    def _filter_columns(self) -> int:
+        """
+        客户集合变化后 ng-set 跟着变：旧列里带环的 ng-route 可能在新 ng-set 下不合法。
+        留着它们 LP 仍是下界但比冷启动弱，所以删掉；容量 / 时间窗不受影响，不用重查。
+        Returns: 删掉的列数
+        """
+        m = self.master
+        real = [i for i in range(m.num_columns) if not m.is_dummy(i)]
+        ok = self.pricing.in_graph([m.routes[i] for i in real])
+        drop = [i for i, good in zip(real, ok) if not good]
+        m.remove_columns(drop)
+        return len(drop)
+
+    def insert_customer(self, paths: List[List[int]], node: int) -> List[List[int]]:
+        """
+        把节点 node 以最便宜的可行位置插进整数解 paths (一次批量评估所有位置)，
+        插不进或者不如单独一辆车时新开一条路径。用于增删客户后修复上界。
+        """
+        fixed = self.master.vehicle_fixed_cost
+        old = [e.distance for e in self.pricing.evaluate(paths)]
+        cands = [(r, k) for r, p in enumerate(paths) for k in range(1, len(p))]
+        evals = self.pricing.evaluate([paths[r][:k] + [node] + paths[r][k:] for r, k in cands])
+        single = self.pricing.evaluate([[0, node, 0]])[0]
+        best, best_delta = None, single.distance + fixed if single.feasible else float('inf')
+        for (r, k), e in zip(cands, evals):
+            if e.feasible and e.distance - old[r] < best_delta:
+                best, best_delta = (r, k), e.distance - old[r]
+        paths = [list(p) for p in paths]
+        if best is not None:
+            r, k = best
+            paths[r].insert(k, node)
+        else:
+            paths.append([0, node, 0])
+        return paths
+
+    def _rebuild_engines(self):
+        # 定价引擎 / 局部搜索共用的 ProblemData 按新算例重建 (毫秒级，远小于一轮 CG)
+        self.pricing.rebuild()
+        self.local_search = pricing_lib.LocalSearch(self.pricing.cpp_data, self.master.vehicle_fixed_cost)
+        # 录制的 ProblemData 已经过期，对偶值的长度也变了
+        self.recorder = None
+        self.last_duals = []
+
     def run(self):
         if self.verbose:
             print("=== Starting Column Generation ===")
@@ -20,24 +187,25 @@ class CGSolver:
             obj, duals = self.master.solve()
             if self.verbose:
                 print(f"Iter {iteration}: Objective = {obj:.2f}")
-            # 2. 解子问题 (Pricing)
-            new_routes = self.pricing.solve(duals)
+            # 2. 解子问题 (Pricing)：定点引擎可能漏列，它找不到列时换浮点引擎按同一组对偶确认
+            self.pricing.set_params(fixed_point=self.fixed_point_pricing)
+            new_routes = self._price(duals)
+            if not new_routes and self.fixed_point_pricing:
+                self.pricing.set_params(fixed_point=0)
+                new_routes = self._price(duals)
             
             # 3. 收敛检查
             if not new_routes:
                 if self.verbose:
                     print("Converged! No negative reduced cost routes found.")
+                self.master.set_root_bound(duals, obj)
                 break
             if self.verbose:
-                print(f"  -> Found {len(new_routes)} routes. Best RC: {new_routes[0].cost:.2f}")
-
-            # 4. 添加列
-            added_count = 0
-            for route in new_routes:
-                # 简单的过滤策略
-                if route.cost < -0.001:
-                    self.master.add_route(route)
-                    added_count += 1
+                print(f"  -> Found {len(new_routes)} routes. Best RC: {new_routes.reduced_costs[0]:.2f}")
+
+            # 4. 添加列 (结果已按 RC 升序，简单的过滤策略: 只加 RC < -0.001 的前缀)
+            added_count = self.master.add_columns(
+                new_routes, int(np.count_nonzero(new_routes.reduced_costs < -0.001)))
             
             if added_count == 0:
                 break
@@ -47,29 +215,48 @@ class CGSolver:
             print("="*40)
         
         final_obj, final_routes = self.master.solve_integer()        
+        if final_routes:
+            final_obj, final_routes = self.improve_solution(final_routes)
         return final_obj, final_routes
     
-    def solve_with_constraints(self, forbidden_arcs: List[Tuple[int, int]]) -> Tuple[bool, float, List[RouteVal]]:
+    def solve_with_constraints(self, forbidden_arcs: List[Tuple[int, int]],
+                               fixed_columns: Optional[List[int]] = None,
+                               deadline: Optional[Deadline] = None,
+                               basis=None) -> Tuple[bool, float, List[RouteVal]]:
         """
         带约束的列生成主循环
+        fixed_columns: 需要固定为 1 的列索引 (潜水启发式使用)，在禁用列之后生效
+        deadline: 全局截止时间 (B&P 传入)。到期后定价引擎立即返回，CG 不再继续迭代，
+                  此时返回的 LP 值不保证是该节点的下界
+        basis: 父节点结束时保存的 LP 基 (master.get_basis())，设置列界限后恢复，作为本节点第一次 LP 的热启动
         Returns: (is_feasible, obj_val, routes_with_lambda)
         """
+        deadline = deadline or Deadline()
         # print(f"DEBUG: Solving with {len(forbidden_arcs)} forbidden arcs") #
         self.master.deactivate_columns(forbidden_arcs)
+        if fixed_columns:
+            self.master.fix_columns(fixed_columns)
+        self.master.set_basis(basis)
+        # 本节点第一次 LP 的单纯形迭代次数 (衡量热启动效果)
+        self.first_lp_iterations = None
+        self.converged = False
         # 定义阶段
         # 最后一级必须是 Exact (bucket_step 极小, limit 极大)
+        # (bucket_step, limit, max_per_customer, name)；max_per_customer > 0 时引擎做多样性选列
         stages = [
-            (2.0, 50,  "Stage 1: Heuristic"), # 加速用
-            (0.1, 500, "Stage 2: Exact")      # 兜底用 (模拟 SOTA 的 Exact Labeling)
+            (2.0, 50,  self.diversity, "Stage 1: Heuristic"), # 加速用
+            (0.1, 500, 0,              "Stage 2: Exact")      # 兜底用 (模拟 SOTA 的 Exact Labeling)
         ]
         
         # 强制参数
         MAX_ITER = 100
-        TIME_LIMIT = 15.0 # 给足时间让 Exact 阶段纠正 Duals
-        start_time = time.time()
+        TIME_LIMIT = 15.0 # 给足时间让 Exact 阶段纠正 Duals (单个节点，且不超过全局截止时间)
+        node_deadline = Deadline(deadline.budget(TIME_LIMIT))
         
         current_stage = 0 
         iteration = 0
+        # 启发式阶段刚报告“无负 RC 列”，下一次 Exact 的结果用来调整稀疏图的 k
+        verify_heuristic = False
         
         while True:
             iteration += 1
@@ -80,19 +267,43 @@ class CGSolver:
             
             # 1. 解主问题
             obj, duals = self.master.solve()
+            if self.first_lp_iterations is None:
+                self.first_lp_iterations = self.master.last_iterations
             if obj == float('inf'): return False, float('inf'), []
+            if deadline.expired():
+                if self.verbose: print("   ⚠️ Global deadline reached.")
+                break
 
             # 2. 设定参数
-            step, limit, name = stages[current_stage]
-            self.pricing.set_params(bucket_step=step, limit=limit)
+            step, limit, per_customer, name = stages[current_stage]
+            # 启发式阶段用对偶感知的稀疏图 (和定点引擎)，Exact 阶段用完整图和浮点引擎
+            heuristic = current_stage < len(stages) - 1
+            arc_limit = self.arc_tuner.k if (heuristic and self.arc_tuner) else 0
+            self.pricing.set_params(bucket_step=step, limit=limit, max_per_customer=per_customer,
+                                    arc_limit=arc_limit, fixed_point=self.fixed_point_pricing if heuristic else 0)
             
             # 3. 求解子问题
-            new_labels = self.pricing.solve(duals, forbidden_arcs)
-            neg_rc = [l for l in new_labels if l.cost < -1e-4]
+            new_labels = self._price(duals, forbidden_arcs, deadline)
+            num_neg = int(np.count_nonzero(new_labels.reduced_costs < -1e-4))
+
+            if new_labels.timed_out:
+                # 引擎被全局截止时间打断：收下已找到的列后结束
+                if num_neg: self.master.add_columns(new_labels, num_neg)
+                if self.verbose: print("   ⚠️ Pricing interrupted by global deadline.")
+                break
+            if verify_heuristic:
+                verify_heuristic = False
+                k = self.arc_tuner.record(missed=num_neg > 0)
+                if num_neg:
+                    # 启发式漏了列：收下 Exact 的列后带着更大的 k 回到启发式阶段 (zig-zag)
+                    if self.verbose: print(f"   -> Heuristic graph missed columns, arc limit -> {k}")
+                    self.master.add_columns(new_labels, num_neg)
+                    current_stage = 0
+                    continue
             
-            if neg_rc:
-                # [情况 A] 找到了负 RC 列
-                for label in neg_rc: self.master.add_route(label)
+            if num_neg:
+                # [情况 A] 找到了负 RC 列 (已按 RC 升序，直接加前 num_neg 列)
+                self.master.add_columns(new_labels, num_neg)
                 
                 # SOTA 技巧：如果 Exact 阶段找到了列，说明 heuristic 漏了。
                 # 但为了利用 heuristic 的速度，我们可以降级回去再跑几轮快车
@@ -104,18 +315,20 @@ class CGSolver:
                 if current_stage < len(stages) - 1:
                     # 还没到 Exact 阶段？升级！
                     current_stage += 1
-                    if self.verbose: print(f"   -> Switching to {stages[current_stage][2]} (Safety Net)...")
+                    verify_heuristic = self.arc_tuner is not None
+                    if self.verbose: print(f"   -> Switching to {stages[current_stage][3]} (Safety Net)...")
                     continue # 立即用新精度再跑一次，不要解主问题
                 else:
                     # 已经是 Exact 阶段，且找不到列了
                     # 这才是真正的收敛
                     if self.verbose: print("   ✅ Exact convergence verified.")
+                    self.converged = True
                     break
             
             # --- [安全限制] ---
             # 只有在非 Exact 阶段，或者已经跑了很多轮 Exact 后才允许超时退出
-            if time.time() - start_time > TIME_LIMIT:
-                if current_stage == len(stages) - 1: # 如果在 Exact 阶段超时，那没办法
+            if node_deadline.expired():
+                if current_stage == len(stages) - 1 or deadline.expired(): # 如果在 Exact 阶段超时，那没办法
                     if self.verbose: print("   ⚠️ Time Limit in Exact Stage.")
                     break
                 else:
@@ -124,7 +337,7 @@ class CGSolver:
                     current_stage = len(stages) - 1
                     continue
 
-        final_obj, _ = self.master.solve()
+        final_obj, self.last_duals = self.master.solve()
         fractional_routes = self.master.get_fractional_solution()
         return True, final_obj, fractional_routes
     
\ No newline at end of file
@@ -1,26 +1,39 @@
 import os
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 from datetime import datetime
 
-def plot_solution(instance, routes, title="VRPTW Solution"):
+def plot_solution(instance, routes, title="VRPTW Solution", show_arcs=False, neighbor_limit=20):
     """
     绘制 VRPTW 路线图并保存到 result 文件夹，文件名包含时间戳
+    show_arcs=True 时在底图上画出 CSR 候选弧 (instance.candidate_arcs，不含 depot 的出入弧)
     """
     plt.figure(figsize=(12, 10))
     
     # 1. 绘制底图 (客户点和仓库)
-    xc = [c.x for c in instance.customers]
-    yc = [c.y for c in instance.customers]
-    
-    plt.scatter(xc[1:], yc[1:], c='grey', s=30, alpha=0.6, label='Customers')
+    xc = np.array([c.x for c in instance.customers])
+    yc = np.array([c.y for c in instance.customers])
+    # [修改] 几千个客户时点要画小一些
+    size = 30 if instance.num_nodes <= 500 else 4
+
+    if show_arcs:
+        offsets, targets, _ = instance.candidate_arcs(neighbor_limit)
+        sources = np.repeat(np.arange(instance.num_nodes), np.diff(offsets))
+        keep = (sources != 0) & (targets != 0)
+        src, dst = sources[keep], targets[keep]
+        segments = np.stack([np.column_stack([xc[src], yc[src]]), np.column_stack([xc[dst], yc[dst]])], axis=1)
+        plt.gca().add_collection(LineCollection(segments, colors='lightgrey', linewidths=0.3, zorder=0))
+
+    plt.scatter(xc[1:], yc[1:], c='grey', s=size, alpha=0.6, label='Customers')
     plt.scatter(xc[0], yc[0], c='red', marker='s', s=100, zorder=10, label='Depot')
     
     # 2. 绘制路径
     cmap = plt.get_cmap('tab20')
     
     for i, path in enumerate(routes):
-        path_x = [instance.customers[node].x for node in path]
-        path_y = [instance.customers[node].y for node in path]
+        path_x = xc[path]
+        path_y = yc[path]
         color = cmap(i % 20)
         
         plt.plot(path_x, path_y, color=color, linewidth=1.5, alpha=0.8, label=f'Vehicle {i+1}')
@@ -0,0 +1,61 @@
+import math
+import random
+import pricing_lib as m
+
+
+def make_random_data(num_customers, seed=0):
+    rng = random.Random(seed)
+    n = num_customers + 1
+    xs = [50.0] + [rng.uniform(0, 100) for _ in range(num_customers)]
+    ys = [50.0] + [rng.uniform(0, 100) for _ in range(num_customers)]
+    dist = [[math.hypot(xs[i] - xs[j], ys[i] - ys[j]) for j in range(n)] for i in range(n)]
+
+    p = m.ProblemData()
+    p.num_nodes = n
+    p.vehicle_capacity = 50
+    p.demands = [0] + [rng.randint(1, 10) for _ in range(num_customers)]
+    p.service_times = [0.0] + [5.0] * num_customers
+    p.tw_start = [0.0] * n
+    p.tw_end = [1000.0] + [rng.uniform(200, 1000) for _ in range(num_customers)]
+    p.dist_matrix = dist
+    p.time_matrix = dist
+    p.neighbors = [sorted((j for j in range(n) if j != i), key=lambda j: dist[i][j])[:10] for i in range(n)]
+    p.ng_neighbor_lists = []
+    return p
+
+
+def check_route(p, route):
+    load, t = 0, p.tw_start[0]
+    for k in range(1, len(route)):
+        u, v = route[k - 1], route[k]
+        load += p.demands[v]
+        t = max(t + p.service_times[u] + p.time_matrix[u][v], p.tw_start[v])
+        if t > p.tw_end[v] + 1e-6 or load > p.vehicle_capacity:
+            return False
+    return True
+
+
+def test_alns_returns_feasible_cover():
+    p = make_random_data(30)
+    solver = m.ALNSSolver(p, vehicle_fixed_cost=2000.0, seed=1)
+    routes = solver.solve(time_limit=5.0, max_iterations=200)
+
+    assert all(r[0] == 0 and r[-1] == 0 for r in routes)
+    assert all(check_route(p, r) for r in routes)
+    assert sorted(c for r in routes for c in r[1:-1]) == list(range(1, p.num_nodes))
+    assert solver.iterations == 200
+
+    # 总需求 / 容量 是车辆数下界，随机宽时间窗下不应离下界太远
+    lower = math.ceil(sum(p.demands) / p.vehicle_capacity)
+    assert len(routes) <= lower + 2
+    dist = sum(p.dist_matrix[r[k]][r[k + 1]] for r in routes for k in range(len(r) - 1))
+    assert abs(solver.best_cost - (dist + 2000.0 * len(routes))) < 1e-6
+
+
+def test_alns_keeps_given_initial_routes_feasible():
+    p = make_random_data(10, seed=3)
+    initial = [[0, c, 0] for c in range(1, p.num_nodes)]
+    solver = m.ALNSSolver(p, vehicle_fixed_cost=2000.0)
+    routes = solver.solve(time_limit=2.0, initial_routes=initial, max_iterations=50)
+    assert len(routes) < len(initial)
+    assert sorted(c for r in routes for c in r[1:-1]) == list(range(1, p.num_nodes))
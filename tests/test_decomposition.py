@@ -0,0 +1,25 @@
+import pytest
+from src.instance import VRPTWInstance
+from src.decomposition import DecompositionSolver, sweep_partition, kmeans_partition
+
+pytest.importorskip("highspy")
+
+
+@pytest.mark.parametrize("partition", [sweep_partition, kmeans_partition])
+def test_partition_covers_customers(partition):
+    """每个客户恰好落在一个分区里"""
+    inst = VRPTWInstance("data/RC101.txt", max_customers=30, verbose=False)
+    parts = partition(inst, 4)
+    assert len(parts) == 4
+    assert sorted(v for p in parts for v in p) == list(range(1, inst.num_nodes))
+
+
+def test_decomposition_returns_cover():
+    """分解求解返回覆盖所有客户的可行解，POPMUSIC 不会让目标值变差"""
+    inst = VRPTWInstance("data/C101.txt", max_customers=20, verbose=False)
+    solver = DecompositionSolver(inst, verbose=False, part_size=8, workers=1, lp_backend="highs",
+                                 part_time_limit=5)
+    obj, routes = solver.solve(time_limit=30)
+    assert sorted(v for r in routes for v in r[1:-1]) == list(range(1, inst.num_nodes))
+    assert obj <= solver.initial_obj + 1e-6
+    assert obj == pytest.approx(solver._cost(routes))
@@ -0,0 +1,100 @@
+import io
+import random
+import contextlib
+import pytest
+import pricing_lib as m
+from src.instance import VRPTWInstance
+from src.pricing import build_problem_data
+
+
+def _instance(n, name="R101"):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return VRPTWInstance(f"data/{name}.txt", max_customers=n, verbose=False)
+
+
+def _brute_force(d, duals, gap, forbidden=()):
+    """DFS 列举全部初等路径：每个客户集合 -> 最小 reduced cost (只保留 <= gap 的)"""
+    forbidden = set(forbidden)
+    best = {}
+
+    def extend(path, t, load, cost):
+        i = path[-1]
+        if i != 0 and (i, 0) not in forbidden:
+            rc = cost + d.dist_matrix[i][0] - duals[0]
+            if t + d.service_times[i] + d.dist_matrix[i][0] <= d.tw_end[0] and rc <= gap + 1e-6:
+                key = frozenset(path[1:])
+                best[key] = min(rc, best.get(key, float('inf')))
+        for j in d.neighbors[i]:
+            if j == 0 or j in path or (i, j) in forbidden or load + d.demands[j] > d.vehicle_capacity:
+                continue
+            tj = max(t + d.service_times[i] + d.dist_matrix[i][j], d.tw_start[j])
+            if tj <= d.tw_end[j]:
+                extend(path + [j], tj, load + d.demands[j], cost + d.dist_matrix[i][j] - duals[j])
+
+    extend([0], d.tw_start[0], 0, 0.0)
+    return best
+
+
+def _pool(res):
+    nodes, offsets = res["nodes"], res["offsets"]
+    return {frozenset(nodes[offsets[k] + 1:offsets[k + 1] - 1].tolist()): res["reduced_costs"][k]
+            for k in range(len(res["reduced_costs"]))}
+
+
+@pytest.mark.parametrize("gap", [0.0, 25.0, 1e9])
+@pytest.mark.parametrize("forbidden", [[], [(0, 3), (5, 0), (2, 7)]])
+def test_enumerator_matches_brute_force(gap, forbidden):
+    """枚举结果与 DFS 暴力列举一致：同一批客户集合、相同的最小 reduced cost，禁止弧生效"""
+    d = build_problem_data(_instance(12))
+    rng = random.Random(1)
+    duals = [0.0] + [rng.uniform(5, 60) for _ in range(d.num_nodes - 1)]
+
+    res = m.RouteEnumerator(d).enumerate(duals, gap, forbidden)
+    expected = _brute_force(d, duals, gap, forbidden)
+    got = _pool(res)
+    assert res["complete"]
+    assert set(got) == set(expected)
+    assert all(got[k] == pytest.approx(expected[k]) for k in expected)
+    assert list(res["reduced_costs"]) == sorted(res["reduced_costs"])
+
+
+def test_enumerator_pool_cap_marks_incomplete():
+    """池子超过 max_routes 时放弃，complete=False"""
+    d = build_problem_data(_instance(12))
+    res = m.RouteEnumerator(d).enumerate([0.0] * d.num_nodes, 1e9, max_routes=10)
+    assert not res["complete"]
+
+
+def test_branch_and_price_closes_root_by_enumeration():
+    """R105 前 25 个客户：根 gap 约 3%，打开枚举后根节点直接关闭，目标值与纯分支相同"""
+    pytest.importorskip("highspy")
+    from src.branching import BranchAndBoundEngine
+
+    results = []
+    for gap in (0.0, 0.05):
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine = BranchAndBoundEngine(_instance(25, "R105"), verbose=False, lp_backend="highs",
+                                          enumeration_gap=gap)
+            obj, _ = engine.solve(global_time_limit=30)
+        results.append((obj, engine))
+    (base_obj, base), (enum_obj, enum) = results
+    assert enum_obj == pytest.approx(base_obj)
+    assert enum.enumerations_closed >= 1 and base.enumerations_tried == 0
+    assert enum.nodes_explored < base.nodes_explored
+    assert enum.best_bound == pytest.approx(enum_obj)
+
+
+def test_branch_and_price_skips_enumeration_beyond_256_nodes():
+    """枚举引擎只支持 256 个节点：更大的算例在小 gap 节点上跳过枚举 (照常分支)，而不是抛异常"""
+    pytest.importorskip("highspy")
+    from benchmark_memory import make_customers
+    from src.branching import BranchAndBoundEngine, TreeNode
+
+    inst = VRPTWInstance.from_arrays(make_customers(300), 200)
+    with pytest.raises(ValueError, match="256"):
+        m.RouteEnumerator(build_problem_data(inst))
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = BranchAndBoundEngine(inst, verbose=False, lp_backend="highs")
+    engine.best_integer_obj = 1000.0
+    assert not engine._try_enumeration(TreeNode(), 999.0, [0.0] * inst.num_nodes)
+    assert engine.enumerations_tried == 0
@@ -0,0 +1,63 @@
+import io
+import contextlib
+import numpy as np
+import pytest
+from src.instance import VRPTWInstance
+from src.solver import CGSolver
+from src.heuristics import PrimalHeuristics
+
+pytest.importorskip("highspy")
+
+
+def _solver(name="RC101", n=25, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        inst = VRPTWInstance(f"data/{name}.txt", max_customers=n, verbose=False)
+    return CGSolver(inst, verbose=False, lp_backend="highs", **kwargs)
+
+
+def _bounds(master):
+    lp = master.lp.h.getLp()
+    return np.array(lp.col_lower_), np.array(lp.col_upper_)
+
+
+@pytest.mark.parametrize("forbidden", [[], [(0, 5), (7, 3)]])
+def test_dive_restores_master(forbidden):
+    """潜水固定列 / 禁用列之后恢复主问题：列界限回到节点约束下的状态，LP 目标值不变"""
+    solver = _solver()
+    ok, obj, routes = solver.solve_with_constraints(forbidden)
+    assert ok and any(r.val < 1.0 - 1e-4 for r in routes)  # 分数解，潜水真的会固定列
+
+    dive_obj, dive_routes = PrimalHeuristics(solver).dive(forbidden)
+    master = solver.master
+    assert dive_obj < float('inf')
+    assert dive_obj >= obj - 1e-4
+    assert all(e.feasible for e in solver.pricing.evaluate([r.path for r in dive_routes]))
+
+    lower, upper = _bounds(master)
+    banned = set(forbidden)
+    expected = [0.0 if any((r[k], r[k + 1]) in banned for k in range(len(r) - 1)) else np.inf
+                for r in master.routes]
+    assert np.all(lower == 0.0)
+    assert np.array_equal(upper, expected)
+    restored, _ = master.solve()
+    assert restored == pytest.approx(obj)
+
+
+def test_restricted_mip_never_returns_dummy_columns():
+    """受限主问题 MIP 不接受 Big-M 虚拟列：列池覆盖不了全部客户时返回 (inf, [])，否则只含真实路径"""
+    solver = _solver(init_heuristic=False)
+    master = solver.master
+    heuristics = PrimalHeuristics(solver)
+    assert heuristics.restricted_mip() == (float('inf'), [])  # 只有虚拟列
+
+    # 只覆盖一部分客户的真实列：必须用虚拟列补齐，同样视为失败
+    master.add_initial_routes([[0, 1, 0], [0, 2, 0]])
+    assert heuristics.restricted_mip() == (float('inf'), [])
+
+    ok, obj, _ = solver.solve_with_constraints([])
+    assert ok
+    mip_obj, routes = heuristics.restricted_mip()
+    assert obj - 1e-4 <= mip_obj < master.big_m
+    assert all(master.has_route(r.path) for r in routes)
+    covered = sorted(c for r in routes for c in r.path[1:-1])
+    assert set(covered) == set(range(1, solver.inst.num_nodes))
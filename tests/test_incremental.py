@@ -0,0 +1,40 @@
+import io
+import contextlib
+import pytest
+from src.instance import VRPTWInstance
+from src.solver import CGSolver
+
+pytest.importorskip("highspy")
+
+
+def _root_lp(solver):
+    ok, obj, _ = solver.solve_with_constraints([])
+    assert ok
+    return obj
+
+
+def _cold_lp(inst):
+    copy = VRPTWInstance.from_arrays(list(inst.customers), inst.vehicle_capacity)
+    return _root_lp(CGSolver(copy, verbose=False, lp_backend="highs"))
+
+
+def test_add_and_remove_customers_match_cold_solve():
+    """增删客户后从保留的列重跑 CG，根节点 LP 与同一客户集合的冷启动一致"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        full = VRPTWInstance("data/R101.txt", max_customers=22, verbose=False)
+    inst = VRPTWInstance.from_arrays(full.customers[:21], full.vehicle_capacity)
+    solver = CGSolver(inst, verbose=False, lp_backend="highs")
+    _root_lp(solver)
+
+    node = solver.add_customer(full.customers[21])
+    assert node == 21 and inst.num_nodes == 22
+    assert solver.master.lp.num_columns == solver.master.num_columns
+    assert _root_lp(solver) == pytest.approx(_cold_lp(inst))
+
+    removed_id = inst.customers[7].id
+    solver.remove_customer(7)
+    assert inst.num_nodes == 21 and all(c.id != removed_id for c in inst.customers)
+    m = solver.master
+    assert all(max(r) < inst.num_nodes for r in m.routes)
+    assert all(e.feasible for e in solver.pricing.evaluate([r for i, r in enumerate(m.routes) if not m.is_dummy(i)]))
+    assert _root_lp(solver) == pytest.approx(_cold_lp(inst))
@@ -0,0 +1,61 @@
+import io
+import contextlib
+import pytest
+from src.instance import VRPTWInstance
+from src.initial import InitialSolutionGenerator, route_distance, route_is_feasible
+from src.pricing import PricingSolver
+from src.solver import CGSolver
+
+
+def _instance(name, n):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return VRPTWInstance(f"data/{name}.txt", max_customers=n, verbose=False)
+
+
+@pytest.mark.parametrize("name", ["C101", "R101", "RC201"])
+@pytest.mark.parametrize("local_search", [False, True])
+def test_constructions_feasible_and_cover_all_customers(name, local_search):
+    """每个构造启发式各自给出覆盖全部客户 (恰好一次) 的可行解；generate 去重后只含可行路径"""
+    inst = _instance(name, 30)
+    gen = InitialSolutionGenerator(inst, local_search=local_search)
+    customers = list(range(1, inst.num_nodes))
+    solutions = [gen.clarke_wright()] + [gen.solomon_i1(*p) for p in gen.I1_PARAMS]
+    if local_search:
+        solutions.append(gen.relocate_search(solutions[0]))
+    for sol in solutions:
+        assert all(route_is_feasible(inst, r) for r in sol)
+        assert sorted(c for r in sol for c in r[1:-1]) == customers
+        assert all(r[0] == r[-1] == 0 and len(r) > 2 for r in sol)
+
+    routes = gen.generate()
+    assert len({tuple(r) for r in routes}) == len(routes)
+    assert set(c for r in routes for c in r[1:-1]) == set(customers)
+
+
+def test_route_helpers_agree_with_cpp_evaluate():
+    """route_distance / route_is_feasible 与 C++ evaluate_routes 的距离和可行性一致 (含不可行的打乱路径)"""
+    inst = _instance("R101", 25)
+    routes = InitialSolutionGenerator(inst).generate()
+    routes += [list(reversed(r)) for r in routes if len(r) > 3]
+    evals = PricingSolver(inst, preprocess=False).evaluate(routes)
+    assert any(not e.feasible for e in evals)
+    for r, e in zip(routes, evals):
+        assert route_distance(inst, r) == pytest.approx(e.distance)
+        assert route_is_feasible(inst, r) == e.feasible
+
+
+def test_init_heuristic_gated_on_instance_size(monkeypatch):
+    """init_heuristic=None 时只在小算例上运行构造启发式；True / False 强制打开 / 关闭"""
+    pytest.importorskip("highspy")
+    calls = []
+    monkeypatch.setattr(InitialSolutionGenerator, "generate", lambda self: calls.append(self) or [])
+    inst = _instance("R101", 20)
+    CGSolver(inst, verbose=False, lp_backend="highs")
+    CGSolver(inst, verbose=False, lp_backend="highs", init_heuristic=False)
+    assert len(calls) == 1
+
+    monkeypatch.setattr("src.solver.INIT_HEURISTIC_MAX_CUSTOMERS", 10)
+    CGSolver(inst, verbose=False, lp_backend="highs")
+    assert len(calls) == 1
+    CGSolver(inst, verbose=False, lp_backend="highs", init_heuristic=True)
+    assert len(calls) == 2
@@ -0,0 +1,58 @@
+import pricing_lib as m
+
+
+def make_line_data(num_nodes, tw_end=1000.0):
+    """所有客户排在一条直线上 (x = 0..N-1)，depot 在 x = 0"""
+    p = m.ProblemData()
+    p.num_nodes = num_nodes
+    p.vehicle_capacity = 100
+    p.demands = [0] + [10] * (num_nodes - 1)
+    p.service_times = [0.0] * num_nodes
+    p.tw_start = [0.0] * num_nodes
+    p.tw_end = [tw_end] * num_nodes
+    dist = [[float(abs(i - j)) for j in range(num_nodes)] for i in range(num_nodes)]
+    p.dist_matrix = dist
+    p.time_matrix = dist
+    p.neighbors = [[j for j in range(num_nodes) if j != i] for i in range(num_nodes)]
+    p.ng_neighbor_lists = [list(range(num_nodes)) for _ in range(num_nodes)]
+    return p
+
+
+def route_dist(p, r):
+    return sum(p.dist_matrix[r[k]][r[k + 1]] for k in range(len(r) - 1))
+
+
+def test_merges_routes_when_vehicle_is_saved():
+    p = make_line_data(4)
+    ls = m.LocalSearch(p, vehicle_fixed_cost=2000.0)
+    out = ls.improve([[0, 1, 0], [0, 2, 0], [0, 3, 0]])
+    assert len(out) == 1
+    assert sorted(out[0][1:-1]) == [1, 2, 3]
+
+
+def test_respects_time_windows():
+    p = make_line_data(3)
+    p.tw_start = [0.0, 0.0, 2.0]
+    p.tw_end = [100.0, 1.0, 2.0]
+    # 0 -> 2 -> 1 不可行 (到 1 时已是 3)，只能合并成 0 -> 1 -> 2
+    ls = m.LocalSearch(p, vehicle_fixed_cost=2000.0)
+    out = ls.improve([[0, 2, 0], [0, 1, 0]])
+    assert out == [[0, 1, 2, 0]]
+
+
+def test_respects_capacity():
+    p = make_line_data(3)
+    p.demands = [0, 60, 60]
+    ls = m.LocalSearch(p, vehicle_fixed_cost=2000.0)
+    out = ls.improve([[0, 1, 0], [0, 2, 0]])
+    assert sorted(out) == [[0, 1, 0], [0, 2, 0]]
+
+
+def test_removes_duplicate_visits_and_never_worsens():
+    p = make_line_data(5)
+    routes = [[0, 4, 1, 0], [0, 2, 3, 1, 0]]  # 1 被覆盖两次
+    ls = m.LocalSearch(p, vehicle_fixed_cost=0.0)
+    out = ls.improve(routes)
+    covered = sorted(c for r in out for c in r[1:-1])
+    assert covered == [1, 2, 3, 4]
+    assert sum(route_dist(p, r) for r in out) <= sum(route_dist(p, r) for r in routes)
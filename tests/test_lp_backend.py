@@ -0,0 +1,129 @@
+import pytest
+from src.lp_backend import LPBackend, make_backend
+
+
+def _available(name):
+    try:
+        make_backend(name)
+    except ImportError:
+        return False
+    return True
+
+
+BACKENDS = [b for b in ("gurobi", "highs") if _available(b)]
+
+
+def _toy(backend):
+    """2 个覆盖约束；列 0 覆盖 {0}，列 1 覆盖 {1}"""
+    lp = make_backend(backend)
+    lp.add_rows(2, 1.0)
+    lp.add_columns([6.0, 4.0], [[0], [1]])
+    return lp
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_incremental_columns_and_duals(backend):
+    lp = _toy(backend)
+    assert lp.solve_lp() == pytest.approx(10.0)
+    assert lp.get_duals() == pytest.approx([6.0, 4.0])
+
+    # 加一列同时覆盖两行且更便宜：目标下降，对偶值随之变化
+    lp.add_columns([7.0], [[0, 1]])
+    assert lp.num_columns == 3
+    assert lp.solve_lp() == pytest.approx(7.0)
+    assert sum(lp.get_duals()) == pytest.approx(7.0)
+    assert lp.get_values() == pytest.approx([0.0, 0.0, 1.0])
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_bounds_and_mip(backend):
+    lp = _toy(backend)
+    lp.add_columns([7.0], [[0, 1]])
+    lp.set_bounds([2], [0.0], [0.0])  # 禁用组合列
+    assert lp.solve_lp() == pytest.approx(10.0)
+    lp.set_bounds([2], [0.0], [float('inf')])
+    assert lp.solve_lp() == pytest.approx(7.0)
+
+    # 整数阶段用单独的模型；MIP 初始解给一个较差的可行解
+    mip = _toy(backend)
+    mip.add_columns([7.0], [[0, 1]])
+    assert mip.solve_mip(5.0, start=[1.0, 1.0, 0.0]) == pytest.approx([0.0, 0.0, 1.0])
+
+
+def test_highs_warm_start_after_adding_columns():
+    highspy = pytest.importorskip("highspy")
+    lp = make_backend("highs")
+    n = 30
+    lp.add_rows(n, 1.0)
+    lp.add_columns([10.0] * n, [[i] for i in range(n)])
+    lp.solve_lp()
+    assert lp.h.getInfo().simplex_iteration_count >= n
+    lp.add_columns([15.0], [[0, 1]])
+    assert lp.solve_lp() == pytest.approx(10.0 * n - 5.0)
+    assert lp.h.getModelStatus() == highspy.HighsModelStatus.kOptimal
+    # 从上一次的最优基出发，只需要极少的迭代
+    assert lp.h.getInfo().simplex_iteration_count <= 3
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        make_backend("cplex")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_basis_restore_with_new_columns(backend):
+    """保存的基在加列、改界限之后恢复：新列补成非基，重解结果正确且迭代很少"""
+    n = 20
+    lp = make_backend(backend)
+    lp.add_rows(n, 1.0)
+    lp.add_columns([10.0] * n, [[i] for i in range(n)])
+    lp.add_columns([15.0] * (n // 2), [[2 * k, 2 * k + 1] for k in range(n // 2)])
+    assert lp.solve_lp() == pytest.approx(15.0 * (n // 2))
+    basis = lp.get_basis()
+    assert basis is not None and len(basis[0]) == lp.num_columns
+
+    # 模拟另一棵子树：禁用所有组合列后重解，基被完全改变
+    lp.set_bounds(range(n, n + n // 2), [0.0] * (n // 2), [0.0] * (n // 2))
+    assert lp.solve_lp() == pytest.approx(10.0 * n)
+    lp.add_columns([14.0], [[0, 1]])
+
+    # 回到原节点：恢复界限和保存的基
+    lp.set_bounds(range(n, n + n // 2), [0.0] * (n // 2), [float('inf')] * (n // 2))
+    lp.set_basis(basis)
+    assert lp.solve_lp() == pytest.approx(15.0 * (n // 2) - 1.0)
+    assert lp.iterations <= 3
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_repeated_rows_in_column(backend):
+    """ng-route 可能重复访问客户：重复的行号合并成系数 2"""
+    lp = _toy(backend)
+    lp.add_columns([5.0, 3.0], [[0, 1, 0], [1]])
+    assert lp.num_columns == 4
+    # 列 2 在行 0 上系数为 2：x2 = x3 = 0.5 即可覆盖两行
+    assert lp.solve_lp() == pytest.approx(4.0)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_delete_rows_and_columns(backend):
+    """删行 / 删列后行号、列号前移，模型可以继续加列求解"""
+    lp = _toy(backend)
+    lp.add_columns([5.0], [[0, 1]])
+    assert lp.solve_lp() == pytest.approx(5.0)
+    lp.delete_rows([0])          # 只剩原来的行 1
+    lp.delete_columns([2])       # 删掉覆盖两行的列
+    assert lp.num_columns == 2
+    assert lp.solve_lp() == pytest.approx(4.0)
+    lp.add_columns([1.0], [[0]])
+    assert lp.solve_lp() == pytest.approx(1.0)
+    assert lp.get_duals() == pytest.approx([1.0])
+
+
+def test_incomplete_backend_fails_on_creation():
+    """漏实现接口方法的后端在创建时就报错，而不是求解到一半才报错"""
+    class Partial(LPBackend):
+        def add_rows(self, num_rows, rhs):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,103 @@
+import io
+import contextlib
+import pytest
+from src.instance import VRPTWInstance
+from src.solver import CGSolver
+
+pytest.importorskip("highspy")
+
+
+def _instance(n=15):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return VRPTWInstance("data/R101.txt", max_customers=n, verbose=False)
+
+
+def test_select_columns_reduced_cost_filter():
+    """整数阶段的列过滤：没有根节点对偶或没有上界时保留全部；否则只留约简成本 <= 上界 - 下界的列加 keep"""
+    solver = CGSolver(_instance(), verbose=False, lp_backend="highs")
+    ok, obj, _ = solver.solve_with_constraints([])
+    assert ok and solver.converged
+    master = solver.master
+    everything = list(range(master.num_columns))
+    assert master.select_columns(obj + 50.0) == everything  # 还没有 set_root_bound
+
+    master.set_root_bound(solver.last_duals, obj)
+    assert master.select_columns() == everything
+    rc = master.reduced_costs(solver.last_duals)
+    assert rc.min() >= -1e-4  # 精确收敛：所有列约简成本非负
+    selected = master.select_columns(obj + 50.0)
+    assert selected == [i for i in everything if rc[i] <= 50.0 + 1e-4]
+    assert 0 < len(selected) < len(everything)
+
+    # keep 里的路径无论约简成本多大都保留
+    worst = max(everything, key=lambda i: rc[i])
+    assert worst not in selected
+    assert worst in master.select_columns(obj + 50.0, keep=[master.routes[worst]])
+
+
+def test_root_bound_not_set_without_exact_convergence(monkeypatch):
+    """根节点 CG 没有精确收敛 (Exact 阶段超时) 时不设列过滤的对偶，也不报告根节点下界 / 全局下界"""
+    from src.branching import BranchAndBoundEngine
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = BranchAndBoundEngine(_instance(), verbose=False, lp_backend="highs")
+        solve = engine.cg_solver.solve_with_constraints
+
+        def timed_out(*args, **kwargs):
+            result = solve(*args, **kwargs)
+            engine.cg_solver.converged = False
+            return result
+
+        monkeypatch.setattr(engine.cg_solver, "solve_with_constraints", timed_out)
+        obj, _ = engine.solve(global_time_limit=10)
+    assert obj < float('inf')
+    assert engine.cg_solver.master.root_duals is None
+    assert engine.root_bound == float('inf')
+    assert engine.best_bound == -float('inf')  # 没有任何节点收敛，不能声称最优
+
+
+def test_exact_stage_uses_floating_point_engine():
+    """fixed_point_pricing 只用在启发式阶段：Exact 阶段 (收敛证明) 总是浮点引擎，根 LP 与纯浮点一致"""
+    inst = _instance(25)
+    base = CGSolver(inst, verbose=False, lp_backend="highs")
+    ok, base_obj, _ = base.solve_with_constraints([])
+    assert ok and base.converged
+
+    solver = CGSolver(inst, verbose=False, lp_backend="highs", fixed_point_pricing=10000)
+    engines = []
+    solve = solver.pricing.solve
+
+    def traced(*args, **kwargs):
+        engines.append((solver.pricing.bucket_step, solver.pricing.cpp_solver.fixed_point))
+        return solve(*args, **kwargs)
+
+    solver.pricing.solve = traced
+    ok, obj, _ = solver.solve_with_constraints([])
+    assert ok and solver.converged
+    assert obj == pytest.approx(base_obj, abs=1e-4)
+    assert {f for step, f in engines if step == 2.0} == {10000}
+    assert {f for step, f in engines if step == 0.1} == {0}
+
+
+def test_run_proves_convergence_with_floating_point_engine():
+    """run() 打开 fixed_point_pricing 时，收敛 (set_root_bound) 由浮点引擎确认：根节点下界与纯浮点一致"""
+    inst = _instance(25)
+    with contextlib.redirect_stdout(io.StringIO()):
+        base = CGSolver(inst, verbose=False, lp_backend="highs")
+        base.run()
+
+        solver = CGSolver(inst, verbose=False, lp_backend="highs", fixed_point_pricing=10000)
+        engines = []
+        solve = solver.pricing.solve
+
+        def traced(*args, **kwargs):
+            result = solve(*args, **kwargs)
+            engines.append((solver.pricing.cpp_solver.fixed_point, len(result)))
+            return result
+
+        solver.pricing.solve = traced
+        solver.run()
+    assert base.master.root_duals is not None and solver.master.root_duals is not None
+    assert solver.master.root_bound == pytest.approx(base.master.root_bound, abs=1e-4)
+    assert engines[0][0] == 10000
+    assert engines[-1] == (0, 0)  # 最后一次 (确认收敛的) 定价是浮点引擎，且没有列
@@ -163,4 +163,271 @@ def test_espprc_no_cycle():
 
     # 绝对不应该包含循环路径
     for path in paths:
-        assert path != [0, 1, 2, 1, 0], f"Found invalid cycle path: {path}"
\ No newline at end of file
+        assert path != [0, 1, 2, 1, 0], f"Found invalid cycle path: {path}"
+# ==========================================
+# 3. 引擎返回的成本 / 批量路径评估
+# ==========================================
+
+def test_solve_columns_costs_match_evaluate_routes():
+    """引擎给出的 reduced cost / 距离 / 载重应与批量评估结果一致"""
+    b = PricingDataBuilder(4)
+    b.demands = [0, 10, 20, 30]
+    b.set_edge(0, 1, 10); b.set_edge(1, 2, 15); b.set_edge(2, 3, 5); b.set_edge(3, 0, 20)
+    duals = [0.0, 40.0, 40.0, 40.0]
+
+    p = b.to_cpp_input()
+    columns = m.LabelingSolver(p, 1.0).solve_columns(duals)
+    assert columns
+    assert [c.reduced_cost for c in columns] == sorted(c.reduced_cost for c in columns)
+
+    evals = m.evaluate_routes(p, [c.path for c in columns], duals)
+    for col, ev in zip(columns, evals):
+        assert ev.feasible
+        assert col.distance == pytest.approx(ev.distance)
+        assert col.reduced_cost == pytest.approx(ev.reduced_cost)
+        assert col.load == ev.load
+        assert col.duration == pytest.approx(ev.duration)
+
+def test_evaluate_routes_flags_infeasible():
+    b = PricingDataBuilder(3)
+    b.capacity = 50
+    b.demands = [0, 30, 30]
+    b.tw_end[2] = 15.0  # 0 -> 1 -> 2 到达时刻 20，超出时间窗
+    evals = m.evaluate_routes(b.to_cpp_input(), [[0, 1, 0], [0, 1, 2, 0], [0, 2, 0]])
+    assert [e.feasible for e in evals] == [True, False, True]
+    assert evals[0].distance == pytest.approx(200.0)
+    assert evals[0].reduced_cost == pytest.approx(200.0)  # 不传 duals 时等于距离
+    assert evals[1].load == 60
+
+def test_solve_arrays_matches_solve_columns():
+    """扁平数组结果与逐列结果一致：path k = nodes[offsets[k]:offsets[k+1]]"""
+    b = PricingDataBuilder(4)
+    b.set_edge(0, 1, 10); b.set_edge(1, 2, 15); b.set_edge(2, 3, 5); b.set_edge(3, 0, 20)
+    duals = [0.0, 40.0, 40.0, 40.0]
+    solver = m.LabelingSolver(b.to_cpp_input(), 1.0)
+
+    columns = solver.solve_columns(duals)
+    arrays = solver.solve_arrays(duals)
+    assert len(arrays["offsets"]) == len(columns) + 1
+    nodes, offsets = arrays["nodes"], arrays["offsets"]
+    for k, col in enumerate(columns):
+        assert nodes[offsets[k]:offsets[k + 1]].tolist() == col.path
+        assert arrays["reduced_costs"][k] == pytest.approx(col.reduced_cost)
+        assert arrays["distances"][k] == pytest.approx(col.distance)
+
+def test_column_limit_and_diversity_selection():
+    """max_columns 截断取 RC 最小的列；max_per_customer 限制每个客户被覆盖的次数"""
+    b = PricingDataBuilder(5)
+    duals = [0.0] + [150.0] * 4
+    solver = m.LabelingSolver(b.to_cpp_input(), 1.0)
+
+    all_cols = solver.solve_columns(duals)
+    top = solver.solve_columns(duals, max_columns=3)
+    assert [c.path for c in top] == [c.path for c in all_cols[:3]]
+
+    diverse = solver.solve_columns(duals, max_per_customer=2)
+    assert diverse
+    for v in range(1, 5):
+        assert sum(v in c.path for c in diverse) <= 2
+    assert [c.reduced_cost for c in diverse] == sorted(c.reduced_cost for c in diverse)
+
+def test_solve_stats_counters():
+    """每次 solve 后 stats 反映本次的计数器和桶直方图"""
+    b = PricingDataBuilder(4)
+    b.capacity = 50
+    b.demands = [0, 30, 30, 10]
+    duals = [0.0, 150.0, 150.0, 150.0]
+    solver = m.LabelingSolver(b.to_cpp_input(), 1.0)
+
+    cols = solver.solve_columns(duals, forbidden_arcs=[(0, 3)])
+    st = solver.stats
+    assert st.columns_returned == len(cols)
+    assert st.labels_created == sum(st.bucket_histogram)
+    assert st.peak_pool == st.labels_created + 1  # + root
+    assert st.capacity_rejected > 0   # 1 -> 2 超载
+    assert st.forbidden_skipped == 1  # root 的 0 -> 3
+    assert st.dominance_checks >= st.dominated_forward + st.dominated_backward
+    assert st.time_total >= st.time_collection >= 0.0
+    assert st.to_dict()["labels_created"] == st.labels_created
+
+    solver.solve_columns(duals)
+    assert solver.stats.forbidden_skipped == 0
+
+def test_time_limit_interrupts_labeling():
+    """time_limit 到期后引擎立即停止扩展，并在 stats 中标记 timed_out"""
+    b = PricingDataBuilder(5)
+    duals = [0.0] + [150.0] * 4
+    solver = m.LabelingSolver(b.to_cpp_input(), 1.0)
+
+    assert solver.solve_columns(duals)
+    assert not solver.stats.timed_out
+
+    cols = solver.solve_columns(duals, time_limit=1e-9)
+    assert solver.stats.timed_out
+    assert cols == []
+    assert solver.solve_arrays(duals, time_limit=1e-9)["timed_out"]
+
+def test_load_buckets_match_single_list_dominance():
+    """二维 (时间 × 载重) 支配桶与一维引擎返回的列完全相同，且会整格跳过部分比较"""
+    b = PricingDataBuilder(7)
+    b.capacity = 60
+    b.demands = [0, 10, 20, 30, 15, 25, 10]
+    for i in range(7):
+        for j in range(7):
+            if i != j:
+                b.set_edge(i, j, 10.0 + 3 * abs(i - j), time=5.0 + abs(i - j))
+    b.tw_start = [0.0, 0.0, 10.0, 20.0, 0.0, 30.0, 15.0]
+    b.tw_end = [200.0, 60.0, 80.0, 100.0, 120.0, 150.0, 90.0]
+    duals = [0.0, 40.0, 55.0, 30.0, 45.0, 60.0, 35.0]
+    p = b.to_cpp_input()
+
+    base = m.LabelingSolver(p, 1.0).solve_columns(duals)
+    for load_buckets, time_cells in [(1, 1), (4, 8), (8, 16)]:
+        solver = m.LabelingSolver(p, 1.0, load_buckets=load_buckets, time_cells=time_cells)
+        cols = solver.solve_columns(duals)
+        assert [c.path for c in cols] == [c.path for c in base]
+        assert [c.reduced_cost for c in cols] == pytest.approx([c.reduced_cost for c in base])
+        assert solver.stats.to_dict()["cells_skipped"] >= 0
+
+def test_simd_dominance_matches_scalar():
+    """AVX2 支配内核与标量内核返回的列完全相同 (CPU 不支持 AVX2 时 use_simd 保持 False)"""
+    b = PricingDataBuilder(9)
+    b.capacity = 80
+    b.demands = [0, 10, 20, 30, 15, 25, 10, 5, 20]
+    for i in range(9):
+        for j in range(9):
+            if i != j:
+                b.set_edge(i, j, 8.0 + 2 * ((i * 7 + j * 3) % 5), time=4.0 + abs(i - j))
+    duals = [0.0, 40.0, 55.0, 30.0, 45.0, 60.0, 35.0, 25.0, 50.0]
+    p = b.to_cpp_input()
+
+    scalar = m.LabelingSolver(p, 1.0)
+    scalar.use_simd = False
+    assert not scalar.use_simd
+    vector = m.LabelingSolver(p, 1.0)
+    assert vector.use_simd == (m.simd_level() == "avx2")
+
+    for forbidden in ([], [(0, 1), (2, 3)]):
+        a = scalar.solve_columns(duals, forbidden_arcs=forbidden)
+        v = vector.solve_columns(duals, forbidden_arcs=forbidden)
+        assert [c.path for c in v] == [c.path for c in a]
+        assert [c.reduced_cost for c in v] == pytest.approx([c.reduced_cost for c in a])
+        assert vector.stats.dominated_backward == scalar.stats.dominated_backward
+
+def test_preprocess_tightens_windows_and_keeps_columns():
+    """时间窗收紧 + 删弧后定价结果不变"""
+    b = PricingDataBuilder(5)
+    b.capacity = 50
+    b.demands = [0, 30, 30, 10, 10]
+    b.tw_end = [100.0, 1000.0, 1000.0, 40.0, 1000.0]
+    b.tw_start[4] = 0.0
+    # 4 只能从 depot 以 10 的时刻到达 -> tw_start 被推后；
+    # 1 必须在 100 - 10 之前出发回 depot -> tw_end 被提前；3 -> 4 -> 0 的三角路径在原始时间窗下不可行
+    b.set_edge(3, 4, 10.0, time=85.0)
+    duals = [0.0, 150.0, 150.0, 150.0, 150.0]
+    p = b.to_cpp_input()
+    base = m.LabelingSolver(p, 1.0).solve_columns(duals)
+
+    q = b.to_cpp_input()
+    rep = m.preprocess(q)
+    assert q.tw_start[4] == pytest.approx(10.0)
+    assert q.tw_end[1] == pytest.approx(90.0)
+    assert 4 not in q.neighbors[3]
+    assert rep.removed_capacity == 2   # 1 <-> 2 超载
+    assert rep.removed_triangle >= 1
+    assert rep.arcs_after == rep.arcs_before - 2 - rep.removed_time - rep.removed_triangle - rep.removed_tightened
+
+    cols = m.LabelingSolver(q, 1.0).solve_columns(duals)
+    assert sorted(c.path for c in cols) == sorted(c.path for c in base)
+    evals = m.evaluate_routes(q, [c.path for c in base])
+    assert all(e.feasible for e in evals)
+
+def test_arc_limit_builds_dual_aware_sparse_graph():
+    """arc_limit > 0: 每个客户只保留 dist - dual 最小的 k 条出弧，depot 保留全部"""
+    b = PricingDataBuilder(6)
+    duals = [0.0, 10.0, 200.0, 10.0, 180.0, 10.0]
+    solver = m.LabelingSolver(b.to_cpp_input(), 1.0)
+    full = solver.solve_columns(duals)
+    full_arcs = solver.stats.graph_arcs
+
+    solver.arc_limit = 1
+    sparse = solver.solve_columns(duals)
+    assert solver.stats.graph_arcs == 5 + 5 * 1   # depot 5 条 + 每个客户 1 条
+    assert sparse and sparse[0].reduced_cost >= full[0].reduced_cost - 1e-9
+    # 对偶大的 2 和 4 互相是最好的后继，稀疏图里仍能找到 0-2-4-0
+    assert any(c.path in ([0, 2, 4, 0], [0, 4, 2, 0]) for c in sparse)
+
+    solver.arc_limit = 0
+    solver.solve_columns(duals)
+    assert solver.stats.graph_arcs == full_arcs
+
+def test_arc_limit_tuner():
+    from src.pricing import ArcLimitTuner
+    tuner = ArcLimitTuner(k=10, k_min=4, k_max=20, grow=1.5, patience=2)
+    assert tuner.record(missed=True) == 15
+    assert tuner.record(missed=True) == 20   # 不超过 k_max
+    assert tuner.record(missed=False) == 20
+    assert tuner.record(missed=False) == 19  # 连续 patience 次没漏才收缩
+    assert (tuner.checks, tuner.misses) == (4, 2)
+
+def test_warm_start_matches_cold_solves():
+    """热启动 (上一次的 label 按新对偶重算后做种子) 与冷启动的 reduced cost 完全一致，禁止弧使种子失效"""
+    b = PricingDataBuilder(7)
+    b.capacity = 60
+    b.demands = [0, 10, 20, 30, 15, 25, 10]
+    for i in range(7):
+        for j in range(7):
+            if i != j:
+                b.set_edge(i, j, 10.0 + 3 * abs(i - j), time=5.0 + abs(i - j))
+    p = b.to_cpp_input()
+    cold = m.LabelingSolver(p, 1.0)
+    warm = m.LabelingSolver(p, 1.0)
+    warm.warm_start = True
+
+    duals = [0.0, 40.0, 55.0, 30.0, 45.0, 60.0, 35.0]
+    calls = [(duals, [])]
+    for it in range(4):
+        duals = [d * (0.95 if (v + it) % 2 else 1.03) for v, d in enumerate(duals)]
+        calls.append((duals, []))
+    calls.append((duals, [(0, 5), (2, 4)]))
+
+    for k, (d, forbidden) in enumerate(calls):
+        a = cold.solve_columns(d, forbidden_arcs=forbidden)
+        w = warm.solve_columns(d, forbidden_arcs=forbidden)
+        assert [c.reduced_cost for c in w] == pytest.approx([c.reduced_cost for c in a])
+        assert all(not ({(c.path[i], c.path[i + 1]) for i in range(len(c.path) - 1)} & set(forbidden)) for c in w)
+        if k > 0:
+            assert warm.stats.seeded_labels > 0
+    assert cold.stats.seeded_labels == 0
+
+def test_fixed_point_engine_matches_float():
+    """定点引擎 (int32 时间 / int64 成本) 在取整不影响支配的算例上与浮点引擎返回的列和 reduced cost 相同，label 更小"""
+    b = PricingDataBuilder(8)
+    b.capacity = 70
+    b.demands = [0, 10, 20, 30, 15, 25, 10, 5]
+    b.service_times = [0.0] + [2.5] * 7
+    for i in range(8):
+        for j in range(8):
+            if i != j:
+                b.set_edge(i, j, math.sqrt(30 + (i - j) ** 2 * 7), time=math.sqrt(20 + (i * 3 - j) ** 2))
+    b.tw_start = [0.0, 0.0, 10.0, 20.0, 0.0, 30.0, 15.0, 5.0]
+    b.tw_end = [250.0, 60.0, 80.0, 100.0, 120.0, 150.0, 90.0, 70.0]
+    duals = [0.0, 40.3, 55.1, 30.7, 45.2, 60.9, 35.4, 25.05]
+    p = b.to_cpp_input()
+
+    for load_buckets in (0, 4):
+        base = m.LabelingSolver(p, 1.0, load_buckets=load_buckets)
+        fixed = m.LabelingSolver(p, 1.0, load_buckets=load_buckets, fixed_point=10000)
+        assert (base.fixed_point, fixed.fixed_point) == (0, 10000)
+        assert fixed.label_bytes < base.label_bytes
+        for forbidden in ([], [(0, 2), (3, 5)]):
+            a = base.solve_columns(duals, forbidden_arcs=forbidden)
+            f = fixed.solve_columns(duals, forbidden_arcs=forbidden)
+            assert sorted(c.path for c in f) == sorted(c.path for c in a)
+            assert [c.reduced_cost for c in f] == pytest.approx([c.reduced_cost for c in a], abs=1e-9)
+            assert sorted(c.duration for c in f) == pytest.approx(sorted(c.duration for c in a), abs=1e-9)
+            assert all(e.feasible for e in m.evaluate_routes(p, [c.path for c in f]))
+
+    # 计划期 × 缩放倍数超出 int32 的安全范围
+    with pytest.raises(ValueError):
+        m.LabelingSolver(p, 1.0, fixed_point=10**8)
@@ -0,0 +1,27 @@
+import pricing_lib as m
+from src.recording import PricingRecorder, load_snapshots
+from test_alns import make_random_data
+
+
+def test_recorder_round_trip(tmp_path):
+    """录制的快照回放后，引擎结果与原调用一致"""
+    p = make_random_data(12, seed=5)
+    p.ng_neighbor_lists = [list(range(p.num_nodes)) for _ in range(p.num_nodes)]
+    duals = [0.0] + [60.0] * 12
+
+    rec = PricingRecorder(p, name="toy")
+    rec.record(duals, [], bucket_step=1.0, limit=50)
+    rec.record(duals, [(0, 3), (4, 7)], bucket_step=2.0, limit=20, max_per_customer=3)
+    path = str(tmp_path / "toy.npz")
+    rec.save(path)
+
+    data, snaps, name = load_snapshots(path)
+    assert name == "toy" and len(snaps) == 2
+    assert snaps[1]["forbidden_arcs"] == [(0, 3), (4, 7)]
+    assert (snaps[1]["bucket_step"], snaps[1]["limit"], snaps[1]["max_per_customer"]) == (2.0, 20, 3)
+
+    for snap in snaps:
+        args = (snap["duals"], snap["forbidden_arcs"], snap["limit"], snap["max_per_customer"])
+        original = m.LabelingSolver(p, snap["bucket_step"]).solve(*args)
+        replayed = m.LabelingSolver(data, snap["bucket_step"]).solve(*args)
+        assert replayed == original
@@ -0,0 +1,44 @@
+import pytest
+from src.instance import VRPTWInstance
+from src.service import SharedInstanceStore, SolveService, attach_instance
+from src.branching import BranchAndBoundEngine
+
+pytest.importorskip("highspy")
+
+DATA = "data/C101.txt"
+
+
+def test_shared_instance_round_trip():
+    """共享内存重建的算例与直接解析的算例完全一致"""
+    direct = VRPTWInstance(DATA, max_customers=12, verbose=False)
+    store = SharedInstanceStore()
+    try:
+        handle = store.get(DATA, 12)
+        assert store.get(DATA, 12) is handle  # 同一 (文件, 客户数) 只发布一次
+        rebuilt = attach_instance(handle)
+    finally:
+        store.close()
+    assert rebuilt.customers == direct.customers
+    assert rebuilt.vehicle_capacity == direct.vehicle_capacity
+    assert rebuilt.dist_matrix == direct.dist_matrix
+    assert rebuilt.ng_masks == direct.ng_masks
+
+
+def test_service_solves_and_expires():
+    """常驻 worker 的结果与直接求解一致；排队超时的请求不求解直接返回 Expired"""
+    instance = VRPTWInstance(DATA, max_customers=10, verbose=False)
+    direct_obj, _ = BranchAndBoundEngine(instance, verbose=False, lp_backend="highs").solve(global_time_limit=10)
+
+    with SolveService(workers=1, lp_backend="highs") as service:
+        first = service.submit(DATA, time_limit=10, max_customers=10)
+        late = service.submit(DATA, time_limit=10, max_customers=10, queue_timeout=0.0)
+        again = service.solve(DATA, time_limit=10, max_customers=10)
+        res = first.result()
+        stats = service.stats()
+
+    assert late.result()["status"] == "Expired"
+    for r in (res, again):
+        assert r["status"] == "Optimal"
+        assert r["objective"] == pytest.approx(direct_obj)
+    assert res["worker"] == again["worker"]  # 同一个常驻进程
+    assert (stats["completed"], stats["expired"], stats["instances"]) == (2, 1, 1)
@@ -0,0 +1,75 @@
+import pytest
+from src.instance import VRPTWInstance
+from src.pricing import build_problem_data
+from src.solver import CGSolver
+
+
+@pytest.mark.parametrize("name", ["R101", "C201"])
+def test_sparse_matches_dense(name):
+    """稀疏模式 (CSR 候选弧 + 坐标现算距离) 与稠密矩阵给出完全相同的近邻表、ng 集合和距离"""
+    dense = VRPTWInstance(f"data/{name}.txt", max_customers=60, verbose=False)
+    sparse = VRPTWInstance(f"data/{name}.txt", max_customers=60, verbose=False, sparse=True)
+    assert sparse.ng_masks == dense.ng_masks
+    assert all(sparse.dist(i, j) == dense.dist_matrix[i][j] == sparse.dist_matrix[i][j]
+               for i in range(dense.num_nodes) for j in range(dense.num_nodes))
+
+    d, s = build_problem_data(dense), build_problem_data(sparse)
+    assert s.sparse and not s.dist_matrix and not d.sparse
+    assert s.neighbors == d.neighbors
+    assert s.ng_neighbor_lists == d.ng_neighbor_lists
+
+    offsets, targets, dists = sparse.candidate_arcs()
+    assert len(offsets) == sparse.num_nodes + 1 and offsets[-1] == len(targets) == len(dists)
+    assert all(dists[k] == dense.dist_matrix[i][targets[k]]
+               for i in range(sparse.num_nodes) for k in range(offsets[i], offsets[i + 1]))
+
+
+def test_sparse_root_lp_matches_dense():
+    pytest.importorskip("highspy")
+    objs = []
+    for sparse in (False, True):
+        inst = VRPTWInstance("data/RC101.txt", max_customers=30, verbose=False, sparse=sparse)
+        ok, obj, _ = CGSolver(inst, verbose=False, lp_backend="highs").solve_with_constraints([])
+        assert ok
+        objs.append(obj)
+    assert objs[0] == objs[1]
+
+
+def _ng_feasible(path, ng_sets):
+    memory = set()
+    for v in path[1:-1]:
+        if v in memory:
+            return False
+        memory = (memory & ng_sets[v]) | {v}
+    return True
+
+
+def test_pricing_respects_ng_sets_beyond_256_nodes():
+    """400 个客户 (节点下标超过 FastBitset 的 256 位)：定价返回的列都满足 ng-route 约束，且都是可行路径"""
+    import numpy as np
+    from benchmark_memory import make_customers
+    from src.pricing import PricingSolver
+
+    inst = VRPTWInstance.from_arrays(make_customers(400), 200, sparse=True)
+    pricing = PricingSolver(inst)
+    pricing.set_params(limit=500)
+    rng = np.random.default_rng(0)
+    duals = [0.0] + rng.uniform(50, 150, inst.num_nodes - 1).tolist()
+    result = pricing.solve(duals)
+    assert len(result) > 0
+    ng_sets = [set(ng) | {i} for i, ng in enumerate(pricing.cpp_data.ng_neighbor_lists)]
+    paths = [result.path(k) for k in range(len(result))]
+    assert any(max(p) >= 256 for p in paths)
+    assert all(_ng_feasible(p, ng_sets) for p in paths)
+    assert all(e.feasible for e in pricing.evaluate(paths))
+
+
+def test_elementary_pricing_rejects_more_than_256_nodes():
+    """没有 ng-set (基本路径) 时记忆集是全集，超过 256 个节点直接报错，而不是静默放过重复访问"""
+    import pricing_lib
+    from benchmark_memory import make_customers
+
+    data = build_problem_data(VRPTWInstance.from_arrays(make_customers(300), 200, sparse=True))
+    data.ng_neighbor_lists = []
+    with pytest.raises(ValueError, match="256"):
+        pricing_lib.LabelingSolver(data, 1.0)